@@ -0,0 +1,6 @@
+"""
+Benchmarks for DocuChat
+
+Standalone scripts, run from the repository root, e.g.
+``python -m benchmarks.bench_page_mapping``.
+"""
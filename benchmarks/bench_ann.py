@@ -0,0 +1,84 @@
+"""
+Approximate search benchmark.
+
+Measures recall@k and per-query latency of IVFIndex across nprobe values,
+against exact NumpyVectorIndex search over the same synthetic, clustered
+collection. Use it to pick nlist/nprobe for a latency budget.
+
+Usage:
+    python -m benchmarks.bench_ann [--rows 200000] [--dimension 384] [--nprobe 1 4 16 64]
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.ivf_index import IVFIndex
+from src.numpy_index import NumpyVectorIndex
+
+
+def clustered_vectors(rows: int, dimension: int, topics: int, spread: float,
+                      seed: int = 0) -> np.ndarray:
+    """Vectors grouped around topic centers, like embeddings of a document archive."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(0, topics, rows)]
+    vectors += spread * rng.normal(size=vectors.shape).astype(np.float32)
+    return vectors
+
+
+def timed_search(index, queries: np.ndarray, top_k: int, **options):
+    """Search one query at a time; returns (result ids, mean ms per query)."""
+    start = time.perf_counter()
+    results = [index.search(query, top_k, **options)[0] for query in queries]
+    elapsed = time.perf_counter() - start
+    return [[r["chunk_id"] for r in hits] for hits in results], 1000 * elapsed / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--spread", type=float, default=1.5,
+                        help="noise around topic centers; higher is harder")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+    
+    vectors = clustered_vectors(args.rows + args.queries, args.dimension, args.topics,
+                                args.spread)
+    vectors, queries = vectors[:args.rows], vectors[args.rows:]
+    ids = [f"doc.pdf_chunk_{i}" for i in range(args.rows)]
+    texts = [""] * args.rows
+    metadatas = [{}] * args.rows
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = NumpyVectorIndex(f"{tmp}/exact")
+        exact.add(ids, texts, metadatas, vectors)
+        
+        start = time.perf_counter()
+        ivf = IVFIndex(f"{tmp}/ivf", nlist=args.nlist, train_threshold=args.rows)
+        ivf.add(ids, texts, metadatas, vectors)
+        build_seconds = time.perf_counter() - start
+        
+        truth, exact_ms = timed_search(exact, queries, args.top_k)
+        print(f"{args.rows} rows x {args.dimension} dims, "
+              f"{len(ivf.centroids)} cells (trained in {build_seconds:.1f}s)")
+        print(f"{'search':>12} {f'recall@{args.top_k}':>10} {'ms/query':>9} {'speedup':>8}")
+        print(f"{'exact':>12} {1.0:>10.3f} {exact_ms:>9.2f} {1.0:>7.1f}x")
+        
+        for nprobe in args.nprobe:
+            found, ms = timed_search(ivf, queries, args.top_k, nprobe=nprobe)
+            recall = np.mean([
+                len(set(a) & set(b)) / len(b) for a, b in zip(found, truth)
+            ])
+            print(f"{f'nprobe={nprobe}':>12} {recall:>10.3f} {ms:>9.2f} {exact_ms / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
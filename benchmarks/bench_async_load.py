@@ -0,0 +1,138 @@
+"""
+Async query load test.
+
+Drives RAGPipeline.aquery() with closed-loop clients at increasing
+concurrency (1-256 by default) and reports p50/p99 latency and QPS per
+level. Retrieval runs over a synthetic NumPy index with deterministic hash
+embeddings; answers come from a local mock OpenAI-compatible server
+(requires openai) or, with ``--llm fake``, from the in-process
+FakeProvider with the same delays.
+
+Usage:
+    python -m benchmarks.bench_async_load [--concurrency 1 4 16 64 256] [--llm server|fake]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.mock_llm_server import MockLLMServer
+from src.context_builder import ContextBuilder
+from src.document_processor import DocumentChunk
+from src.llm_interface import FakeProvider, LLMInterface
+from src.rag_pipeline import RAGPipeline
+from src.retriever import Retriever
+from src.vector_store import VectorStore
+
+
+class HashEmbedder:
+    """Deterministic pseudo-embeddings, so the benchmark needs no model."""
+    
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+    
+    def generate_embeddings(self, texts):
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+            vectors[i] = np.random.default_rng(seed).normal(size=self.dimension)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def build_store(persist_dir: str, chunks: int, embedder: HashEmbedder) -> VectorStore:
+    """NumPy vector store filled with synthetic chunks."""
+    store = VectorStore(persist_dir=persist_dir, provider="numpy")
+    documents = [
+        DocumentChunk(text=f"Clause {i}: the supplier shall notify the buyer within {i % 90} days.",
+                      metadata={"source": f"contract_{i // 50}.pdf", "pages": [i % 50 + 1]},
+                      chunk_id=f"contract_{i // 50}.pdf_chunk_{i % 50}")
+        for i in range(chunks)
+    ]
+    for start in range(0, chunks, 10_000):
+        batch = documents[start:start + 10_000]
+        store.add_documents(batch, embedder.generate_embeddings([c.text for c in batch]))
+    return store
+
+
+async def run_level(pipeline: RAGPipeline, concurrency: int, requests: int, level: int):
+    """Closed loop: ``concurrency`` clients each send their next question on answer."""
+    latencies = []
+    counter = iter(range(requests))
+    
+    async def client():
+        for n in counter:
+            start = time.perf_counter()
+            await pipeline.aquery(f"Notice period for clause {level}-{n}?", top_k=5)
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return np.array(latencies), time.perf_counter() - start
+
+
+async def run(args, store: VectorStore, embedder: HashEmbedder, llm: LLMInterface):
+    retriever = Retriever(store, embedder)
+    context_builder = ContextBuilder(max_tokens=1500)
+    print(f"{'conc':>5} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'QPS':>9}")
+    for level, concurrency in enumerate(args.concurrency):
+        pipeline = RAGPipeline(None, embedder, store, retriever, llm,
+                               context_builder=context_builder,
+                               max_concurrency=concurrency,
+                               retrieval_workers=args.retrieval_workers)
+        requests = max(args.requests, 4 * concurrency)
+        latencies, elapsed = await run_level(pipeline, concurrency, requests, level)
+        pipeline.close()
+        p50, p99 = np.percentile(latencies * 1000, [50, 99])
+        print(f"{concurrency:>5} {requests:>9} {p50:>9.1f} {p99:>9.1f} "
+              f"{requests / elapsed:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+",
+                        default=[1, 2, 4, 8, 16, 32, 64, 128, 256])
+    parser.add_argument("--requests", type=int, default=64,
+                        help="Minimum requests per level (at least 4 per client)")
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--retrieval-workers", type=int, default=8)
+    parser.add_argument("--llm", choices=["server", "fake"], default="server")
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    args = parser.parse_args()
+    
+    embedder = HashEmbedder(args.dimension)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store = build_store(tmp, args.chunks, embedder)
+        print(f"Indexed {args.chunks} chunks in {time.perf_counter() - start:.1f}s; "
+              f"LLM: {args.llm} ({args.first_token_delay * 1000:.0f} ms to first token, "
+              f"{args.tokens} tokens at {args.token_delay * 1000:.0f} ms)")
+        
+        server = None
+        if args.llm == "server":
+            server = MockLLMServer(tokens=args.tokens, first_token_delay=args.first_token_delay,
+                                   token_delay=args.token_delay).start_in_thread()
+            llm = LLMInterface(model_name="mock", max_tokens=args.tokens, provider="openai",
+                               provider_options={"api_key": "mock",
+                                                 "base_url": server.base_url,
+                                                 "max_connections": max(args.concurrency)})
+        else:
+            words = " ".join(f"word{i}" for i in range(args.tokens))
+            llm = LLMInterface(model_name="fake", max_tokens=args.tokens,
+                               provider=FakeProvider(words, token_delay=args.token_delay,
+                                                     first_token_delay=args.first_token_delay))
+        
+        asyncio.run(run(args, store, embedder, llm))
+        if server is not None:
+            print(f"{server.requests} LLM requests over {server.connections} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+BM25 lexical index benchmark.
+
+Builds a BM25Index over a synthetic corpus whose word frequencies follow a
+Zipf distribution (like natural text), adding chunks in ingestion-sized
+batches, then reports ingestion throughput as the index grows (flat with
+the tiered segment merges), build time, on-disk size and per-query latency
+percentiles for short keyword queries.
+
+Usage:
+    python -m benchmarks.bench_bm25 [--chunks 1000000] [--words-per-chunk 80]
+                                    [--add-size 256]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.bm25_index import BM25Index
+
+
+def zipf_corpus(chunks: int, words_per_chunk: int, vocabulary: int, seed: int = 0):
+    """Yield (chunk_ids, texts) batches of synthetic Zipf-distributed text."""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}" for i in range(vocabulary)])
+    weights = 1.0 / np.arange(1, vocabulary + 1)
+    weights /= weights.sum()
+    batch = 10_000
+    for start in range(0, chunks, batch):
+        count = min(batch, chunks - start)
+        tokens = rng.choice(vocabulary, size=(count, words_per_chunk), p=weights)
+        yield (
+            [f"doc.pdf_chunk_{start + i}" for i in range(count)],
+            [" ".join(row) for row in words[tokens]],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--words-per-chunk", type=int, default=80)
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-words", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--add-size", type=int, default=256,
+                        help="Chunks per add() call (the ingestion batch size)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        index = BM25Index(tmp)
+        print(f"{'chunks':>10} {'seconds':>8} {'chunks/s':>9} {'segments':>9}")
+        report_every = max(args.chunks // 8, 1)
+        added = reported = 0
+        start = interval_start = time.perf_counter()
+        for chunk_ids, texts in zipf_corpus(args.chunks, args.words_per_chunk,
+                                            args.vocabulary):
+            for offset in range(0, len(chunk_ids), args.add_size):
+                index.add(chunk_ids[offset:offset + args.add_size],
+                          texts[offset:offset + args.add_size])
+            added += len(chunk_ids)
+            if added - reported >= report_every or added == args.chunks:
+                now = time.perf_counter()
+                print(f"{added:>10} {now - start:>8.1f} "
+                      f"{(added - reported) / (now - interval_start):>9.0f} "
+                      f"{len(index._segments):>9}")
+                interval_start, reported = now, added
+        index.save()
+        build_seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(os.path.join(tmp, "bm25.npz")) / 2**20
+        postings = len(index._segments[0]) if index._segments else 0
+        
+        print(f"{args.chunks} chunks x {args.words_per_chunk} words, "
+              f"{len(index._terms)} terms, {postings} postings")
+        print(f"built in {build_seconds:.1f}s, {size_mb:.1f} MB on disk")
+        
+        # Query words drawn uniformly from the 10,000 most frequent terms:
+        # content words, from rare to very common (the top ranks behave like
+        # stop words and are the expensive case)
+        rng = np.random.default_rng(1)
+        print(f"{'query terms':>16} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for label, low, high in (("rank 100-10000", 100, 10_000),
+                                 ("rank 0-10000", 0, 10_000)):
+            latencies = []
+            for _ in range(args.queries):
+                terms = rng.integers(low, min(high, args.vocabulary), args.query_words)
+                query = " ".join(f"w{t}" for t in terms)
+                start = time.perf_counter()
+                index.search(query, args.top_k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            p50, p95 = np.percentile(latencies, [50, 95])
+            print(f"{label:>16} {p50:>8.2f} {p95:>8.2f} {max(latencies):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Chunk container memory benchmark.
+
+Chunks a synthetic corpus with DocumentProcessor and compares the memory
+held by the per-chunk DocumentChunk lists against the columnar
+ChunkStore, measured with tracemalloc, plus the time to build each and
+to read every chunk's text back.
+
+Usage:
+    python -m benchmarks.bench_chunk_memory [--documents 200] [--pages 20]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from src.document_processor import DocumentProcessor
+
+WORDS = ("notice period contract party clause termination agreement payment "
+         "liability schedule section warranty effective date obligations").split()
+
+
+def make_corpus(documents: int, pages: int, words_per_page: int, seed: int):
+    rng = random.Random(seed)
+    return {
+        f"doc{d}.pdf": {
+            p: " ".join(rng.choice(WORDS) for _ in range(words_per_page))
+            for p in range(1, pages + 1)
+        }
+        for d in range(documents)
+    }
+
+
+def measure(build):
+    """Build the chunks, returning (result, bytes held, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    corpus = make_corpus(args.documents, args.pages, args.words_per_page, args.seed)
+    processor = DocumentProcessor(chunk_size=args.chunk_size,
+                                  chunk_overlap=args.chunk_overlap, max_chunks_per_doc=None)
+    
+    builders = {
+        "list": lambda: [processor.create_chunks(pages, name)
+                         for name, pages in corpus.items()],
+        "columnar": lambda: [processor.create_chunk_store(pages, name)
+                             for name, pages in corpus.items()],
+    }
+    print(f"{args.documents} documents x {args.pages} pages, chunk_size={args.chunk_size}, "
+          f"overlap={args.chunk_overlap}")
+    print(f"{'container':>9} {'chunks':>8} {'MiB':>8} {'B/chunk':>8} {'build s':>8} "
+          f"{'read s':>7}")
+    for name, build in builders.items():
+        documents, held, build_seconds = measure(build)
+        count = sum(len(chunks) for chunks in documents)
+        start = time.perf_counter()
+        for chunks in documents:
+            for chunk in chunks:
+                chunk.text
+        read_seconds = time.perf_counter() - start
+        print(f"{name:>9} {count:>8} {held / 2 ** 20:>8.1f} {held / count:>8.0f} "
+              f"{build_seconds:>8.2f} {read_seconds:>7.2f}")
+        del documents
+
+
+if __name__ == "__main__":
+    main()
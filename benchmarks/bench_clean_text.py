@@ -0,0 +1,88 @@
+"""
+Text cleaning microbenchmark.
+
+Times the original chain of re.sub / str.replace passes against the
+precompiled TextNormalizer over a fixed, seeded page corpus and checks the
+output is byte-identical.
+
+Usage:
+    python -m benchmarks.bench_clean_text [--pages 500] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import timeit
+from typing import List
+
+from src.text_normalizer import TextNormalizer
+
+VOCABULARY = (
+    "The contract shall be terminated upon 30 days written notice . "
+    "Section 4.2(b) liability indemnity “quoted” ‘single’ — – … © ™ • "
+    "Page 12 page 3 2024 $1,200.50 % café naïve 中文 x_1 a12 12b ; : ! ?"
+).split(" ")
+
+
+def page_corpus(num_pages: int, seed: int = 42) -> List[str]:
+    """Generate PDF-like pages: short lines, blank lines, running footers."""
+    rng = random.Random(seed)
+    pages = []
+    for page_num in range(1, num_pages + 1):
+        lines = []
+        for _ in range(rng.randint(30, 60)):
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(4, 14))]
+            lines.append(" ".join(words))
+            if rng.random() < 0.1:
+                lines.append("")
+        lines.append(f"\t  Page {page_num}  ")
+        pages.append("\n".join(lines))
+    return pages
+
+
+def legacy_clean_text(text: str) -> str:
+    """The original DocumentProcessor.clean_text, pass for pass."""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'Page \d+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'[^\w\s.,!?;:()\-\'"]+', '', text)
+    text = re.sub(r'\b\d+\b', '', text)
+    text = text.replace('"', '"').replace('"', '"')
+    text = text.replace(', "\'").replace(', "'")
+    return text.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    pages = page_corpus(args.pages)
+    normalizer = TextNormalizer()
+    
+    mismatches = sum(
+        normalizer.normalize(page) != legacy_clean_text(page) for page in pages
+    )
+    total_mb = sum(len(page) for page in pages) / 1e6
+    
+    results = {}
+    for name, clean in [("legacy chain", legacy_clean_text),
+                        ("TextNormalizer", normalizer.normalize)]:
+        best = min(timeit.repeat(
+            lambda: [clean(page) for page in pages],
+            number=1, repeat=args.repeat
+        ))
+        results[name] = best
+        print(
+            f"{name:<16} {best * 1000:>8.1f} ms  "
+            f"{args.pages / best:>9.0f} pages/s  {total_mb / best:>6.1f} MB/s"
+        )
+    
+    print(f"speedup: {results['legacy chain'] / results['TextNormalizer']:.2f}x, "
+          f"identical output: {mismatches == 0}")
+    if mismatches:
+        raise SystemExit(f"{mismatches} pages differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compressed storage benchmark.
+
+Reports, per compression mode, the memory the search path keeps resident,
+recall@k against exact float32 search, and per-query latency, with and
+without exact re-ranking from the float rows.
+
+Usage:
+    python -m benchmarks.bench_compression [--rows 200000] [--dimension 384]
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_ann import clustered_vectors, timed_search
+from src.numpy_index import NumpyVectorIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--spread", type=float, default=1.5)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--pq-subspaces", type=int, default=None)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    args = parser.parse_args()
+    
+    vectors = clustered_vectors(args.rows + args.queries, args.dimension, args.topics,
+                                args.spread)
+    vectors, queries = vectors[:args.rows], vectors[args.rows:]
+    ids = [f"doc.pdf_chunk_{i}" for i in range(args.rows)]
+    texts = [""] * args.rows
+    metadatas = [{}] * args.rows
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = NumpyVectorIndex(f"{tmp}/float32")
+        exact.add(ids, texts, metadatas, vectors)
+        truth, exact_ms = timed_search(exact, queries, args.top_k)
+        float_mb = exact._vectors.nbytes / 2**20
+        
+        print(f"{args.rows} rows x {args.dimension} dims")
+        print(f"{'mode':>14} {'search MB':>10} {f'recall@{args.top_k}':>10} {'ms/query':>9}")
+        print(f"{'float32':>14} {float_mb:>10.1f} {1.0:>10.3f} {exact_ms:>9.2f}")
+        
+        for mode in ("int8", "pq"):
+            start = time.perf_counter()
+            index = NumpyVectorIndex(f"{tmp}/{mode}", compression=mode,
+                                     pq_subspaces=args.pq_subspaces,
+                                     compression_train_rows=args.rows)
+            index.add(ids, texts, metadatas, vectors)
+            build_seconds = time.perf_counter() - start
+            codes_mb = index._codes.nbytes / 2**20
+            
+            for rerank_factor in (1, args.rerank_factor):
+                index.rerank_factor = rerank_factor
+                found, ms = timed_search(index, queries, args.top_k)
+                recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, truth)])
+                label = mode if rerank_factor == 1 else f"{mode}+rerank{rerank_factor}"
+                print(f"{label:>14} {codes_mb:>10.1f} {recall:>10.3f} {ms:>9.2f}")
+            print(f"{'':>14} ({mode} trained and encoded in {build_seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
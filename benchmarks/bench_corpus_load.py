@@ -0,0 +1,125 @@
+"""
+Index cold-start benchmark.
+
+Builds a NumpyVectorIndex of synthetic chunks, then loads it in fresh
+processes before and after checkpointing its rows into corpus segments and
+reports start-up time, resident memory and the latency of fetching chunks
+by ID, plus the time of a full and of a one-row checkpoint.
+
+Usage:
+    python -m benchmarks.bench_corpus_load [--rows 200000] [--text-chars 800]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.numpy_index import NumpyVectorIndex
+
+WORDS = ("notice period contract party clause termination agreement payment "
+         "liability schedule section warranty effective date obligations").split()
+
+
+def rss_mib() -> float:
+    """Current resident set size of this process."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def build(index_dir: str, rows: int, text_chars: int, dimension: int, seed: int):
+    rng = np.random.default_rng(seed)
+    words = random.Random(seed)
+    index = NumpyVectorIndex(index_dir)
+    for start in range(0, rows, 10_000):
+        batch = range(start, min(start + 10_000, rows))
+        texts = [" ".join(words.choice(WORDS) for _ in range(text_chars // 8))[:text_chars]
+                 for _ in batch]
+        index.add(
+            [f"doc{i // 100}.pdf_chunk_{i % 100}" for i in batch], texts,
+            [{"source": f"doc{i // 100}.pdf", "pages": [i % 100 // 5 + 1],
+              "chunk_index": i % 100, "start_char": (i % 100) * 600,
+              "end_char": (i % 100) * 600 + text_chars, "ingested_at": 1.7e9 + i}
+             for i in batch],
+            rng.normal(size=(len(batch), dimension)).astype(np.float32)
+        )
+    return index
+
+
+def load(index_dir: str, lookups: int, seed: int) -> dict:
+    """Measure a cold load in a fresh process."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_corpus_load", "--child", index_dir,
+         "--lookups", str(lookups), "--seed", str(seed)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def child(index_dir: str, lookups: int, seed: int):
+    """Load the index, fetch chunks by ID and print the measurements as JSON."""
+    baseline = rss_mib()
+    start = time.perf_counter()
+    index = NumpyVectorIndex(index_dir)
+    load_seconds = time.perf_counter() - start
+    loaded_rss = rss_mib()
+    
+    rng = random.Random(seed)
+    ids = [f"doc{i // 100}.pdf_chunk_{i % 100}"
+           for i in (rng.randrange(len(index)) for _ in range(lookups))]
+    start = time.perf_counter()
+    for chunk_id in ids:
+        index.get([chunk_id])
+    get_us = (time.perf_counter() - start) / lookups * 1e6
+    print(json.dumps({"load_seconds": load_seconds, "rss_mib": loaded_rss - baseline,
+                      "get_us": get_us}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--text-chars", type=int, default=800)
+    parser.add_argument("--dimension", type=int, default=64)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(args.child, args.lookups, args.seed)
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        index_dir = os.path.join(tmp, "index")
+        start = time.perf_counter()
+        index = build(index_dir, args.rows, args.text_chars, args.dimension, args.seed)
+        jsonl_mib = os.path.getsize(os.path.join(index_dir, "rows.jsonl")) / 2 ** 20
+        print(f"Built {args.rows} rows in {time.perf_counter() - start:.1f}s "
+              f"(rows.jsonl {jsonl_mib:.0f} MiB)")
+        results = {"jsonl": load(index_dir, args.lookups, args.seed)}
+        
+        start = time.perf_counter()
+        index.checkpoint()
+        full_seconds = time.perf_counter() - start
+        index.add(["extra"], ["extra"], [{"source": "extra.pdf"}],
+                  np.ones((1, args.dimension), dtype=np.float32))
+        start = time.perf_counter()
+        index.checkpoint()
+        print(f"Checkpoint: {full_seconds:.2f}s for every row, "
+              f"{(time.perf_counter() - start) * 1e3:.1f}ms after a one-row add")
+        results["corpus"] = load(index_dir, args.lookups, args.seed)
+        
+        print(f"{'rows from':>10} {'load s':>8} {'RSS MiB':>8} {'get us':>7}")
+        for mode, result in results.items():
+            print(f"{mode:>10} {result['load_seconds']:>8.2f} {result['rss_mib']:>8.0f} "
+                  f"{result['get_us']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
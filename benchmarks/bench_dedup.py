@@ -0,0 +1,93 @@
+"""
+Chunk deduplication benchmark.
+
+Generates a corpus of policy documents, each with several lightly edited
+revisions and a boilerplate disclaimer page, chunks it and filters the
+chunks through a ChunkDeduplicator at several thresholds. Reports how
+many chunks (and characters) no longer need embedding and the filtering
+throughput.
+
+Usage:
+    python -m benchmarks.bench_dedup [--documents 100] [--revisions 4]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+
+from src.deduplication import ChunkDeduplicator
+from src.document_processor import DocumentProcessor
+
+WORDS = ("notice period contract party clause termination agreement payment "
+         "liability schedule section warranty effective date obligations records "
+         "retention audit employee privacy request officer incident").split()
+
+DISCLAIMER = (
+    "This document is provided for internal use only. It does not constitute legal "
+    "advice. Printed copies are uncontrolled; always refer to the policy portal for "
+    "the current version. Questions about this policy should be directed to the "
+    "compliance office. "
+) * 3
+
+
+def sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def revise(text: str, rng: random.Random, edits: int) -> str:
+    words = text.split(" ")
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def make_corpus(documents: int, revisions: int, pages: int, edits: int, seed: int):
+    """{name: {page: text}} with revisions of each document and a shared disclaimer."""
+    rng = random.Random(seed)
+    corpus = {}
+    for d in range(documents):
+        base = {p: " ".join(sentence(rng) for _ in range(30)) for p in range(1, pages + 1)}
+        for r in range(revisions):
+            pages_text = {p: revise(text, rng, edits * r) for p, text in base.items()}
+            pages_text[pages + 1] = DISCLAIMER
+            corpus[f"policy{d}_rev{r}.pdf"] = pages_text
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--revisions", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--edits", type=int, default=3,
+                        help="Words changed per page and revision step")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.85, 0.95, 1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    processor = DocumentProcessor(chunk_size=800, chunk_overlap=200, max_chunks_per_doc=None)
+    corpus = make_corpus(args.documents, args.revisions, args.pages, args.edits, args.seed)
+    chunks = [chunk for name, pages in corpus.items()
+              for chunk in processor.create_chunks(pages, name)]
+    chars = sum(len(chunk.text) for chunk in chunks)
+    print(f"{len(corpus)} documents ({args.documents} x {args.revisions} revisions), "
+          f"{len(chunks)} chunks, {chars} characters")
+    print(f"{'threshold':>9} {'stored':>7} {'exact':>6} {'near':>6} {'saved':>6} "
+          f"{'chars saved':>11} {'chunks/s':>9}")
+    
+    for threshold in args.thresholds:
+        with tempfile.TemporaryDirectory() as tmp:
+            dedup = ChunkDeduplicator(tmp, threshold=threshold)
+            start = time.perf_counter()
+            unique, _ = dedup.filter(chunks)
+            elapsed = time.perf_counter() - start
+            stats = dedup.stats
+            print(f"{threshold:>9.2f} {len(unique):>7} {stats.exact_duplicates:>6} "
+                  f"{stats.near_duplicates:>6} {stats.saved_fraction:>6.0%} "
+                  f"{stats.saved_chars / chars:>11.0%} {len(chunks) / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Embedding throughput benchmark.
+
+Measures texts/s of EmbeddingGenerator.generate_embeddings across batch
+sizes, against encoding the same batches in arrival order, using the model
+configured in config/config.yaml. Requires sentence-transformers.
+
+Usage:
+    python -m benchmarks.bench_embeddings [--texts 2000] [--batch-sizes 1 8 32 128]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from src.embeddings import EmbeddingGenerator
+
+WORDS = (
+    "the contract shall be terminated upon written notice section clause "
+    "liability indemnity policy termination party obligations agreement"
+).split()
+
+
+def mixed_length_texts(count: int, seed: int = 7) -> List[str]:
+    """Chunk-like texts with a wide spread of lengths."""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.choice([8, 20, 60, 140])))
+        for _ in range(count)
+    ]
+
+
+def encode_unsorted(generator: EmbeddingGenerator, texts: List[str],
+                    batch_size: int) -> np.ndarray:
+    """Baseline: batches in arrival order, one encode call each."""
+    return np.concatenate([
+        generator.model.encode(texts[i:i + batch_size], batch_size=batch_size,
+                               convert_to_numpy=True, show_progress_bar=False)
+        for i in range(0, len(texts), batch_size)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+",
+                        default=[1, 8, 16, 32, 64, 128])
+    args = parser.parse_args()
+    
+    generator = EmbeddingGenerator(args.model, device=args.device, normalize=True)
+    texts = mixed_length_texts(args.texts)
+    generator.generate_embeddings(texts[:8])  # load model and warm up
+    
+    print(f"{'batch':>6} {'sorted texts/s':>15} {'unsorted texts/s':>17}")
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        generator.generate_embeddings(texts, batch_size=batch_size)
+        sorted_rate = len(texts) / (time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        encode_unsorted(generator, texts, batch_size)
+        unsorted_rate = len(texts) / (time.perf_counter() - started)
+        
+        print(f"{batch_size:>6} {sorted_rate:>15.1f} {unsorted_rate:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Staged ingestion benchmark.
+
+Generates PDFs and indexes them into a numpy vector store twice: with the
+sequential loop (extract a batch of files, then embed, then write) and
+with the overlapped IngestionPipeline. Embedding is simulated by a model
+that sleeps per chunk, as a GPU or remote embedding service would, so
+the benchmark needs no model download. Reports wall time and per-stage
+metrics of the staged run.
+
+Usage:
+    python -m benchmarks.bench_ingestion [--documents 64] [--workers 4]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import fitz
+import numpy as np
+
+from src.document_processor import DocumentProcessor
+from src.ingestion_pipeline import IngestionPipeline
+from src.vector_store import VectorStore
+
+WORDS = ("notice period contract party clause termination agreement payment "
+         "liability schedule section warranty effective date obligations").split()
+
+FILES_PER_BATCH = 32
+
+
+class SimulatedEmbedder:
+    """Deterministic vectors after a per-chunk delay that releases the GIL."""
+    
+    def __init__(self, seconds_per_chunk: float, dimension: int = 384):
+        self.seconds_per_chunk = seconds_per_chunk
+        self.dimension = dimension
+    
+    def generate_embeddings(self, texts):
+        time.sleep(self.seconds_per_chunk * len(texts))
+        rng = np.random.default_rng(len(texts))
+        return rng.standard_normal((len(texts), self.dimension)).astype(np.float32)
+
+
+def write_corpus(directory: str, documents: int, pages: int, seed: int):
+    rng = random.Random(seed)
+    for d in range(documents):
+        doc = fitz.open()
+        for _ in range(pages):
+            page = doc.new_page()
+            text = " ".join(rng.choice(WORDS) for _ in range(400))
+            page.insert_textbox(fitz.Rect(50, 50, 560, 800), text, fontsize=8)
+        doc.save(os.path.join(directory, f"doc{d}.pdf"))
+        doc.close()
+
+
+def sequential(processor, embedder, store, paths):
+    """The pre-pipeline loop: each stage waits for the previous one."""
+    for start in range(0, len(paths), FILES_PER_BATCH):
+        chunks_by_file = processor.process_files(paths[start:start + FILES_PER_BATCH])
+        for chunks in chunks_by_file.values():
+            if len(chunks):
+                store.add_documents(chunks, embedder.generate_embeddings(
+                    [chunk.text for chunk in chunks]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=64)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--ms-per-chunk", type=float, default=1.0,
+                        help="Simulated embedding time per chunk")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    processor = DocumentProcessor(max_chunks_per_doc=None, workers=args.workers)
+    embedder = SimulatedEmbedder(args.ms_per_chunk / 1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "corpus")
+        os.mkdir(corpus)
+        write_corpus(corpus, args.documents, args.pages, args.seed)
+        paths = sorted(os.path.join(corpus, name) for name in os.listdir(corpus))
+        print(f"{args.documents} documents x {args.pages} pages, {args.workers} workers, "
+              f"{args.ms_per_chunk} ms/chunk embedding")
+        
+        store = VectorStore(os.path.join(tmp, "sequential"), provider="numpy")
+        start = time.perf_counter()
+        sequential(processor, embedder, store, paths)
+        baseline = time.perf_counter() - start
+        print(f"{'sequential':>10}: {baseline:6.2f}s ({len(paths) / baseline:.1f} files/s)")
+        
+        store = VectorStore(os.path.join(tmp, "staged"), provider="numpy")
+        pipeline = IngestionPipeline(processor, embedder, store,
+                                     batch_size=args.batch_size, queue_size=args.queue_size)
+        start = time.perf_counter()
+        report = pipeline.run(paths, on_indexed=lambda path, chunk_ids: None)
+        staged = time.perf_counter() - start
+        print(f"{'staged':>10}: {staged:6.2f}s ({len(paths) / staged:.1f} files/s, "
+              f"{baseline / staged:.2f}x)")
+        
+        print(f"{'stage':>10} {'items':>7} {'rate/s':>8} {'busy':>7} {'idle':>7} "
+              f"{'blocked':>8} {'queue max':>9} {'mean':>5}")
+        for stage in report.stages:
+            print(f"{stage.name:>10} {stage.items:>7} {stage.throughput:>8.1f} "
+                  f"{stage.busy:>6.2f}s {stage.idle:>6.2f}s {stage.blocked:>7.2f}s "
+                  f"{stage.max_queue_depth:>9} {stage.mean_queue_depth:>5.1f}")
+
+
+if __name__ == "__main__":
+    main()
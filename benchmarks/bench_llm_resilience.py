@@ -0,0 +1,66 @@
+"""
+LLM tail latency benchmark.
+
+Sends questions to two fake providers with injected slow responses and
+failures, with retries and failover only and then with hedged requests,
+and reports end-to-end p50/p99 plus each provider's time-to-first-token
+histogram.
+
+Usage:
+    python -m benchmarks.bench_llm_resilience [--requests 400] [--slow-rate 0.05]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.llm_interface import FakeProvider, LLMInterface
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--first-token-delay", type=float, default=0.02)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-delay", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    context = [{"chunk_id": "a_0", "text": "Notice period is thirty days.",
+                "metadata": {"source": "a.pdf", "pages": [2]}, "score": 0.9}]
+    print(f"{args.slow_rate:.0%} of first tokens +{args.slow_delay * 1000:.0f} ms, "
+          f"{args.error_rate:.0%} errors")
+    print(f"{'mode':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hedged':>7}")
+    for hedge in (False, True):
+        providers = [
+            FakeProvider("Thirty days [1].", token_delay=0,
+                         first_token_delay=args.first_token_delay, error_rate=args.error_rate,
+                         slow_rate=args.slow_rate, slow_delay=args.slow_delay,
+                         seed=args.seed + i)
+            for i in range(2)
+        ]
+        llm = LLMInterface(provider=providers[0], fallbacks=[{"provider": providers[1]}],
+                           backoff_base=0.05, hedge=hedge, hedge_min_samples=20,
+                           seed=args.seed)
+        latencies, hedged = [], 0
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = llm.generate_answer("How long is notice?", context)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hedged += response["metadata"]["hedged"]
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        mode = "hedged" if hedge else "retries"
+        print(f"{mode:>8} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {hedged:>7}")
+        
+        for name, stats in llm.latency_stats().items():
+            ttft = stats["time_to_first_token"]
+            print(f"    {name}: {stats['attempts']} attempts, {stats['errors']} errors, "
+                  f"{stats['wins']} answers; first token p50 {ttft['p50'] * 1000:.0f} ms, "
+                  f"p99 {ttft['p99'] * 1000:.0f} ms")
+            print("      " + "  ".join(f"<={bound}s:{n}" for bound, n in ttft["buckets"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Chunk-to-page mapping benchmark.
+
+Compares the previous linear scan over every page range with the sorted
+offset index used by DocumentProcessor.create_chunks, on synthetic
+documents of increasing length, and checks both produce identical
+``pages`` metadata.
+
+Usage:
+    python -m benchmarks.bench_page_mapping [--pages 5000]
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Dict, List
+
+from src.document_processor import DocumentProcessor
+
+
+def synthetic_pages(num_pages: int, seed: int = 0) -> Dict[int, str]:
+    """Generate page texts of varying length, including some empty pages."""
+    rng = random.Random(seed)
+    words = ["contract", "clause", "liability", "section", "policy", "term"]
+    return {
+        page_num: " ".join(rng.choice(words) for _ in range(rng.randint(0, 300)))
+        for page_num in range(1, num_pages + 1)
+    }
+
+
+def scan_pages(start: int, end: int, page_mapping: Dict[tuple, int]) -> List[int]:
+    """Reference implementation: scan every page range for each chunk."""
+    pages = set()
+    for (page_start, page_end), page_num in page_mapping.items():
+        if not (end <= page_start or start >= page_end):
+            pages.add(page_num)
+    return sorted(list(pages))
+
+
+def run(num_pages: int, processor: DocumentProcessor) -> None:
+    page_texts = synthetic_pages(num_pages)
+    
+    started = time.perf_counter()
+    chunks = processor.create_chunks(page_texts, "synthetic.pdf")
+    chunking_time = time.perf_counter() - started
+    
+    # Rebuild the page ranges and time both lookups on the same spans
+    page_mapping = {}
+    page_starts, page_ends, page_numbers = [], [], []
+    current_pos = 0
+    for page_num in sorted(page_texts):
+        page_len = len(processor.clean_text(page_texts[page_num]))
+        page_mapping[(current_pos, current_pos + page_len)] = page_num
+        page_starts.append(current_pos)
+        page_ends.append(current_pos + page_len)
+        page_numbers.append(page_num)
+        current_pos += page_len + 1
+    
+    started = time.perf_counter()
+    for c in chunks:
+        processor._get_pages_for_chunk(
+            c.metadata["start_char"], c.metadata["end_char"],
+            page_starts, page_ends, page_numbers
+        )
+    index_time = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    scanned = [
+        scan_pages(c.metadata["start_char"], c.metadata["end_char"], page_mapping)
+        for c in chunks
+    ]
+    scan_time = time.perf_counter() - started
+    
+    identical = scanned == [c.metadata["pages"] for c in chunks]
+    print(
+        f"{num_pages:>6} pages {len(chunks):>7} chunks | "
+        f"create_chunks {chunking_time * 1000:>9.1f} ms | "
+        f"mapping: linear scan {scan_time * 1000:>9.1f} ms, "
+        f"offset index {index_time * 1000:>6.2f} ms | "
+        f"pages identical: {identical}"
+    )
+    if not identical:
+        raise SystemExit("page metadata mismatch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    processor = DocumentProcessor(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        max_chunks_per_doc=None
+    )
+    
+    sizes = sorted({max(1, args.pages // 8), max(1, args.pages // 4),
+                    max(1, args.pages // 2), args.pages})
+    for num_pages in sizes:
+        run(num_pages, processor)
+
+
+if __name__ == "__main__":
+    main()
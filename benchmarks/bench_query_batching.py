@@ -0,0 +1,101 @@
+"""
+Query embedding micro-batching benchmark.
+
+Compares query-embedding throughput and latency when concurrent callers
+each encode their own query against routing them through
+QueryEmbeddingBatcher, at several client counts. Uses a real
+sentence-transformers model; ``--simulated`` replaces it with an encoder
+whose cost is a fixed per-call overhead plus a small per-text cost, one
+forward pass at a time, for machines without the model.
+
+Usage:
+    python -m benchmarks.bench_query_batching [--clients 1 4 16 64] [--max-wait-ms 2]
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from src.embeddings import EmbeddingGenerator
+from src.query_batcher import QueryEmbeddingBatcher
+
+
+class SimulatedModel:
+    """Encoder costing ``call_ms`` per forward pass plus ``text_ms`` per text."""
+    
+    def __init__(self, call_ms: float, text_ms: float, dimension: int = 384):
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+        self.dimension = dimension
+        self._lock = threading.Lock()
+    
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+    
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        # One forward pass at a time, as on a CPU whose cores one pass saturates
+        with self._lock:
+            time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        return np.ones((len(texts), self.dimension), dtype=np.float32)
+
+
+def run_clients(embedder, clients: int, queries_per_client: int):
+    """Closed loop: each client embeds its next query as soon as the last returns."""
+    latencies = [[] for _ in range(clients)]
+    
+    def client(c):
+        for q in range(queries_per_client):
+            start = time.perf_counter()
+            embedder.generate_embeddings([f"what is the notice period in contract {c}-{q}?"])
+            latencies[c].append(time.perf_counter() - start)
+    
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return np.concatenate([np.array(times) for times in latencies]) * 1000, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--simulated", action="store_true")
+    parser.add_argument("--call-ms", type=float, default=8.0,
+                        help="Simulated per-call cost")
+    parser.add_argument("--text-ms", type=float, default=0.3,
+                        help="Simulated per-text cost")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--queries", type=int, default=50, help="Queries per client")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    
+    model = SimulatedModel(args.call_ms, args.text_ms) if args.simulated else None
+    generator = EmbeddingGenerator(args.model, device=args.device, model=model)
+    generator.generate_embeddings(["warm up"])
+    
+    print(f"max_batch_size={args.max_batch_size}, max_wait_ms={args.max_wait_ms}")
+    print(f"{'clients':>7} {'mode':>8} {'QPS':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for clients in args.clients:
+        for mode in ("direct", "batched"):
+            embedder = generator
+            if mode == "batched":
+                embedder = QueryEmbeddingBatcher(generator, max_batch_size=args.max_batch_size,
+                                                 max_wait_ms=args.max_wait_ms)
+            latencies, elapsed = run_clients(embedder, clients, args.queries)
+            batch = embedder.stats()["mean_batch_size"] if mode == "batched" else 1.0
+            if mode == "batched":
+                embedder.close()
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"{clients:>7} {mode:>8} {len(latencies) / elapsed:>9.1f} "
+                  f"{p50:>8.1f} {p99:>8.1f} {batch:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
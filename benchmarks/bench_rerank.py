@@ -0,0 +1,58 @@
+"""
+Cross-encoder re-ranking latency benchmark.
+
+Measures the latency CrossEncoderReranker adds to a query as the number of
+re-scored candidates N grows, cold (every pair scored) and warm (scores
+served from the pair cache), at a given token budget. Requires
+sentence-transformers.
+
+Usage:
+    python -m benchmarks.bench_rerank [--candidates 10 25 50 100 200] [--max-length 256]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_embeddings import mixed_length_texts
+from src.reranker import CrossEncoderReranker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10, 25, 50, 100, 200])
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=10)
+    args = parser.parse_args()
+    
+    reranker = CrossEncoderReranker(args.model, device=args.device,
+                                    batch_size=args.batch_size, max_length=args.max_length)
+    texts = mixed_length_texts(max(args.candidates))
+    results = [
+        {"chunk_id": f"doc.pdf_chunk_{i}", "text": text, "metadata": {}, "score": 0.0}
+        for i, text in enumerate(texts)
+    ]
+    reranker.rerank("warm up", results[:8])
+    
+    print(f"max_length={args.max_length}, batch_size={args.batch_size}")
+    print(f"{'N':>5} {'cold p50 ms':>12} {'cold p95 ms':>12} {'warm p50 ms':>12}")
+    for n in args.candidates:
+        cold, warm = [], []
+        for q in range(args.queries):
+            query = f"termination notice obligations {n} {q}"
+            start = time.perf_counter()
+            reranker.rerank(query, results[:n], top_k=5)
+            cold.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            reranker.rerank(query, results[:n], top_k=5)
+            warm.append((time.perf_counter() - start) * 1000)
+        p50, p95 = np.percentile(cold, [50, 95])
+        print(f"{n:>5} {p50:>12.1f} {p95:>12.1f} {np.median(warm):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Local mock of an OpenAI-compatible chat completions server.
+
+Answers POST /v1/chat/completions with a fixed number of words, waiting
+``first_token_delay`` seconds before the first and ``token_delay`` between
+words, streamed as server-sent events when the request asks for
+``stream``. Connections are kept alive, and the server counts requests
+and accepted connections so a load test can check that its client reuses
+pooled connections.
+
+Usage:
+    python -m benchmarks.mock_llm_server [--port 8001] [--first-token-delay 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+
+class MockLLMServer:
+    """Streaming chat completions endpoint on asyncio streams."""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, tokens: int = 40,
+                 first_token_delay: float = 0.2, token_delay: float = 0.02):
+        self.host = host
+        self.port = port
+        self.tokens = tokens
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.requests = 0
+        self.connections = 0
+        self._server = None
+        self._loop = None
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+    
+    async def start(self):
+        """Listen on the running loop; port 0 picks a free port."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+    
+    def start_in_thread(self) -> "MockLLMServer":
+        """Serve from a daemon thread with its own event loop."""
+        started = threading.Event()
+        
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+        
+        threading.Thread(target=run, name="mock-llm-server", daemon=True).start()
+        started.wait()
+        return self
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path = request_line.decode("latin-1").split(" ")[:2]
+                
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    self.requests += 1
+                    await self._complete(json.loads(body or b"{}"), writer)
+                else:
+                    writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _complete(self, request: dict, writer: asyncio.StreamWriter):
+        model = request.get("model", "mock")
+        count = min(self.tokens, request.get("max_tokens") or self.tokens)
+        words = [f"word{i}" for i in range(count)]
+        await asyncio.sleep(self.first_token_delay)
+        
+        if not request.get("stream"):
+            await asyncio.sleep(self.token_delay * max(len(words) - 1, 0))
+            payload = json.dumps({
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(words),
+                          "total_tokens": len(words)},
+            }).encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(payload), payload))
+            return
+        
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            text = word if i == 0 else " " + word
+            self._write_event(writer, self._chunk(model, {"content": text}))
+            await writer.drain()
+        self._write_event(writer, self._chunk(model, {}, finish_reason="stop"))
+        self._write_event(writer, "[DONE]")
+        writer.write(b"0\r\n\r\n")
+    
+    @staticmethod
+    def _chunk(model: str, delta: dict, finish_reason=None) -> str:
+        return json.dumps({
+            "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        })
+    
+    @staticmethod
+    def _write_event(writer: asyncio.StreamWriter, data: str):
+        event = f"data: {data}\n\n".encode()
+        writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+    
+    server = MockLLMServer(args.host, args.port, args.tokens,
+                           args.first_token_delay, args.token_delay)
+    
+    async def serve():
+        await server.start()
+        print(f"Mock LLM listening on {server.base_url}")
+        await asyncio.Event().wait()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+"""
+BM25 Index Module
+
+Lexical (BM25) search over chunk texts with a compact postings-array
+inverted index that supports incremental updates.
+"""
+
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Collection, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .metadata_index import MetadataFilter, MetadataIndex
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and identifiers such as "PN-4471-B", "7.3.2" or "ISO/IEC"
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./:]\w+)*")
+PART_PATTERN = re.compile(r"\w+")
+
+# Segments of one size tier (postings within a factor of MERGE_FACTOR)
+# merged together; each posting is rewritten about once per tier
+MERGE_FACTOR = 8
+
+INDEX_FILENAME = "bm25.npz"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased tokens; compound identifiers also yield their parts.
+    
+    "Clause 7.3(b) of PN-4471" gives clause, 7.3, 7, 3, b, of, pn-4471, pn, 4471,
+    so an exact identifier query scores highest while partial ones still match.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(PART_PATTERN.findall(token))
+    return tokens
+
+
+class _Segment:
+    """Immutable CSR postings: sorted term ids, offsets, doc ids and term frequencies."""
+    
+    __slots__ = ("terms", "offsets", "docs", "tfs")
+    
+    def __init__(self, terms: np.ndarray, offsets: np.ndarray, docs: np.ndarray,
+                 tfs: np.ndarray):
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.tfs = tfs
+    
+    @classmethod
+    def from_postings(cls, terms: np.ndarray, docs: np.ndarray, tfs: np.ndarray):
+        """Build from unsorted (term, doc, tf) triples; docs stay ascending per term."""
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+        unique_terms, starts = np.unique(terms, return_index=True)
+        offsets = np.append(starts, len(terms)).astype(np.int64)
+        return cls(unique_terms.astype(np.int32), offsets, docs, tfs)
+    
+    def postings(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        i = np.searchsorted(self.terms, term)
+        if i == len(self.terms) or self.terms[i] != term:
+            return self.docs[:0], self.tfs[:0]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.docs[start:end], self.tfs[start:end]
+    
+    def expanded(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(term, doc, tf) triples, one per posting."""
+        return np.repeat(self.terms, np.diff(self.offsets)), self.docs, self.tfs
+    
+    def __len__(self):
+        return len(self.docs)
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over chunk texts.
+    
+    Features:
+    - Postings stored as numpy arrays (int32 doc ids, uint16 term
+      frequencies) in a few immutable segments, so lookups are a binary
+      search plus an array slice per query term
+    - Incremental adds: each add() writes a new segment; once
+      ``MERGE_FACTOR`` segments share a size tier they are merged into one
+      of the next tier (a logarithmic merge policy, so bulk ingestion stays
+      O(n log n) instead of rewriting the whole index every few adds), and
+      save() merges everything
+    - Deletes and re-adds tombstone the old document; merging drops its
+      postings and save() drops the document itself, renumbering the rest
+    - Per-document arrays grow by doubling their capacity, so many small
+      adds copy each entry O(1) times
+    - A MetadataIndex over the documents, so search(where=...) resolves a
+      metadata filter to a row mask without listing matching chunk IDs
+    - Persistence to a single ``bm25.npz`` under ``index_dir``
+    """
+    
+    def __init__(self, index_dir: str, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the index, loading it from disk if present.
+        
+        Args:
+            index_dir: Directory holding the index file
+            k1: Term-frequency saturation
+            b: Document-length normalization
+        """
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+        
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._chunk_ids: List[str] = []
+        self._doc_of: Dict[str, int] = {}
+        self._lengths = self._lengths_buffer = np.zeros(0, dtype=np.int32)
+        self._deleted = self._deleted_buffer = np.zeros(0, dtype=bool)
+        self._metadata_index = MetadataIndex()
+        self._segments: List[_Segment] = []
+        self._live_length = 0
+        self._dirty = False
+        
+        self._load()
+        logger.info(f"Initialized BM25Index at {index_dir} ({len(self)} chunks)")
+    
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.index_dir, INDEX_FILENAME)
+    
+    def _load(self):
+        if not os.path.exists(self._index_path):
+            return
+        with np.load(self._index_path) as data:
+            self._terms = data["vocab"].tobytes().decode("utf-8").split("\0")
+            self._chunk_ids = data["chunk_ids"].tobytes().decode("utf-8").split("\0")
+            self._lengths = self._lengths_buffer = data["lengths"]
+            self._deleted = self._deleted_buffer = data["deleted"]
+            segment = _Segment(data["terms"], data["offsets"], data["docs"], data["tfs"])
+            if "source_ids" in data.files:
+                sources = data["sources"].tobytes().decode("utf-8").split("\0")
+                self._metadata_index.add_columns(
+                    0, sources if sources != [""] else [], data["source_ids"],
+                    data["first_pages"], data["last_pages"], data["ingested_at"]
+                )
+        if self._terms == [""]:
+            self._terms = []
+        if self._chunk_ids == [""]:
+            self._chunk_ids = []
+        if len(self._metadata_index) != len(self._chunk_ids):
+            logger.warning(f"{self._index_path} has no chunk metadata; filtered keyword "
+                           f"search only matches chunks added from now on")
+            self._metadata_index.add(0, [{}] * len(self._chunk_ids))
+        self._vocab = {term: i for i, term in enumerate(self._terms)}
+        self._doc_of = {
+            chunk_id: doc for doc, chunk_id in enumerate(self._chunk_ids)
+            if not self._deleted[doc]
+        }
+        self._segments = [segment] if len(segment) else []
+        self._live_length = int(self._lengths[~self._deleted].sum())
+    
+    def add(self, chunk_ids: List[str], texts: List[str],
+            metadatas: Optional[List[Dict]] = None):
+        """
+        Index chunk texts; re-adding a chunk_id replaces it.
+        
+        Args:
+            chunk_ids: Chunk identifiers
+            texts: Chunk texts
+            metadatas: Chunk metadata for filtered search, stamped with an
+                ``ingested_at`` time like the vector store's
+        """
+        if not chunk_ids:
+            return
+        self.delete([c for c in chunk_ids if c in self._doc_of])
+        
+        first_doc = len(self._chunk_ids)
+        terms, docs, tfs, lengths = [], [], [], []
+        for offset, (chunk_id, text) in enumerate(zip(chunk_ids, texts)):
+            doc = first_doc + offset
+            if chunk_id in self._doc_of:
+                # Repeated within this call: the last occurrence wins
+                self._tombstone(self._doc_of[chunk_id])
+            self._doc_of[chunk_id] = doc
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for token, count in Counter(tokens).items():
+                term = self._vocab.get(token)
+                if term is None:
+                    term = self._vocab[token] = len(self._terms)
+                    self._terms.append(token)
+                terms.append(term)
+                docs.append(doc)
+                tfs.append(count)
+        
+        self._chunk_ids.extend(chunk_ids)
+        self._extend_docs(len(self._chunk_ids))
+        self._lengths[first_doc:] = lengths
+        self._deleted[first_doc:] = False
+        ingested_at = time.time()
+        self._metadata_index.add(first_doc, [
+            {"ingested_at": ingested_at, **metadata}
+            for metadata in (metadatas or [{}] * len(chunk_ids))
+        ])
+        self._live_length += sum(lengths)
+        if terms:
+            self._segments.append(_Segment.from_postings(
+                np.array(terms, dtype=np.int32),
+                np.array(docs, dtype=np.int32),
+                np.minimum(np.array(tfs), np.iinfo(np.uint16).max).astype(np.uint16)
+            ))
+            self._merge_tiers()
+        self._dirty = True
+    
+    def _extend_docs(self, num_docs: int):
+        """Grow the per-document arrays to num_docs, doubling their buffers when full."""
+        if num_docs > len(self._deleted_buffer):
+            capacity = max(num_docs, 2 * len(self._deleted_buffer))
+            lengths = np.zeros(capacity, dtype=np.int32)
+            lengths[:len(self._lengths)] = self._lengths
+            deleted = np.zeros(capacity, dtype=bool)
+            deleted[:len(self._deleted)] = self._deleted
+            self._lengths_buffer, self._deleted_buffer = lengths, deleted
+        self._lengths = self._lengths_buffer[:num_docs]
+        self._deleted = self._deleted_buffer[:num_docs]
+    
+    def _tombstone(self, doc: int):
+        if not self._deleted[doc]:
+            self._deleted[doc] = True
+            self._live_length -= int(self._lengths[doc])
+    
+    def delete(self, chunk_ids: List[str]):
+        """
+        Remove chunks (unknown IDs are ignored).
+        
+        Args:
+            chunk_ids: IDs of the chunks to delete
+        """
+        for chunk_id in chunk_ids:
+            doc = self._doc_of.pop(chunk_id, None)
+            if doc is not None:
+                self._tombstone(doc)
+                self._dirty = True
+    
+    @staticmethod
+    def _tier(segment: _Segment) -> int:
+        return int(math.log(max(len(segment), 1), MERGE_FACTOR))
+    
+    def _merge_tiers(self):
+        """Merge segments of the newest segment's tier while it has MERGE_FACTOR."""
+        while self._segments:
+            tier = self._tier(self._segments[-1])
+            same = [segment for segment in self._segments if self._tier(segment) == tier]
+            if len(same) < MERGE_FACTOR:
+                return
+            # Doc ids are unique to one segment, so segment order does not matter
+            merged = self._merged(same)
+            self._segments = [s for s in self._segments if self._tier(s) != tier]
+            if not len(merged):
+                return
+            self._segments.append(merged)
+    
+    def _merged(self, segments: List[_Segment]) -> _Segment:
+        """One segment holding the live postings of segments."""
+        parts = [segment.expanded() for segment in segments]
+        terms = np.concatenate([p[0] for p in parts])
+        docs = np.concatenate([p[1] for p in parts])
+        tfs = np.concatenate([p[2] for p in parts])
+        live = ~self._deleted[docs]
+        return _Segment.from_postings(terms[live], docs[live], tfs[live])
+    
+    def _merge(self):
+        """Combine all segments into one, dropping postings of deleted docs."""
+        if not self._segments:
+            return
+        self._segments = [self._merged(self._segments)]
+    
+    def _compact(self):
+        """Drop deleted docs, renumbering the rest in order; segments must be merged."""
+        live = ~self._deleted
+        if live.all():
+            return
+        remap = (np.cumsum(live) - 1).astype(np.int32)
+        # The merged segment has only live postings, and the renumbering keeps
+        # their order, so each term's docs stay ascending
+        self._segments = [
+            _Segment(segment.terms, segment.offsets, remap[segment.docs], segment.tfs)
+            for segment in self._segments
+        ]
+        kept = np.flatnonzero(live)
+        self._chunk_ids = [self._chunk_ids[doc] for doc in kept.tolist()]
+        self._doc_of = {chunk_id: doc for doc, chunk_id in enumerate(self._chunk_ids)}
+        self._lengths = self._lengths_buffer = self._lengths[kept]
+        self._deleted = self._deleted_buffer = np.zeros(len(kept), dtype=bool)
+        self._metadata_index = self._metadata_index.select(kept)
+    
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        chunk_ids: Optional[Collection[str]] = None,
+        where: Optional[MetadataFilter] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Best-scoring chunks for a query.
+        
+        Args:
+            query: Query text
+            top_k: Number of results
+            chunk_ids: Only consider these chunks
+            where: Only consider chunks matching this metadata filter
+        
+        Returns:
+            (chunk_id, score) pairs, best first
+        """
+        terms = {self._vocab[t] for t in tokenize(query) if t in self._vocab}
+        num_docs = len(self)
+        if not terms or num_docs == 0 or top_k <= 0:
+            return []
+        
+        allowed = ~self._deleted
+        if where is not None:
+            allowed = self._filter_mask(where)
+        if chunk_ids is not None:
+            listed = np.zeros(len(self._chunk_ids), dtype=bool)
+            listed[[self._doc_of[c] for c in chunk_ids if c in self._doc_of]] = True
+            allowed = allowed & listed
+        avg_length = self._live_length / num_docs
+        
+        scores = np.zeros(len(self._chunk_ids), dtype=np.float32)
+        matched = np.zeros(len(self._chunk_ids), dtype=bool)
+        for term in terms:
+            docs, tfs = self._postings(term)
+            live = ~self._deleted[docs]
+            df = int(live.sum())
+            keep = live & allowed[docs]
+            if not keep.any():
+                continue
+            docs, tfs = docs[keep], tfs[keep].astype(np.float32)
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[docs] / avg_length)
+            # Doc ids are unique within a posting list, so += does not collide
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+            matched[docs] = True
+        
+        docs = np.flatnonzero(matched)
+        if len(docs) == 0:
+            return []
+        doc_scores = scores[docs]
+        k = min(top_k, len(docs))
+        best = np.argpartition(-doc_scores, k - 1)[:k]
+        best = best[np.argsort(-doc_scores[best], kind="stable")]
+        return [(self._chunk_ids[docs[i]], float(doc_scores[i])) for i in best]
+    
+    def _filter_mask(self, where: MetadataFilter) -> np.ndarray:
+        """Docs matching a filter, as a mask over doc numbers (deleted ones included)."""
+        mask = np.zeros(len(self._chunk_ids), dtype=bool)
+        mask[self._metadata_index.rows(where)] = True
+        if where.include_ids:
+            mask[[self._doc_of[c] for c in where.include_ids if c in self._doc_of]] = True
+        return mask
+    
+    def _postings(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        pieces = [segment.postings(term) for segment in self._segments]
+        if len(pieces) == 1:
+            return pieces[0]
+        return (np.concatenate([p[0] for p in pieces]),
+                np.concatenate([p[1] for p in pieces]))
+    
+    def save(self):
+        """Merge segments, drop deleted docs and write the index atomically."""
+        if not self._dirty:
+            return
+        self._merge()
+        self._compact()
+        segment = self._segments[0] if self._segments else _Segment.from_postings(
+            np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32),
+            np.zeros(0, dtype=np.uint16)
+        )
+        sources, source_ids, first_pages, last_pages, ingested_at = (
+            self._metadata_index.columns()
+        )
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_path = self._index_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            vocab=np.frombuffer("\0".join(self._terms).encode("utf-8"), dtype=np.uint8),
+            chunk_ids=np.frombuffer("\0".join(self._chunk_ids).encode("utf-8"), dtype=np.uint8),
+            lengths=self._lengths,
+            deleted=self._deleted,
+            terms=segment.terms,
+            offsets=segment.offsets,
+            docs=segment.docs,
+            tfs=segment.tfs,
+            sources=np.frombuffer("\0".join(sources).encode("utf-8"), dtype=np.uint8),
+            source_ids=source_ids,
+            first_pages=first_pages,
+            last_pages=last_pages,
+            ingested_at=ingested_at,
+        )
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
+    
+    def reset(self):
+        """Delete every chunk and the index file."""
+        if os.path.exists(self._index_path):
+            os.remove(self._index_path)
+        self._vocab, self._terms, self._chunk_ids, self._doc_of = {}, [], [], {}
+        self._lengths = self._lengths_buffer = np.zeros(0, dtype=np.int32)
+        self._deleted = self._deleted_buffer = np.zeros(0, dtype=bool)
+        self._metadata_index = MetadataIndex()
+        self._segments = []
+        self._live_length = 0
+        self._dirty = False
+    
+    def __len__(self):
+        return len(self._doc_of)
+    
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._doc_of
@@ -0,0 +1,271 @@
+"""
+Chunk Store Module
+
+Columnar, array-backed container for document chunks.
+"""
+
+import logging
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkView:
+    """
+    One chunk of a ChunkStore, read on access.
+    
+    Exposes the DocumentChunk attributes (text, metadata, chunk_id), so
+    code written against DocumentChunk works unchanged, plus the
+    individual fields without building the metadata dict.
+    """
+    
+    __slots__ = ("_store", "_row")
+    
+    def __init__(self, store: "ChunkStore", row: int):
+        self._store = store
+        self._row = row
+    
+    @property
+    def text(self) -> str:
+        store, row = self._store, self._row
+        return store.buffer[store.text_start[row]:store.text_end[row]]
+    
+    @property
+    def source(self) -> str:
+        return self._store.sources[self._store.source_id[self._row]]
+    
+    @property
+    def chunk_index(self) -> int:
+        return int(self._store.chunk_index[self._row])
+    
+    @property
+    def chunk_id(self) -> str:
+        return f"{self._store.id_prefix(self._store.source_id[self._row])}_chunk_{self.chunk_index}"
+    
+    @property
+    def start_char(self) -> int:
+        return int(self._store.start_char[self._row])
+    
+    @property
+    def end_char(self) -> int:
+        return int(self._store.end_char[self._row])
+    
+    @property
+    def pages(self) -> List[int]:
+        return list(range(int(self._store.page_first[self._row]),
+                          int(self._store.page_last[self._row]) + 1))
+    
+    @property
+    def metadata(self) -> Dict:
+        """DocumentChunk-style metadata dict, built on each access."""
+        return {
+            "source": self.source,
+            "pages": self.pages,
+            "chunk_index": self.chunk_index,
+            "start_char": self.start_char,
+            "end_char": self.end_char,
+        }
+    
+    def __repr__(self):
+        return f"ChunkView(chunk_id={self.chunk_id}, length={len(self.text)})"
+
+
+class ChunkStore:
+    """
+    Chunks stored as columns instead of one object per chunk.
+    
+    Chunk texts are spans (``text_start``/``text_end``) of one shared
+    string buffer, so overlapping chunks of a document share the
+    document's text rather than each holding a copy. Source, chunk index,
+    character offsets and page span are NumPy columns; sources are stored
+    once in a lookup table, each with the prefix of its chunk IDs (the
+    source name unless the document was given a distinct key).
+    
+    Features:
+    - Sequence of ChunkView (len, indexing, iteration), accepted wherever a
+      list of DocumentChunk is
+    - Slicing returns a ChunkStore over views of the same buffer and
+      columns (no copying)
+    - Compact pickling, e.g. from ingestion worker processes
+    
+    Pages are a contiguous span (first to last page), as produced by the
+    DocumentProcessor for documents with consecutive page numbers.
+    """
+    
+    def __init__(
+        self,
+        buffer: str,
+        text_start: np.ndarray,
+        text_end: np.ndarray,
+        source_id: np.ndarray,
+        sources: Sequence[str],
+        chunk_index: np.ndarray,
+        start_char: np.ndarray,
+        end_char: np.ndarray,
+        page_first: np.ndarray,
+        page_last: np.ndarray,
+        id_prefixes: Optional[Sequence[str]] = None
+    ):
+        self.buffer = buffer
+        self.text_start = text_start
+        self.text_end = text_end
+        self.source_id = source_id
+        self.sources = list(sources)
+        self.chunk_index = chunk_index
+        self.start_char = start_char
+        self.end_char = end_char
+        self.page_first = page_first
+        self.page_last = page_last
+        self.id_prefixes = list(id_prefixes) if id_prefixes is not None else self.sources
+    
+    def id_prefix(self, source_id: int) -> str:
+        """Chunk ID prefix of the source at source_id."""
+        return self.id_prefixes[source_id]
+    
+    @classmethod
+    def empty(cls) -> "ChunkStore":
+        return ChunkStoreBuilder().build()
+    
+    @classmethod
+    def from_chunks(cls, chunks: Sequence) -> "ChunkStore":
+        """Columnar copy of DocumentChunk-like objects."""
+        builder = ChunkStoreBuilder()
+        for chunk in chunks:
+            metadata = chunk.metadata
+            builder.append_text(chunk.text, metadata["source"], metadata["chunk_index"],
+                                metadata["start_char"], metadata["end_char"],
+                                metadata.get("pages") or [],
+                                id_prefix=chunk.chunk_id.rsplit("_chunk_", 1)[0])
+        return builder.build()
+    
+    def to_chunks(self) -> List:
+        """The chunks as DocumentChunk objects."""
+        from .document_processor import DocumentChunk
+        return [DocumentChunk(view.text, view.metadata, view.chunk_id) for view in self]
+    
+    def __len__(self) -> int:
+        return len(self.text_start)
+    
+    def __getitem__(self, key: Union[int, slice]) -> Union[ChunkView, "ChunkStore"]:
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("ChunkStore slices must be contiguous")
+            return ChunkStore(
+                self.buffer, self.text_start[key], self.text_end[key], self.source_id[key],
+                self.sources, self.chunk_index[key], self.start_char[key], self.end_char[key],
+                self.page_first[key], self.page_last[key], self.id_prefixes
+            )
+        row = range(len(self))[key]
+        return ChunkView(self, row)
+    
+    def __iter__(self) -> Iterator[ChunkView]:
+        for row in range(len(self)):
+            yield ChunkView(self, row)
+    
+    def texts(self) -> List[str]:
+        """All chunk texts, in order."""
+        buffer = self.buffer
+        return [buffer[start:end] for start, end in zip(self.text_start.tolist(),
+                                                          self.text_end.tolist())]
+    
+    def chunk_ids(self) -> List[str]:
+        """All chunk IDs, in order."""
+        return [f"{self.id_prefixes[source]}_chunk_{index}" for source, index in
+                zip(self.source_id.tolist(), self.chunk_index.tolist())]
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: the text buffer plus the columns."""
+        columns = (self.text_start, self.text_end, self.source_id, self.chunk_index,
+                   self.start_char, self.end_char, self.page_first, self.page_last)
+        return len(self.buffer.encode("utf-8")) + sum(column.nbytes for column in columns)
+    
+    def __repr__(self):
+        return f"ChunkStore({len(self)} chunks, {len(self.sources)} sources)"
+
+
+class ChunkStoreBuilder:
+    """Accumulates chunks in growable arrays and freezes them into a ChunkStore."""
+    
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._sources: Dict[Tuple[str, str], int] = {}  # (source, ID prefix)
+        self._text_start = array("q")
+        self._text_end = array("q")
+        self._source_id = array("i")
+        self._chunk_index = array("i")
+        self._start_char = array("q")
+        self._end_char = array("q")
+        self._page_first = array("i")
+        self._page_last = array("i")
+    
+    def add_text(self, text: str) -> int:
+        """Append text to the buffer; returns its offset for append()."""
+        offset = self._length
+        self._parts.append(text)
+        self._length += len(text)
+        return offset
+    
+    def append(self, text_start: int, text_end: int, source: str, chunk_index: int,
+               start_char: int, end_char: int, pages: Sequence[int],
+               source_id: Optional[int] = None):
+        """
+        Add a chunk whose text is buffer[text_start:text_end].
+        
+        Args:
+            text_start, text_end: Span of the chunk text in the buffer
+            source: Source document name
+            chunk_index: Position of the chunk in its document
+            start_char, end_char: Offsets of the chunk in its document
+            pages: Pages the chunk spans (stored as first and last)
+            source_id: Result of source_id(source), to skip the lookup
+        """
+        if source_id is None:
+            source_id = self.source_id(source)
+        self._text_start.append(text_start)
+        self._text_end.append(text_end)
+        self._source_id.append(source_id)
+        self._chunk_index.append(chunk_index)
+        self._start_char.append(start_char)
+        self._end_char.append(end_char)
+        self._page_first.append(pages[0] if pages else 0)
+        self._page_last.append(pages[-1] if pages else -1)
+    
+    def append_text(self, text: str, source: str, chunk_index: int, start_char: int,
+                    end_char: int, pages: Sequence[int], id_prefix: Optional[str] = None):
+        """Add a chunk with its own copy of text (IDs prefixed by id_prefix or source)."""
+        offset = self.add_text(text)
+        self.append(offset, offset + len(text), source, chunk_index, start_char, end_char,
+                    pages, source_id=self.source_id(source, id_prefix))
+    
+    def source_id(self, source: str, id_prefix: Optional[str] = None) -> int:
+        """
+        Index of source in the source table, adding it if new.
+        
+        Args:
+            source: Source document name
+            id_prefix: Prefix of the source's chunk IDs (default: source)
+        """
+        return self._sources.setdefault((source, id_prefix or source), len(self._sources))
+    
+    def __len__(self) -> int:
+        return len(self._text_start)
+    
+    def build(self) -> ChunkStore:
+        return ChunkStore(
+            "".join(self._parts),
+            np.frombuffer(self._text_start, dtype=np.int64),
+            np.frombuffer(self._text_end, dtype=np.int64),
+            np.frombuffer(self._source_id, dtype=np.int32),
+            [source for source, _ in self._sources],
+            np.frombuffer(self._chunk_index, dtype=np.int32),
+            np.frombuffer(self._start_char, dtype=np.int64),
+            np.frombuffer(self._end_char, dtype=np.int64),
+            np.frombuffer(self._page_first, dtype=np.int32),
+            np.frombuffer(self._page_last, dtype=np.int32),
+            [id_prefix for _, id_prefix in self._sources]
+        )
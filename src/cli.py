@@ -4,9 +4,17 @@ CLI Module
 Command-line interface for DocuChat using Rich for beautiful output.
 """
 
+import json
 import logging
+import os
+
+import click
 from rich.console import Console
 from rich.logging import RichHandler
+from rich.table import Table
+
+from .config import DEFAULT_CONFIG_PATH, build_pipeline, load_config
+from .document_processor import CHUNKING_STRATEGIES
 
 # Configure rich logging
 logging.basicConfig(
@@ -19,26 +27,234 @@ logger = logging.getLogger(__name__)
 console = Console()
 
 
-def main():
+@click.group()
+@click.option("--config", "config_path", default=DEFAULT_CONFIG_PATH, show_default=True,
+              help="Configuration file")
+@click.pass_context
+def main(ctx, config_path):
     """
-    Main CLI entry point.
+    DocuChat - Intelligent Document Q&A System.
     
+    \f
     TODO (Day 5):
-    - Implement Click commands
-    - Process command for document ingestion
-    - Query command for Q&A
     - Interactive chat mode
-    - Beautiful output with Rich
     """
-    console.print("[bold green]DocuChat - Intelligent Document Q&A System[/bold green]")
-    console.print("Version 0.1.0\n")
+    ctx.obj = {"config": load_config(config_path)}
+    logging.getLogger().setLevel(ctx.obj["config"].get("app", {}).get("log_level", "INFO"))
+
+
+@main.command()
+@click.option("--input", "input_path", required=True, help="PDF file or directory of PDFs")
+@click.option("--force", is_flag=True, help="Re-index files even if unchanged")
+@click.option("--chunking", type=click.Choice(CHUNKING_STRATEGIES), default=None,
+              help="Chunking strategy for this run instead of the configured one "
+                   "(with --force to re-chunk indexed files)")
+@click.option("--workers", type=click.IntRange(min=1), default=None,
+              help="Extraction worker processes instead of the configured number")
+@click.option("--batch-size", type=click.IntRange(min=1), default=None,
+              help="Chunks per embedding call and index write instead of the configured size")
+@click.pass_context
+def process(ctx, input_path, force, chunking, workers, batch_size):
+    """Index PDF documents."""
+    config = ctx.obj["config"]
+    overrides = {"chunking": chunking, "workers": workers, "batch_size": batch_size}
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    if overrides:
+        processing = {**config.get("document_processing", {}), **overrides}
+        config = {**config, "document_processing": processing}
+    pipeline = build_pipeline(config)
+    summary = pipeline.process_documents(input_path, force=force)
+    console.print(
+        f"[bold green]Indexed {summary['chunks']} chunks[/bold green] "
+        f"({summary['added']} new, {summary['modified']} modified, "
+        f"{summary['unchanged']} unchanged, {summary['deleted']} deleted, "
+        f"{summary['failed']} failed files)"
+    )
+    if summary.get("duplicates"):
+        console.print(f"[dim]{summary['duplicates']} duplicate chunks stored as "
+                      f"citation aliases instead of being embedded[/dim]")
+    if pipeline.last_ingestion is not None:
+        print_stages(pipeline.last_ingestion)
+
+
+def print_stages(report):
+    """Per-stage throughput and queue table for an ingestion run."""
+    table = Table(title=f"Ingestion stages ({report.elapsed:.2f}s)", show_edge=False)
+    table.add_column("Stage")
+    table.add_column("Items", justify="right")
+    table.add_column("Rate", justify="right")
+    table.add_column("Busy", justify="right")
+    table.add_column("Idle", justify="right")
+    table.add_column("Blocked", justify="right")
+    table.add_column("Queue max/mean", justify="right")
+    for stage in report.stages:
+        table.add_row(
+            stage.name,
+            f"{stage.items} {stage.unit}",
+            f"{stage.throughput:.1f}/s",
+            f"{stage.busy:.2f}s",
+            f"{stage.idle:.2f}s",
+            f"{stage.blocked:.2f}s",
+            f"{stage.max_queue_depth}/{stage.mean_queue_depth:.1f}"
+        )
+    console.print(table)
+
+
+@main.command()
+@click.argument("question")
+@click.option("--top-k", type=int, default=None, help="Chunks to retrieve")
+@click.option("--stream/--no-stream", default=True, show_default=True,
+              help="Print the answer as it is generated")
+@click.pass_context
+def query(ctx, question, top_k, stream):
+    """Ask a question about the indexed documents."""
+    config = ctx.obj["config"]
+    pipeline = build_pipeline(config)
+    top_k = top_k or config.get("retrieval", {}).get("top_k", 5)
+    
+    if stream:
+        result = None
+        for event in pipeline.query_stream(question, top_k=top_k):
+            if event["type"] == "token":
+                console.print(event["text"], end="", markup=False, highlight=False,
+                              soft_wrap=True)
+            elif event["type"] == "answer":
+                result = event
+        console.print()
+    else:
+        result = pipeline.query(question, top_k=top_k)
+        console.print(result["answer"], markup=False, highlight=False)
+    
+    print_sources(result)
+
+
+def print_sources(result):
+    """Citation table and timing line for a query result."""
+    table = Table(title="Sources", show_edge=False)
+    table.add_column("#", justify="right")
+    table.add_column("Document")
+    table.add_column("Pages")
+    table.add_column("Score", justify="right")
+    show_aliases = any(source.get("aliases") for source in result["sources"])
+    if show_aliases:
+        table.add_column("Also in")
+    for number, source in enumerate(result["sources"], start=1):
+        score = source.get("score")
+        row = [
+            str(source.get("number", number)),
+            str(source.get("source")),
+            ", ".join(str(p) for p in source.get("pages") or []),
+            "" if score is None else f"{score:.3f}"
+        ]
+        if show_aliases:
+            row.append(", ".join(
+                f"{alias['source']} p. {', '.join(str(p) for p in alias['pages'])}"
+                if alias["pages"] else str(alias["source"])
+                for alias in source.get("aliases") or []
+            ))
+        table.add_row(*row)
+    console.print(table)
     
-    console.print("[yellow]CLI not yet implemented. Coming on Day 5![/yellow]")
-    console.print("\nPlanned commands:")
-    console.print("  • docuchat process <directory>  - Process PDF documents")
-    console.print("  • docuchat query <question>     - Ask a question")
-    console.print("  • docuchat chat                 - Interactive chat mode")
-    console.print("  • docuchat reset                - Clear vector database")
+    metadata = result["metadata"]
+    timings = []
+    if metadata.get("time_to_first_token") is not None:
+        timings.append(f"first token {metadata['time_to_first_token']:.2f}s")
+    if metadata.get("llm", {}).get("latency") is not None:
+        timings.append(f"generation {metadata['llm']['latency']:.2f}s")
+    if metadata.get("cache"):
+        timings.append(f"cache {metadata['cache']}")
+    if timings:
+        console.print(f"[dim]{' · '.join(timings)}[/dim]")
+
+
+@main.command()
+@click.argument("questions_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output", "output_path", default=None,
+              help="Results JSONL (default: <questions>.results.jsonl)")
+@click.option("--top-k", type=int, default=None, help="Chunks to retrieve per question")
+@click.option("--concurrency", type=int, default=None, help="LLM calls in flight at once")
+@click.pass_context
+def batch(ctx, questions_path, output_path, top_k, concurrency):
+    """
+    Answer every question in a JSONL file.
+    
+    Each input line is {"id": ..., "question": ...} (id defaults to the
+    line number). Results are appended to the output file as they
+    complete; re-running the command skips questions already answered,
+    so an interrupted run resumes where it stopped and failed questions
+    are retried.
+    """
+    config = ctx.obj["config"]
+    top_k = top_k or config.get("retrieval", {}).get("top_k", 5)
+    concurrency = concurrency or config.get("app", {}).get("batch_concurrency", 8)
+    output_path = output_path or f"{os.path.splitext(questions_path)[0]}.results.jsonl"
+    
+    answered = load_answered_ids(output_path)
+    questions = []
+    with open(questions_path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"question": item}
+            item.setdefault("id", number)
+            if item["id"] not in answered:
+                questions.append(item)
+    console.print(f"{len(questions)} questions to answer ({len(answered)} already done)")
+    if not questions:
+        return
+    
+    pipeline = build_pipeline(config)
+    failed = 0
+    with open(output_path, "a", encoding="utf-8") as out:
+        if not ends_with_newline(output_path):
+            out.write("\n")  # terminate a line cut short by an interrupted run
+        for done, result in enumerate(
+            pipeline.query_batch(questions, top_k=top_k, max_concurrency=concurrency), start=1
+        ):
+            failed += "error" in result
+            out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            if done % 100 == 0 or done == len(questions):
+                console.print(f"[dim]{done}/{len(questions)} answered[/dim]")
+    pipeline.close()
+    console.print(f"[bold green]Wrote {len(questions) - failed} answers[/bold green] to "
+                  f"{output_path} ({failed} failed; re-run to retry them)")
+
+
+def ends_with_newline(path):
+    """True for a missing or empty file, or one whose last byte is a newline."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def load_answered_ids(output_path):
+    """IDs with a successful result in an existing output file."""
+    answered = set()
+    if not os.path.exists(output_path):
+        return answered
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interrupted run
+            if "error" not in result:
+                answered.add(result.get("id"))
+    return answered
+
+
+@main.command()
+@click.confirmation_option(prompt="Delete every indexed chunk?")
+@click.pass_context
+def reset(ctx):
+    """Clear the vector database."""
+    build_pipeline(ctx.obj["config"]).reset()
+    console.print("[bold green]Index cleared[/bold green]")
 
 
 if __name__ == "__main__":
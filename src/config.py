@@ -0,0 +1,233 @@
+"""
+Config Module
+
+Loads config/config.yaml and wires the pipeline components it describes.
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+
+import yaml
+
+from .bm25_index import BM25Index
+from .context_builder import ContextBuilder
+from .deduplication import ChunkDeduplicator
+from .document_processor import DocumentProcessor
+from .embeddings import EmbeddingGenerator
+from .llm_interface import QUERY_TEMPLATE, SYSTEM_PROMPT, LLMInterface
+from .query_batcher import QueryEmbeddingBatcher
+from .query_cache import QueryCache
+from .rag_pipeline import RAGPipeline
+from .reranker import CrossEncoderReranker
+from .retriever import Retriever
+from .text_normalizer import TextNormalizer
+from .vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+DEFAULT_PROMPTS_PATH = "config/prompts.yaml"
+
+
+def load_config(path: str = DEFAULT_CONFIG_PATH) -> Dict:
+    """
+    Read a YAML config file.
+    
+    Args:
+        path: Config file location
+    
+    Returns:
+        The parsed config (empty sections default to {})
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def load_prompts(path: str = DEFAULT_PROMPTS_PATH) -> Dict:
+    """
+    Read the prompt templates file.
+    
+    Args:
+        path: Prompts file location
+    
+    Returns:
+        The parsed templates, or {} (built-in prompts) if the file is missing
+    """
+    if not os.path.exists(path):
+        logger.warning(f"Prompts file {path} not found; using the built-in prompts")
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _provider_options(entry: Dict) -> Dict:
+    """Client options of an LLM provider entry (HTTP providers only)."""
+    if entry.get("provider", "openai") not in ("openai", "anthropic"):
+        return {}
+    return {key: entry[key] for key in ("base_url", "max_connections") if entry.get(key)}
+
+
+def build_llm(config: Dict, prompts: Optional[Dict] = None) -> LLMInterface:
+    """
+    LLMInterface from the ``models.llm`` section, with its fallback providers.
+    
+    Args:
+        config: Parsed config.yaml
+        prompts: Parsed prompts file (system_prompt, query_template and
+            citation_format; missing entries keep the built-in prompts)
+    """
+    llm = config.get("models", {}).get("llm", {})
+    hedge = llm.get("hedge", {})
+    prompts = prompts or {}
+    citation_format = prompts.get("citation_format")
+    return LLMInterface(
+        model_name=llm.get("model", "gpt-4-turbo-preview"),
+        temperature=llm.get("temperature", 0.1),
+        max_tokens=llm.get("max_tokens", 1000),
+        provider=llm.get("provider", "openai"),
+        system_prompt=prompts.get("system_prompt", SYSTEM_PROMPT).strip(),
+        query_template=prompts.get("query_template", QUERY_TEMPLATE).rstrip(),
+        citation_format=citation_format.strip() if citation_format else None,
+        provider_options=_provider_options(llm),
+        fallbacks=[
+            {"provider": entry["provider"], "model": entry.get("model"),
+             **_provider_options(entry)}
+            for entry in llm.get("fallbacks") or []
+        ],
+        max_retries=llm.get("max_retries", 2),
+        backoff_base=llm.get("backoff_base", 0.5),
+        backoff_max=llm.get("backoff_max", 8.0),
+        hedge=hedge.get("enabled", False),
+        hedge_delay=hedge.get("delay"),
+        hedge_min_samples=hedge.get("min_samples", 20)
+    )
+
+
+def build_pipeline(config: Dict) -> RAGPipeline:
+    """
+    Construct every component from a loaded config.
+    
+    Args:
+        config: Parsed config.yaml
+    
+    Returns:
+        A RAGPipeline over the configured processor, embedder, vector store,
+        optional chunk deduplicator, BM25 index, reranker, query embedding
+        batcher and query cache, and LLM (with the templates from
+        ``models.llm.prompts_path``)
+    """
+    embedding = config.get("models", {}).get("embedding", {})
+    processing = config.get("document_processing", {})
+    store = config.get("vector_store", {})
+    retrieval = config.get("retrieval", {})
+    app = config.get("app", {})
+    
+    processor = DocumentProcessor(
+        chunk_size=processing.get("chunk_size", 800),
+        chunk_overlap=processing.get("chunk_overlap", 200),
+        max_chunks_per_doc=processing.get("max_chunks_per_doc", 500),
+        workers=processing.get("workers", 1),
+        file_timeout=processing.get("file_timeout"),
+        normalizer=TextNormalizer(**processing.get("normalization", {})),
+        columnar=processing.get("columnar", False),
+        chunking=processing.get("chunking", "fixed")
+    )
+    embedder = EmbeddingGenerator(
+        model_name=embedding.get("name", "sentence-transformers/all-MiniLM-L6-v2"),
+        device=embedding.get("device", "cpu"),
+        batch_size=embedding.get("batch_size", 32),
+        normalize=embedding.get("normalize", False),
+        cache_dir=app.get("cache_dir") if app.get("enable_caching") else None,
+        cache_max_entries=app.get("cache_max_entries", 500_000)
+    )
+    
+    provider = store.get("provider", "chromadb")
+    index_options = None
+    if provider in ("numpy", "ivf"):
+        index_options = {
+            "compression": store.get("compression"),
+            "pq_subspaces": store.get("pq_subspaces"),
+            "rerank_factor": store.get("rerank_factor", 4),
+        }
+        if provider == "ivf":
+            index_options.update(store.get("ivf", {}))
+    persist_dir = store.get("persist_directory", "./data/chroma_db")
+    vector_store = VectorStore(
+        persist_dir=persist_dir,
+        collection_name=store.get("collection_name", "documents"),
+        distance_metric=store.get("distance_metric", "cosine"),
+        provider=provider,
+        index_options=index_options
+    )
+    
+    dedup = processing.get("deduplication", {})
+    deduplicator = None
+    if dedup.get("enabled"):
+        deduplicator = ChunkDeduplicator(
+            os.path.join(persist_dir, "dedup"),
+            threshold=dedup.get("threshold", 0.85),
+            num_perm=dedup.get("num_perm", 128),
+            shingle_size=dedup.get("shingle_size", 5)
+        )
+    
+    hybrid = retrieval.get("hybrid", {})
+    lexical_index = None
+    if hybrid.get("enabled"):
+        lexical_index = BM25Index(os.path.join(persist_dir, "bm25"),
+                                  k1=hybrid.get("k1", 1.2), b=hybrid.get("b", 0.75))
+    reranker = None
+    if retrieval.get("rerank"):
+        options = retrieval.get("reranker", {})
+        reranker = CrossEncoderReranker(
+            model_name=options.get("model", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+            device=embedding.get("device", "cpu"),
+            candidates=options.get("candidates", 50),
+            batch_size=options.get("batch_size", 64),
+            max_length=options.get("max_length", 256),
+            timeout=options.get("timeout"),
+            cache_size=options.get("cache_size", 10_000)
+        )
+    batching = retrieval.get("query_batching", {})
+    query_embedder = embedder
+    if batching.get("enabled"):
+        query_embedder = QueryEmbeddingBatcher(
+            embedder,
+            max_batch_size=batching.get("max_batch_size", 32),
+            max_wait_ms=batching.get("max_wait_ms", 2.0)
+        )
+    retriever = Retriever(
+        vector_store, query_embedder,
+        lexical_index=lexical_index,
+        fusion=hybrid.get("fusion", "rrf"),
+        rrf_k=hybrid.get("rrf_k", 60),
+        lexical_weight=hybrid.get("lexical_weight", 0.5),
+        fusion_candidates=hybrid.get("candidates", 50),
+        reranker=reranker,
+        deduplicator=deduplicator
+    )
+    
+    prompts = load_prompts(
+        config.get("models", {}).get("llm", {}).get("prompts_path", DEFAULT_PROMPTS_PATH)
+    )
+    
+    cache = app.get("query_cache", {})
+    query_cache = None
+    if cache.get("enabled"):
+        query_cache = QueryCache(
+            max_entries=cache.get("max_entries", 1000),
+            ttl_seconds=cache.get("ttl_seconds", 3600),
+            similarity_threshold=cache.get("similarity_threshold", 0.95)
+        )
+    
+    return RAGPipeline(
+        processor, embedder, vector_store, retriever, build_llm(config, prompts),
+        lexical_index=lexical_index,
+        deduplicator=deduplicator,
+        context_builder=ContextBuilder(max_tokens=retrieval.get("context_max_tokens", 3000)),
+        query_cache=query_cache,
+        max_concurrency=app.get("max_concurrent_queries", 16),
+        retrieval_workers=app.get("retrieval_workers"),
+        ingest_batch_size=processing.get("batch_size", 256),
+        ingest_queue_size=processing.get("queue_size", 4)
+    )
@@ -0,0 +1,189 @@
+"""
+Context Builder Module
+
+Turns retrieved chunks into a de-duplicated LLM context that fits a token
+budget.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Characters per token assumed when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+# Slack when aligning overlapping chunk texts, whose edges were stripped
+OVERLAP_SLACK = 3
+
+
+class TokenCounter:
+    """
+    Fast local token count.
+    
+    Uses tiktoken's ``encoding_name`` BPE when installed; otherwise
+    estimates one token per ``CHARS_PER_TOKEN`` characters.
+    """
+    
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._loaded = False
+    
+    @property
+    def encoding(self):
+        """The tiktoken encoding (None if tiktoken is not installed)."""
+        if not self._loaded:
+            self._loaded = True
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except ImportError:
+                logger.warning(
+                    "tiktoken not installed; estimating token counts from length. "
+                    "Install it with: pip install tiktoken"
+                )
+        return self._encoding
+    
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+        if self.encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+def _append_overlapping(text: str, next_text: str, overlap: int) -> str:
+    """
+    Append next_text to text, dropping the ~overlap characters they share.
+    
+    Chunk texts are stripped, so the shared span can be a few characters
+    shorter than the character offsets say; the longest prefix of
+    next_text near that length which text ends with is taken as shared.
+    """
+    longest = min(overlap, len(next_text), len(text))
+    for size in range(longest, max(overlap - OVERLAP_SLACK, 1) - 1, -1):
+        if text.endswith(next_text[:size]):
+            return text + next_text[size:]
+    return f"{text} {next_text}"
+
+
+class ContextBuilder:
+    """
+    Builds the context passed to the LLM from retrieved chunks.
+    
+    Features:
+    - Chunks from the same source whose ``start_char``/``end_char`` spans
+      overlap or touch are merged into one passage, so text shared by
+      overlapping chunks is sent once
+    - Passages are packed greedily, best score first, into
+      ``max_tokens``; a passage that does not fit is skipped and smaller
+      ones are still tried
+    """
+    
+    def __init__(self, max_tokens: int = 3000, token_counter: Optional[TokenCounter] = None):
+        """
+        Initialize the context builder.
+        
+        Args:
+            max_tokens: Token budget for the context passages
+            token_counter: Counter used for the budget (tiktoken cl100k_base
+                if available)
+        """
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter or TokenCounter()
+    
+    def build(self, chunks: List[Dict], max_tokens: Optional[int] = None) -> List[Dict]:
+        """
+        Merge retrieved chunks and pack them into the token budget.
+        
+        Args:
+            chunks: Retrieval results (dicts with chunk_id, text, metadata
+                and score)
+            max_tokens: Override the configured budget for this call
+        
+        Returns:
+            Passages in the same dict shape, best first. Merged passages
+            carry the IDs of their chunks in ``metadata["chunk_ids"]``; each
+            passage also has a ``tokens`` count.
+        """
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        passages = self.merge(chunks)
+        passages.sort(key=lambda p: p["score"], reverse=True)
+        
+        packed, used = [], 0
+        for passage in passages:
+            tokens = self.token_counter.count(passage["text"])
+            if used + tokens > budget:
+                continue
+            packed.append({**passage, "tokens": tokens})
+            used += tokens
+        
+        logger.info(
+            f"Packed {len(packed)} of {len(passages)} passages "
+            f"({len(chunks)} chunks) into {used}/{budget} tokens"
+        )
+        return packed
+    
+    @staticmethod
+    def merge(chunks: List[Dict]) -> List[Dict]:
+        """
+        Merge overlapping or adjacent chunks of the same source.
+        
+        Chunks without character offsets are passed through unchanged. A
+        merged passage takes the best score of its chunks.
+        
+        Args:
+            chunks: Retrieval results
+        
+        Returns:
+            Passages in no particular order
+        """
+        passages = []
+        by_source: Dict[str, List[Dict]] = {}
+        for chunk in chunks:
+            metadata = chunk.get("metadata") or {}
+            if metadata.get("start_char") is None or metadata.get("end_char") is None:
+                passages.append(chunk)
+            else:
+                by_source.setdefault(metadata.get("source"), []).append(chunk)
+        
+        for source_chunks in by_source.values():
+            source_chunks.sort(key=lambda c: (c["metadata"]["start_char"],
+                                              c["metadata"]["end_char"]))
+            current = None
+            for chunk in source_chunks:
+                metadata = chunk["metadata"]
+                if current is None or metadata["start_char"] > current["metadata"]["end_char"]:
+                    if current is not None:
+                        passages.append(current)
+                    current = {
+                        **chunk,
+                        "metadata": {**metadata, "chunk_ids": [chunk["chunk_id"]]},
+                    }
+                    continue
+                
+                merged = current["metadata"]
+                merged["chunk_ids"].append(chunk["chunk_id"])
+                current["score"] = max(current["score"], chunk["score"])
+                merged["pages"] = sorted(set(merged.get("pages") or [])
+                                         | set(metadata.get("pages") or []))
+                if metadata["end_char"] > merged["end_char"]:
+                    overlap = merged["end_char"] - metadata["start_char"]
+                    current["text"] = _append_overlapping(current["text"], chunk["text"],
+                                                          overlap)
+                    merged["end_char"] = metadata["end_char"]
+            passages.append(current)
+        return passages
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    builder = ContextBuilder(max_tokens=50)
+    context = builder.build([
+        {"chunk_id": "a_0", "text": "The quick brown fox", "score": 0.9,
+         "metadata": {"source": "a.pdf", "pages": [1], "start_char": 0, "end_char": 20}},
+        {"chunk_id": "a_1", "text": "brown fox jumps over", "score": 0.8,
+         "metadata": {"source": "a.pdf", "pages": [1], "start_char": 10, "end_char": 31}},
+    ])
+    print([passage["text"] for passage in context])
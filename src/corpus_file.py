@@ -0,0 +1,261 @@
+"""
+Corpus File Module
+
+Memory-mapped binary file of chunk IDs, texts and metadata.
+"""
+
+import json
+import logging
+import os
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DCCORPUS"
+VERSION = 1
+
+# Metadata keys stored as typed columns; any other key goes to a per-row JSON blob
+_SOURCE, _PAGES, _CHUNK_INDEX, _START_CHAR, _END_CHAR, _INGESTED_AT = (
+    1, 2, 4, 8, 16, 32
+)
+_INT_FIELDS = (("chunk_index", _CHUNK_INDEX), ("start_char", _START_CHAR),
+               ("end_char", _END_CHAR))
+
+
+def _is_int(value) -> bool:
+    return type(value) is int
+
+
+def _variable_column(blobs: List[bytes]) -> Tuple[np.ndarray, bytes]:
+    """Offsets (one more than the values) and concatenation of byte strings."""
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    return offsets, b"".join(blobs)
+
+
+def _hash_table(chunk_ids: List[bytes]) -> np.ndarray:
+    """Open-addressing table of rows by crc32 of the ID; the last row wins."""
+    last_row = {chunk_id: row for row, chunk_id in enumerate(chunk_ids)}
+    size = 1
+    while size < 2 * len(last_row):
+        size *= 2
+    mask = size - 1
+    slots = [-1] * size
+    for chunk_id, row in last_row.items():
+        slot = zlib.crc32(chunk_id) & mask
+        while slots[slot] >= 0:
+            slot = (slot + 1) & mask
+        slots[slot] = row
+    return np.array(slots, dtype=np.int64)
+
+
+def write_corpus_file(
+    path: str,
+    chunk_ids: Sequence[str],
+    texts: Sequence[str],
+    metadatas: Sequence[Dict],
+    log_bytes: int = 0
+):
+    """
+    Write rows to a corpus file, replacing any existing file atomically.
+    
+    Args:
+        path: Destination file
+        chunk_ids: Chunk identifier per row
+        texts: Chunk text per row
+        metadatas: Chunk metadata dict per row (JSON-serializable)
+        log_bytes: Caller's bookkeeping, e.g. how much of an append log the
+            file covers; read back as CorpusFile.log_bytes
+    """
+    num_rows = len(chunk_ids)
+    sources: Dict[str, int] = {}
+    fields = np.zeros(num_rows, dtype=np.uint8)
+    source_id = np.full(num_rows, -1, dtype=np.int32)
+    page_first = np.full(num_rows, -1, dtype=np.int32)
+    page_last = np.full(num_rows, -1, dtype=np.int32)
+    ints = {name: np.zeros(num_rows, dtype=np.int64) for name, _ in _INT_FIELDS}
+    ingested_at = np.full(num_rows, np.nan)
+    pages: List[bytes] = []
+    extras: List[bytes] = []
+    
+    for row, metadata in enumerate(metadatas):
+        extra = {}
+        for key, value in metadata.items():
+            if key == "source" and isinstance(value, str):
+                source_id[row] = sources.setdefault(value, len(sources))
+                fields[row] |= _SOURCE
+            elif key == "pages" and isinstance(value, list) and all(map(_is_int, value)):
+                pages.append(np.asarray(value, dtype=np.int32).tobytes())
+                if value:
+                    page_first[row], page_last[row] = min(value), max(value)
+                fields[row] |= _PAGES
+            elif key in ints and _is_int(value):
+                ints[key][row] = value
+                fields[row] |= dict(_INT_FIELDS)[key]
+            elif key == "ingested_at" and isinstance(value, float):
+                ingested_at[row] = value
+                fields[row] |= _INGESTED_AT
+            else:
+                extra[key] = value
+        if not fields[row] & _PAGES:
+            pages.append(b"")
+        extras.append(json.dumps(extra).encode("utf-8") if extra else b"")
+    
+    encoded_ids = [chunk_id.encode("utf-8") for chunk_id in chunk_ids]
+    id_offsets, id_blob = _variable_column(encoded_ids)
+    text_offsets, text_blob = _variable_column([text.encode("utf-8") for text in texts])
+    page_offsets, page_blob = _variable_column(pages)
+    extra_offsets, extra_blob = _variable_column(extras)
+    sections = [
+        ("id_offsets", id_offsets), ("id_blob", np.frombuffer(id_blob, dtype=np.uint8)),
+        ("text_offsets", text_offsets),
+        ("text_blob", np.frombuffer(text_blob, dtype=np.uint8)),
+        ("fields", fields), ("source_id", source_id),
+        ("page_offsets", page_offsets // 4),
+        ("page_values", np.frombuffer(page_blob, dtype=np.int32)),
+        ("page_first", page_first), ("page_last", page_last),
+        *ints.items(), ("ingested_at", ingested_at),
+        ("extra_offsets", extra_offsets),
+        ("extra_blob", np.frombuffer(extra_blob, dtype=np.uint8)),
+        ("slots", _hash_table(encoded_ids)),
+    ]
+    
+    # Sections start 8-byte aligned after the directory, whose length depends
+    # on the offsets it records: grow its reserved size until they agree
+    directory = {"version": VERSION, "rows": num_rows, "log_bytes": log_bytes,
+                 "sources": list(sources), "sections": {}}
+    header_size = 0
+    while True:
+        offset = len(MAGIC) + 8 + header_size
+        for name, column in sections:
+            offset += -offset % 8
+            directory["sections"][name] = [offset, column.dtype.str, len(column)]
+            offset += column.nbytes
+        header = json.dumps(directory).encode("utf-8")
+        if len(header) <= header_size:
+            break
+        header_size = len(header)
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + np.uint64(header_size).tobytes() + header.ljust(header_size))
+        for name, column in sections:
+            f.write(b"\0" * (directory["sections"][name][0] - f.tell()))
+            f.write(column.tobytes())
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote {num_rows} rows to corpus file {path}")
+
+
+class CorpusFile:
+    """
+    Read-only, memory-mapped view of a file written by write_corpus_file().
+    
+    Layout: an 8-byte magic, the length of a JSON directory (row count,
+    source table, section offsets) and the directory itself, followed by
+    8-byte aligned sections:
+    - ``id_offsets`` / ``id_blob`` and ``text_offsets`` / ``text_blob``:
+      UTF-8 blobs with one offset per row plus an end offset
+    - ``source_id``, ``page_first``, ``page_last``, ``chunk_index``,
+      ``start_char``, ``end_char``, ``ingested_at``: metadata columns,
+      with a ``fields`` bitmask of which keys each row has
+    - ``page_offsets`` / ``page_values``: the exact page list of each row
+    - ``extra_offsets`` / ``extra_blob``: JSON of any other metadata keys
+    - ``slots``: open-addressing hash table from chunk_id to row
+    
+    Opening reads only the directory. Rows are decoded on access and the
+    operating system pages in the bytes they touch, so start-up time and
+    resident memory do not grow with the corpus.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Map a corpus file.
+        
+        Args:
+            path: File written by write_corpus_file()
+        
+        Raises:
+            ValueError: If the file is not a corpus file of this version
+        """
+        self.path = path
+        self._raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if self._raw[:len(MAGIC)].tobytes() != MAGIC:
+            raise ValueError(f"Not a corpus file: {path}")
+        header_length = int(self._raw[len(MAGIC):len(MAGIC) + 8].view(np.uint64)[0])
+        header_start = len(MAGIC) + 8
+        directory = json.loads(self._raw[header_start:header_start + header_length].tobytes())
+        if directory["version"] != VERSION:
+            raise ValueError(f"Unsupported corpus file version {directory['version']}: {path}")
+        
+        self.num_rows: int = directory["rows"]
+        self.log_bytes: int = directory["log_bytes"]
+        self.sources: List[str] = directory["sources"]
+        self._sections: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, count) in directory["sections"].items():
+            dtype = np.dtype(dtype)
+            self._sections[name] = self._raw[offset:offset + count * dtype.itemsize].view(dtype)
+        self.source_id = self._sections["source_id"]
+        self.page_first = self._sections["page_first"]
+        self.page_last = self._sections["page_last"]
+        self.ingested_at = self._sections["ingested_at"]
+    
+    def __len__(self) -> int:
+        return self.num_rows
+    
+    def _bytes(self, name: str, row: int) -> bytes:
+        offsets = self._sections[f"{name}_offsets"]
+        return self._sections[f"{name}_blob"][offsets[row]:offsets[row + 1]].tobytes()
+    
+    def chunk_id(self, row: int) -> str:
+        return self._bytes("id", row).decode("utf-8")
+    
+    def text(self, row: int) -> str:
+        return self._bytes("text", row).decode("utf-8")
+    
+    def metadata(self, row: int) -> Dict:
+        """Metadata dict of a row, as it was written."""
+        sections = self._sections
+        fields = int(sections["fields"][row])
+        metadata = {}
+        if fields & _SOURCE:
+            metadata["source"] = self.sources[sections["source_id"][row]]
+        if fields & _PAGES:
+            offsets = sections["page_offsets"]
+            metadata["pages"] = sections["page_values"][offsets[row]:offsets[row + 1]].tolist()
+        for name, flag in _INT_FIELDS:
+            if fields & flag:
+                metadata[name] = int(sections[name][row])
+        if fields & _INGESTED_AT:
+            metadata["ingested_at"] = float(sections["ingested_at"][row])
+        extra = self._bytes("extra", row)
+        if extra:
+            metadata.update(json.loads(extra))
+        return metadata
+    
+    def row_of(self, chunk_id: str) -> Optional[int]:
+        """
+        Last row holding chunk_id, in O(1) expected time.
+        
+        Args:
+            chunk_id: Chunk identifier to look up
+        
+        Returns:
+            Row number, or None if the ID is not in the file
+        """
+        key = chunk_id.encode("utf-8")
+        slots = self._sections["slots"]
+        mask = len(slots) - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            row = int(slots[slot])
+            if row < 0:
+                return None
+            if self._bytes("id", row) == key:
+                return row
+            slot = (slot + 1) & mask
+    
+    def __repr__(self):
+        return f"CorpusFile({self.path}, {self.num_rows} rows)"
@@ -0,0 +1,515 @@
+"""
+Deduplication Module
+
+Detection of exact and near-duplicate chunks with MinHash and LSH.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .metadata_index import MetadataFilter, MetadataIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "dedup.npz"
+
+_WORD = re.compile(r"\w+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Split a signature into (bands, rows) for a similarity threshold.
+    
+    Two chunks become candidates when all rows of any band agree, which
+    happens with probability 1 - (1 - s^rows)^bands at Jaccard similarity s.
+    The split chosen has the steepest S-curve whose midpoint
+    (1/bands)^(1/rows) is still at or below the threshold, so pairs above
+    it are almost always found; candidates are then checked against the
+    threshold itself.
+    
+    Args:
+        num_perm: Signature length
+        threshold: Jaccard similarity at which chunks count as duplicates
+    
+    Returns:
+        (bands, rows) with bands * rows == num_perm
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold:
+            best = (num_perm // rows, rows)
+    return best
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles.
+    
+    A text is lowercased, split into words and turned into the set of its
+    ``shingle_size``-word shingles; each of ``num_perm`` universal hash
+    functions keeps its minimum over the set. The fraction of equal
+    signature positions estimates the Jaccard similarity of two sets.
+    """
+    
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        """
+        Initialize the hash functions.
+        
+        Args:
+            num_perm: Number of hash functions (signature length)
+            shingle_size: Words per shingle
+            seed: Seed of the hash functions; signatures are only
+                comparable between hashers with the same settings
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 29, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 29, num_perm, dtype=np.uint64)
+    
+    def shingles(self, words: Sequence[str]) -> np.ndarray:
+        """crc32 hashes of the distinct shingles of a word sequence."""
+        size = self.shingle_size
+        if len(words) <= size:
+            grams = {" ".join(words)}
+        else:
+            grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams),
+                           dtype=np.uint64, count=len(grams))
+    
+    def signature(self, words: Sequence[str]) -> np.ndarray:
+        """MinHash signature (uint32, num_perm values) of a word sequence."""
+        hashes = self.shingles(words)[:, None] * self._a + self._b
+        hashes = (hashes % np.uint64(_MERSENNE_PRIME)) & np.uint64(_MAX_HASH)
+        return hashes.min(axis=0).astype(np.uint32)
+
+
+@dataclass
+class DedupStats:
+    """Counts of the chunks a ChunkDeduplicator has filtered."""
+    
+    chunks: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    saved_chars: int = 0
+    
+    @property
+    def duplicates(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+    
+    @property
+    def saved_fraction(self) -> float:
+        """Share of filtered chunks that needed no embedding of their own."""
+        return self.duplicates / self.chunks if self.chunks else 0.0
+
+
+class ChunkDeduplicator:
+    """
+    Keeps one stored chunk per cluster of exact or near-duplicate chunks.
+    
+    Each stored ("canonical") chunk is registered with a digest of its
+    normalized text and a MinHash signature indexed in LSH bands. A new
+    chunk whose digest matches, or whose estimated Jaccard similarity to
+    an LSH candidate reaches the threshold, becomes an alias of that
+    canonical chunk instead of being embedded and stored.
+    
+    Features:
+    - Aliases keep their own chunk ID and metadata (source, pages), so
+      citations can list every document a passage appears in and
+      metadata filters can match a stored chunk through its aliases
+    - Duplicates within one batch are found as well as across batches
+    - remove() keeps a cluster alive when its canonical chunk goes away by
+      promoting the first alias in its place
+    - Chunks registered by filter() stay pending until commit() confirms
+      they were stored; rollback() forgets pending chunks after a failed
+      run and save() never persists them
+    - Persistence to a single ``dedup.npz`` under ``index_dir``
+    - Thread-safe, so one thread can filter while another commits
+    """
+    
+    def __init__(
+        self,
+        index_dir: str,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """
+        Initialize the deduplicator, loading its index from disk if present.
+        
+        Args:
+            index_dir: Directory holding the index file
+            threshold: Estimated Jaccard similarity of word shingles at
+                which a chunk is a near duplicate (1.0 = exact only)
+            num_perm: MinHash signature length; longer is more accurate
+            shingle_size: Words per shingle
+            seed: Seed of the MinHash functions
+        
+        Raises:
+            ValueError: If threshold is not in (0, 1], or the saved index
+                was built with different MinHash settings
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.index_dir = index_dir
+        self.threshold = threshold
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self._hasher = MinHasher(num_perm, shingle_size, seed)
+        self._params = np.array([num_perm, shingle_size, seed], dtype=np.int64)
+        self.stats = DedupStats()
+        self._lock = threading.Lock()
+        self._clear()
+        self._load()
+        logger.info(
+            f"Initialized ChunkDeduplicator at {index_dir} ({len(self)} chunks, "
+            f"{self.alias_count} aliases, {self.bands}x{self.rows} LSH bands)"
+        )
+    
+    def _clear(self):
+        self._ids: List[Optional[str]] = []  # canonical chunk per row, None once removed
+        self._signatures: List[np.ndarray] = []
+        self._digests: List[bytes] = []
+        self._row_of: Dict[str, int] = {}
+        self._row_of_digest: Dict[bytes, int] = {}
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._aliases: Dict[str, List[Dict]] = {}
+        self._canonical_of: Dict[str, str] = {}
+        self._pending: Set[str] = set()  # registered by filter(), not yet committed
+        self._alias_index: Optional[Tuple[MetadataIndex, List[str]]] = None
+        self._dirty = False
+    
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.index_dir, INDEX_FILENAME)
+    
+    def _load(self):
+        if not os.path.exists(self._index_path):
+            return
+        with np.load(self._index_path) as data:
+            if not np.array_equal(data["params"], self._params):
+                raise ValueError(
+                    f"Deduplication index {self._index_path} was built with different "
+                    f"MinHash settings; reset the index to change them"
+                )
+            chunk_ids = data["chunk_ids"].tobytes().decode("utf-8").split("\0")
+            signatures = data["signatures"]
+            digests = data["digests"]
+            aliases = json.loads(data["aliases"].tobytes().decode("utf-8"))
+        if len(signatures):
+            for chunk_id, signature, digest in zip(chunk_ids, signatures, digests):
+                self._insert(chunk_id, digest.tobytes(), signature)
+        for canonical, records in aliases.items():
+            self._aliases[canonical] = records
+            for record in records:
+                self._canonical_of[record["chunk_id"]] = canonical
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes()
+                for band in range(self.bands)]
+    
+    def _insert(self, chunk_id: str, digest: bytes, signature: np.ndarray):
+        row = len(self._ids)
+        self._ids.append(chunk_id)
+        self._signatures.append(signature)
+        self._digests.append(digest)
+        self._row_of[chunk_id] = row
+        self._row_of_digest[digest] = row
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(row)
+    
+    def _retire(self, row: int):
+        """Stop matching a row (its bucket entries are skipped from now on)."""
+        self._ids[row] = None
+        if self._row_of_digest.get(self._digests[row]) == row:
+            del self._row_of_digest[self._digests[row]]
+    
+    def _refresh(self, row: int, digest: bytes, signature: np.ndarray):
+        """Match a row against new text stored under the same chunk ID."""
+        if self._row_of_digest.get(self._digests[row]) == row:
+            del self._row_of_digest[self._digests[row]]
+        self._digests[row] = digest
+        self._signatures[row] = signature
+        self._row_of_digest.setdefault(digest, row)
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(row)
+    
+    def _drop_alias(self, chunk_id: str):
+        canonical = self._canonical_of.pop(chunk_id, None)
+        if canonical is None:
+            return
+        records = [r for r in self._aliases[canonical] if r["chunk_id"] != chunk_id]
+        if records:
+            self._aliases[canonical] = records
+        else:
+            del self._aliases[canonical]
+    
+    def _similar(self, signature: np.ndarray) -> Optional[int]:
+        """Live row most similar to signature, if at or above the threshold."""
+        candidates = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(key, ()))
+        best, best_score = None, self.threshold
+        for row in candidates:
+            if self._ids[row] is None:
+                continue
+            score = np.count_nonzero(self._signatures[row] == signature) / len(signature)
+            if score >= best_score:
+                best, best_score = row, score
+        return best
+    
+    def filter(self, chunks: Sequence) -> Tuple[List, List[Tuple[object, str]]]:
+        """
+        Split chunks into new ones and duplicates of stored chunks.
+        
+        New chunks are registered as canonical, so later chunks (in this
+        call or later ones) can match them; duplicates are recorded as
+        aliases of the chunk they match. Both stay pending until commit().
+        
+        A chunk whose ID is already canonical (its file is indexed again
+        after an interrupted run) is returned as new, so it is stored
+        again, and never becomes an alias of itself.
+        
+        Args:
+            chunks: DocumentChunk-like objects (text, metadata, chunk_id)
+        
+        Returns:
+            (chunks to embed and store, [(duplicate chunk, canonical chunk ID)])
+        """
+        unique, duplicates = [], []
+        with self._lock:
+            for chunk in chunks:
+                chunk_id, text = chunk.chunk_id, chunk.text
+                words = _WORD.findall(text.lower())
+                digest = hashlib.blake2b(" ".join(words).encode("utf-8"),
+                                         digest_size=16).digest()
+                self.stats.chunks += 1
+                self._drop_alias(chunk_id)
+                
+                own = self._row_of.get(chunk_id)
+                if own is not None:
+                    if self._digests[own] != digest:
+                        self._refresh(own, digest, self._hasher.signature(words))
+                    unique.append(chunk)
+                    continue
+                
+                row = self._row_of_digest.get(digest)
+                if row is not None:
+                    self.stats.exact_duplicates += 1
+                else:
+                    signature = self._hasher.signature(words)
+                    row = self._similar(signature) if self.threshold < 1 else None
+                    if row is None:
+                        self._insert(chunk_id, digest, signature)
+                        self._pending.add(chunk_id)
+                        unique.append(chunk)
+                        continue
+                    self.stats.near_duplicates += 1
+                
+                canonical = self._ids[row]
+                self._aliases.setdefault(canonical, []).append(
+                    {"chunk_id": chunk_id, "metadata": dict(chunk.metadata)}
+                )
+                self._canonical_of[chunk_id] = canonical
+                self._pending.add(chunk_id)
+                self.stats.saved_chars += len(text)
+                duplicates.append((chunk, canonical))
+            
+            self._dirty = self._dirty or bool(chunks)
+            self._alias_index = None
+        return unique, duplicates
+    
+    def commit(self, chunk_ids: Sequence[str]):
+        """
+        Confirm chunks registered by filter(): canonical chunks once they
+        are stored, aliases once the rest of their document is.
+        
+        Args:
+            chunk_ids: Chunk IDs to confirm; unknown IDs are ignored
+        """
+        with self._lock:
+            ingested_at = time.time()
+            for chunk_id in chunk_ids:
+                if chunk_id not in self._pending:
+                    continue
+                self._pending.discard(chunk_id)
+                canonical = self._canonical_of.get(chunk_id)
+                if canonical is not None:
+                    # Stamped like the vector store stamps stored chunks
+                    for record in self._aliases[canonical]:
+                        if record["chunk_id"] == chunk_id:
+                            record["metadata"].setdefault("ingested_at", ingested_at)
+            self._alias_index = None
+    
+    def rollback(self) -> int:
+        """
+        Forget every chunk registered by filter() and not committed.
+        
+        Returns:
+            Number of chunks forgotten
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._alias_index = None
+            for chunk_id in pending:
+                self._drop_alias(chunk_id)
+            for chunk_id in pending:
+                row = self._row_of.pop(chunk_id, None)
+                if row is None:
+                    continue
+                for record in self._aliases.pop(chunk_id, []):
+                    self._canonical_of.pop(record["chunk_id"], None)
+                self._retire(row)
+        if pending:
+            logger.warning(f"Rolled back {len(pending)} uncommitted chunks")
+        return len(pending)
+    
+    def remove(self, chunk_ids: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Forget chunks, canonical or aliases.
+        
+        A removed canonical chunk with surviving aliases hands its cluster
+        to the first of them, whose text the caller must then store under
+        the alias's ID and metadata.
+        
+        Args:
+            chunk_ids: Chunk IDs to forget; unknown IDs are ignored
+        
+        Returns:
+            Promotions: {removed canonical ID: alias record (chunk_id,
+            metadata) that replaces it}
+        """
+        with self._lock:
+            self._alias_index = None
+            return self._remove(chunk_ids)
+    
+    def _remove(self, chunk_ids: Sequence[str]) -> Dict[str, Dict]:
+        for chunk_id in chunk_ids:
+            if chunk_id in self._canonical_of:
+                self._drop_alias(chunk_id)
+                self._dirty = True
+        
+        promotions = {}
+        for chunk_id in chunk_ids:
+            row = self._row_of.pop(chunk_id, None)
+            if row is None:
+                continue
+            self._dirty = True
+            records = self._aliases.pop(chunk_id, None)
+            if not records:
+                self._retire(row)
+                continue
+            
+            heir, rest = records[0], records[1:]
+            self._ids[row] = heir["chunk_id"]
+            self._row_of[heir["chunk_id"]] = row
+            del self._canonical_of[heir["chunk_id"]]
+            if rest:
+                self._aliases[heir["chunk_id"]] = rest
+                for record in rest:
+                    self._canonical_of[record["chunk_id"]] = heir["chunk_id"]
+            promotions[chunk_id] = heir
+        return promotions
+    
+    def aliases(self, chunk_id: str) -> List[Dict]:
+        """Metadata of the duplicates of a stored chunk, in ingestion order."""
+        return [record["metadata"] for record in self._aliases.get(chunk_id, [])]
+    
+    def matching(self, where: MetadataFilter) -> List[str]:
+        """
+        Stored chunks with a committed alias matching a metadata filter.
+        
+        A filter on, say, ``sources=["b.pdf"]`` does not match the stored
+        copy of a passage b.pdf shares with a.pdf, as the copy carries
+        a.pdf's metadata; searches add these chunks to the filter's
+        matches. The alias metadata is indexed on first use after a change.
+        
+        Args:
+            where: Filter to resolve against the aliases' metadata
+        
+        Returns:
+            Canonical chunk IDs, each once
+        """
+        with self._lock:
+            if self._alias_index is None:
+                index, owners = MetadataIndex(), []
+                records = [
+                    (canonical, record["metadata"])
+                    for canonical, records in self._aliases.items()
+                    if canonical not in self._pending
+                    for record in records if record["chunk_id"] not in self._pending
+                ]
+                if records:
+                    owners, metadatas = map(list, zip(*records))
+                    index.add(0, metadatas)
+                self._alias_index = (index, owners)
+            index, owners = self._alias_index
+        return list(dict.fromkeys(owners[row] for row in index.rows(where).tolist()))
+    
+    def canonical(self, chunk_id: str) -> Optional[str]:
+        """ID of the stored chunk a duplicate was matched to, if it is an alias."""
+        return self._canonical_of.get(chunk_id)
+    
+    def __len__(self) -> int:
+        return len(self._row_of)
+    
+    @property
+    def alias_count(self) -> int:
+        return len(self._canonical_of)
+    
+    def save(self):
+        """Write the live, committed chunks and aliases atomically."""
+        with self._lock:
+            self._save()
+    
+    def _save(self):
+        if not self._dirty:
+            return
+        pending = self._pending
+        rows = [row for row, chunk_id in enumerate(self._ids)
+                if chunk_id is not None and chunk_id not in pending]
+        aliases = {}
+        for canonical, records in self._aliases.items():
+            records = [r for r in records if r["chunk_id"] not in pending]
+            if records and canonical not in pending:
+                aliases[canonical] = records
+        num_perm = int(self._params[0])
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_path = self._index_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            params=self._params,
+            chunk_ids=np.frombuffer("\0".join(self._ids[row] for row in rows).encode("utf-8"),
+                                    dtype=np.uint8),
+            signatures=np.array([self._signatures[row] for row in rows],
+                                dtype=np.uint32).reshape(len(rows), num_perm),
+            digests=np.frombuffer(b"".join(self._digests[row] for row in rows),
+                                  dtype=np.uint8).reshape(len(rows), 16),
+            aliases=np.frombuffer(json.dumps(aliases).encode("utf-8"), dtype=np.uint8),
+        )
+        os.replace(tmp_path, self._index_path)
+        self._dirty = bool(pending)
+    
+    def reset(self):
+        """Forget every chunk and delete the index file."""
+        if os.path.exists(self._index_path):
+            os.remove(self._index_path)
+        self._clear()
+        self.stats = DedupStats()
+    
+    def __repr__(self):
+        return (f"ChunkDeduplicator({len(self)} chunks, {self.alias_count} aliases, "
+                f"threshold={self.threshold})")
@@ -4,16 +4,37 @@ Document Processor Module
 Handles PDF extraction, text cleaning, and intelligent chunking for RAG pipeline.
 """
 
+import hashlib
 import os
 import re
-from typing import List, Dict, Optional
+import signal
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator, Union
 from dataclasses import dataclass
 import logging
 
 import fitz  # PyMuPDF
 
+from .chunk_store import ChunkStore, ChunkStoreBuilder
+from .text_normalizer import TextNormalizer
+
 logger = logging.getLogger(__name__)
 
+CHUNKING_STRATEGIES = ("fixed", "blocks")
+
+# Separates PyMuPDF text blocks in page text extracted for "blocks" chunking
+BLOCK_SEPARATOR = "\n\n"
+
+# Sentence boundaries for splitting blocks longer than a chunk
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+# A single-line block this short, without closing punctuation, is a heading
+HEADING_MAX_CHARS = 80
+
 
 @dataclass
 class DocumentChunk:
@@ -26,6 +47,98 @@ class DocumentChunk:
         return f"DocumentChunk(chunk_id={self.chunk_id}, length={len(self.text)})"
 
 
+# A document's chunks: a list, or a ChunkStore when the processor is columnar
+Chunks = Union[List[DocumentChunk], ChunkStore]
+
+
+def document_key(pdf_path: str) -> str:
+    """
+    Prefix of a file's chunk IDs: its name plus a short hash of its path.
+    
+    Files with the same name in different directories get distinct chunk
+    IDs, while a file keeps its IDs from one run to the next.
+    """
+    digest = hashlib.blake2b(os.path.abspath(pdf_path).encode("utf-8"), digest_size=4)
+    return f"{os.path.basename(pdf_path)}@{digest.hexdigest()}"
+
+
+@dataclass
+class IngestionStats:
+    """Throughput summary for a multi-document ingestion run."""
+    documents: int = 0
+    failed: int = 0
+    pages: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class FileTimeoutError(TimeoutError):
+    """Raised when a single document exceeds its processing time budget."""
+
+
+# Extra seconds the parent allows past file_timeout before killing a worker,
+# so the worker's own alarm gets to report Python-level overruns first
+_KILL_GRACE_SECONDS = 1.0
+
+
+def _raise_file_timeout(signum, frame):
+    raise FileTimeoutError("document processing timed out")
+
+
+def _terminate_pool(executor: ProcessPoolExecutor):
+    """Kill an executor's worker processes and shut it down."""
+    # No public API stops one task; terminating the workers breaks the pool
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _process_file_worker(
+    processor: "DocumentProcessor",
+    pdf_path: str,
+    timeout: Optional[float] = None
+) -> Tuple[Chunks, int]:
+    """
+    Process a single PDF, enforcing an optional wall-clock timeout.
+    
+    Module-level so it can be pickled into a process pool. The timeout is
+    enforced with SIGALRM, so it only applies on POSIX platforms and when
+    running on the main thread of the (worker) process, and it cannot
+    interrupt native code such as a PyMuPDF call that never returns; in a
+    pool, iter_process_files() kills such workers from the parent.
+    
+    Args:
+        processor: Configured DocumentProcessor
+        pdf_path: Path to the PDF file
+        timeout: Per-file timeout in seconds (None to disable)
+        
+    Returns:
+        Tuple of (chunks, number of pages)
+    """
+    use_alarm = (
+        bool(timeout)
+        and hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_file_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return processor._process_file(pdf_path)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
 class DocumentProcessor:
     """
     Processes PDF documents into semantically meaningful chunks.
@@ -35,13 +148,21 @@ class DocumentProcessor:
     - Cleans and normalizes text
     - Creates overlapping chunks for better context retrieval
     - Preserves document structure and page numbers
+    - Optional multi-process ingestion of whole directories
+    - Optional columnar output (ChunkStore) instead of DocumentChunk lists
+    - Fixed-size or structure-aware ("blocks") chunking
     """
     
     def __init__(
         self,
         chunk_size: int = 800,
         chunk_overlap: int = 200,
-        max_chunks_per_doc: Optional[int] = 500
+        max_chunks_per_doc: Optional[int] = 500,
+        workers: Optional[int] = 1,
+        file_timeout: Optional[float] = None,
+        normalizer: Optional[TextNormalizer] = None,
+        columnar: bool = False,
+        chunking: str = "fixed"
     ):
         """
         Initialize the document processor.
@@ -50,14 +171,39 @@ class DocumentProcessor:
             chunk_size: Target size for each chunk in characters
             chunk_overlap: Number of overlapping characters between chunks
             max_chunks_per_doc: Maximum chunks to extract per document (None for unlimited)
+            workers: Number of worker processes for directory ingestion
+                (1 for in-process, None for one per CPU)
+            file_timeout: Per-file processing timeout in seconds (None to
+                disable). With a pool the parent kills the worker of a file
+                that overruns it; in-process it is best effort (see
+                _process_file_worker)
+            normalizer: Text normalization rules (defaults to all rules enabled)
+            columnar: Return each document's chunks as a ChunkStore rather
+                than a list of DocumentChunk
+            chunking: "fixed" for character windows, or "blocks" to pack
+                whole paragraphs and sentences from the PDF layout
+        
+        Raises:
+            ValueError: If chunking is not a known strategy
         """
+        if chunking not in CHUNKING_STRATEGIES:
+            raise ValueError(
+                f"Unknown chunking strategy: {chunking} "
+                f"(expected one of {CHUNKING_STRATEGIES})"
+            )
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.max_chunks_per_doc = max_chunks_per_doc
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.file_timeout = file_timeout
+        self.normalizer = normalizer or TextNormalizer()
+        self.columnar = columnar
+        self.chunking = chunking
+        self.last_stats: Optional[IngestionStats] = None
         
         logger.info(
             f"Initialized DocumentProcessor (chunk_size={chunk_size}, "
-            f"overlap={chunk_overlap})"
+            f"overlap={chunk_overlap}, workers={self.workers}, chunking={chunking})"
         )
     
     def extract_text_from_pdf(self, pdf_path: str) -> Dict[int, str]:
@@ -67,6 +213,9 @@ class DocumentProcessor:
         Args:
             pdf_path: Path to the PDF file
             
+        With "blocks" chunking, the text blocks of each page are joined by
+        BLOCK_SEPARATOR so the chunker can find paragraph boundaries.
+        
         Returns:
             Dictionary mapping page numbers to extracted text
             
@@ -83,7 +232,7 @@ class DocumentProcessor:
             
             for page_num in range(len(doc)):
                 page = doc[page_num]
-                text = page.get_text()
+                text = self._page_text(page)
                 page_texts[page_num + 1] = text  # 1-indexed page numbers
             
             doc.close()
@@ -93,6 +242,49 @@ class DocumentProcessor:
         except Exception as e:
             raise ValueError(f"Error reading PDF {pdf_path}: {str(e)}")
     
+    def iter_page_texts(self, pdf_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Lazily read a PDF page by page.
+        
+        The file is opened eagerly so missing or unreadable PDFs fail at
+        call time; page text is only extracted as the iterator advances.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Iterator of (page number, raw text) tuples, 1-indexed
+            
+        Raises:
+            FileNotFoundError: If PDF file doesn't exist
+            ValueError: If PDF cannot be opened
+        """
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            raise ValueError(f"Error reading PDF {pdf_path}: {str(e)}")
+        
+        return self._iter_doc_pages(doc)
+    
+    def _iter_doc_pages(self, doc) -> Iterator[Tuple[int, str]]:
+        try:
+            for page_num in range(len(doc)):
+                yield page_num + 1, self._page_text(doc[page_num])
+        finally:
+            doc.close()
+    
+    def _page_text(self, page) -> str:
+        """Raw text of a page, with blocks separated for "blocks" chunking."""
+        if self.chunking != "blocks":
+            return page.get_text()
+        # (x0, y0, x1, y1, text, block_no, block_type); type 1 is an image
+        return BLOCK_SEPARATOR.join(
+            block[4].strip() for block in page.get_text("blocks") if block[6] == 0
+        )
+    
     def clean_text(self, text: str) -> str:
         """
         Clean and normalize extracted text.
@@ -103,28 +295,13 @@ class DocumentProcessor:
         Returns:
             Cleaned text
         """
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove page numbers and headers/footers (common patterns)
-        text = re.sub(r'Page \d+', '', text, flags=re.IGNORECASE)
-        
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s.,!?;:()\-\'"]+', '', text)
-        
-        # Remove standalone numbers (often artifacts)
-        text = re.sub(r'\b\d+\b', '', text)
-        
-        # Normalize quotes
-        text = text.replace('"', '"').replace('"', '"')
-        text = text.replace(''', "'").replace(''', "'")
-        
-        return text.strip()
+        return self.normalizer.normalize(text)
     
     def create_chunks(
         self,
         page_texts: Dict[int, str],
-        doc_name: str
+        doc_name: str,
+        doc_key: Optional[str] = None
     ) -> List[DocumentChunk]:
         """
         Create overlapping chunks from page texts.
@@ -132,42 +309,200 @@ class DocumentProcessor:
         Args:
             page_texts: Dictionary of page numbers to text
             doc_name: Name of the source document
+            doc_key: Chunk ID prefix (default: doc_name; see document_key)
             
         Returns:
             List of DocumentChunk objects
         """
-        chunks = []
-        chunk_counter = 0
+        full_text, spans = self._chunk_spans(page_texts, doc_name)
+        chunks = [
+            DocumentChunk(
+                text=full_text[start:end].strip(),
+                metadata={
+                    "source": doc_name,
+                    "pages": chunk_pages,
+                    "chunk_index": chunk_index,
+                    "start_char": start,
+                    "end_char": end
+                },
+                chunk_id=f"{doc_key or doc_name}_chunk_{chunk_index}"
+            )
+            for chunk_index, start, end, chunk_pages in spans
+        ]
+        
+        logger.info(f"Created {len(chunks)} chunks from {doc_name}")
+        return chunks
+    
+    def create_chunk_store(
+        self,
+        page_texts: Dict[int, str],
+        doc_name: str,
+        doc_key: Optional[str] = None
+    ) -> ChunkStore:
+        """
+        Create the same chunks as create_chunks(), in columnar form.
+        
+        The document text is stored once and each chunk is a span of it, so
+        the overlap between neighbouring chunks is not duplicated.
+        
+        Args:
+            page_texts: Dictionary of page numbers to text
+            doc_name: Name of the source document
+            doc_key: Chunk ID prefix (default: doc_name)
+            
+        Returns:
+            ChunkStore with one row per chunk
+        """
+        full_text, spans = self._chunk_spans(page_texts, doc_name)
+        builder = ChunkStoreBuilder()
+        base = builder.add_text(full_text)
+        source_id = builder.source_id(doc_name, doc_key)
+        for chunk_index, start, end, chunk_pages in spans:
+            # Span of full_text[start:end].strip() without copying it
+            raw = full_text[start:end]
+            stripped = raw.strip()
+            text_start = base + start + (len(raw) - len(raw.lstrip()) if stripped else 0)
+            builder.append(text_start, text_start + len(stripped), doc_name, chunk_index,
+                           start, end, chunk_pages, source_id=source_id)
+        
+        logger.info(f"Created {len(builder)} chunks from {doc_name}")
+        return builder.build()
+    
+    def _chunk_spans(
+        self,
+        page_texts: Dict[int, str],
+        doc_name: str
+    ) -> Tuple[str, List[Tuple[int, int, int, List[int]]]]:
+        """
+        Lay out the document text and the boundaries of its chunks.
+        
+        Returns:
+            The combined page text and one (chunk_index, start_char,
+            end_char, pages) tuple per chunk
+        """
+        if self.chunking == "blocks":
+            units = list(self._iter_block_units(sorted(page_texts.items())))
+            spans = [span[:4] for span in self._pack_units(units, doc_name)]
+            return " ".join(text for _, text, _ in units), spans
         
-        # Combine all pages into one text with page markers
-        full_text = ""
-        page_mapping = {}  # Maps character positions to page numbers
+        spans = []
+        
+        # Combine all pages into one text, recording sorted page boundaries
+        page_parts = []
+        page_starts = []
+        page_ends = []
+        page_numbers = []
         current_pos = 0
         
         for page_num in sorted(page_texts.keys()):
             page_text = self.clean_text(page_texts[page_num])
-            page_start = current_pos
-            page_end = current_pos + len(page_text)
-            
-            page_mapping[(page_start, page_end)] = page_num
-            full_text += page_text + " "
-            current_pos = len(full_text)
+            page_starts.append(current_pos)
+            page_ends.append(current_pos + len(page_text))
+            page_numbers.append(page_num)
+            page_parts.append(page_text)
+            current_pos += len(page_text) + 1
+        
+        full_text = " ".join(page_parts) + " " if page_parts else ""
         
         # Create overlapping chunks
         start = 0
         while start < len(full_text):
             # Define chunk boundaries
             end = min(start + self.chunk_size, len(full_text))
-            chunk_text = full_text[start:end]
             
             # Find which page(s) this chunk belongs to
             chunk_pages = self._get_pages_for_chunk(
-                start, end, page_mapping
+                start, end, page_starts, page_ends, page_numbers
             )
+            spans.append((len(spans), start, end, chunk_pages))
+            
+            # Check max chunks limit
+            if self.max_chunks_per_doc and len(spans) >= self.max_chunks_per_doc:
+                logger.warning(
+                    f"Reached max chunks limit ({self.max_chunks_per_doc}) "
+                    f"for document {doc_name}"
+                )
+                break
+            
+            # Move to next chunk with overlap
+            start += self.chunk_size - self.chunk_overlap
+        
+        return full_text, spans
+    
+    def iter_chunks(self, pdf_path: str) -> Iterator[DocumentChunk]:
+        """
+        Stream chunks from a PDF without materializing the whole document.
+        
+        Produces exactly the chunks that process_document would, but only
+        keeps the current page and chunk window in memory.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Iterator of DocumentChunk objects
+        """
+        return self.iter_chunks_from_pages(
+            self.iter_page_texts(pdf_path),
+            os.path.basename(pdf_path),
+            document_key(pdf_path)
+        )
+    
+    def iter_chunks_from_pages(
+        self,
+        page_texts: Iterable[Tuple[int, str]],
+        doc_name: str,
+        doc_key: Optional[str] = None
+    ) -> Iterator[DocumentChunk]:
+        """
+        Sliding-window chunker over a stream of pages.
+        
+        Chunk boundaries and page metadata are identical to create_chunks;
+        pages must arrive in ascending page order.
+        
+        Args:
+            page_texts: Iterable of (page number, raw text) tuples
+            doc_name: Name of the source document
+            doc_key: Chunk ID prefix (default: doc_name)
             
-            # Create chunk with metadata
-            chunk = DocumentChunk(
-                text=chunk_text.strip(),
+        Yields:
+            DocumentChunk objects
+        """
+        id_prefix = doc_key or doc_name
+        if self.chunking == "blocks":
+            for chunk_index, start, end, chunk_pages, text in self._pack_units(
+                self._iter_block_units(page_texts), doc_name
+            ):
+                yield DocumentChunk(
+                    text=text,
+                    metadata={
+                        "source": doc_name,
+                        "pages": chunk_pages,
+                        "chunk_index": chunk_index,
+                        "start_char": start,
+                        "end_char": end
+                    },
+                    chunk_id=f"{id_prefix}_chunk_{chunk_index}"
+                )
+            return
+        
+        step = self.chunk_size - self.chunk_overlap
+        window = ""         # full_text[window_start:] of the virtual document
+        window_start = 0
+        total_len = 0
+        open_pages = deque()  # (page_start, page_end, page_num) still in reach
+        start = 0
+        chunk_counter = 0
+        
+        def make_chunk(end: int) -> DocumentChunk:
+            while open_pages and open_pages[0][1] <= start:
+                open_pages.popleft()
+            chunk_pages = [
+                page_num for page_start, page_end, page_num in open_pages
+                if page_start < end and page_end > start
+            ]
+            return DocumentChunk(
+                text=window[start - window_start:end - window_start].strip(),
                 metadata={
                     "source": doc_name,
                     "pages": chunk_pages,
@@ -175,53 +510,195 @@ class DocumentProcessor:
                     "start_char": start,
                     "end_char": end
                 },
-                chunk_id=f"{doc_name}_chunk_{chunk_counter}"
+                chunk_id=f"{id_prefix}_chunk_{chunk_counter}"
             )
-            
-            chunks.append(chunk)
-            chunk_counter += 1
-            
-            # Check max chunks limit
+        
+        def limit_reached() -> bool:
             if self.max_chunks_per_doc and chunk_counter >= self.max_chunks_per_doc:
                 logger.warning(
                     f"Reached max chunks limit ({self.max_chunks_per_doc}) "
                     f"for document {doc_name}"
                 )
-                break
+                return True
+            return False
+        
+        pages = iter(page_texts)
+        exhausted = False
+        while not exhausted:
+            page = next(pages, None)
+            if page is None:
+                exhausted = True
+            else:
+                page_num, raw_text = page
+                page_text = self.clean_text(raw_text)
+                open_pages.append((total_len, total_len + len(page_text), page_num))
+                window += page_text + " "
+                total_len += len(page_text) + 1
             
-            # Move to next chunk with overlap
-            start += self.chunk_size - self.chunk_overlap
+            # Emit every chunk whose extent is now fully known
+            while start < total_len and (
+                exhausted or start + self.chunk_size <= total_len
+            ):
+                yield make_chunk(min(start + self.chunk_size, total_len))
+                chunk_counter += 1
+                if limit_reached():
+                    logger.info(f"Created {chunk_counter} chunks from {doc_name}")
+                    return
+                start += step
+            
+            # Drop text no future chunk can reach
+            if start > window_start:
+                window = window[start - window_start:]
+                window_start = start
         
-        logger.info(f"Created {len(chunks)} chunks from {doc_name}")
-        return chunks
+        logger.info(f"Created {chunk_counter} chunks from {doc_name}")
     
-    def _get_pages_for_chunk(
+    def _iter_block_units(
+        self,
+        page_texts: Iterable[Tuple[int, str]]
+    ) -> Iterator[Tuple[int, str, bool]]:
+        """
+        Cleaned paragraphs of each page, split to fit in a chunk.
+        
+        Blocks are separated by BLOCK_SEPARATOR in the raw page text. A
+        block longer than chunk_size is split at sentence ends, and a
+        sentence longer than chunk_size at the last space that fits.
+        
+        Yields:
+            (page number, text, is_heading) tuples in document order
+        """
+        for page_num, raw_text in page_texts:
+            for block in raw_text.split(BLOCK_SEPARATOR):
+                text = self.clean_text(block)
+                if not text:
+                    continue
+                if len(text) <= self.chunk_size:
+                    is_heading = (
+                        "\n" not in block.strip() and len(text) <= HEADING_MAX_CHARS
+                        and text[-1] not in ".!?"
+                    )
+                    yield page_num, text, is_heading
+                    continue
+                for piece in self._split_long_text(text):
+                    yield page_num, piece, False
+    
+    def _split_long_text(self, text: str) -> Iterator[str]:
+        """Pieces of at most chunk_size characters, cut at sentences or words."""
+        piece = ""
+        for sentence in _SENTENCE_END.split(text):
+            if piece and len(piece) + 1 + len(sentence) <= self.chunk_size:
+                piece += " " + sentence
+                continue
+            if piece:
+                yield piece
+            while len(sentence) > self.chunk_size:
+                cut = sentence.rfind(" ", 0, self.chunk_size + 1)
+                if cut <= 0:
+                    cut = self.chunk_size
+                yield sentence[:cut].rstrip()
+                sentence = sentence[cut:].lstrip()
+            piece = sentence
+        if piece:
+            yield piece
+    
+    def _pack_units(
         self,
+        units: Iterable[Tuple[int, str, bool]],
+        doc_name: str
+    ) -> Iterator[Tuple[int, int, int, List[int], str]]:
+        """
+        Pack consecutive units into chunks of at most chunk_size characters.
+        
+        Offsets refer to the units joined by single spaces. Each chunk
+        after the first repeats the trailing units of the previous one that
+        fit in chunk_overlap, except where a heading starts a new section.
+        A heading starts a new chunk once the current one is half full, and
+        is never left at the end of a chunk when its section follows.
+        
+        Yields:
+            (chunk_index, start_char, end_char, pages, text) per chunk
+        """
+        current = deque()  # (start, page, text, is_heading) of the units in the chunk
+        size = 0           # length of the current units joined by spaces
+        offset = 0
+        chunk_index = 0
+        
+        def emit():
+            start = current[0][0]
+            text = " ".join(unit[2] for unit in current)
+            pages = sorted({unit[1] for unit in current})
+            return chunk_index, start, start + len(text), pages, text
+        
+        for page_num, text, is_heading in units:
+            needed = len(text) + (1 if current else 0)
+            if current and (size + needed > self.chunk_size
+                            or (is_heading and size >= self.chunk_size // 2)):
+                # A heading closing the chunk moves on with its section
+                heading = None
+                if len(current) > 1 and current[-1][3] and \
+                        len(current[-1][2]) + 1 + len(text) <= self.chunk_size:
+                    heading = current.pop()
+                yield emit()
+                chunk_index += 1
+                if self.max_chunks_per_doc and chunk_index >= self.max_chunks_per_doc:
+                    logger.warning(
+                        f"Reached max chunks limit ({self.max_chunks_per_doc}) "
+                        f"for document {doc_name}"
+                    )
+                    return
+                
+                # Keep the trailing units that fit in the overlap and leave
+                # room for this unit
+                kept, kept_size = deque(), 0
+                if heading is not None:
+                    kept.append(heading)
+                    kept_size = len(heading[2])
+                elif not is_heading:
+                    for unit in reversed(current):
+                        grown = kept_size + len(unit[2]) + (1 if kept else 0)
+                        if grown > self.chunk_overlap or grown + 1 + len(text) > self.chunk_size:
+                            break
+                        kept.appendleft(unit)
+                        kept_size = grown
+                current, size = kept, kept_size
+                needed = len(text) + (1 if current else 0)
+            
+            current.append((offset, page_num, text, is_heading))
+            size += needed
+            offset += len(text) + 1
+        
+        if current:
+            yield emit()
+    
+    @staticmethod
+    def _get_pages_for_chunk(
         start: int,
         end: int,
-        page_mapping: Dict[tuple, int]
+        page_starts: List[int],
+        page_ends: List[int],
+        page_numbers: List[int]
     ) -> List[int]:
         """
         Determine which pages a chunk spans.
         
+        Page ranges are disjoint and sorted, so the overlapping pages form a
+        contiguous run found with two binary searches.
+        
         Args:
             start: Start character position
             end: End character position
-            page_mapping: Mapping of character ranges to page numbers
+            page_starts: Sorted start offsets of each page
+            page_ends: Sorted end offsets of each page
+            page_numbers: Page number for each offset pair
             
         Returns:
             List of page numbers the chunk spans
         """
-        pages = set()
-        
-        for (page_start, page_end), page_num in page_mapping.items():
-            # Check if chunk overlaps with this page
-            if not (end <= page_start or start >= page_end):
-                pages.add(page_num)
-        
-        return sorted(list(pages))
+        first = bisect_right(page_ends, start)
+        last = bisect_left(page_starts, end)
+        return page_numbers[first:last]
     
-    def process_document(self, pdf_path: str) -> List[DocumentChunk]:
+    def process_document(self, pdf_path: str) -> Chunks:
         """
         Complete processing pipeline for a single PDF document.
         
@@ -229,8 +706,13 @@ class DocumentProcessor:
             pdf_path: Path to PDF file
             
         Returns:
-            List of DocumentChunk objects ready for embedding
+            DocumentChunk list (ChunkStore if columnar) ready for embedding
         """
+        chunks, _ = self._process_file(pdf_path)
+        return chunks
+    
+    def _process_file(self, pdf_path: str) -> Tuple[Chunks, int]:
+        """Run the processing pipeline, also returning the page count."""
         doc_name = os.path.basename(pdf_path)
         logger.info(f"Processing document: {doc_name}")
         
@@ -238,12 +720,15 @@ class DocumentProcessor:
         page_texts = self.extract_text_from_pdf(pdf_path)
         
         # Create chunks
-        chunks = self.create_chunks(page_texts, doc_name)
+        if self.columnar:
+            chunks = self.create_chunk_store(page_texts, doc_name, document_key(pdf_path))
+        else:
+            chunks = self.create_chunks(page_texts, doc_name, document_key(pdf_path))
         
         logger.info(f"Successfully processed {doc_name}: {len(chunks)} chunks created")
-        return chunks
+        return chunks, len(page_texts)
     
-    def process_directory(self, dir_path: str) -> Dict[str, List[DocumentChunk]]:
+    def process_directory(self, dir_path: str) -> Dict[str, Chunks]:
         """
         Process all PDF files in a directory.
         
@@ -256,24 +741,146 @@ class DocumentProcessor:
         if not os.path.isdir(dir_path):
             raise ValueError(f"Directory not found: {dir_path}")
         
-        all_chunks = {}
         pdf_files = [f for f in os.listdir(dir_path) if f.endswith('.pdf')]
         
         logger.info(f"Found {len(pdf_files)} PDF files in {dir_path}")
         
-        for pdf_file in pdf_files:
-            pdf_path = os.path.join(dir_path, pdf_file)
-            try:
-                chunks = self.process_document(pdf_path)
+        return self.process_files(
+            [os.path.join(dir_path, pdf_file) for pdf_file in pdf_files]
+        )
+    
+    def iter_process_files(
+        self,
+        pdf_paths: List[str],
+        max_pending: Optional[int] = None
+    ) -> Iterator[Tuple[str, Optional[Chunks], int]]:
+        """
+        Process PDF files lazily, in parallel when workers > 1.
+        
+        At most ``max_pending`` files are submitted to the pool ahead of the
+        consumer, so a slow consumer holds back extraction instead of
+        letting finished chunks pile up in memory. With a pool, all worker
+        processes are started before the first result is yielded.
+        
+        With ``file_timeout`` set, at most ``workers`` files are in flight,
+        and a file still running ``file_timeout`` (plus a short grace)
+        seconds after a worker picked it up fails: the pool is killed,
+        since its worker may be stuck in native code, and the other files
+        in flight are resubmitted to a new one.
+        
+        Args:
+            pdf_paths: Paths of the PDF files to process
+            max_pending: Files in flight at once (default: 2 per worker)
+        
+        Yields:
+            (pdf_path, chunks, number of pages) per file in completion order;
+            chunks is None (and pages 0) when the file failed or timed out
+        """
+        if self.workers <= 1 or (len(pdf_paths) <= 1 and not self.file_timeout):
+            for pdf_path in pdf_paths:
+                try:
+                    chunks, num_pages = _process_file_worker(self, pdf_path, self.file_timeout)
+                except Exception as e:
+                    logger.error(f"Failed to process {os.path.basename(pdf_path)}: {str(e)}")
+                    yield pdf_path, None, 0
+                else:
+                    yield pdf_path, chunks, num_pages
+            return
+        
+        max_pending = max(1, max_pending or 2 * self.workers)
+        deadline = None
+        if self.file_timeout:
+            # Files queued behind busy workers would run against the clock
+            max_pending = min(max_pending, self.workers)
+            deadline = self.file_timeout + _KILL_GRACE_SECONDS
+        queued = deque(pdf_paths)
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        pending: Dict = {}
+        started: Dict = {}
+        try:
+            while queued or pending:
+                while queued and len(pending) < max_pending:
+                    pdf_path = queued.popleft()
+                    pending[executor.submit(_process_file_worker, self, pdf_path,
+                                            self.file_timeout)] = pdf_path
+                done, _ = wait(pending, timeout=deadline and min(deadline / 4, 1.0),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    pdf_path = pending.pop(future)
+                    started.pop(future, None)
+                    try:
+                        chunks, num_pages = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to process {os.path.basename(pdf_path)}: {str(e)}")
+                        yield pdf_path, None, 0
+                    else:
+                        yield pdf_path, chunks, num_pages
+                if deadline is None:
+                    continue
+                
+                now = time.monotonic()
+                for future in pending:
+                    if future.running():
+                        started.setdefault(future, now)
+                expired = [f for f in pending if now - started.get(f, now) > deadline]
+                if not expired:
+                    continue
+                for future in expired:
+                    pdf_path = pending.pop(future)
+                    logger.error(f"Failed to process {os.path.basename(pdf_path)}: "
+                                 f"timed out after {self.file_timeout}s, worker killed")
+                    yield pdf_path, None, 0
+                queued.extendleft(reversed(list(pending.values())))
+                pending.clear()
+                started.clear()
+                _terminate_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+        finally:
+            executor.shutdown()
+    
+    def process_files(self, pdf_paths: List[str]) -> Dict[str, Chunks]:
+        """
+        Process a list of PDF files, in parallel when workers > 1.
+        
+        Failures (including timeouts) are logged and skipped per file, so one
+        bad PDF never aborts the batch. Throughput is logged and kept in
+        ``last_stats``.
+        
+        Args:
+            pdf_paths: Paths of the PDF files to process
+            
+        Returns:
+            Dictionary mapping filenames to their chunks, in input order
+        """
+        stats = IngestionStats()
+        started = time.perf_counter()
+        results: Dict[str, Tuple[Chunks, int]] = {}
+        
+        for pdf_path, chunks, num_pages in self.iter_process_files(
+                pdf_paths, max_pending=len(pdf_paths)):
+            if chunks is None:
+                stats.failed += 1
+            else:
+                results[os.path.basename(pdf_path)] = chunks, num_pages
+        
+        all_chunks = {}
+        for pdf_path in pdf_paths:
+            pdf_file = os.path.basename(pdf_path)
+            if pdf_file in results:
+                chunks, num_pages = results[pdf_file]
                 all_chunks[pdf_file] = chunks
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file}: {str(e)}")
-                continue
+                stats.pages += num_pages
+                stats.chunks += len(chunks)
+        
+        stats.documents = len(all_chunks)
+        stats.elapsed = time.perf_counter() - started
+        self.last_stats = stats
         
-        total_chunks = sum(len(chunks) for chunks in all_chunks.values())
         logger.info(
-            f"Processed {len(all_chunks)} documents, "
-            f"total {total_chunks} chunks"
+            f"Processed {stats.documents} documents, "
+            f"total {stats.chunks} chunks "
+            f"({stats.pages_per_second:.1f} pages/s, "
+            f"{stats.chunks_per_second:.1f} chunks/s)"
         )
         
         return all_chunks
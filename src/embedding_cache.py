@@ -0,0 +1,335 @@
+"""
+Embedding Cache Module
+
+Persistent, content-addressed cache of embedding vectors with LRU eviction.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KEY_SIZE = 16  # bytes of BLAKE2b digest per key
+INITIAL_CAPACITY = 1024
+
+# One journal record: a key and the slot it now occupies (put or hit)
+_JOURNAL_DTYPE = np.dtype([("key", np.uint8, KEY_SIZE), ("slot", "<i8")])
+
+# Journal records kept before the index is rewritten, at least this many
+# and at least as many as there are entries
+MIN_COMPACT_RECORDS = 65_536
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by hash(model name, normalized text).
+    
+    Layout under ``cache_dir``:
+    - ``vectors.f32``: float32 matrix of cached vectors, memory-mapped
+    - ``index.npz``: key digests and their row slots, least recent first,
+      with the generation of the journal that continues it
+    - ``journal.<generation>.bin``: (key, slot) records of puts and hits
+      since that index was written, replayed on load
+    - ``meta.json``: vector dimension and allocated capacity
+    
+    Lookups gather all hit rows from the memory map in one fancy-indexing
+    call, so no per-vector deserialization happens. When ``max_entries`` is
+    reached the least recently used entry's slot is reused.
+    
+    flush() only appends the records since the last flush to the journal,
+    so its cost does not grow with the cache. The index is rewritten (and
+    a new journal started) by close(), or by flush() once the journal
+    holds more records than the index has entries.
+    """
+    
+    def __init__(self, cache_dir: str, max_entries: int = 500_000):
+        """
+        Initialize the cache, loading any existing index from disk.
+        
+        Args:
+            cache_dir: Directory holding the cache files
+            max_entries: Maximum number of cached vectors
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._index: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free_slots: List[int] = []
+        self._vectors = None
+        self._dimension = None
+        self._capacity = 0
+        self._generation = 0
+        self._journal: List[Tuple[bytes, int]] = []  # records not yet flushed
+        self._journal_records = 0  # records in the journal file
+        self._meta_dirty = False
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+        logger.info(
+            f"Initialized EmbeddingCache at {cache_dir} "
+            f"({len(self._index)} entries, max {max_entries})"
+        )
+    
+    @staticmethod
+    def make_key(model_name: str, text: str) -> bytes:
+        """
+        Content address for a text embedded by a given model.
+        
+        Whitespace is normalized so re-extracted text with different line
+        breaks still hits the cache.
+        """
+        normalized = " ".join(text.split())
+        return hashlib.blake2b(
+            f"{model_name}\0{normalized}".encode("utf-8"),
+            digest_size=KEY_SIZE
+        ).digest()
+    
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.cache_dir, "vectors.f32")
+    
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, "index.npz")
+    
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.cache_dir, "meta.json")
+    
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self.cache_dir, f"journal.{generation}.bin")
+    
+    @property
+    def unflushed(self) -> int:
+        """Puts and hits recorded since the last flush."""
+        return len(self._journal)
+    
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._dimension = meta["dimension"]
+        self._capacity = meta["capacity"]
+        self._open_vectors()
+        
+        if os.path.exists(self._index_path):
+            with np.load(self._index_path) as data:
+                raw_keys, slots = data["keys"].tobytes(), data["slots"]
+                self._generation = int(data["generation"]) if "generation" in data else 0
+            keys = [raw_keys[i:i + KEY_SIZE] for i in range(0, len(raw_keys), KEY_SIZE)]
+            self._index = OrderedDict(zip(keys, slots.tolist()))
+        self._replay_journal()
+        for path in glob.glob(os.path.join(self.cache_dir, "journal.*.bin")):
+            if path != self._journal_path(self._generation):
+                os.remove(path)  # left over from an interrupted rewrite
+        used = set(self._index.values())
+        self._free_slots = [s for s in range(self._capacity - 1, -1, -1) if s not in used]
+        
+        # Honour a smaller max_entries than the cache was written with
+        while len(self._index) > self.max_entries:
+            self._evict()
+    
+    def _replay_journal(self):
+        path = self._journal_path(self._generation)
+        if not os.path.exists(path):
+            return
+        # A torn last record (crash mid-append) is ignored
+        count = os.path.getsize(path) // _JOURNAL_DTYPE.itemsize
+        records = np.fromfile(path, dtype=_JOURNAL_DTYPE, count=count)
+        self._journal_records = count
+        owner = {slot: key for key, slot in self._index.items()}
+        for raw_key, slot in zip(records["key"], records["slot"].tolist()):
+            key = raw_key.tobytes()
+            previous = owner.get(slot)
+            if previous is not None and previous != key:
+                del self._index[previous]  # evicted, its slot reused
+            old_slot = self._index.get(key)
+            if old_slot is not None and old_slot != slot:
+                del owner[old_slot]
+            self._index[key] = slot
+            self._index.move_to_end(key)
+            owner[slot] = key
+    
+    def _open_vectors(self):
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+",
+            shape=(self._capacity, self._dimension)
+        )
+    
+    def _grow(self, needed: int):
+        """Extend the vector file so at least ``needed`` slots exist."""
+        new_capacity = max(self._capacity * 2, INITIAL_CAPACITY, needed)
+        new_capacity = min(new_capacity, self.max_entries)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self._dimension * 4)
+        self._free_slots = (
+            list(range(new_capacity - 1, self._capacity - 1, -1)) + self._free_slots
+        )
+        self._capacity = new_capacity
+        self._meta_dirty = True
+        self._open_vectors()
+    
+    def _evict(self):
+        _, slot = self._index.popitem(last=False)
+        self._free_slots.append(slot)
+        self.evictions += 1
+    
+    def get_many(self, keys: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up many keys at once.
+        
+        Args:
+            keys: Cache keys from make_key
+        
+        Returns:
+            Tuple of (boolean hit mask over keys, float32 vectors for the hits
+            in key order)
+        """
+        found = np.zeros(len(keys), dtype=bool)
+        slots = []
+        for i, key in enumerate(keys):
+            slot = self._index.get(key)
+            if slot is not None:
+                self._index.move_to_end(key)
+                self._journal.append((key, slot))  # recency changed
+                found[i] = True
+                slots.append(slot)
+        
+        hit_count = len(slots)
+        self.hits += hit_count
+        self.misses += len(keys) - hit_count
+        if hit_count:
+            return found, np.array(self._vectors[np.array(slots)], dtype=np.float32)
+        return found, np.zeros((0, self._dimension or 0), dtype=np.float32)
+    
+    def put_many(self, keys: List[bytes], vectors: np.ndarray):
+        """
+        Insert or refresh vectors, evicting least recently used entries.
+        
+        Args:
+            keys: Cache keys from make_key
+            vectors: Array of shape (len(keys), dimension)
+        """
+        if not keys:
+            return
+        if len(keys) > self.max_entries:
+            keys = keys[-self.max_entries:]
+            vectors = vectors[-self.max_entries:]
+        
+        if self._dimension is None:
+            self._dimension = int(vectors.shape[1])
+            self._meta_dirty = True
+        elif vectors.shape[1] != self._dimension:
+            raise ValueError(
+                f"Vector dimension {vectors.shape[1]} does not match cache "
+                f"dimension {self._dimension}"
+            )
+        
+        new_keys = sum(1 for key in set(keys) if key not in self._index)
+        if len(self._index) + new_keys > self._capacity and self._capacity < self.max_entries:
+            self._grow(len(self._index) + new_keys)
+        
+        slots = []
+        for key in keys:
+            slot = self._index.get(key)
+            if slot is None:
+                if not self._free_slots:
+                    self._evict()
+                slot = self._free_slots.pop()
+            self._index[key] = slot
+            self._index.move_to_end(key)
+            self._journal.append((key, slot))
+            slots.append(slot)
+        
+        self._vectors[np.array(slots)] = vectors
+    
+    def flush(self):
+        """
+        Persist the vectors and append the new puts and hits to the journal.
+        
+        The index itself is rewritten only once the journal outgrows it.
+        """
+        if not self._journal or self._vectors is None:
+            return
+        # Vectors and capacity first, so journal records never point past them
+        self._vectors.flush()
+        if self._meta_dirty:
+            self._write_meta()
+        
+        if self._journal_records + len(self._journal) > max(MIN_COMPACT_RECORDS,
+                                                           len(self._index)):
+            self._write_index()
+            return
+        records = np.empty(len(self._journal), dtype=_JOURNAL_DTYPE)
+        records["key"] = np.frombuffer(b"".join(key for key, _ in self._journal),
+                                       dtype=np.uint8).reshape(-1, KEY_SIZE)
+        records["slot"] = [slot for _, slot in self._journal]
+        with open(self._journal_path(self._generation), "ab") as f:
+            records.tofile(f)
+        self._journal_records += len(records)
+        self._journal = []
+    
+    def close(self):
+        """Flush, folding the journal into a rewritten index."""
+        if self._vectors is None:
+            return
+        if self._journal or self._journal_records:
+            self._vectors.flush()
+            if self._meta_dirty:
+                self._write_meta()
+            self._write_index()
+    
+    def _write_meta(self):
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump({"dimension": self._dimension, "capacity": self._capacity}, f)
+        self._meta_dirty = False
+    
+    def _write_index(self):
+        """Write the whole LRU index and start an empty journal."""
+        old_journal = self._journal_path(self._generation)
+        generation = self._generation + 1
+        # Raw uint8 rows: fixed-width bytes dtypes would drop trailing NULs
+        keys = np.frombuffer(b"".join(self._index), dtype=np.uint8).reshape(-1, KEY_SIZE)
+        slots = np.fromiter(self._index.values(), dtype=np.int64, count=len(self._index))
+        tmp_path = self._index_path + ".tmp.npz"
+        np.savez(tmp_path, keys=keys, slots=slots, generation=np.int64(generation))
+        os.replace(tmp_path, self._index_path)
+        
+        # The old journal is already folded in; a crash before this removal
+        # leaves it under a generation the new index does not replay
+        if os.path.exists(old_journal):
+            os.remove(old_journal)
+        self._generation = generation
+        self._journal = []
+        self._journal_records = 0
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+    
+    def __len__(self):
+        return len(self._index)
+    
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
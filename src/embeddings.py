@@ -5,33 +5,214 @@ Generates vector embeddings for text chunks using sentence transformers.
 """
 
 import logging
-from typing import List
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
 import numpy as np
 
+from .embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
+# Cache entries written since the last flush, or seconds since it, after
+# which generate_embeddings() flushes the cache (see EmbeddingCache.flush)
+CACHE_FLUSH_ENTRIES = 1024
+CACHE_FLUSH_SECONDS = 30.0
+
 
 class EmbeddingGenerator:
     """
     Generates embeddings for text using sentence transformers.
     
-    TODO (Day 2):
-    - Load sentence-transformers model
-    - Batch embedding generation
-    - Caching mechanism
+    Features:
+    - Lazy model loading (the model is only loaded on first use)
+    - Length-sorted batching to minimize padding waste
+    - Contiguous float32 output in input order
+    - Optional L2 normalization
+    - Optional persistent cache so unchanged texts are never re-embedded;
+      it is flushed every ``CACHE_FLUSH_ENTRIES`` entries or
+      ``CACHE_FLUSH_SECONDS``, by flush_cache() (RAGPipeline calls it after
+      each ingestion run) and by close()
+    - Safe to call from several threads (cache access is serialized)
     """
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        device: str = "cpu",
+        batch_size: int = 32,
+        normalize: bool = False,
+        model=None,
+        cache_dir: Optional[str] = None,
+        cache_max_entries: int = 500_000
+    ):
+        """
+        Initialize the embedding generator.
+        
+        Args:
+            model_name: Sentence-transformers model name or path
+            device: Device to run the model on ("cpu" or "cuda")
+            batch_size: Number of texts encoded per forward pass
+            normalize: L2-normalize embeddings (for cosine/dot-product search)
+            model: Preloaded model exposing encode() (loaded from model_name if None)
+            cache_dir: Directory for the on-disk embedding cache (None disables caching)
+            cache_max_entries: Maximum number of cached vectors
+        """
         self.model_name = model_name
-        logger.info(f"Initialized EmbeddingGenerator with model: {model_name}")
-        # TODO: Load model
+        self.device = device
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self._model = model
+        self.cache = None
+        self._cache_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        if cache_dir:
+            model_slug = re.sub(r'[^\w.-]+', '_', model_name)
+            self.cache = EmbeddingCache(
+                os.path.join(cache_dir, "embeddings", model_slug),
+                max_entries=cache_max_entries
+            )
+        logger.info(
+            f"Initialized EmbeddingGenerator with model: {model_name} "
+            f"(batch_size={batch_size}, normalize={normalize})"
+        )
     
-    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
-        """Generate embeddings for a list of texts."""
-        # TODO: Implement
-        logger.warning("EmbeddingGenerator.generate_embeddings not yet implemented")
-        return np.array([])
-
+    @property
+    def model(self):
+        """The underlying sentence-transformers model, loaded on first access."""
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise ImportError(
+                    "sentence-transformers is required for EmbeddingGenerator. "
+                    "Install it with: pip install sentence-transformers"
+                ) from e
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+            logger.info(f"Loaded embedding model {self.model_name} on {self.device}")
+        return self._model
+    
+    @property
+    def dimension(self) -> int:
+        """Dimensionality of the generated embeddings."""
+        return self.model.get_sentence_embedding_dimension()
+    
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts.
+        
+        Cached vectors are reused; only cache misses are encoded, in
+        length-sorted batches so each batch pads to a similar length.
+        Results are scattered back so row i is the embedding of texts[i].
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Override the configured batch size for this call
+        
+        Returns:
+            C-contiguous float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        if self.cache is None:
+            embeddings = self._encode(texts, batch_size)
+        else:
+            embeddings = self._encode_with_cache(texts, batch_size)
+        
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            np.maximum(norms, 1e-12, out=norms)
+            embeddings /= norms
+        
+        return embeddings
+    
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Encode texts in length-sorted batches, returning rows in input order."""
+        batch_size = batch_size or self.batch_size
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = None
+        
+        for batch_start in range(0, len(texts), batch_size):
+            indices = order[batch_start:batch_start + batch_size]
+            batch = self.model.encode(
+                [texts[i] for i in indices],
+                batch_size=len(indices),
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            embeddings[indices] = batch
+        
+        return embeddings
+    
+    def _encode_with_cache(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        """Serve cache hits, encode each distinct miss once and cache it."""
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        with self._cache_lock:
+            found, cached = self.cache.get_many(keys)
+        
+        # Texts repeated within the call are encoded once
+        pending: Dict[bytes, List[int]] = {}
+        for i in np.flatnonzero(~found):
+            pending.setdefault(keys[i], []).append(i)
+        
+        encoded = None
+        if pending:
+            miss_keys = list(pending)
+            encoded = self._encode([texts[pending[key][0]] for key in miss_keys], batch_size)
+            with self._cache_lock:
+                self.cache.put_many(miss_keys, encoded)
+                if self.cache.unflushed >= CACHE_FLUSH_ENTRIES \
+                        or time.monotonic() - self._last_flush >= CACHE_FLUSH_SECONDS:
+                    self.cache.flush()
+                    self._last_flush = time.monotonic()
+        
+        dimension = cached.shape[1] if len(cached) else encoded.shape[1]
+        embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+        if len(cached):
+            embeddings[found] = cached
+        for row, key in enumerate(pending):
+            embeddings[pending[key]] = encoded[row]
+        
+        logger.debug(
+            f"Embedding cache: {int(found.sum())} hits, {len(texts) - int(found.sum())} misses"
+        )
+        return embeddings
+    
+    def cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters of the embedding cache (empty if caching is off)."""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def flush_cache(self):
+        """Persist cache entries written since the last flush."""
+        if self.cache is None:
+            return
+        with self._cache_lock:
+            self.cache.flush()
+            self._last_flush = time.monotonic()
+    
+    def close(self):
+        """Flush the cache and compact its on-disk index."""
+        if self.cache is None:
+            return
+        with self._cache_lock:
+            self.cache.close()
 
 if __name__ == "__main__":
-    print("EmbeddingGenerator module (placeholder) loaded successfully!")
+    logging.basicConfig(level=logging.INFO)
+    
+    generator = EmbeddingGenerator(normalize=True)
+    vectors = generator.generate_embeddings(["What is RAG?", "Retrieval-Augmented Generation"])
+    print(f"Generated embeddings with shape {vectors.shape}")
@@ -0,0 +1,164 @@
+"""
+Ingestion Manifest Module
+
+Tracks which files have been indexed so re-runs only process what changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class FileRecord:
+    """What was indexed for one file, and the file state it came from."""
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IngestionPlan:
+    """Files to index, re-index, skip or purge on this run."""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+
+class IngestionManifest:
+    """
+    JSON manifest of indexed files, keyed by absolute path.
+    
+    A file is considered unchanged when its size and mtime match the
+    recorded ones. When they differ the content hash decides, so touching
+    a file or copying it back in place does not trigger re-indexing.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Initialize the manifest, loading it from disk if present.
+        
+        Args:
+            path: Location of the manifest JSON file
+        """
+        self.path = path
+        self.records: Dict[str, FileRecord] = {}
+        
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.records = {
+                record["path"]: FileRecord(**record) for record in data.get("files", [])
+            }
+        logger.info(f"Loaded ingestion manifest {path} ({len(self.records)} files)")
+    
+    def plan(self, file_paths: List[str], directory: Optional[str] = None) -> IngestionPlan:
+        """
+        Compare the given files with the manifest.
+        
+        Args:
+            file_paths: Files currently present in the indexed location
+            directory: The indexed directory; only recorded files directly
+                inside it can be reported as deleted. None considers every
+                recorded file.
+        
+        Returns:
+            IngestionPlan with absolute paths; recorded files missing from
+            file_paths are reported as deleted
+        """
+        plan = IngestionPlan()
+        seen = set()
+        root = os.path.abspath(directory) if directory is not None else None
+        
+        for file_path in file_paths:
+            key = os.path.abspath(file_path)
+            seen.add(key)
+            record = self.records.get(key)
+            if record is None:
+                plan.added.append(key)
+                continue
+            
+            stat = os.stat(key)
+            if stat.st_size == record.size and stat.st_mtime_ns == record.mtime_ns:
+                plan.unchanged.append(key)
+            elif hash_file(key) == record.content_hash:
+                # Same bytes, new timestamp: remember the stat, skip the work
+                record.size = stat.st_size
+                record.mtime_ns = stat.st_mtime_ns
+                plan.unchanged.append(key)
+            else:
+                plan.modified.append(key)
+        
+        plan.deleted = [
+            key for key in self.records
+            if key not in seen and (root is None or os.path.dirname(key) == root)
+        ]
+        return plan
+    
+    def chunk_ids(self, file_path: str) -> List[str]:
+        """Chunk IDs recorded for a file (empty if unknown)."""
+        record = self.records.get(os.path.abspath(file_path))
+        return list(record.chunk_ids) if record else []
+    
+    def record(
+        self,
+        file_path: str,
+        chunk_ids: List[str],
+        content_hash: Optional[str] = None
+    ):
+        """
+        Record that a file has been indexed.
+        
+        Args:
+            file_path: Indexed file
+            chunk_ids: IDs of the chunks it produced
+            content_hash: SHA-256 of the content (computed if None)
+        """
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        self.records[key] = FileRecord(
+            path=key,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            content_hash=content_hash or hash_file(key),
+            chunk_ids=list(chunk_ids)
+        )
+    
+    def remove(self, file_path: str):
+        """Forget a file."""
+        self.records.pop(os.path.abspath(file_path), None)
+    
+    def save(self):
+        """Write the manifest atomically."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": [asdict(r) for r in self.records.values()]}, f)
+        os.replace(tmp_path, self.path)
+    
+    def clear(self):
+        """Forget every file and remove the manifest from disk."""
+        self.records = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
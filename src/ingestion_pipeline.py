@@ -0,0 +1,326 @@
+"""
+Ingestion Pipeline Module
+
+Overlapped extract → embed → index stages connected by bounded queues.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+# How often a blocked stage checks whether another stage has failed
+_POLL_SECONDS = 0.1
+
+
+@dataclass
+class StageStats:
+    """Throughput and queue metrics of one ingestion stage."""
+    name: str
+    unit: str
+    items: int = 0
+    busy: float = 0.0  # seconds spent working
+    idle: float = 0.0  # seconds waiting for input
+    blocked: float = 0.0  # seconds waiting for room in the output queue
+    max_queue_depth: int = 0
+    _depth_total: int = 0
+    _depth_samples: int = 0
+    
+    @property
+    def throughput(self) -> float:
+        """Items per second of work (excluding waits)."""
+        return self.items / self.busy if self.busy > 0 else 0.0
+    
+    @property
+    def mean_queue_depth(self) -> float:
+        """Average output queue depth seen after each hand-off."""
+        return self._depth_total / self._depth_samples if self._depth_samples else 0.0
+    
+    def record_depth(self, depth: int):
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+
+@dataclass
+class IngestionReport:
+    """Outcome and per-stage metrics of an IngestionPipeline run."""
+    files: int = 0
+    failed: int = 0
+    pages: int = 0
+    chunks: int = 0
+    duplicates: int = 0
+    elapsed: float = 0.0
+    stages: List[StageStats] = field(default_factory=lambda: [
+        StageStats("extract", "files"),
+        StageStats("embed", "chunks"),
+        StageStats("index", "chunks"),
+    ])
+
+
+class IngestionPipeline:
+    """
+    Staged producer/consumer ingestion of PDF files.
+    
+    Three stages run concurrently, so parsing, embedding and index writes
+    overlap instead of leaving the CPU or disk idle at each hand-off:
+    - extract: the DocumentProcessor's process pool (or the calling thread
+      with one worker) turns files into chunks, yielding them as they finish
+    - embed: a thread filters duplicates (with a ChunkDeduplicator) and
+      embeds chunks in batches of ``batch_size`` across file boundaries
+    - index: a thread bulk-writes each batch to the vector store and the
+      lexical index
+    
+    Features:
+    - Bounded queues of ``queue_size`` files and batches between the stages
+      provide back-pressure: a slow stage stalls the ones upstream, so
+      memory stays flat whatever the corpus size
+    - A file is reported done (on_indexed) only once all its chunks are
+      written, so a crash never records a partially indexed file; the
+      deduplicator's clusters are committed at the same points
+    - A failure in any stage stops the others and is re-raised by run()
+    - Per-stage throughput, wait times and queue depths in ``last_report``
+    """
+    
+    def __init__(
+        self,
+        document_processor,
+        embedding_generator,
+        vector_store,
+        lexical_index=None,
+        deduplicator=None,
+        batch_size: int = 256,
+        queue_size: int = 4
+    ):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            document_processor: DocumentProcessor turning PDFs into chunks
+            embedding_generator: EmbeddingGenerator for chunk vectors
+            vector_store: VectorStore receiving the chunks
+            lexical_index: Optional BM25Index kept in sync with the store
+            deduplicator: Optional ChunkDeduplicator; duplicates are not embedded
+            batch_size: Chunks per embedding call and bulk index write
+            queue_size: Files (extract → embed) and batches (embed → index)
+                buffered between stages
+        
+        Raises:
+            ValueError: If batch_size or queue_size is less than 1
+        """
+        if batch_size < 1 or queue_size < 1:
+            raise ValueError(
+                f"batch_size and queue_size must be at least 1, got {batch_size}, {queue_size}"
+            )
+        self.document_processor = document_processor
+        self.embedding_generator = embedding_generator
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.deduplicator = deduplicator
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.last_report: Optional[IngestionReport] = None
+    
+    def run(
+        self,
+        pdf_paths: List[str],
+        on_indexed: Callable[[str, List[str]], None]
+    ) -> IngestionReport:
+        """
+        Ingest files through the three stages.
+        
+        Args:
+            pdf_paths: PDF files to index
+            on_indexed: Called as on_indexed(pdf_path, chunk_ids) from the
+                index stage once every chunk of a file is written (chunk_ids
+                include duplicates stored only as aliases)
+        
+        Returns:
+            Files indexed and failed, pages, chunks and duplicates, with
+            per-stage metrics (also kept in ``last_report``)
+        """
+        report = IngestionReport()
+        self.last_report = report
+        extract = report.stages[0]
+        to_embed: queue.Queue = queue.Queue(self.queue_size)
+        to_index: queue.Queue = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        threads = [
+            threading.Thread(target=self._guard, name=f"ingest-{name}", daemon=True,
+                             args=(stage, stop, errors, *args))
+            for name, stage, args in (
+                ("embed", self._embed_stage, (to_embed, to_index, report)),
+                ("index", self._index_stage, (to_index, report, on_indexed)),
+            )
+        ]
+        
+        def start():
+            if not threads[0].ident:
+                for thread in threads:
+                    thread.start()
+        
+        started = time.perf_counter()
+        results = self.document_processor.iter_process_files(pdf_paths)
+        try:
+            tick = time.perf_counter()
+            for pdf_path, chunks, num_pages in results:
+                # Start the threads only once the process pool (if any) has
+                # forked its workers: forking a multi-threaded process is unsafe
+                start()
+                extract.busy += time.perf_counter() - tick
+                if chunks is None:
+                    report.failed += 1
+                else:
+                    extract.items += 1
+                    report.pages += num_pages
+                    if not self._put(to_embed, (pdf_path, chunks), extract, stop):
+                        break
+                tick = time.perf_counter()
+            start()
+            self._put(to_embed, _DONE, extract, stop)
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            results.close()
+            for thread in threads:
+                if thread.ident:
+                    thread.join()
+            report.elapsed = time.perf_counter() - started
+        
+        if errors:
+            raise errors[0]
+        self._log(report)
+        return report
+    
+    @staticmethod
+    def _guard(stage, stop: threading.Event, errors: List[BaseException], *args):
+        """Run a stage thread, stopping the others if it fails."""
+        try:
+            stage(stop, *args)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+    
+    @staticmethod
+    def _put(q: queue.Queue, item, stats: StageStats, stop: threading.Event) -> bool:
+        """Blocking put that gives up (returning False) once the run is stopped."""
+        started = time.perf_counter()
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+            except queue.Full:
+                continue
+            stats.blocked += time.perf_counter() - started
+            stats.record_depth(q.qsize())
+            return True
+        return False
+    
+    @staticmethod
+    def _get(q: queue.Queue, stats: StageStats, stop: threading.Event):
+        """Blocking get; returns _DONE once the run is stopped."""
+        started = time.perf_counter()
+        while not stop.is_set():
+            try:
+                item = q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            stats.idle += time.perf_counter() - started
+            return item
+        return _DONE
+    
+    def _embed_stage(self, stop: threading.Event, to_embed: queue.Queue,
+                     to_index: queue.Queue, report: IngestionReport):
+        stats = report.stages[1]
+        pending: List = []
+        # (path, chunk IDs, position in the stream just after its last new chunk)
+        files: List = []
+        queued = emitted = 0
+        
+        def flush(count: int) -> bool:
+            nonlocal files, emitted
+            batch = pending[:count]
+            del pending[:count]
+            started = time.perf_counter()
+            embeddings = None
+            if batch:
+                embeddings = self.embedding_generator.generate_embeddings(
+                    [chunk.text for chunk in batch]
+                )
+            stats.busy += time.perf_counter() - started
+            stats.items += len(batch)
+            emitted += len(batch)
+            done = [(path, chunk_ids) for path, chunk_ids, end in files if end <= emitted]
+            files = [entry for entry in files if entry[2] > emitted]
+            return self._put(to_index, (batch, embeddings, done), stats, stop)
+        
+        while True:
+            item = self._get(to_embed, stats, stop)
+            if item is _DONE:
+                break
+            pdf_path, chunks = item
+            started = time.perf_counter()
+            new = chunks
+            if self.deduplicator is not None and len(chunks):
+                new, duplicates = self.deduplicator.filter(chunks)
+                report.duplicates += len(duplicates)
+            pending.extend(new)
+            queued += len(new)
+            files.append((pdf_path, [chunk.chunk_id for chunk in chunks], queued))
+            stats.busy += time.perf_counter() - started
+            while len(pending) >= self.batch_size:
+                if not flush(self.batch_size):
+                    return
+        
+        if stop.is_set():
+            return
+        if (pending or files) and not flush(len(pending)):
+            return
+        self._put(to_index, _DONE, stats, stop)
+    
+    def _index_stage(self, stop: threading.Event, to_index: queue.Queue,
+                     report: IngestionReport, on_indexed: Callable[[str, List[str]], None]):
+        stats = report.stages[2]
+        while True:
+            item = self._get(to_index, stats, stop)
+            if item is _DONE:
+                return
+            batch, embeddings, done = item
+            started = time.perf_counter()
+            if batch:
+                chunk_ids = [chunk.chunk_id for chunk in batch]
+                self.vector_store.add_documents(batch, embeddings)
+                if self.lexical_index is not None:
+                    self.lexical_index.add(chunk_ids, [chunk.text for chunk in batch],
+                                           [chunk.metadata for chunk in batch])
+                if self.deduplicator is not None:
+                    self.deduplicator.commit(chunk_ids)
+            for pdf_path, chunk_ids in done:
+                # Aliases are committed with their file: their canonical
+                # chunks were written in this batch or an earlier one
+                if self.deduplicator is not None:
+                    self.deduplicator.commit(chunk_ids)
+                on_indexed(pdf_path, chunk_ids)
+                report.files += 1
+                report.chunks += len(chunk_ids)
+            stats.busy += time.perf_counter() - started
+            stats.items += len(batch)
+    
+    @staticmethod
+    def _log(report: IngestionReport):
+        for stage in report.stages:
+            logger.info(
+                f"Ingestion stage {stage.name}: {stage.items} {stage.unit} "
+                f"({stage.throughput:.1f} {stage.unit}/s busy {stage.busy:.2f}s, "
+                f"idle {stage.idle:.2f}s, blocked {stage.blocked:.2f}s, "
+                f"queue depth max {stage.max_queue_depth} / "
+                f"mean {stage.mean_queue_depth:.1f})"
+            )
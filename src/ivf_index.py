@@ -0,0 +1,249 @@
+"""
+IVF Index Module
+
+Approximate nearest-neighbour search with an inverted-file (IVF) index:
+k-means coarse quantization over the NumpyVectorIndex storage.
+"""
+
+import logging
+import math
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .metadata_index import MetadataFilter
+from .numpy_index import NumpyVectorIndex, _top_k
+from .quantization import kmeans, nearest_centroid
+
+logger = logging.getLogger(__name__)
+
+
+class IVFIndex(NumpyVectorIndex):
+    """
+    Inverted-file index for large collections.
+    
+    Vectors are clustered with k-means into ``nlist`` cells; a query scores
+    the centroids, then searches exactly only the rows of the ``nprobe``
+    closest cells. ``nprobe`` trades recall for latency and can be
+    overridden per search.
+    
+    The index trains itself once ``train_threshold`` rows are stored (exact
+    search is used until then). Later inserts are assigned to the nearest
+    existing centroid; call train() again after the collection has grown
+    substantially to re-cluster.
+    
+    Extra files under ``index_dir``:
+    - ``centroids.npy``: (nlist, dimension) float32 centroids
+    - ``assignments.i32``: cell of every row, appended in row order
+    """
+    
+    def __init__(
+        self,
+        index_dir: str,
+        distance_metric: str = "cosine",
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        train_threshold: int = 10_000,
+        kmeans_iterations: int = 20,
+        seed: int = 0,
+        **storage_options
+    ):
+        """
+        Initialize the index, loading existing rows and clustering from disk.
+        
+        Args:
+            index_dir: Directory holding the index files
+            distance_metric: "cosine" or "ip"
+            nlist: Number of cells (None for 4 * sqrt(rows) at training time)
+            nprobe: Cells searched per query
+            train_threshold: Rows required before the index trains itself
+            kmeans_iterations: Lloyd iterations when training
+            seed: Random seed for training sample and initialization
+            **storage_options: NumpyVectorIndex options such as compression
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        
+        self.centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists: List[List[np.ndarray]] = []
+        
+        super().__init__(index_dir, distance_metric, **storage_options)
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+    
+    def _load(self):
+        super()._load()
+        centroids_path = self._path("centroids.npy")
+        if self.dimension is None or not os.path.exists(centroids_path):
+            return
+        self.centroids = np.load(centroids_path)
+        
+        assignments_path = self._path("assignments.i32")
+        assignments = np.zeros(0, dtype=np.int32)
+        if os.path.exists(assignments_path):
+            assignments = np.fromfile(assignments_path, dtype=np.int32)[:len(self._rows)]
+        missing = np.arange(len(assignments), len(self._rows))
+        if len(missing):
+            assignments = np.concatenate([assignments, self._assign(self._vectors[missing])])
+        assignments.tofile(assignments_path)
+        self._assignments = assignments
+        self._rebuild_lists()
+    
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest centroid of each vector."""
+        return nearest_centroid(vectors, self.centroids)
+    
+    def _rebuild_lists(self):
+        nlist = len(self.centroids)
+        order = np.argsort(self._assignments, kind="stable")
+        bounds = np.cumsum(np.bincount(self._assignments, minlength=nlist))[:-1]
+        self._lists = [[rows] for rows in np.split(order.astype(np.int64), bounds)]
+    
+    def _list_rows(self, cell: int) -> np.ndarray:
+        pieces = self._lists[cell]
+        if len(pieces) > 1:
+            self._lists[cell] = pieces = [np.concatenate(pieces)]
+        return pieces[0] if pieces else np.zeros(0, dtype=np.int64)
+    
+    def _append(self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict],
+                vectors: np.ndarray):
+        first_row = len(self._rows)
+        super()._append(chunk_ids, texts, metadatas, vectors)
+        
+        if self.centroids is None:
+            if len(self) >= self.train_threshold:
+                self.train()
+            return
+        
+        assignments = self._assign(vectors)
+        with open(self._path("assignments.i32"), "ab") as f:
+            f.write(assignments.tobytes())
+        self._assignments = np.concatenate([self._assignments, assignments])
+        
+        rows = np.arange(first_row, first_row + len(vectors), dtype=np.int64)
+        order = np.argsort(assignments, kind="stable")
+        cells, starts = np.unique(assignments[order], return_index=True)
+        for cell, cell_rows in zip(cells, np.split(rows[order], starts[1:])):
+            self._lists[cell].append(cell_rows)
+    
+    def train(self, nlist: Optional[int] = None, sample_size: Optional[int] = None):
+        """
+        Cluster the stored vectors and assign every row to a cell.
+        
+        Args:
+            nlist: Number of cells (defaults to the configured or automatic value)
+            sample_size: Rows used for k-means (default 256 per cell)
+        """
+        live = np.flatnonzero(~self._deleted)
+        if len(live) == 0:
+            raise ValueError("Cannot train an empty index")
+        nlist = nlist or self.nlist or max(1, int(4 * math.sqrt(len(live))))
+        nlist = min(nlist, len(live))
+        sample_size = min(len(live), sample_size or 256 * nlist)
+        
+        rng = np.random.default_rng(self.seed)
+        sample_rows = np.sort(rng.choice(live, sample_size, replace=False))
+        sample = np.asarray(self._vectors[sample_rows], dtype=np.float32)
+        
+        self.centroids = kmeans(sample, nlist, self.kmeans_iterations, rng,
+                                spherical=self.distance_metric == "cosine")
+        np.save(self._path("centroids.npy"), self.centroids)
+        
+        self._assignments = self._assign(self._vectors)
+        self._assignments.tofile(self._path("assignments.i32"))
+        self._rebuild_lists()
+        logger.info(
+            f"Trained IVF index at {self.index_dir}: {nlist} cells "
+            f"from {sample_size} sampled rows"
+        )
+    
+    def search(self, query_embeddings, top_k: int = 5,
+               where: Optional[MetadataFilter] = None,
+               nprobe: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Approximate top-k search for a batch of queries.
+        
+        Args:
+            query_embeddings: Array of shape (num_queries, dimension)
+            top_k: Number of results per query
+            where: Only return chunks matching this filter
+            nprobe: Cells searched per query (defaults to self.nprobe)
+        
+        Returns:
+            One result list per query, best match first
+        """
+        return super().search(query_embeddings, top_k, where, nprobe=nprobe)
+    
+    def _search_candidates(self, queries: np.ndarray, top_k: int,
+                           rows: Optional[np.ndarray] = None,
+                           nprobe: Optional[int] = None):
+        if self.centroids is None:
+            return self._search_rows(queries, top_k, rows)
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        if rows is None:
+            return self._search_cells(queries, top_k, nprobe)
+        
+        # A selective filter matches fewer rows than the probed cells hold:
+        # scoring the matches directly is cheaper and exact
+        if len(rows) <= len(self) * nprobe / len(self.centroids):
+            return self._search_rows(queries, top_k, rows)
+        allowed = np.zeros(len(self._rows), dtype=bool)
+        allowed[rows] = True
+        best_rows, best_scores = self._search_cells(queries, top_k, nprobe, allowed)
+        
+        # Probed cells may hold fewer than top_k matches; rescan those queries
+        short = ~np.isfinite(best_scores[:, -1])
+        if short.any():
+            exact_rows, exact_scores = self._search_rows(queries[short], top_k, rows)
+            width = exact_rows.shape[1]
+            best_rows[short, :width] = exact_rows
+            best_scores[short, :width] = exact_scores
+            best_scores[short, width:] = -np.inf
+        return best_rows, best_scores
+    
+    def _search_cells(self, queries: np.ndarray, top_k: int, nprobe: int,
+                      allowed: Optional[np.ndarray] = None):
+        """Probe the nprobe best cells per query; allowed masks rows (live ones if None)."""
+        probes = _top_k(queries @ self.centroids.T, nprobe)
+        if allowed is None:
+            allowed = ~self._deleted
+        
+        best_rows = np.zeros((len(queries), top_k), dtype=np.int64)
+        best_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        for i, (query, cells) in enumerate(zip(queries, probes)):
+            candidates = np.concatenate([self._list_rows(cell) for cell in cells])
+            candidates = np.sort(candidates[allowed[candidates]])
+            if len(candidates) == 0:
+                continue
+            scores = self._scores(query[None, :], candidates)[0]
+            keep = _top_k(scores[None, :], top_k)[0]
+            keep = keep[np.argsort(-scores[keep], kind="stable")]
+            best_rows[i, :len(keep)] = candidates[keep]
+            best_scores[i, :len(keep)] = scores[keep]
+        return best_rows, best_scores
+    
+    def compact(self):
+        """Rewrite the files without deleted rows, reassigning cells."""
+        if self.centroids is not None:
+            self._assignments = np.zeros(0, dtype=np.int32)
+            self._lists = [[] for _ in range(len(self.centroids))]
+            if os.path.exists(self._path("assignments.i32")):
+                os.remove(self._path("assignments.i32"))
+        super().compact()
+    
+    def reset(self):
+        """Delete every row and the clustering."""
+        super().reset()
+        for name in ("centroids.npy", "assignments.i32"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        self.centroids = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = []
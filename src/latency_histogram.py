@@ -0,0 +1,79 @@
+"""
+Latency Histogram Module
+
+Fixed-size, log-bucketed latency histograms for percentile reporting.
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    Latency distribution in logarithmic buckets.
+    
+    Bucket bounds grow geometrically from ``min_seconds`` to
+    ``max_seconds`` (``buckets_per_doubling`` per factor of two), so
+    percentiles are accurate to a few percent at any scale while memory
+    stays constant however many samples are recorded. Percentiles report
+    the upper bound of the bucket they fall in.
+    """
+    
+    def __init__(self, min_seconds: float = 0.001, max_seconds: float = 300.0,
+                 buckets_per_doubling: int = 4):
+        """
+        Initialize an empty histogram.
+        
+        Args:
+            min_seconds: Upper bound of the first bucket
+            max_seconds: Largest bound; slower samples land in an overflow bucket
+            buckets_per_doubling: Resolution of the buckets
+        """
+        steps = int(np.ceil(np.log2(max_seconds / min_seconds) * buckets_per_doubling))
+        self.bounds: List[float] = [
+            float(b) for b in min_seconds * 2.0 ** (np.arange(steps + 1) / buckets_per_doubling)
+        ]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        """Add one sample."""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate q-th percentile in seconds (None when empty)."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+    
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Sample count, mean, p50/p95/p99 and max in seconds."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else None,
+        }
+    
+    def buckets(self) -> Dict[str, int]:
+        """Non-empty buckets keyed by their upper bound ("inf" for overflow)."""
+        labels = [f"{bound:.4g}" for bound in self.bounds] + ["inf"]
+        return {label: n for label, n in zip(labels, self.counts) if n}
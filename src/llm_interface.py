@@ -4,34 +4,481 @@ LLM Interface Module
 Handles interactions with Large Language Models (OpenAI, Anthropic, etc.)
 """
 
+import asyncio
+import itertools
 import logging
-from typing import List, Dict, Optional
+import os
+import queue
+import random
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from .latency_histogram import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = (
+    "You answer questions about the user's documents using only the numbered "
+    "context passages provided. Cite the passages you rely on as [1], [2], ... "
+    "If the passages do not contain the answer, say so."
+)
+
+# Last user message; {context} is the numbered passages
+QUERY_TEMPLATE = "Context:\n{context}\n\nQuestion: {question}"
+
+
+def format_context(context_chunks: List[Dict], citation_format: Optional[str] = None) -> str:
+    """
+    Number the passages for citation, with their source and pages.
+    
+    Args:
+        context_chunks: Passages to number
+        citation_format: Label template with {document} and {page} fields
+            (None: "(source, pages p)")
+    """
+    parts = []
+    for number, chunk in enumerate(context_chunks, start=1):
+        metadata = chunk.get("metadata") or {}
+        pages = ", ".join(str(p) for p in metadata.get("pages") or [])
+        source = metadata.get("source", "unknown")
+        if citation_format is not None:
+            label = citation_format.format(document=source, page=pages or "n/a")
+        else:
+            label = f"({source}" + (f", pages {pages}" if pages else "") + ")"
+        parts.append(f"[{number}] {label}\n{chunk['text']}")
+    return "\n\n".join(parts)
+
+
+def build_messages(
+    query: str,
+    context_chunks: List[Dict],
+    conversation_history: Optional[List] = None,
+    query_template: str = QUERY_TEMPLATE,
+    citation_format: Optional[str] = None
+) -> List[Dict]:
+    """
+    Chat messages for a question.
+    
+    Args:
+        query: Question text
+        context_chunks: Passages to answer from
+        conversation_history: Previous turns, as {"role", "content"} dicts or
+            (question, answer) pairs
+        query_template: Question message with {context} and {question} fields
+        citation_format: Passage label template (see format_context)
+    
+    Returns:
+        Messages in {"role", "content"} form, ending with the question
+    """
+    messages = []
+    for turn in conversation_history or []:
+        if isinstance(turn, dict):
+            messages.append(turn)
+        else:
+            question, answer = turn
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+    messages.append({
+        "role": "user",
+        "content": query_template.format(
+            context=format_context(context_chunks, citation_format), question=query
+        ),
+    })
+    return messages
+
+
+def cite(context_chunks: List[Dict]) -> List[Dict]:
+    """Citation entry per passage, numbered as in the prompt."""
+    return [
+        {
+            "number": number,
+            "chunk_id": chunk.get("chunk_id"),
+            "source": (chunk.get("metadata") or {}).get("source"),
+            "pages": (chunk.get("metadata") or {}).get("pages", []),
+            "score": chunk.get("score"),
+        }
+        for number, chunk in enumerate(context_chunks, start=1)
+    ]
+
+
+def _async_http_client(max_connections: int):
+    """Shared httpx.AsyncClient whose pool keeps up to max_connections alive."""
+    import httpx
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections,
+                            max_keepalive_connections=max_connections),
+        timeout=httpx.Timeout(60.0, connect=5.0)
+    )
+
+
+class OpenAIProvider:
+    """
+    Streams chat completions from the OpenAI API (or a compatible server
+    at ``base_url``).
+    
+    The async client is created once and reused, so concurrent requests
+    share one pool of at most ``max_connections`` keep-alive connections.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, client=None,
+                 base_url: Optional[str] = None, max_connections: int = 64,
+                 async_client=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self._client = client
+        self._async_client = async_client
+    
+    def _import_openai(self):
+        try:
+            import openai
+        except ImportError as e:
+            raise ImportError(
+                "openai is required for the openai LLM provider. "
+                "Install it with: pip install openai"
+            ) from e
+        return openai
+    
+    @property
+    def client(self):
+        """The OpenAI client, created on first access."""
+        if self._client is None:
+            self._client = self._import_openai().OpenAI(
+                api_key=self.api_key or os.environ.get("OPENAI_API_KEY"),
+                base_url=self.base_url
+            )
+        return self._client
+    
+    @property
+    def async_client(self):
+        """The AsyncOpenAI client over a pooled HTTP client, created on first access."""
+        if self._async_client is None:
+            self._async_client = self._import_openai().AsyncOpenAI(
+                api_key=self.api_key or os.environ.get("OPENAI_API_KEY"),
+                base_url=self.base_url,
+                http_client=_async_http_client(self.max_connections)
+            )
+        return self._async_client
+    
+    def stream(self, system: str, messages: List[Dict], model: str,
+               temperature: float, max_tokens: int) -> Iterator[str]:
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": "system", "content": system}, *messages],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for event in response:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+    
+    async def astream(self, system: str, messages: List[Dict], model: str,
+                      temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        response = await self.async_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "system", "content": system}, *messages],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        async for event in response:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+
+class AnthropicProvider:
+    """
+    Streams messages from the Anthropic API.
+    
+    Like OpenAIProvider, the async client is created once over a pool of
+    at most ``max_connections`` keep-alive connections.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, client=None,
+                 base_url: Optional[str] = None, max_connections: int = 64,
+                 async_client=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self._client = client
+        self._async_client = async_client
+    
+    def _import_anthropic(self):
+        try:
+            import anthropic
+        except ImportError as e:
+            raise ImportError(
+                "anthropic is required for the anthropic LLM provider. "
+                "Install it with: pip install anthropic"
+            ) from e
+        return anthropic
+    
+    @property
+    def client(self):
+        """The Anthropic client, created on first access."""
+        if self._client is None:
+            self._client = self._import_anthropic().Anthropic(
+                api_key=self.api_key or os.environ.get("ANTHROPIC_API_KEY"),
+                base_url=self.base_url
+            )
+        return self._client
+    
+    @property
+    def async_client(self):
+        """The AsyncAnthropic client over a pooled HTTP client, created on first access."""
+        if self._async_client is None:
+            self._async_client = self._import_anthropic().AsyncAnthropic(
+                api_key=self.api_key or os.environ.get("ANTHROPIC_API_KEY"),
+                base_url=self.base_url,
+                http_client=_async_http_client(self.max_connections)
+            )
+        return self._async_client
+    
+    def stream(self, system: str, messages: List[Dict], model: str,
+               temperature: float, max_tokens: int) -> Iterator[str]:
+        with self.client.messages.stream(
+            model=model,
+            system=system,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ) as response:
+            for text in response.text_stream:
+                if text:
+                    yield text
+    
+    async def astream(self, system: str, messages: List[Dict], model: str,
+                      temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        async with self.async_client.messages.stream(
+            model=model,
+            system=system,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ) as response:
+            async for text in response.text_stream:
+                if text:
+                    yield text
+
+
+class FakeProvider:
+    """
+    Offline provider for tests and demos.
+    
+    Emits ``answer`` word by word, waiting ``first_token_delay`` seconds
+    before the first word and ``token_delay`` between words. The default
+    answer quotes the start of the first context passage.
+    
+    Faults can be injected to exercise retries, hedging and failover: the
+    first ``fail_first`` calls and a random ``error_rate`` share of the
+    rest raise ConnectionError before any token, and a ``slow_rate``
+    share of calls waits ``slow_delay`` extra seconds for the first token.
+    """
+    
+    def __init__(self, answer: Optional[str] = None, token_delay: float = 0.02,
+                 first_token_delay: float = 0.2, error_rate: float = 0.0,
+                 fail_first: int = 0, slow_rate: float = 0.0, slow_delay: float = 0.0,
+                 seed: Optional[int] = None):
+        self.answer = answer
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def _first_delay(self) -> float:
+        """Delay before the first token, or ConnectionError for an injected failure."""
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.fail_first or self._rng.random() < self.error_rate
+            slow = self._rng.random() < self.slow_rate
+        if fail:
+            raise ConnectionError(f"injected failure (call {self.calls})")
+        return self.first_token_delay + (self.slow_delay if slow else 0.0)
+    
+    def _answer(self, messages: List[Dict]) -> str:
+        if self.answer is not None:
+            return self.answer
+        context = messages[-1]["content"].split("\n\nQuestion:")[0]
+        passage = context.split("\n", 2)[2] if context.count("\n") >= 2 else ""
+        return f"According to [1]: {' '.join(passage.split()[:30])}" if passage \
+            else "The documents do not contain an answer."
+    
+    def stream(self, system: str, messages: List[Dict], model: str,
+               temperature: float, max_tokens: int) -> Iterator[str]:
+        time.sleep(self._first_delay())
+        words = self._answer(messages).split(" ")
+        for i, word in enumerate(words[:max_tokens]):
+            if i:
+                time.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+    
+    async def astream(self, system: str, messages: List[Dict], model: str,
+                      temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        await asyncio.sleep(self._first_delay())
+        words = self._answer(messages).split(" ")
+        for i, word in enumerate(words[:max_tokens]):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+    "fake": FakeProvider,
+}
+
+
+class LLMError(RuntimeError):
+    """Raised when every attempt at an answer failed, or a stream broke mid-answer."""
+
+
+class _Route:
+    """A provider and model to send questions to, with its latency record."""
+    
+    def __init__(self, name: str, provider, model_name: str):
+        self.name = name
+        self.provider = provider
+        self.model_name = model_name
+        self.time_to_first_token = LatencyHistogram()
+        self.latency = LatencyHistogram()
+        self.attempts = 0
+        self.errors = 0
+        self.wins = 0
+
+
+class _Attempt:
+    __slots__ = ("number", "route", "started", "cancelled", "task")
+    
+    def __init__(self, number: int, route: _Route):
+        self.number = number
+        self.route = route
+        self.started = time.perf_counter()
+        self.cancelled = threading.Event()
+        self.task = None
+
+
+def _make_provider(provider, options: Optional[Dict] = None):
+    if not isinstance(provider, str):
+        return provider
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    return PROVIDERS[provider](**(options or {}))
+
 
 class LLMInterface:
     """
     Interface for interacting with LLMs for answer generation.
     
-    TODO (Day 4):
-    - Initialize LLM client (OpenAI/Anthropic)
-    - Prompt engineering
-    - Response generation with streaming
-    - Error handling and retries
+    Features:
+    - OpenAI, Anthropic and an offline fake provider
+    - Numbered context passages with citations returned as structured
+      sources
+    - Streaming: generate_answer_stream() yields tokens as they arrive,
+      then a final event with the answer, sources and timings
+      (time to first token, total latency)
+    - Async variants (agenerate_answer, agenerate_answer_stream) over the
+      providers' pooled async clients, for serving many questions from
+      one event loop
+    - Retries with exponential backoff and full jitter, failing over to
+      the ``fallbacks`` providers in order
+    - Optional hedging: when the first token is late (past ``hedge_delay``,
+      or the route's p95 time to first token), a second attempt starts on
+      the next route and whichever answers first is streamed
+    - Per-provider time-to-first-token and latency histograms
+      (latency_stats())
+    
+    An attempt can be retried or hedged until its first token arrives;
+    after that the answer is committed to it, and a broken stream raises
+    LLMError.
     """
     
     def __init__(
         self,
         model_name: str = "gpt-4-turbo-preview",
         temperature: float = 0.1,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        provider="openai",
+        system_prompt: str = SYSTEM_PROMPT,
+        query_template: str = QUERY_TEMPLATE,
+        citation_format: Optional[str] = None,
+        provider_options: Optional[Dict] = None,
+        fallbacks: Optional[List[Dict]] = None,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        seed: Optional[int] = None
     ):
+        """
+        Initialize the LLM interface.
+        
+        Args:
+            model_name: Model identifier for the provider
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            provider: "openai", "anthropic", "fake", or a provider object
+                exposing stream() (and astream() for the async methods)
+            system_prompt: Instructions sent with every question
+            query_template: Question message with {context} and {question}
+                fields
+            citation_format: Passage label with {document} and {page}
+                fields (None: "(source, pages p)")
+            provider_options: Keyword arguments for a named provider, e.g.
+                base_url or max_connections
+            fallbacks: Routes tried after the primary, as dicts with
+                ``provider`` (name or object), ``model`` and any provider
+                options
+            max_retries: Retries per route once every route has failed
+            backoff_base: First backoff in seconds, doubled per round
+            backoff_max: Cap on a single backoff
+            hedge: Start a second attempt when the first token is late
+            hedge_delay: Seconds to wait before hedging (None: the route's
+                p95 time to first token, once it has ``hedge_min_samples``)
+            hedge_min_samples: Samples needed before the p95 is trusted
+            seed: Seed for the backoff jitter
+        """
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
-        logger.info(f"Initialized LLMInterface with model: {model_name}")
-        # TODO: Initialize API client
+        self.system_prompt = system_prompt
+        self.query_template = query_template
+        self.citation_format = citation_format
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+        self._rng = random.Random(seed)
+        
+        self.provider = _make_provider(provider, provider_options)
+        self.routes: List[_Route] = []
+        self._add_route(provider, self.provider, model_name)
+        for fallback in fallbacks or []:
+            options = {k: v for k, v in fallback.items() if k not in ("provider", "model")}
+            self._add_route(fallback["provider"],
+                            _make_provider(fallback["provider"], options),
+                            fallback.get("model") or model_name)
+        logger.info(
+            f"Initialized LLMInterface with model: {model_name} "
+            f"(routes={[route.name for route in self.routes]}, hedge={hedge})"
+        )
+    
+    def _add_route(self, provider, provider_obj, model_name: str):
+        name = provider if isinstance(provider, str) else type(provider).__name__
+        if any(route.name == name for route in self.routes):
+            name = f"{name}#{len(self.routes) + 1}"
+        self.routes.append(_Route(name, provider_obj, model_name))
     
     def generate_answer(
         self,
@@ -39,14 +486,338 @@ class LLMInterface:
         context_chunks: List[Dict],
         conversation_history: Optional[List] = None
     ) -> Dict:
-        """Generate an answer given query and retrieved context."""
-        # TODO: Implement
-        logger.warning("LLMInterface.generate_answer not yet implemented")
+        """
+        Generate an answer given query and retrieved context.
+        
+        Args:
+            query: Question text
+            context_chunks: Passages to answer from (retrieval result dicts)
+            conversation_history: Previous turns
+        
+        Returns:
+            Dict with answer, sources and metadata (model, timings)
+        """
+        final = None
+        for event in self.generate_answer_stream(query, context_chunks, conversation_history):
+            if event["type"] == "answer":
+                final = event
+        return {key: value for key, value in final.items() if key != "type"}
+    
+    def generate_answer_stream(
+        self,
+        query: str,
+        context_chunks: List[Dict],
+        conversation_history: Optional[List] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream an answer token by token.
+        
+        Args:
+            query: Question text
+            context_chunks: Passages to answer from (retrieval result dicts)
+            conversation_history: Previous turns
+        
+        Yields:
+            {"type": "token", "text": ...} for each piece of text as it
+            arrives, then one {"type": "answer", "answer", "sources",
+            "metadata"} event; metadata has model, time_to_first_token and
+            latency in seconds and the number of streamed tokens
+        """
+        start = time.perf_counter()
+        first_token_at = None
+        pieces: List[str] = []
+        outcome: Dict = {}
+        for text in self._stream(self._messages(query, context_chunks, conversation_history),
+                                 outcome):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            pieces.append(text)
+            yield {"type": "token", "text": text}
+        
+        yield self._final_event(pieces, context_chunks, start, first_token_at, outcome)
+    
+    async def agenerate_answer(
+        self,
+        query: str,
+        context_chunks: List[Dict],
+        conversation_history: Optional[List] = None
+    ) -> Dict:
+        """Async generate_answer(); the provider must implement astream()."""
+        final = None
+        async for event in self.agenerate_answer_stream(query, context_chunks,
+                                                        conversation_history):
+            if event["type"] == "answer":
+                final = event
+        return {key: value for key, value in final.items() if key != "type"}
+    
+    async def agenerate_answer_stream(
+        self,
+        query: str,
+        context_chunks: List[Dict],
+        conversation_history: Optional[List] = None
+    ) -> AsyncIterator[Dict]:
+        """Async generate_answer_stream(), yielding the same events."""
+        start = time.perf_counter()
+        first_token_at = None
+        pieces: List[str] = []
+        outcome: Dict = {}
+        async for text in self._astream(
+            self._messages(query, context_chunks, conversation_history), outcome
+        ):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            pieces.append(text)
+            yield {"type": "token", "text": text}
+        
+        yield self._final_event(pieces, context_chunks, start, first_token_at, outcome)
+    
+    def _messages(self, query: str, context_chunks: List[Dict],
+                  conversation_history: Optional[List]) -> List[Dict]:
+        return build_messages(query, context_chunks, conversation_history,
+                              self.query_template, self.citation_format)
+    
+    def _stream(self, messages: List[Dict], outcome: Dict) -> Iterator[str]:
+        """
+        Text of the first attempt to answer, with retries, failover and hedging.
+        
+        Each attempt streams from its own thread into a shared queue; the
+        first one to produce a token wins and the others are cancelled.
+        """
+        events: "queue.Queue[Tuple[int, str, object]]" = queue.Queue()
+        schedule = self._schedule()
+        active: Dict[int, _Attempt] = {}
+        counter = itertools.count()
+        winner = None
+        last_error = None
+        
+        def launch(backoff: bool = True) -> bool:
+            step = next(schedule, None)
+            if step is None:
+                return False
+            route, delay = step
+            if backoff and delay:
+                time.sleep(delay)
+            attempt = _Attempt(next(counter), route)
+            route.attempts += 1
+            active[attempt.number] = attempt
+            outcome["attempts"] = attempt.number + 1
+            threading.Thread(target=self._run_attempt, args=(attempt, messages, events),
+                             name=f"llm-{route.name}", daemon=True).start()
+            return True
+        
+        launch()
+        try:
+            while True:
+                try:
+                    number, kind, value = events.get(
+                        timeout=self._hedge_timeout(winner, active, outcome)
+                    )
+                except queue.Empty:
+                    outcome["hedged"] = True
+                    launch(backoff=False)
+                    continue
+                attempt = active.get(number)
+                if attempt is None:
+                    continue
+                if kind == "error":
+                    last_error = self._attempt_failed(attempt, active, winner, value)
+                    if not active and not launch():
+                        raise LLMError(f"All {attempt.number + 1} LLM attempts failed: "
+                                       f"{last_error}") from last_error
+                    continue
+                if winner is None:
+                    winner = self._attempt_won(attempt, active, outcome)
+                if kind == "token":
+                    yield value
+                else:
+                    winner.route.latency.record(time.perf_counter() - winner.started)
+                    return
+        finally:
+            for attempt in active.values():
+                attempt.cancelled.set()
+    
+    def _run_attempt(self, attempt: _Attempt, messages: List[Dict], events: queue.Queue):
+        try:
+            for text in attempt.route.provider.stream(
+                self.system_prompt, messages, attempt.route.model_name,
+                self.temperature, self.max_tokens
+            ):
+                if attempt.cancelled.is_set():
+                    return
+                events.put((attempt.number, "token", text))
+            events.put((attempt.number, "done", None))
+        except Exception as e:
+            events.put((attempt.number, "error", e))
+    
+    async def _astream(self, messages: List[Dict], outcome: Dict) -> AsyncIterator[str]:
+        """Async _stream(): attempts are tasks on the running event loop."""
+        events: asyncio.Queue = asyncio.Queue()
+        schedule = self._schedule()
+        active: Dict[int, _Attempt] = {}
+        counter = itertools.count()
+        winner = None
+        last_error = None
+        
+        async def run(attempt: _Attempt):
+            try:
+                async for text in attempt.route.provider.astream(
+                    self.system_prompt, messages, attempt.route.model_name,
+                    self.temperature, self.max_tokens
+                ):
+                    events.put_nowait((attempt.number, "token", text))
+                events.put_nowait((attempt.number, "done", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                events.put_nowait((attempt.number, "error", e))
+        
+        async def launch(backoff: bool = True) -> bool:
+            step = next(schedule, None)
+            if step is None:
+                return False
+            route, delay = step
+            if backoff and delay:
+                await asyncio.sleep(delay)
+            attempt = _Attempt(next(counter), route)
+            route.attempts += 1
+            active[attempt.number] = attempt
+            outcome["attempts"] = attempt.number + 1
+            attempt.task = asyncio.ensure_future(run(attempt))
+            return True
+        
+        await launch()
+        try:
+            while True:
+                try:
+                    number, kind, value = await asyncio.wait_for(
+                        events.get(), self._hedge_timeout(winner, active, outcome)
+                    )
+                except asyncio.TimeoutError:
+                    outcome["hedged"] = True
+                    await launch(backoff=False)
+                    continue
+                attempt = active.get(number)
+                if attempt is None:
+                    continue
+                if kind == "error":
+                    last_error = self._attempt_failed(attempt, active, winner, value)
+                    if not active and not await launch():
+                        raise LLMError(f"All {attempt.number + 1} LLM attempts failed: "
+                                       f"{last_error}") from last_error
+                    continue
+                if winner is None:
+                    winner = self._attempt_won(attempt, active, outcome)
+                if kind == "token":
+                    yield value
+                else:
+                    winner.route.latency.record(time.perf_counter() - winner.started)
+                    return
+        finally:
+            for attempt in active.values():
+                attempt.task.cancel()
+    
+    def _schedule(self) -> Iterator[Tuple[_Route, float]]:
+        """
+        (route, backoff) for each attempt: every route in order, then again
+        after an exponentially growing, fully jittered backoff.
+        """
+        for retry in range(self.max_retries + 1):
+            for i, route in enumerate(self.routes):
+                delay = 0.0
+                if retry and i == 0:
+                    cap = min(self.backoff_max, self.backoff_base * 2 ** (retry - 1))
+                    delay = self._rng.uniform(0, cap)
+                yield route, delay
+    
+    def _hedge_timeout(self, winner: Optional[_Attempt], active: Dict[int, _Attempt],
+                       outcome: Dict) -> Optional[float]:
+        """Seconds until the (single) hedge should start, or None to wait indefinitely."""
+        if not self.hedge or outcome.get("hedged") or winner is not None or len(active) != 1:
+            return None
+        attempt = next(iter(active.values()))
+        delay = self.hedge_delay
+        if delay is None:
+            histogram = attempt.route.time_to_first_token
+            if histogram.count < self.hedge_min_samples:
+                return None
+            delay = histogram.percentile(95)
+        return max(0.0, attempt.started + delay - time.perf_counter())
+    
+    def _attempt_failed(self, attempt: _Attempt, active: Dict[int, _Attempt],
+                        winner: Optional[_Attempt], error: Exception) -> Exception:
+        del active[attempt.number]
+        attempt.route.errors += 1
+        if attempt is winner:
+            raise LLMError(f"{attempt.route.name} failed mid-answer: {error}") from error
+        logger.warning(f"LLM attempt {attempt.number + 1} on {attempt.route.name} failed: "
+                       f"{error!r}")
+        return error
+    
+    @staticmethod
+    def _attempt_won(attempt: _Attempt, active: Dict[int, _Attempt], outcome: Dict) -> _Attempt:
+        """Commit to attempt: record its time to first token, cancel the rest."""
+        attempt.route.time_to_first_token.record(time.perf_counter() - attempt.started)
+        attempt.route.wins += 1
+        for other in active.values():
+            if other is not attempt:
+                other.cancelled.set()
+                if other.task is not None:
+                    other.task.cancel()
+        active.clear()
+        active[attempt.number] = attempt
+        outcome["route"] = attempt.route
+        return attempt
+    
+    def latency_stats(self) -> Dict[str, Dict]:
+        """
+        Per-route record: attempts, errors, answers won, and time-to-first-
+        token and total latency summaries with their histogram buckets.
+        """
+        return {
+            route.name: {
+                "model": route.model_name,
+                "attempts": route.attempts,
+                "errors": route.errors,
+                "wins": route.wins,
+                "time_to_first_token": {**route.time_to_first_token.summary(),
+                                        "buckets": route.time_to_first_token.buckets()},
+                "latency": {**route.latency.summary(), "buckets": route.latency.buckets()},
+            }
+            for route in self.routes
+        }
+    
+    def _final_event(self, pieces: List[str], context_chunks: List[Dict], start: float,
+                     first_token_at: Optional[float], outcome: Dict) -> Dict:
+        latency = time.perf_counter() - start
+        ttft = None if first_token_at is None else first_token_at - start
+        route = outcome.get("route", self.routes[0])
+        logger.info(
+            f"Generated {len(pieces)} tokens with {route.model_name} ({route.name}) in "
+            f"{latency:.3f}s (time to first token: {ttft if ttft is None else f'{ttft:.3f}s'})"
+        )
         return {
-            "answer": "Not yet implemented",
-            "sources": []
+            "type": "answer",
+            "answer": "".join(pieces),
+            "sources": cite(context_chunks),
+            "metadata": {
+                "model": route.model_name,
+                "provider": route.name,
+                "attempts": outcome.get("attempts", 1),
+                "hedged": outcome.get("hedged", False),
+                "time_to_first_token": ttft,
+                "latency": latency,
+                "tokens": len(pieces),
+            },
         }
 
 
 if __name__ == "__main__":
-    print("LLMInterface module (placeholder) loaded successfully!")
+    logging.basicConfig(level=logging.INFO)
+    
+    llm = LLMInterface(provider="fake")
+    chunks = [{"chunk_id": "a_0", "text": "RAG combines retrieval with generation.",
+               "metadata": {"source": "a.pdf", "pages": [1]}, "score": 0.9}]
+    for event in llm.generate_answer_stream("What is RAG?", chunks):
+        if event["type"] == "token":
+            print(event["text"], end="", flush=True)
+    print(f"\n{event['metadata']}")
@@ -0,0 +1,199 @@
+"""
+Metadata Index Module
+
+Inverted index over chunk metadata, used to restrict vector search to the
+rows matching a filter before scoring.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MetadataFilter:
+    """
+    Restrictions on which chunks a search may return; None means no limit.
+    
+    Attributes:
+        sources: Document names (the ``source`` metadata) to search within
+        page_range: Inclusive (first, last) page range a chunk must overlap
+        ingested_after: Earliest ingestion time, seconds since the epoch
+        ingested_before: Ingestion time upper bound (exclusive)
+        include_ids: Chunks that match whatever the restrictions above,
+            e.g. stored copies of deduplicated chunks that match them
+    """
+    sources: Optional[Sequence[str]] = None
+    page_range: Optional[Tuple[int, int]] = None
+    ingested_after: Optional[float] = None
+    ingested_before: Optional[float] = None
+    include_ids: Optional[Sequence[str]] = None
+
+
+class MetadataIndex:
+    """
+    Row-number index over ``source``, ``pages`` and ``ingested_at``.
+    
+    Rows are numbered in insertion order, matching the vector storage, and
+    only ever appended. Each source has a sorted posting list of its rows;
+    page span and ingestion time are kept as columns and checked with
+    vectorized comparisons on the candidate rows. Deleted rows are left in
+    place for the caller to mask out.
+    
+    The columns are buffers whose capacity doubles when full, so appending
+    in many small batches copies each row O(1) times; only the first
+    ``len(self)`` entries are used.
+    """
+    
+    def __init__(self):
+        self._postings: Dict[str, List[np.ndarray]] = {}
+        self._size = 0
+        self._first_page = np.zeros(0, dtype=np.int32)
+        self._last_page = np.zeros(0, dtype=np.int32)
+        self._ingested_at = np.zeros(0, dtype=np.float64)
+    
+    def add(self, first_row: int, metadatas: List[Dict]):
+        """
+        Index rows first_row, first_row + 1, ... with the given metadata.
+        
+        Args:
+            first_row: Row number of metadatas[0]
+            metadatas: Chunk metadata dicts
+        """
+        sources: Dict[Optional[str], int] = {}
+        source_ids = np.zeros(len(metadatas), dtype=np.int32)
+        first_pages = np.full(len(metadatas), -1, dtype=np.int32)
+        last_pages = np.full(len(metadatas), -1, dtype=np.int32)
+        ingested_at = np.full(len(metadatas), np.nan)
+        
+        for offset, metadata in enumerate(metadatas):
+            source_ids[offset] = sources.setdefault(metadata.get("source"), len(sources))
+            pages = metadata.get("pages")
+            if pages:
+                first_pages[offset] = min(pages)
+                last_pages[offset] = max(pages)
+            if metadata.get("ingested_at") is not None:
+                ingested_at[offset] = metadata["ingested_at"]
+        
+        self.add_columns(first_row, list(sources), source_ids, first_pages, last_pages,
+                         ingested_at)
+    
+    def add_columns(
+        self,
+        first_row: int,
+        sources: Sequence[Optional[str]],
+        source_ids: np.ndarray,
+        first_pages: np.ndarray,
+        last_pages: np.ndarray,
+        ingested_at: np.ndarray
+    ):
+        """
+        Index rows from metadata already in columns, e.g. a CorpusFile's.
+        
+        Args:
+            first_row: Row number of the first entry
+            sources: Source table that source_ids index into
+            source_ids: Source of each row (negative for none)
+            first_pages, last_pages: Page span of each row (-1 for none)
+            ingested_at: Ingestion time of each row (NaN for none)
+        """
+        if len(source_ids):
+            order = np.argsort(source_ids, kind="stable")
+            bounds = np.flatnonzero(np.diff(source_ids[order])) + 1
+            for rows in np.split(order, bounds):
+                source_id = source_ids[rows[0]]
+                source = sources[source_id] if source_id >= 0 else None
+                self._postings.setdefault(source, []).append(rows.astype(np.int64) + first_row)
+        end = self._size + len(source_ids)
+        if end > len(self._first_page):
+            self._grow(end)
+        self._first_page[self._size:end] = first_pages
+        self._last_page[self._size:end] = last_pages
+        self._ingested_at[self._size:end] = ingested_at
+        self._size = end
+    
+    def _grow(self, needed: int):
+        """Reallocate the columns with room for at least ``needed`` rows."""
+        capacity = max(needed, 2 * len(self._first_page))
+        for name in ("_first_page", "_last_page", "_ingested_at"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+    
+    def _source_rows(self, source: str) -> np.ndarray:
+        pieces = self._postings.get(source)
+        if not pieces:
+            return np.zeros(0, dtype=np.int64)
+        if len(pieces) > 1:
+            self._postings[source] = pieces = [np.concatenate(pieces)]
+        return pieces[0]
+    
+    def rows(self, where: MetadataFilter) -> np.ndarray:
+        """
+        Rows matching every restriction in the filter.
+        
+        Args:
+            where: Filter to resolve
+        
+        Returns:
+            Sorted int64 array of row numbers
+        """
+        if where.sources is not None:
+            rows = np.concatenate(
+                [self._source_rows(source) for source in set(where.sources)]
+                or [np.zeros(0, dtype=np.int64)]
+            )
+            rows.sort()
+        else:
+            rows = np.arange(len(self), dtype=np.int64)
+        
+        mask = np.ones(len(rows), dtype=bool)
+        if where.page_range is not None:
+            first, last = where.page_range
+            mask &= (self._first_page[rows] <= last) & (self._last_page[rows] >= first)
+            mask &= self._first_page[rows] >= 0
+        if where.ingested_after is not None:
+            mask &= self._ingested_at[rows] >= where.ingested_after
+        if where.ingested_before is not None:
+            mask &= self._ingested_at[rows] < where.ingested_before
+        return rows[mask]
+    
+    def sources(self) -> List[str]:
+        """Every source seen so far."""
+        return [source for source in self._postings if source is not None]
+    
+    def columns(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every row's metadata in the form add_columns takes, e.g. to save it.
+        
+        Returns:
+            (sources, source_ids, first_pages, last_pages, ingested_at); rows
+            without a source have source id -1
+        """
+        sources = self.sources()
+        source_ids = np.full(self._size, -1, dtype=np.int32)
+        for source_id, source in enumerate(sources):
+            source_ids[self._source_rows(source)] = source_id
+        return (sources, source_ids, self._first_page[:self._size].copy(),
+                self._last_page[:self._size].copy(), self._ingested_at[:self._size].copy())
+    
+    def select(self, rows: np.ndarray) -> "MetadataIndex":
+        """
+        A new index over the given rows, renumbered 0, 1, ... in order.
+        
+        Args:
+            rows: Sorted row numbers to keep
+        """
+        sources, source_ids, first_pages, last_pages, ingested_at = self.columns()
+        index = MetadataIndex()
+        index.add_columns(0, sources, source_ids[rows], first_pages[rows], last_pages[rows],
+                          ingested_at[rows])
+        return index
+    
+    def __len__(self):
+        return self._size
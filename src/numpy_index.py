@@ -0,0 +1,731 @@
+"""
+NumPy Index Module
+
+In-process exact vector search over an append-only, memory-mapped matrix,
+optionally scored from compressed codes.
+"""
+
+import bisect
+import glob
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .corpus_file import CorpusFile, write_corpus_file
+from .metadata_index import MetadataFilter, MetadataIndex
+from .quantization import load_quantizer, make_quantizer, save_quantizer
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix multiply; bounds the (queries x rows) score buffer
+SEARCH_BLOCK_ROWS = 65536
+
+SUPPORTED_METRICS = ("cosine", "ip")
+
+# Names the live corpus segments and the row log continuing them
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k best scores per row, unordered."""
+    if k >= scores.shape[1]:
+        return np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+class _RowTable:
+    """
+    chunk_id, text and metadata of each row: the rows of the mapped corpus
+    segments in order, followed by the rows appended since the last one was
+    written.
+    """
+    
+    def __init__(self, segments: Sequence[CorpusFile] = ()):
+        self.segments = list(segments)
+        self.starts: List[int] = []  # first row of each segment
+        self.base = 0
+        for segment in self.segments:
+            self.starts.append(self.base)
+            self.base += len(segment)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadata: List[Dict] = []
+        self._tail_row_of: Dict[str, int] = {}
+    
+    def __len__(self):
+        return self.base + len(self._ids)
+    
+    @property
+    def tail_rows(self) -> int:
+        """Rows not in a corpus segment."""
+        return len(self._ids)
+    
+    def _locate(self, row: int) -> Tuple[CorpusFile, int]:
+        i = bisect.bisect_right(self.starts, row) - 1
+        return self.segments[i], row - self.starts[i]
+    
+    def chunk_id(self, row: int) -> str:
+        if row < self.base:
+            segment, offset = self._locate(row)
+            return segment.chunk_id(offset)
+        return self._ids[row - self.base]
+    
+    def text(self, row: int) -> str:
+        if row < self.base:
+            segment, offset = self._locate(row)
+            return segment.text(offset)
+        return self._texts[row - self.base]
+    
+    def metadata(self, row: int) -> Dict:
+        if row < self.base:
+            segment, offset = self._locate(row)
+            return segment.metadata(offset)
+        return self._metadata[row - self.base]
+    
+    def tail_metadata(self) -> List[Dict]:
+        return self._metadata
+    
+    def extend(self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict]):
+        first_row = len(self)
+        self._ids.extend(chunk_ids)
+        self._texts.extend(texts)
+        self._metadata.extend(metadatas)
+        for offset, chunk_id in enumerate(chunk_ids):
+            self._tail_row_of[chunk_id] = first_row + offset
+    
+    def truncate(self, num_rows: int):
+        """Drop tail rows from num_rows on (segment rows always stay)."""
+        keep = num_rows - self.base
+        del self._ids[keep:], self._texts[keep:], self._metadata[keep:]
+        self._tail_row_of = {
+            chunk_id: self.base + offset for offset, chunk_id in enumerate(self._ids)
+        }
+    
+    def find(self, chunk_id: str) -> Optional[int]:
+        """Last row written with chunk_id, deleted or not."""
+        row = self._tail_row_of.get(chunk_id)
+        if row is not None:
+            return row
+        for start, segment in zip(reversed(self.starts), reversed(self.segments)):
+            row = segment.row_of(chunk_id)
+            if row is not None:
+                return start + row
+        return None
+
+
+class NumpyVectorIndex:
+    """
+    Exact (brute-force) vector index backed by plain files.
+    
+    Layout under ``index_dir``:
+    - ``vectors.f32``: float32 rows, appended and memory-mapped read-only
+    - ``rows.<generation>.corpus``: the rows up to the last checkpoint()
+      as memory-mapped CorpusFile segments, so start-up does not read or
+      hold every chunk's text
+    - ``rows.<generation>.jsonl`` (``rows.jsonl`` before the first
+      checkpoint): chunk_id, text and metadata of each row added since,
+      appended on every add and parsed on load
+    - ``checkpoint.json``: names of the live segments and row log
+    - ``tombstones.i64``: rows removed by delete() or replaced by a re-add
+    - ``meta.json``: dimension and metric
+    - ``quantizer.npz`` / ``codes.u8``: trained quantizer and one code per
+      row, when compression is enabled
+    
+    Search multiplies the query batch against the matrix block by block and
+    keeps a running top-k with argpartition, so memory stays bounded for
+    any collection size.
+    
+    With ``compression`` ("int8" or "pq") search scores the compact codes
+    instead of the floats, so only the codes need to stay in memory. The
+    best ``top_k * rerank_factor`` candidates are then re-scored exactly
+    from the float rows, which are still kept on disk. The quantizer is
+    trained once ``compression_train_rows`` rows are stored. Until then,
+    search uses the floats.
+    
+    A MetadataIndex over the rows lets search(where=...) score only the
+    rows matching a source, page or ingestion-time filter.
+    """
+    
+    def __init__(
+        self,
+        index_dir: str,
+        distance_metric: str = "cosine",
+        compression: Optional[str] = None,
+        pq_subspaces: Optional[int] = None,
+        rerank_factor: int = 4,
+        compression_train_rows: int = 10_000
+    ):
+        """
+        Initialize the index, loading existing rows from disk.
+        
+        Args:
+            index_dir: Directory holding the index files
+            distance_metric: "cosine" (vectors are normalized on add) or
+                "ip" (raw dot product)
+            compression: None (float32 search), "int8" or "pq"
+            pq_subspaces: Bytes per vector for "pq" (must divide the dimension)
+            rerank_factor: Candidates per result re-scored from the float
+                rows when compressed; 1 disables re-ranking
+            compression_train_rows: Rows required before the quantizer trains
+        """
+        if distance_metric not in SUPPORTED_METRICS:
+            raise ValueError(
+                f"Unsupported distance metric for numpy index: {distance_metric} "
+                f"(expected one of {SUPPORTED_METRICS})"
+            )
+        self.index_dir = index_dir
+        self.distance_metric = distance_metric
+        self.dimension: Optional[int] = None
+        self.compression = compression
+        self.pq_subspaces = pq_subspaces
+        self.rerank_factor = rerank_factor
+        self.compression_train_rows = compression_train_rows
+        
+        self._vectors = None
+        self._rows = _RowTable()
+        self._log_name = "rows.jsonl"
+        self._generation = 0
+        self._deleted = self._deleted_buffer = np.zeros(0, dtype=bool)
+        self._quantizer = None
+        self._codes = None
+        self._metadata_index = MetadataIndex()
+        
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+        logger.info(
+            f"Initialized NumpyVectorIndex at {index_dir} "
+            f"({len(self)} live rows, metric={distance_metric})"
+        )
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+    
+    def _load(self):
+        if not os.path.exists(self._path("meta.json")):
+            return
+        with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dimension = meta["dimension"]
+        if meta.get("distance_metric", self.distance_metric) != self.distance_metric:
+            raise ValueError(
+                f"Index at {self.index_dir} was built with metric "
+                f"{meta['distance_metric']}, not {self.distance_metric}"
+            )
+        
+        vectors_path = self._path("vectors.f32")
+        vector_rows = (
+            os.path.getsize(vectors_path) // (4 * self.dimension)
+            if os.path.exists(vectors_path) else 0
+        )
+        segments, log_start = self._open_checkpoint(vector_rows)
+        rows_path = self._path(self._log_name)
+        
+        ids, texts, metadatas = [], [], []
+        row_ends = []
+        offset = log_start
+        if os.path.exists(rows_path):
+            with open(rows_path, "rb") as f:
+                f.seek(log_start)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn write from an interrupted add
+                    row = json.loads(line)
+                    ids.append(row["id"])
+                    texts.append(row["text"])
+                    metadatas.append(row["metadata"])
+                    offset += len(line)
+                    row_ends.append(offset)
+        self._rows = _RowTable(segments)
+        self._rows.extend(ids, texts, metadatas)
+        num_rows = min(vector_rows, len(self._rows))
+        self._rows.truncate(num_rows)
+        tail_rows = num_rows - self._rows.base
+        
+        # Cut both files back to the last row written completely to each
+        with open(vectors_path, "ab") as f:
+            f.truncate(num_rows * 4 * self.dimension)
+        with open(rows_path, "ab") as f:
+            f.truncate(row_ends[tail_rows - 1] if tail_rows else log_start)
+        self._map_vectors(num_rows)
+        self._remove_stale_row_files()
+        
+        self._deleted = self._deleted_buffer = np.zeros(num_rows, dtype=bool)
+        if os.path.exists(self._path("tombstones.i64")):
+            tombstones = np.fromfile(self._path("tombstones.i64"), dtype=np.int64)
+            if (tombstones >= num_rows).any():
+                tombstones = tombstones[tombstones < num_rows]
+                tombstones.tofile(self._path("tombstones.i64"))
+            self._deleted[tombstones] = True
+        for start, segment in zip(self._rows.starts, self._rows.segments):
+            self._metadata_index.add_columns(start, segment.sources, segment.source_id,
+                                             segment.page_first, segment.page_last,
+                                             segment.ingested_at)
+        self._metadata_index.add(self._rows.base, self._rows.tail_metadata())
+        self._load_codes()
+    
+    def _open_checkpoint(self, vector_rows: int) -> Tuple[List[CorpusFile], int]:
+        """Map the checkpointed segments; also returns where the row log starts."""
+        checkpoint_path = self._path(CHECKPOINT_FILE)
+        if not os.path.exists(checkpoint_path):
+            corpus = self._open_corpus(vector_rows)
+            if corpus is None:
+                return [], 0
+            return [corpus], corpus.log_bytes
+        
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        segments = [CorpusFile(self._path(name)) for name in checkpoint["segments"]]
+        # Unlike a legacy rows.corpus there is no full row log to fall back on
+        if sum(len(segment) for segment in segments) > vector_rows:
+            raise ValueError(
+                f"Index at {self.index_dir} has checkpointed rows missing from vectors.f32"
+            )
+        self._generation = checkpoint["generation"]
+        self._log_name = checkpoint["log"]
+        return segments, 0
+    
+    def _open_corpus(self, vector_rows: int) -> Optional[CorpusFile]:
+        """A legacy single rows.corpus, unless the other files no longer match it."""
+        corpus_path = self._path("rows.corpus")
+        if not os.path.exists(corpus_path):
+            return None
+        rows_path = self._path("rows.jsonl")
+        log_bytes = os.path.getsize(rows_path) if os.path.exists(rows_path) else 0
+        try:
+            corpus = CorpusFile(corpus_path)
+        except ValueError as e:
+            logger.warning(f"Ignoring {corpus_path}: {e}")
+            return None
+        if len(corpus) > vector_rows or corpus.log_bytes > log_bytes:
+            logger.warning(f"Ignoring {corpus_path}: it is ahead of the index files")
+            return None
+        return corpus
+    
+    def checkpoint(self):
+        """
+        Write the rows added since the last checkpoint to a new corpus
+        segment and start an empty row log, so the next load maps them.
+        
+        Trailing segments no larger than the rows after them are merged
+        into the new one, so segment sizes shrink geometrically: there are
+        at most log2(rows) segments and a row is rewritten at most that
+        many times. Cheap to call when nothing was added since the last
+        checkpoint.
+        """
+        if self._rows.tail_rows == 0:
+            return
+        segments = self._rows.segments
+        kept, first_row = len(segments), self._rows.base
+        while kept > 0 and len(segments[kept - 1]) <= len(self._rows) - first_row:
+            kept -= 1
+            first_row -= len(segments[kept])
+        
+        generation = self._generation + 1
+        segment_name = f"rows.{generation}.corpus"
+        log_name = f"rows.{generation}.jsonl"
+        rows = range(first_row, len(self._rows))
+        write_corpus_file(
+            self._path(segment_name),
+            [self._rows.chunk_id(row) for row in rows],
+            [self._rows.text(row) for row in rows],
+            [self._rows.metadata(row) for row in rows]
+        )
+        open(self._path(log_name), "w").close()
+        
+        # Switching the checkpoint file is the commit point; until then a
+        # load still uses the old segments and row log
+        names = [os.path.basename(segment.path) for segment in segments[:kept]]
+        tmp_path = self._path(CHECKPOINT_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"generation": generation, "segments": names + [segment_name],
+                       "log": log_name}, f)
+        os.replace(tmp_path, self._path(CHECKPOINT_FILE))
+        
+        self._generation = generation
+        self._log_name = log_name
+        self._rows = _RowTable(segments[:kept] + [CorpusFile(self._path(segment_name))])
+        self._remove_stale_row_files()
+    
+    def _remove_stale_row_files(self):
+        """Delete row logs and segments the current checkpoint does not use."""
+        live = {os.path.basename(segment.path) for segment in self._rows.segments}
+        live.add(self._log_name)
+        for pattern in ("rows.corpus", "rows.jsonl", "rows.*.corpus", "rows.*.jsonl"):
+            for path in glob.glob(self._path(pattern)):
+                if os.path.basename(path) not in live:
+                    os.remove(path)
+    
+    def _row(self, chunk_id: str) -> Optional[int]:
+        """Live row holding chunk_id, or None."""
+        row = self._rows.find(chunk_id)
+        if row is None or self._deleted[row]:
+            return None
+        return row
+    
+    def _load_codes(self):
+        if self.compression is None:
+            return
+        if os.path.exists(self._path("quantizer.npz")):
+            quantizer = load_quantizer(self._path("quantizer.npz"))
+            if quantizer.kind == self.compression:
+                self._quantizer = quantizer
+        if self._quantizer is None:
+            self._maybe_train_quantizer()
+            return
+        
+        num_rows = len(self._rows)
+        code_size = self._quantizer.code_size
+        codes_path = self._path("codes.u8")
+        stored = os.path.getsize(codes_path) // code_size if os.path.exists(codes_path) else 0
+        with open(codes_path, "ab") as f:
+            f.truncate(min(stored, num_rows) * code_size)
+            if stored < num_rows:
+                f.write(self._quantizer.encode(self._vectors[stored:]).tobytes())
+        self._map_codes()
+    
+    def _map_codes(self):
+        num_rows = len(self._rows)
+        if num_rows == 0:
+            self._codes = np.zeros((0, self._quantizer.code_size), dtype=np.uint8)
+        else:
+            self._codes = np.memmap(
+                self._path("codes.u8"), dtype=np.uint8, mode="r",
+                shape=(num_rows, self._quantizer.code_size)
+            )
+    
+    def _maybe_train_quantizer(self):
+        if self.compression is None or self._quantizer is not None:
+            return
+        if len(self) < max(self.compression_train_rows, 1):
+            return
+        self.train_quantizer()
+    
+    def train_quantizer(self, sample_size: int = 100_000, seed: int = 0):
+        """
+        Train the compression quantizer and encode every stored row.
+        
+        Args:
+            sample_size: Maximum rows used for training
+            seed: Random seed for the training sample
+        """
+        rng = np.random.default_rng(seed)
+        live = np.flatnonzero(~self._deleted)
+        sample_rows = np.sort(rng.choice(live, min(sample_size, len(live)), replace=False))
+        quantizer = make_quantizer(self.compression, self.dimension, self.pq_subspaces)
+        quantizer.train(np.asarray(self._vectors[sample_rows]), rng)
+        
+        self._codes = None
+        quantizer.encode(self._vectors).tofile(self._path("codes.u8"))
+        save_quantizer(quantizer, self._path("quantizer.npz"))
+        self._quantizer = quantizer
+        self._map_codes()
+        logger.info(
+            f"Trained {self.compression} quantizer for {self.index_dir} "
+            f"({quantizer.code_size} bytes per vector)"
+        )
+    
+    def _map_vectors(self, num_rows: int):
+        if num_rows == 0:
+            self._vectors = np.zeros((0, self.dimension or 0), dtype=np.float32)
+        else:
+            self._vectors = np.memmap(
+                self._path("vectors.f32"), dtype=np.float32, mode="r",
+                shape=(num_rows, self.dimension)
+            )
+    
+    def _prepare(self, vectors) -> np.ndarray:
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+        if self.distance_metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            np.maximum(norms, 1e-12, out=norms)
+            vectors /= norms
+        return vectors
+    
+    def _extend_deleted(self, num_rows: int):
+        """Grow the deleted mask to num_rows, doubling its buffer when full."""
+        if num_rows > len(self._deleted_buffer):
+            buffer = np.zeros(max(num_rows, 2 * len(self._deleted_buffer)), dtype=bool)
+            buffer[:len(self._deleted)] = self._deleted
+            self._deleted_buffer = buffer
+        self._deleted = self._deleted_buffer[:num_rows]
+    
+    def _tombstone(self, rows: List[int]):
+        if not rows:
+            return
+        self._deleted[rows] = True
+        with open(self._path("tombstones.i64"), "ab") as f:
+            f.write(np.asarray(rows, dtype=np.int64).tobytes())
+    
+    def add(self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict], embeddings):
+        """
+        Append rows; re-adding an existing chunk_id replaces it.
+        
+        Args:
+            chunk_ids: Unique chunk identifiers
+            texts: Chunk texts
+            metadatas: Chunk metadata dicts (JSON-serializable)
+            embeddings: Array of shape (len(chunk_ids), dimension)
+        """
+        if not chunk_ids:
+            return
+        vectors = self._prepare(embeddings)
+        if len(set(chunk_ids)) != len(chunk_ids):
+            # Keep the last occurrence of each ID, as sequential adds would
+            last = {chunk_id: i for i, chunk_id in enumerate(chunk_ids)}
+            keep = sorted(last.values())
+            chunk_ids = [chunk_ids[i] for i in keep]
+            texts = [texts[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            vectors = vectors[keep]
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"dimension": self.dimension,
+                           "distance_metric": self.distance_metric}, f)
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match index "
+                f"dimension {self.dimension}"
+            )
+        
+        self._tombstone([row for row in map(self._row, chunk_ids) if row is not None])
+        self._append(chunk_ids, texts, metadatas, vectors)
+    
+    def _append(self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict],
+                vectors: np.ndarray):
+        """Write already-prepared rows to the end of the files."""
+        first_row = len(self._rows)
+        with open(self._path("vectors.f32"), "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self._path(self._log_name), "a", encoding="utf-8") as f:
+            for chunk_id, text, metadata in zip(chunk_ids, texts, metadatas):
+                f.write(json.dumps({"id": chunk_id, "text": text, "metadata": metadata}) + "\n")
+        
+        self._rows.extend(chunk_ids, texts, metadatas)
+        self._extend_deleted(len(self._rows))
+        self._metadata_index.add(first_row, metadatas)
+        self._map_vectors(len(self._rows))
+        
+        if self._quantizer is not None:
+            with open(self._path("codes.u8"), "ab") as f:
+                f.write(self._quantizer.encode(vectors).tobytes())
+            self._map_codes()
+        else:
+            self._maybe_train_quantizer()
+    
+    def delete(self, chunk_ids: List[str]):
+        """
+        Remove rows by chunk_id (unknown IDs are ignored).
+        
+        Args:
+            chunk_ids: IDs of the chunks to delete
+        """
+        rows = {row for row in map(self._row, chunk_ids) if row is not None}
+        self._tombstone(sorted(rows))
+    
+    def search(
+        self,
+        query_embeddings,
+        top_k: int = 5,
+        where: Optional[MetadataFilter] = None,
+        **search_options
+    ) -> List[List[Dict]]:
+        """
+        Exact top-k search for a batch of queries.
+        
+        Args:
+            query_embeddings: Array of shape (num_queries, dimension)
+            top_k: Number of results per query
+            where: Only return chunks matching this filter
+        
+        Returns:
+            One result list per query, each with chunk_id, text, metadata and
+            score, best match first
+        """
+        queries = self._prepare(query_embeddings)
+        if len(self) == 0 or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+        
+        rows = None
+        if where is not None:
+            rows = self.filter_rows(where)
+            if len(rows) == 0:
+                return [[] for _ in range(len(queries))]
+        
+        if self._quantizer is None or self.rerank_factor <= 1:
+            return self._format(*self._search_candidates(queries, top_k, rows,
+                                                         **search_options))
+        candidates, scores = self._search_candidates(queries, top_k * self.rerank_factor,
+                                                     rows, **search_options)
+        return self._format(*self._rerank(queries, candidates, scores, top_k))
+    
+    def filter_rows(self, where: MetadataFilter) -> np.ndarray:
+        """Live rows matching a filter, sorted."""
+        rows = self._metadata_index.rows(where)
+        if where.include_ids:
+            included = [self._row(chunk_id) for chunk_id in where.include_ids]
+            rows = np.union1d(rows, [row for row in included if row is not None]).astype(np.int64)
+        return rows[~self._deleted[rows]]
+    
+    def filter_ids(self, where: MetadataFilter) -> List[str]:
+        """IDs of the live chunks matching a filter."""
+        return [self._rows.chunk_id(row) for row in self.filter_rows(where).tolist()]
+    
+    def get(self, chunk_ids: List[str]) -> List[Dict]:
+        """
+        Stored chunks by ID, in the given order (unknown IDs are skipped).
+        
+        Args:
+            chunk_ids: IDs of the chunks to fetch
+        
+        Returns:
+            List of dicts with chunk_id, text and metadata
+        """
+        rows = [(chunk_id, self._row(chunk_id)) for chunk_id in chunk_ids]
+        return [
+            {
+                "chunk_id": chunk_id,
+                "text": self._rows.text(row),
+                "metadata": self._rows.metadata(row),
+            }
+            for chunk_id, row in rows
+            if row is not None
+        ]
+    
+    def _search_candidates(self, queries: np.ndarray, top_k: int,
+                           rows: Optional[np.ndarray] = None):
+        return self._search_rows(queries, top_k, rows)
+    
+    def _scores(self, queries: np.ndarray, rows) -> np.ndarray:
+        """Scores of queries against rows (a slice or an index array)."""
+        if self._quantizer is not None:
+            return self._quantizer.score(queries, self._codes[rows])
+        return queries @ self._vectors[rows].T
+    
+    def _rerank(self, queries: np.ndarray, rows: np.ndarray, scores: np.ndarray,
+                top_k: int):
+        """Re-score approximate candidates from the float rows, keep top_k."""
+        best_rows = np.zeros((len(queries), top_k), dtype=np.int64)
+        best_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        for i, query in enumerate(queries):
+            candidates = np.sort(rows[i][np.isfinite(scores[i])])
+            if len(candidates) == 0:
+                continue
+            exact = self._vectors[candidates] @ query
+            keep = np.argsort(-exact, kind="stable")[:top_k]
+            best_rows[i, :len(keep)] = candidates[keep]
+            best_scores[i, :len(keep)] = exact[keep]
+        return best_rows, best_scores
+    
+    def _search_rows(self, queries: np.ndarray, top_k: int,
+                     rows: Optional[np.ndarray] = None):
+        """
+        Blocked matrix-multiply search returning (rows, scores) arrays.
+        
+        Scores every row, or only the given live rows (sorted) when a
+        filter has selected candidates.
+        """
+        num_queries = len(queries)
+        best_rows = np.zeros((num_queries, 0), dtype=np.int64)
+        best_scores = np.zeros((num_queries, 0), dtype=np.float32)
+        
+        total = len(self._rows) if rows is None else len(rows)
+        for start in range(0, total, SEARCH_BLOCK_ROWS):
+            if rows is None:
+                block_rows = np.arange(start, min(start + SEARCH_BLOCK_ROWS, total))
+                scores = self._scores(queries, slice(start, start + SEARCH_BLOCK_ROWS))
+                deleted = self._deleted[start:start + scores.shape[1]]
+                if deleted.any():
+                    scores[:, deleted] = -np.inf
+            else:
+                block_rows = rows[start:start + SEARCH_BLOCK_ROWS]
+                scores = self._scores(queries, block_rows)
+            
+            candidates = _top_k(scores, top_k)
+            scores = np.concatenate(
+                [best_scores, np.take_along_axis(scores, candidates, axis=1)], axis=1
+            )
+            candidate_rows = np.concatenate([best_rows, block_rows[candidates]], axis=1)
+            keep = _top_k(scores, top_k)
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+            best_rows = np.take_along_axis(candidate_rows, keep, axis=1)
+        
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return (np.take_along_axis(best_rows, order, axis=1),
+                np.take_along_axis(best_scores, order, axis=1))
+    
+    def _format(self, rows: np.ndarray, scores: np.ndarray) -> List[List[Dict]]:
+        return [
+            [
+                {
+                    "chunk_id": self._rows.chunk_id(row),
+                    "text": self._rows.text(row),
+                    "metadata": self._rows.metadata(row),
+                    "score": float(score),
+                }
+                for row, score in zip(query_rows, query_scores)
+                if np.isfinite(score)
+            ]
+            for query_rows, query_scores in zip(rows.tolist(), scores.tolist())
+        ]
+    
+    def compact(self):
+        """Rewrite the files without deleted rows."""
+        live = np.flatnonzero(~self._deleted)
+        if len(live) == len(self._rows):
+            return
+        checkpointed = bool(self._rows.segments)
+        vectors = np.array(self._vectors[live]) if len(live) else None
+        ids = [self._rows.chunk_id(r) for r in live]
+        texts = [self._rows.text(r) for r in live]
+        metadatas = [self._rows.metadata(r) for r in live]
+        
+        self._vectors = self._codes = None
+        self._reset_rows()
+        for name in ("vectors.f32", "tombstones.i64", "codes.u8"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        open(self._path("vectors.f32"), "wb").close()
+        open(self._path(self._log_name), "w").close()
+        self._deleted = self._deleted_buffer = np.zeros(0, dtype=bool)
+        self._metadata_index = MetadataIndex()
+        self._map_vectors(0)
+        if self._quantizer is not None:
+            self._map_codes()
+        if ids:
+            self._append(ids, texts, metadatas, vectors)
+        if checkpointed:
+            self.checkpoint()
+        logger.info(f"Compacted {self.index_dir} to {len(ids)} rows")
+    
+    def reset(self):
+        """Delete every row and the index files."""
+        self._vectors = self._codes = None
+        self._reset_rows()
+        for name in ("vectors.f32", "rows.jsonl", "tombstones.i64", "meta.json",
+                     "codes.u8", "quantizer.npz"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+        self.dimension = None
+        self._deleted = self._deleted_buffer = np.zeros(0, dtype=bool)
+        self._metadata_index = MetadataIndex()
+        self._quantizer = None
+        self._map_vectors(0)
+    
+    def _reset_rows(self):
+        """Forget every row and remove the checkpoint, segments and row logs."""
+        if os.path.exists(self._path(CHECKPOINT_FILE)):
+            os.remove(self._path(CHECKPOINT_FILE))
+        self._rows = _RowTable()
+        self._log_name = "rows.jsonl"
+        self._generation = 0
+        self._remove_stale_row_files()
+    
+    def __len__(self):
+        return len(self._deleted) - int(np.count_nonzero(self._deleted))
+    
+    def __contains__(self, chunk_id: str) -> bool:
+        return self._row(chunk_id) is not None
@@ -0,0 +1,243 @@
+"""
+Quantization Module
+
+Compressed vector codes (int8 scalar and product quantization) scored
+with asymmetric distance computation, plus the shared k-means helper.
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows encoded per step; bounds the temporary float buffers
+ENCODE_BLOCK_ROWS = 65536
+
+# int8 rows widened to float per matmul; small enough to stay in cache
+SCORE_BLOCK_ROWS = 1024
+
+PQ_CENTROIDS = 256  # one uint8 code per subspace
+
+
+def nearest_centroid(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Index of the L2-nearest centroid for each vector, computed block by block.
+    
+    Uses argmax of x.c - |c|^2 / 2, which for unit-length centroids is the
+    same as the largest dot product.
+    """
+    bias = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ENCODE_BLOCK_ROWS):
+        scores = np.asarray(vectors[start:start + ENCODE_BLOCK_ROWS]) @ centroids.T
+        scores -= bias
+        assignments[start:start + len(scores)] = scores.argmax(axis=1)
+    return assignments
+
+
+def kmeans(
+    data: np.ndarray,
+    k: int,
+    iterations: int,
+    rng: np.random.Generator,
+    spherical: bool = False
+) -> np.ndarray:
+    """
+    Lloyd's k-means.
+    
+    Args:
+        data: Training vectors, shape (n, dimension), n >= k
+        k: Number of centroids
+        iterations: Maximum Lloyd iterations
+        rng: Random generator for initialization and empty-cluster reseeding
+        spherical: Keep centroids unit length (for cosine similarity)
+    
+    Returns:
+        float32 centroids of shape (k, dimension)
+    """
+    centroids = data[rng.choice(len(data), k, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignments = nearest_centroid(data, centroids)
+        order = np.argsort(assignments, kind="stable")
+        cells, starts = np.unique(assignments[order], return_index=True)
+        sums = np.add.reduceat(data[order], starts, axis=0)
+        counts = np.diff(np.append(starts, len(data)))
+        
+        updated = centroids.copy()
+        updated[cells] = sums / counts[:, None]
+        empty = np.setdiff1d(np.arange(k), cells)
+        if len(empty):
+            updated[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+        if spherical:
+            norms = np.linalg.norm(updated, axis=1, keepdims=True)
+            updated /= np.maximum(norms, 1e-12)
+        converged = np.allclose(updated, centroids, atol=1e-6)
+        centroids = updated
+        if converged:
+            break
+    return centroids
+
+
+class ScalarQuantizer:
+    """
+    Per-dimension 8-bit quantization: 4x smaller than float32.
+    
+    Each dimension is mapped linearly from its trained [min, max] range
+    onto 0..255. Scores against a float query are computed without
+    decoding: q.x ~= (q * scale).codes + q.low.
+    """
+    
+    kind = "int8"
+    
+    def __init__(self, low: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        self.low = low
+        self.scale = scale
+    
+    @property
+    def code_size(self) -> int:
+        return len(self.low)
+    
+    def train(self, vectors: np.ndarray, rng: Optional[np.random.Generator] = None):
+        """Learn the per-dimension value ranges."""
+        self.low = vectors.min(axis=0).astype(np.float32)
+        high = vectors.max(axis=0).astype(np.float32)
+        self.scale = np.maximum(high - self.low, 1e-12) / 255
+    
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.empty(vectors.shape, dtype=np.uint8)
+        for start in range(0, len(vectors), ENCODE_BLOCK_ROWS):
+            block = (np.asarray(vectors[start:start + ENCODE_BLOCK_ROWS]) - self.low) / self.scale
+            codes[start:start + len(block)] = np.clip(np.rint(block), 0, 255)
+        return codes
+    
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes * self.scale + self.low
+    
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products, shape (num_queries, num_codes)."""
+        scaled = queries * self.scale
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        # Widen codes a cache-sized slice at a time rather than all at once
+        for start in range(0, len(codes), SCORE_BLOCK_ROWS):
+            block = np.asarray(codes[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = scaled @ block.T
+        scores += (queries @ self.low)[:, None]
+        return scores
+    
+    def state(self) -> dict:
+        return {"low": self.low, "scale": self.scale}
+
+
+class ProductQuantizer:
+    """
+    Product quantization: one byte per subspace.
+    
+    Vectors are split into ``subspaces`` contiguous slices, each encoded as
+    the nearest of 256 k-means centroids. Queries are scored with per-query
+    lookup tables of subspace inner products (asymmetric distance
+    computation), so codes are never decoded.
+    """
+    
+    kind = "pq"
+    
+    def __init__(self, subspaces: int, codebooks: Optional[np.ndarray] = None,
+                 iterations: int = 15):
+        """
+        Args:
+            subspaces: Number of slices; must divide the dimension
+            codebooks: Trained centroids, shape (subspaces, 256, dimension // subspaces)
+            iterations: k-means iterations per subspace when training
+        """
+        self.subspaces = subspaces
+        self.codebooks = codebooks
+        self.iterations = iterations
+    
+    @property
+    def code_size(self) -> int:
+        return self.subspaces
+    
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors).reshape(len(vectors), self.subspaces, -1)
+    
+    def train(self, vectors: np.ndarray, rng: Optional[np.random.Generator] = None):
+        """Learn one codebook per subspace (needs at least 256 vectors)."""
+        if vectors.shape[1] % self.subspaces:
+            raise ValueError(
+                f"Dimension {vectors.shape[1]} is not divisible by "
+                f"{self.subspaces} PQ subspaces"
+            )
+        if len(vectors) < PQ_CENTROIDS:
+            raise ValueError(f"PQ training needs at least {PQ_CENTROIDS} vectors")
+        rng = rng or np.random.default_rng(0)
+        parts = self._split(vectors)
+        self.codebooks = np.stack([
+            kmeans(np.ascontiguousarray(parts[:, j]), PQ_CENTROIDS, self.iterations, rng)
+            for j in range(self.subspaces)
+        ])
+    
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(vectors), self.subspaces), dtype=np.uint8)
+        for start in range(0, len(vectors), ENCODE_BLOCK_ROWS):
+            parts = self._split(vectors[start:start + ENCODE_BLOCK_ROWS])
+            for j in range(self.subspaces):
+                codes[start:start + len(parts), j] = nearest_centroid(
+                    np.ascontiguousarray(parts[:, j]), self.codebooks[j]
+                )
+        return codes
+    
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = [self.codebooks[j][codes[:, j]] for j in range(self.subspaces)]
+        return np.concatenate(parts, axis=1)
+    
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products, shape (num_queries, num_codes)."""
+        # tables[j, q, c]: inner product of query q's slice j with centroid c
+        tables = np.einsum("qjd,jcd->jqc", self._split(queries), self.codebooks)
+        codes = np.asarray(codes)
+        scores = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for j in range(self.subspaces):
+            scores += tables[j][:, codes[:, j]]
+        return scores
+    
+    def state(self) -> dict:
+        return {"codebooks": self.codebooks}
+
+
+COMPRESSION_MODES = ("int8", "pq")
+
+
+def make_quantizer(mode: str, dimension: int, pq_subspaces: Optional[int] = None):
+    """
+    Create an untrained quantizer.
+    
+    Args:
+        mode: "int8" or "pq"
+        dimension: Vector dimension
+        pq_subspaces: PQ slices (default: the largest divisor of the
+            dimension giving at least 8 dimensions per slice)
+    """
+    if mode == "int8":
+        return ScalarQuantizer()
+    if mode == "pq":
+        if pq_subspaces is None:
+            pq_subspaces = max(
+                [m for m in range(1, dimension // 8 + 1) if dimension % m == 0] or [1]
+            )
+        return ProductQuantizer(pq_subspaces)
+    raise ValueError(f"Unknown compression mode: {mode} (expected one of {COMPRESSION_MODES})")
+
+
+def save_quantizer(quantizer, path: str):
+    np.savez(path, kind=quantizer.kind, **quantizer.state())
+
+
+def load_quantizer(path: str):
+    """Load a quantizer saved with save_quantizer."""
+    with np.load(path) as data:
+        kind = str(data["kind"])
+        if kind == "int8":
+            return ScalarQuantizer(data["low"], data["scale"])
+        codebooks = data["codebooks"]
+        return ProductQuantizer(len(codebooks), codebooks)
@@ -0,0 +1,192 @@
+"""
+Query Batcher Module
+
+Coalesces concurrent query embeddings into shared encoder batches.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _Request:
+    __slots__ = ("texts", "future")
+    
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class QueryEmbeddingBatcher:
+    """
+    Micro-batching front end for an EmbeddingGenerator.
+    
+    A forward pass over one short query costs nearly as much as one over
+    a few dozen, so under concurrent load each query is queued instead of
+    encoded on its own. A worker thread takes the first waiting request,
+    keeps collecting requests for up to ``max_wait_ms`` or until
+    ``max_batch_size`` texts are queued, encodes them in one
+    generate_embeddings() call and hands each caller its rows.
+    
+    Features:
+    - Drop-in for the generator on the query path (generate_embeddings,
+      dimension), e.g. as Retriever's embedding_generator
+    - A lone request waits at most ``max_wait_ms`` for company
+    - Requests of ``max_batch_size`` texts or more bypass the queue
+    - Encoder errors are raised in every caller of the failed batch
+    """
+    
+    def __init__(
+        self,
+        embedding_generator,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            embedding_generator: EmbeddingGenerator doing the encoding
+            max_batch_size: Maximum texts encoded per batch
+            max_wait_ms: How long the first request of a batch waits for
+                more to arrive
+        """
+        self.embedding_generator = embedding_generator
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._carry: Optional[_Request] = None
+        
+        self.requests = 0
+        self.batches = 0
+        self.batched_texts = 0
+        logger.info(
+            f"Initialized QueryEmbeddingBatcher (max_batch_size={max_batch_size}, "
+            f"max_wait_ms={max_wait_ms})"
+        )
+    
+    @property
+    def dimension(self) -> int:
+        """Dimensionality of the generated embeddings."""
+        return self.embedding_generator.dimension
+    
+    def generate_embeddings(self, texts: List[str],
+                            batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embed texts, sharing the encoder call with concurrent requests.
+        
+        Blocks until this request's batch has been encoded.
+        
+        Args:
+            texts: Texts to embed (usually one query)
+            batch_size: Passed through for requests that bypass the queue
+        
+        Returns:
+            Float32 array of shape (len(texts), dimension), row i for texts[i]
+        """
+        if not texts or len(texts) >= self.max_batch_size:
+            return self.embedding_generator.generate_embeddings(texts, batch_size)
+        
+        self._ensure_worker()
+        request = _Request(list(texts))
+        self._queue.put(request)
+        return request.future.result()
+    
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="query-batcher",
+                                                daemon=True)
+                self._worker.start()
+    
+    def _run(self):
+        while True:
+            first = self._carry or self._queue.get()
+            self._carry = None
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            stop = False
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 \
+                        else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                if size + len(request.texts) > self.max_batch_size:
+                    # Starts the next batch rather than overflowing this one
+                    self._carry = request
+                    break
+                batch.append(request)
+                size += len(request.texts)
+            self._encode(batch)
+            if stop:
+                return
+    
+    def _encode(self, batch: List[_Request]):
+        texts = [text for request in batch for text in request.texts]
+        try:
+            embeddings = self.embedding_generator.generate_embeddings(texts)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        
+        self.requests += len(batch)
+        self.batches += 1
+        self.batched_texts += len(texts)
+        offset = 0
+        for request in batch:
+            request.future.set_result(embeddings[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+    
+    def close(self):
+        """Stop the worker after it encodes the requests already queued."""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+    
+    def stats(self) -> Dict[str, float]:
+        """Requests served through the queue and the mean batch size."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_texts / self.batches if self.batches else 0.0,
+        }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    class _Generator:
+        dimension = 2
+        
+        def generate_embeddings(self, texts, batch_size=None):
+            time.sleep(0.01)
+            return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+    
+    batcher = QueryEmbeddingBatcher(_Generator(), max_batch_size=16, max_wait_ms=5)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda i: batcher.generate_embeddings([f"query {i}"]), range(64)))
+    print(batcher.stats())
@@ -0,0 +1,230 @@
+"""
+Query Cache Module
+
+Two-level (exact, then semantic) cache of RAG answers with TTL and LRU
+eviction.
+"""
+
+import copy
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Case-, width- and whitespace-insensitive form, without trailing punctuation."""
+    text = unicodedata.normalize("NFKC", question).casefold()
+    return _WHITESPACE.sub(" ", text).strip().rstrip("?!. ")
+
+
+class _Entry:
+    __slots__ = ("context", "question", "slot", "response", "created_at")
+    
+    def __init__(self, context, question, slot, response, created_at):
+        self.context = context
+        self.question = question
+        self.slot = slot
+        self.response = response
+        self.created_at = created_at
+
+
+class QueryCache:
+    """
+    In-memory answer cache for RAGPipeline.query.
+    
+    A lookup first tries the normalized question text, then the cached
+    question whose embedding has the highest cosine similarity to the new
+    one, accepted if at least ``similarity_threshold``. Embeddings live in
+    one preallocated matrix, so the semantic level is a single
+    matrix-vector product over at most ``max_entries`` rows.
+    
+    Entries expire ``ttl_seconds`` after they were stored; when full, the
+    least recently used entry is evicted. invalidate() drops everything,
+    e.g. after the indexed documents changed. ``context`` separates
+    answers that are not interchangeable (such as different top_k).
+    
+    Responses are deep-copied on put() and on every hit, so callers may
+    mutate what they stored or were served without touching the cache.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = 3600,
+        similarity_threshold: float = 0.95,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Lifetime of an answer (None never expires)
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            clock: Time source, seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.clock = clock
+        
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._slot_keys: List[Optional[tuple]] = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._embeddings: Optional[np.ndarray] = None
+        self._active = np.zeros(max_entries, dtype=bool)
+        self._lock = threading.Lock()
+        
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        logger.info(
+            f"Initialized QueryCache (max_entries={max_entries}, ttl={ttl_seconds}s, "
+            f"threshold={similarity_threshold})"
+        )
+    
+    def get(self, question: str, embedding=None, context: Hashable = None) -> Optional[Dict]:
+        """
+        Cached answer for a question, or None.
+        
+        Args:
+            question: Question text
+            embedding: Question embedding (None skips the semantic level)
+            context: Only match answers stored with an equal context
+        
+        Returns:
+            A copy of the cached response with ``metadata["cache"]`` set to
+            "exact" or "semantic", or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get((context, normalize_question(question)))
+            if entry is not None and self._expired(entry):
+                self._remove(entry)
+                self.expirations += 1
+                entry = None
+            level = "exact"
+            if entry is None and embedding is not None:
+                entry = self._nearest(embedding, context)
+                level = "semantic"
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end((entry.context, entry.question))
+            if level == "exact":
+                self.exact_hits += 1
+            else:
+                self.semantic_hits += 1
+            response = copy.deepcopy(entry.response)
+        response.setdefault("metadata", {})["cache"] = level
+        return response
+    
+    def _nearest(self, embedding, context: Hashable) -> Optional[_Entry]:
+        if self._embeddings is None or not self._active.any():
+            return None
+        query = self._unit(embedding)
+        if query.shape[0] != self._embeddings.shape[1]:
+            return None
+        scores = self._embeddings @ query
+        scores[~self._active] = -np.inf
+        candidates = np.flatnonzero(scores >= self.similarity_threshold)
+        for slot in candidates[np.argsort(-scores[candidates], kind="stable")]:
+            entry = self._entries[self._slot_keys[slot]]
+            if self._expired(entry):
+                self._remove(entry)
+                self.expirations += 1
+            elif entry.context == context:
+                return entry
+        return None
+    
+    def put(self, question: str, embedding, response: Dict, context: Hashable = None):
+        """
+        Cache an answer.
+        
+        Args:
+            question: Question text
+            embedding: Question embedding (None stores an exact-only entry)
+            response: Answer dict returned by RAGPipeline.query (a copy is
+                stored)
+            context: Key component that must match on lookup
+        """
+        if self.max_entries <= 0:
+            return
+        key = (context, normalize_question(question))
+        response = copy.deepcopy(response)
+        with self._lock:
+            if key in self._entries:
+                self._remove(self._entries[key])
+            while len(self._entries) >= self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                self._release(oldest)
+                self.evictions += 1
+            
+            slot = self._free_slots.pop()
+            if embedding is not None:
+                vector = self._unit(embedding)
+                if self._embeddings is None:
+                    self._embeddings = np.zeros((self.max_entries, len(vector)),
+                                                dtype=np.float32)
+                if len(vector) == self._embeddings.shape[1]:
+                    self._embeddings[slot] = vector
+                    self._active[slot] = True
+            self._slot_keys[slot] = key
+            self._entries[key] = _Entry(context, key[1], slot, response, self.clock())
+    
+    def invalidate(self):
+        """Drop every cached answer (call when the indexed documents change)."""
+        with self._lock:
+            for entry in list(self._entries.values()):
+                self._remove(entry)
+            self.invalidations += 1
+        logger.info("Invalidated query cache")
+    
+    def _expired(self, entry: _Entry) -> bool:
+        return self.ttl_seconds is not None and \
+            self.clock() - entry.created_at > self.ttl_seconds
+    
+    def _remove(self, entry: _Entry):
+        del self._entries[(entry.context, entry.question)]
+        self._release(entry)
+    
+    def _release(self, entry: _Entry):
+        self._active[entry.slot] = False
+        self._slot_keys[entry.slot] = None
+        self._free_slots.append(entry.slot)
+    
+    @staticmethod
+    def _unit(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters per level and current size."""
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+    
+    def __len__(self):
+        return len(self._entries)
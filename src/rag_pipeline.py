@@ -4,19 +4,54 @@ RAG Pipeline Module
 Orchestrates the complete Retrieval-Augmented Generation pipeline.
 """
 
+import asyncio
+import itertools
 import logging
-from typing import Dict, Optional, List
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .context_builder import ContextBuilder
+from .document_processor import DocumentChunk
+from .ingestion_manifest import IngestionManifest
+from .ingestion_pipeline import IngestionPipeline, IngestionReport
+from .query_cache import QueryCache
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_FILENAME = "ingestion_manifest.json"
+
 
 class RAGPipeline:
     """
     Main RAG pipeline orchestrating retrieval and generation.
     
+    A query retrieves chunks, merges and packs them into the context
+    token budget (see ContextBuilder) and asks the LLM to answer from them.
+    With a QueryCache, repeated or near-identical questions are answered
+    from the cache, which is invalidated whenever indexing changes the
+    documents.
+    
+    process_documents() runs extraction, embedding and index writes as
+    overlapped stages (see IngestionPipeline).
+    
+    With a ChunkDeduplicator, exact and near-duplicate chunks (repeated
+    boilerplate, revisions of a document) are not embedded: each cluster
+    is stored once and the other copies are cited as its aliases.
+    
+    aquery() serves questions from an asyncio event loop: embedding and
+    search run in a thread pool, generation awaits the LLM's pooled async
+    client, and at most ``max_concurrency`` queries are in flight at once
+    (later ones wait their turn).
+    
+    query_batch() answers a whole question set: questions are embedded
+    and searched in batches, answers are generated concurrently and
+    yielded as they complete.
+    
     TODO (Day 4):
-    - Integrate all components
-    - Query processing flow
     - Answer generation with citations
     - Conversation management
     """
@@ -27,41 +62,546 @@ class RAGPipeline:
         embedding_generator,
         vector_store,
         retriever,
-        llm_interface
+        llm_interface,
+        lexical_index=None,
+        deduplicator=None,
+        context_builder: Optional[ContextBuilder] = None,
+        query_cache: Optional[QueryCache] = None,
+        max_concurrency: int = 16,
+        retrieval_workers: Optional[int] = None,
+        ingest_batch_size: int = 256,
+        ingest_queue_size: int = 4
     ):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            document_processor: DocumentProcessor turning PDFs into chunks
+            embedding_generator: EmbeddingGenerator for chunk vectors
+            vector_store: VectorStore holding the chunks
+            retriever: Retriever answering searches
+            llm_interface: LLM used to generate answers
+            lexical_index: Optional BM25Index kept in sync with the vector
+                store, for hybrid retrieval
+            deduplicator: Optional ChunkDeduplicator; duplicate chunks are
+                recorded as aliases instead of being embedded and stored
+            context_builder: Packs retrieved chunks into the LLM context
+                (default: ContextBuilder with a 3000-token budget)
+            query_cache: Optional answer cache consulted by query()
+            max_concurrency: Maximum aquery() calls processed at once
+            retrieval_workers: Threads running embedding and search for
+                aquery() (default: max_concurrency)
+            ingest_batch_size: Chunks per embedding call and bulk index
+                write during ingestion
+            ingest_queue_size: Files and batches buffered between
+                ingestion stages
+        """
         self.document_processor = document_processor
         self.embedding_generator = embedding_generator
         self.vector_store = vector_store
         self.retriever = retriever
         self.llm_interface = llm_interface
+        self.lexical_index = lexical_index
+        self.deduplicator = deduplicator
+        self.context_builder = context_builder or ContextBuilder()
+        self.query_cache = query_cache
+        self.max_concurrency = max_concurrency
+        self.retrieval_workers = retrieval_workers or max_concurrency
+        self.ingest_batch_size = ingest_batch_size
+        self.ingest_queue_size = ingest_queue_size
+        self.last_ingestion: Optional[IngestionReport] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
         
         logger.info("Initialized RAGPipeline")
     
-    def process_documents(self, doc_path: str):
-        """Process and index documents."""
-        # TODO: Implement
-        logger.warning("RAGPipeline.process_documents not yet implemented")
+    @property
+    def manifest_path(self) -> str:
+        """Location of the ingestion manifest, next to the vector store."""
+        return os.path.join(self.vector_store.persist_dir, MANIFEST_FILENAME)
+    
+    def process_documents(self, doc_path: str, force: bool = False) -> Dict[str, int]:
+        """
+        Incrementally index a directory of PDFs (or a single PDF).
+        
+        Unchanged files are skipped, modified files have their old chunks
+        replaced and files that disappeared from a directory are purged.
+        
+        Args:
+            doc_path: Directory containing PDFs, or a single PDF file
+            force: Re-index every file even if unchanged
+        
+        Returns:
+            Counts of added, modified, unchanged, deleted and failed files,
+            plus the number of chunks indexed and how many of them were
+            duplicates stored only as aliases. Per-stage metrics are kept
+            in ``last_ingestion``.
+        """
+        if os.path.isdir(doc_path):
+            pdf_paths = sorted(
+                os.path.join(doc_path, f) for f in os.listdir(doc_path) if f.endswith('.pdf')
+            )
+        elif os.path.isfile(doc_path):
+            pdf_paths = [doc_path]
+        else:
+            raise ValueError(f"Path not found: {doc_path}")
+        
+        manifest = IngestionManifest(self.manifest_path)
+        # Only files of this directory can have disappeared: other directories
+        # indexed into the same store are left alone, and a single file says
+        # nothing about the others
+        plan = manifest.plan(pdf_paths, directory=doc_path)
+        if force:
+            plan.modified += plan.unchanged
+            plan.unchanged = []
+        if os.path.isfile(doc_path):
+            plan.deleted = []
+        
+        logger.info(
+            f"Ingestion plan: {len(plan.added)} new, {len(plan.modified)} modified, "
+            f"{len(plan.unchanged)} unchanged, {len(plan.deleted)} deleted"
+        )
+        summary = {
+            "added": len(plan.added),
+            "modified": len(plan.modified),
+            "unchanged": len(plan.unchanged),
+            "deleted": len(plan.deleted),
+            "failed": 0,
+            "chunks": 0,
+            "duplicates": 0,
+        }
+        
+        try:
+            # Purge chunks of files that changed or disappeared
+            stale_ids = [
+                chunk_id for path in plan.modified + plan.deleted
+                for chunk_id in manifest.chunk_ids(path)
+            ]
+            if stale_ids:
+                promoted = self._promoted_chunks(stale_ids)
+                self.vector_store.delete(stale_ids)
+                if self.lexical_index is not None:
+                    self.lexical_index.delete(stale_ids)
+                if promoted:
+                    self._index_chunks(promoted)
+            for path in plan.modified + plan.deleted:
+                manifest.remove(path)
+            
+            ingestion = IngestionPipeline(
+                self.document_processor, self.embedding_generator, self.vector_store,
+                lexical_index=self.lexical_index,
+                deduplicator=self.deduplicator,
+                batch_size=self.ingest_batch_size,
+                queue_size=self.ingest_queue_size
+            )
+            report = ingestion.run(plan.added + plan.modified, on_indexed=manifest.record)
+            self.last_ingestion = report
+            summary["failed"] = report.failed
+            summary["chunks"] = report.chunks
+            summary["duplicates"] = report.duplicates
+        finally:
+            manifest.save()
+            self.vector_store.checkpoint()
+            if self.lexical_index is not None:
+                self.lexical_index.save()
+            if self.deduplicator is not None:
+                # Chunks of files that never finished indexing are forgotten,
+                # so the next run stores them instead of aliasing them
+                self.deduplicator.rollback()
+                self.deduplicator.save()
+            self._flush_embedding_cache()
+            if self.query_cache is not None and (plan.added or plan.modified or plan.deleted):
+                self.query_cache.invalidate()
+        
+        logger.info(
+            f"Indexed {summary['chunks']} chunks from "
+            f"{summary['added'] + summary['modified'] - summary['failed']} files "
+            f"({summary['unchanged']} skipped, {summary['deleted']} purged, "
+            f"{summary['failed']} failed)"
+        )
+        if self.deduplicator is not None:
+            stats = self.deduplicator.stats
+            logger.info(
+                f"Skipped {summary['duplicates']} duplicate chunks; "
+                f"{stats.duplicates}/{stats.chunks} chunks "
+                f"({stats.saved_fraction:.1%}, {stats.saved_chars} characters) "
+                f"deduplicated so far"
+            )
+        return summary
+    
+    def _index_chunks(self, chunks):
+        """Embed chunks and add them to the vector store and lexical index."""
+        embeddings = self.embedding_generator.generate_embeddings(
+            [chunk.text for chunk in chunks]
+        )
+        self.vector_store.add_documents(chunks, embeddings)
+        if self.lexical_index is not None:
+            self.lexical_index.add(
+                [chunk.chunk_id for chunk in chunks],
+                [chunk.text for chunk in chunks],
+                [chunk.metadata for chunk in chunks]
+            )
+    
+    def _promoted_chunks(self, stale_ids: List[str]) -> List[DocumentChunk]:
+        """
+        Forget stale chunks in the deduplicator.
+        
+        Returns:
+            Stored chunks re-keyed to the alias that takes over their
+            cluster, to be indexed once the stale chunks are deleted
+        """
+        if self.deduplicator is None:
+            return []
+        promotions = self.deduplicator.remove(stale_ids)
+        if not promotions:
+            return []
+        stored = {r["chunk_id"]: r for r in self.vector_store.get(list(promotions))}
+        return [
+            DocumentChunk(stored[chunk_id]["text"], dict(heir["metadata"]), heir["chunk_id"])
+            for chunk_id, heir in promotions.items() if chunk_id in stored
+        ]
+    
+    def reset(self):
+        """Clear the vector store and forget every indexed file."""
+        self.vector_store.reset()
+        if self.lexical_index is not None:
+            self.lexical_index.reset()
+        if self.deduplicator is not None:
+            self.deduplicator.reset()
+        if self.query_cache is not None:
+            self.query_cache.invalidate()
+        IngestionManifest(self.manifest_path).clear()
+        logger.info("Reset document index")
     
     def query(
         self,
         question: str,
-        conversation_history: Optional[List] = None
+        conversation_history: Optional[List] = None,
+        top_k: int = 5
     ) -> Dict:
         """
         Process a query through the complete RAG pipeline.
         
+        Args:
+            question: Question text
+            conversation_history: Previous turns, passed to the LLM
+            top_k: Number of chunks to retrieve
+        
         Returns:
-            Dictionary with answer, sources, and metadata
+            Dictionary with question, answer, sources and metadata (chunk,
+            passage and context token counts, the LLM's own metadata under
+            ``llm``, and ``cache``: "exact", "semantic" or "miss" when a
+            query cache is configured)
         """
-        # TODO: Implement
-        logger.warning("RAGPipeline.query not yet implemented")
+        query_embedding, cached = self._cached_answer(question, conversation_history, top_k)
+        if cached is not None:
+            return cached
+        
+        chunks, context = self._retrieve_context(question, top_k, query_embedding)
+        response = self.llm_interface.generate_answer(question, context, conversation_history)
+        result = self._result(question, chunks, context, response)
+        self._cache_answer(question, conversation_history, top_k, query_embedding, result)
+        return result
+    
+    def query_stream(
+        self,
+        question: str,
+        conversation_history: Optional[List] = None,
+        top_k: int = 5
+    ) -> Iterator[Dict]:
+        """
+        Process a query, streaming the answer as the LLM produces it.
+        
+        Args:
+            question: Question text
+            conversation_history: Previous turns, passed to the LLM
+            top_k: Number of chunks to retrieve
+        
+        Yields:
+            {"type": "token", "text": ...} events as text arrives (a cached
+            answer arrives as one token), then one {"type": "answer", ...}
+            event shaped like the query() result, whose metadata also holds
+            ``time_to_first_token``: seconds from the call to the first
+            token, retrieval included
+        """
+        start = time.perf_counter()
+        query_embedding, cached = self._cached_answer(question, conversation_history, top_k)
+        if cached is not None:
+            cached["metadata"]["time_to_first_token"] = time.perf_counter() - start
+            yield {"type": "token", "text": cached["answer"]}
+            yield {"type": "answer", **cached}
+            return
+        
+        chunks, context = self._retrieve_context(question, top_k, query_embedding)
+        first_token_at = None
+        response = None
+        for event in self.llm_interface.generate_answer_stream(
+            question, context, conversation_history
+        ):
+            if event["type"] == "token":
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                yield event
+            elif event["type"] == "answer":
+                response = event
+        
+        result = self._result(question, chunks, context, response)
+        self._cache_answer(question, conversation_history, top_k, query_embedding, result)
+        result["metadata"]["time_to_first_token"] = \
+            None if first_token_at is None else first_token_at - start
+        yield {"type": "answer", **result}
+    
+    def query_batch(
+        self,
+        questions: Iterable[Union[str, Dict]],
+        top_k: int = 5,
+        max_concurrency: int = 8,
+        retrieval_batch_size: int = 256
+    ) -> Iterator[Dict]:
+        """
+        Answer many questions, yielding each result as soon as it is done.
+        
+        Questions are read ``retrieval_batch_size`` at a time; each group
+        is embedded in one pass and searched with one batched vector store
+        call, then its LLM calls join a pool of ``max_concurrency``
+        workers. The next group is retrieved while earlier answers are
+        still being generated. A failed question yields an error result
+        instead of stopping the batch.
+        
+        Args:
+            questions: Question strings, or dicts with ``question`` and an
+                optional ``id`` (default: position in the input)
+            top_k: Number of chunks to retrieve per question
+            max_concurrency: LLM calls in flight at once
+            retrieval_batch_size: Questions embedded and searched together
+        
+        Yields:
+            query() result dicts with the question's ``id`` added, in
+            completion order; failures as {"id", "question", "error"}
+        """
+        items = (
+            {"id": i, "question": q} if isinstance(q, str) else {"id": q.get("id", i), **q}
+            for i, q in enumerate(questions)
+        )
+        pending: set = set()
+        pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="rag-batch")
+        try:
+            while True:
+                group = list(itertools.islice(items, retrieval_batch_size))
+                if not group:
+                    break
+                for item, ready in self._prepare_batch(group, top_k):
+                    if ready is not None:
+                        yield ready
+                    else:
+                        pending.add(pool.submit(self._answer_prepared, item, top_k))
+                # Keep at most a group's worth of answers queued behind the pool
+                while len(pending) > max_concurrency + retrieval_batch_size:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from (future.result() for future in done)
+                done = {future for future in pending if future.done()}
+                pending -= done
+                yield from (future.result() for future in done)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+        finally:
+            # A consumer that stops early should not wait for queued answers
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _prepare_batch(self, group: List[Dict],
+                       top_k: int) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+        """
+        Embed a group of questions and retrieve for those not in the cache.
+        
+        Yields (item, result) for cached answers and failures first, then
+        (item, None) for questions that need an answer, with their
+        embedding, chunks and context attached.
+        """
+        try:
+            embeddings = self.retriever.embedding_generator.generate_embeddings(
+                [item["question"] for item in group]
+            )
+        except Exception as e:
+            logger.error(f"Embedding failed for {len(group)} questions: {e}")
+            for item in group:
+                yield item, {"id": item["id"], "question": item["question"], "error": str(e)}
+            return
+        
+        misses = []
+        for item, embedding in zip(group, embeddings):
+            if self.query_cache is not None:
+                cached = self.query_cache.get(item["question"], embedding, context=top_k)
+                if cached is not None:
+                    yield item, {"id": item["id"], **cached, "question": item["question"]}
+                    continue
+            misses.append((item, embedding))
+        if not misses:
+            return
+        
+        try:
+            retrieved = self.retriever.retrieve_batch(
+                [item["question"] for item, _ in misses], top_k=top_k,
+                query_embeddings=np.array([embedding for _, embedding in misses])
+            )
+        except Exception as e:
+            logger.error(f"Retrieval failed for {len(misses)} questions: {e}")
+            for item, _ in misses:
+                yield item, {"id": item["id"], "question": item["question"], "error": str(e)}
+            return
+        
+        for (item, embedding), chunks in zip(misses, retrieved):
+            context = self.context_builder.build(chunks)
+            yield {**item, "embedding": embedding, "chunks": chunks, "context": context}, None
+    
+    def _answer_prepared(self, item: Dict, top_k: int) -> Dict:
+        try:
+            response = self.llm_interface.generate_answer(item["question"], item["context"])
+        except Exception as e:
+            logger.error(f"Answering question {item['id']} failed: {e}")
+            return {"id": item["id"], "question": item["question"], "error": str(e)}
+        result = self._result(item["question"], item["chunks"], item["context"], response)
+        self._cache_answer(item["question"], None, top_k, item["embedding"], result)
+        return {"id": item["id"], **result}
+    
+    async def aquery(
+        self,
+        question: str,
+        conversation_history: Optional[List] = None,
+        top_k: int = 5
+    ) -> Dict:
+        """
+        Async query(), returning the same result.
+        
+        Blocking work (query embedding, cache lookup, search, re-ranking,
+        context packing) runs in the pipeline's thread pool so the event
+        loop keeps serving other requests; the LLM must support
+        agenerate_answer().
+        
+        Args:
+            question: Question text
+            conversation_history: Previous turns, passed to the LLM
+            top_k: Number of chunks to retrieve
+        
+        Returns:
+            The query() result dict; metadata also has ``queue_wait``, the
+            seconds spent waiting for a concurrency slot
+        """
+        queued_at = time.perf_counter()
+        async with self._concurrency_limit():
+            queue_wait = time.perf_counter() - queued_at
+            query_embedding, cached = await self._run_blocking(
+                self._cached_answer, question, conversation_history, top_k
+            )
+            if cached is not None:
+                cached["metadata"]["queue_wait"] = queue_wait
+                return cached
+            
+            chunks, context = await self._run_blocking(
+                self._retrieve_context, question, top_k, query_embedding
+            )
+            response = await self.llm_interface.agenerate_answer(
+                question, context, conversation_history
+            )
+            result = self._result(question, chunks, context, response)
+            self._cache_answer(question, conversation_history, top_k, query_embedding, result)
+        result["metadata"]["queue_wait"] = queue_wait
+        return result
+    
+    def _concurrency_limit(self) -> asyncio.Semaphore:
+        """The semaphore bounding aquery(), one per event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _run_blocking(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.retrieval_workers,
+                                                thread_name_prefix="rag-retrieval")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    def close(self):
+        """Shut down the aquery() thread pool and close the embedding cache."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        close = getattr(self.embedding_generator, "close", None)
+        if close is not None:
+            close()
+    
+    def _flush_embedding_cache(self):
+        # Generators without a persistent cache need no flushing
+        flush = getattr(self.embedding_generator, "flush_cache", None)
+        if flush is not None:
+            flush()
+    
+    def _cached_answer(self, question: str, conversation_history: Optional[List],
+                       top_k: int) -> Tuple[Optional[np.ndarray], Optional[Dict]]:
+        """Query embedding (when caching) and the cached answer, if any."""
+        # Answers depend on the conversation, so only fresh questions are cached
+        if self.query_cache is None or conversation_history:
+            return None, None
+        query_embedding = self.retriever.embedding_generator.generate_embeddings([question])[0]
+        cached = self.query_cache.get(question, query_embedding, context=top_k)
+        if cached is not None:
+            cached["question"] = question
+        return query_embedding, cached
+    
+    def _cache_answer(self, question: str, conversation_history: Optional[List], top_k: int,
+                      query_embedding: Optional[np.ndarray], result: Dict):
+        if self.query_cache is None or conversation_history:
+            return
+        result["metadata"]["cache"] = "miss"
+        self.query_cache.put(question, query_embedding, result, context=top_k)
+    
+    def _retrieve_context(self, question: str, top_k: int,
+                          query_embedding: Optional[np.ndarray]) -> Tuple[List[Dict], List[Dict]]:
+        """Retrieved chunks and the packed context passages built from them."""
+        chunks = self.retriever.retrieve(question, top_k=top_k,
+                                         query_embedding=query_embedding)
+        return chunks, self.context_builder.build(chunks)
+    
+    def _result(self, question: str, chunks: List[Dict], context: List[Dict],
+                response: Dict) -> Dict:
+        sources = response.get("sources") or [
+            {
+                "source": passage["metadata"].get("source"),
+                "pages": passage["metadata"].get("pages", []),
+                "score": passage["score"],
+            }
+            for passage in context
+        ]
+        if self.deduplicator is not None:
+            # Sources are one per context passage, in order
+            for source, passage in zip(sources, context):
+                source["aliases"] = self._aliases(passage)
         return {
             "question": question,
-            "answer": "Not yet implemented",
-            "sources": [],
-            "metadata": {}
+            "answer": response["answer"],
+            "sources": sources,
+            "metadata": {
+                "retrieved_chunks": len(chunks),
+                "context_passages": len(context),
+                "context_tokens": sum(passage["tokens"] for passage in context),
+                "llm": response.get("metadata", {}),
+            }
         }
+    
+    def _aliases(self, passage: Dict) -> List[Dict]:
+        """Other documents and pages holding (near) copies of a passage."""
+        chunk_ids = passage["metadata"].get("chunk_ids") or [passage.get("chunk_id")]
+        aliases, seen = [], set()
+        for chunk_id in chunk_ids:
+            for metadata in self.deduplicator.aliases(chunk_id):
+                key = (metadata.get("source"), tuple(metadata.get("pages") or []))
+                if key not in seen:
+                    seen.add(key)
+                    aliases.append({"source": key[0], "pages": list(key[1])})
+        return aliases
 
 
 if __name__ == "__main__":
-    print("RAGPipeline module (placeholder) loaded successfully!")
+    print("RAGPipeline module loaded successfully!")
@@ -0,0 +1,194 @@
+"""
+Reranker Module
+
+Second-stage re-ranking of retrieved chunks with a cross-encoder.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores (query, chunk) pairs with a cross-encoder model.
+    
+    Features:
+    - Lazy model loading (the model is only loaded on first use)
+    - All uncached pairs scored together, in length-sorted batches of
+      ``batch_size`` (one forward pass for the default candidate budget)
+    - Pairs truncated to ``max_length`` tokens; chunk text is first cut
+      to ``max_length`` words so oversized chunks are not tokenized in full
+    - Latency cap: if scoring takes longer than ``timeout`` seconds the
+      first-stage order is returned (scoring still finishes in the
+      background and fills the cache)
+    - LRU cache of scores per (query, chunk_id, hash of the scored text),
+      so a chunk re-indexed with new text under the same ID is re-scored
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        device: str = "cpu",
+        candidates: int = 50,
+        batch_size: int = 64,
+        max_length: int = 256,
+        timeout: Optional[float] = None,
+        cache_size: int = 10_000,
+        model=None
+    ):
+        """
+        Initialize the reranker.
+        
+        Args:
+            model_name: Sentence-transformers cross-encoder name or path
+            device: Device to run the model on ("cpu" or "cuda")
+            candidates: First-stage results re-scored per query
+            batch_size: Pairs per forward pass
+            max_length: Token budget per (query, chunk) pair
+            timeout: Seconds to wait for scores before falling back to
+                first-stage order (None waits indefinitely)
+            cache_size: Maximum number of cached pair scores
+            model: Preloaded model exposing predict() (loaded from
+                model_name if None)
+        """
+        self.model_name = model_name
+        self.device = device
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._model = model
+        self._cache: "OrderedDict[Tuple[str, str, bytes], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self.timeouts = 0
+        logger.info(
+            f"Initialized CrossEncoderReranker with model: {model_name} "
+            f"(candidates={candidates}, max_length={max_length}, timeout={timeout})"
+        )
+    
+    @property
+    def model(self):
+        """The underlying cross-encoder model, loaded on first access."""
+        if self._model is None:
+            try:
+                from sentence_transformers import CrossEncoder
+            except ImportError as e:
+                raise ImportError(
+                    "sentence-transformers is required for CrossEncoderReranker. "
+                    "Install it with: pip install sentence-transformers"
+                ) from e
+            self._model = CrossEncoder(self.model_name, device=self.device,
+                                       max_length=self.max_length)
+            logger.info(f"Loaded cross-encoder {self.model_name} on {self.device}")
+        return self._model
+    
+    def rerank(self, query: str, results: List[Dict], top_k: int = 5) -> List[Dict]:
+        """
+        Re-order first-stage results by cross-encoder score.
+        
+        Args:
+            query: Question text
+            results: First-stage results (dicts with chunk_id, text, score),
+                best first
+            top_k: Number of results to return
+        
+        Returns:
+            The top_k results by cross-encoder score, with ``score`` set to
+            that score and the first-stage score kept as ``retrieval_score``;
+            or the first top_k results unchanged if the latency cap was hit
+        """
+        if not results or top_k <= 0:
+            return []
+        if self.timeout is None:
+            scores = self._score(query, results)
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1,
+                                                    thread_name_prefix="reranker")
+            future = self._executor.submit(self._score, query, results)
+            try:
+                scores = future.result(timeout=self.timeout)
+            except TimeoutError:
+                self.timeouts += 1
+                logger.warning(
+                    f"Re-ranking {len(results)} candidates exceeded {self.timeout}s; "
+                    f"using first-stage order"
+                )
+                return results[:top_k]
+        
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [
+            {**results[i], "score": float(scores[i]), "retrieval_score": results[i]["score"]}
+            for i in order
+        ]
+    
+    def _score(self, query: str, results: List[Dict]) -> np.ndarray:
+        """Cross-encoder scores of every result, serving cached pairs."""
+        scores = np.empty(len(results), dtype=np.float32)
+        passages = [self._truncate(result["text"]) for result in results]
+        keys = [
+            (query, result["chunk_id"],
+             hashlib.blake2b(passage.encode("utf-8"), digest_size=16).digest())
+            for result, passage in zip(results, passages)
+        ]
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[i] = self._cache[key]
+                else:
+                    missing.append(i)
+        if not missing:
+            return scores
+        
+        order = np.argsort([-len(passages[i]) for i in missing], kind="stable")
+        predicted = np.empty(len(missing), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            predicted[indices] = self.model.predict(
+                [(query, passages[missing[i]]) for i in indices],
+                batch_size=len(indices),
+                show_progress_bar=False
+            )
+        scores[missing] = predicted
+        
+        with self._lock:
+            for i, score in zip(missing, predicted.tolist()):
+                self._cache[keys[i]] = score
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores
+    
+    def _truncate(self, text: str) -> str:
+        """Cut text to max_length words; every word is at least one token."""
+        words = text.split(maxsplit=self.max_length)
+        if len(words) <= self.max_length:
+            return text
+        return " ".join(words[:self.max_length])
+    
+    def clear_cache(self):
+        """Forget every cached score."""
+        with self._lock:
+            self._cache.clear()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    reranker = CrossEncoderReranker()
+    ranked = reranker.rerank("What is RAG?", [
+        {"chunk_id": "a", "text": "Bananas are yellow.", "score": 0.9},
+        {"chunk_id": "b", "text": "RAG combines retrieval with generation.", "score": 0.8},
+    ], top_k=2)
+    print([r["chunk_id"] for r in ranked])
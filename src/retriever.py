@@ -5,33 +5,275 @@ Handles semantic search and context retrieval for RAG.
 """
 
 import logging
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+
+from .metadata_index import MetadataFilter
 
 logger = logging.getLogger(__name__)
 
+FUSION_METHODS = ("rrf", "weighted")
+
+Timestamp = Union[float, datetime]
+
+
+def _to_epoch(value: Optional[Timestamp]) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _min_max(scores: Dict[str, float]) -> Dict[str, float]:
+    if not scores:
+        return {}
+    low, high = min(scores.values()), max(scores.values())
+    if high == low:
+        return {chunk_id: 1.0 for chunk_id in scores}
+    return {chunk_id: (score - low) / (high - low) for chunk_id, score in scores.items()}
+
 
 class Retriever:
     """
     Retrieves relevant document chunks for a given query.
     
-    TODO (Day 3):
+    Features:
     - Query embedding generation
-    - Similarity search
-    - Re-ranking
-    - Context window management
+    - Similarity search, optionally restricted to sources, a page range or
+      an ingestion time window (resolved before scoring, not post-filtered)
+    - Hybrid search: with a lexical (BM25) index, vector and keyword
+      results are fused by reciprocal rank or by weighted normalized score,
+      so exact terms such as part numbers or clause references are found
+      even when their embeddings are not close to the query's
+    - Optional cross-encoder re-ranking of the first-stage candidates
+    - With a ChunkDeduplicator, filters also match a stored chunk through
+      the metadata of its duplicates (a passage shared by a.pdf and b.pdf
+      is stored once, under a.pdf, yet found with sources=["b.pdf"])
+    
+    Packing the results into the LLM's context window is done by
+    ContextBuilder.
     """
     
-    def __init__(self, vector_store, embedding_generator):
+    def __init__(
+        self,
+        vector_store,
+        embedding_generator,
+        lexical_index=None,
+        fusion: str = "rrf",
+        rrf_k: int = 60,
+        lexical_weight: float = 0.5,
+        fusion_candidates: int = 50,
+        reranker=None,
+        deduplicator=None
+    ):
+        """
+        Initialize the retriever.
+        
+        Args:
+            vector_store: VectorStore to search
+            embedding_generator: EmbeddingGenerator for query vectors
+            lexical_index: Optional BM25Index over the same chunks; enables
+                hybrid search
+            fusion: "rrf" (reciprocal-rank fusion) or "weighted"
+            rrf_k: RRF rank offset; larger values flatten the rank weights
+            lexical_weight: Share of the lexical score with weighted fusion
+            fusion_candidates: Results taken from each side before fusing
+            reranker: Optional CrossEncoderReranker re-scoring the top
+                ``reranker.candidates`` first-stage results
+            deduplicator: Optional ChunkDeduplicator of the indexed chunks,
+                consulted to resolve filters
+        """
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {fusion}")
         self.vector_store = vector_store
         self.embedding_generator = embedding_generator
-        logger.info("Initialized Retriever")
+        self.lexical_index = lexical_index
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.lexical_weight = lexical_weight
+        self.fusion_candidates = fusion_candidates
+        self.reranker = reranker
+        self.deduplicator = deduplicator
+        logger.info(
+            f"Initialized Retriever (hybrid={lexical_index is not None}, "
+            f"rerank={reranker is not None})"
+        )
+    
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        sources: Optional[Sequence[str]] = None,
+        pages: Optional[Union[int, Tuple[int, int]]] = None,
+        ingested_after: Optional[Timestamp] = None,
+        ingested_before: Optional[Timestamp] = None,
+        query_embedding=None
+    ) -> List[Dict]:
+        """
+        Retrieve the most relevant chunks for a query.
+        
+        Args:
+            query: Question text
+            top_k: Number of chunks to return
+            sources: Only search these documents (``source`` metadata, e.g.
+                "contract.pdf")
+            pages: A page number, or an inclusive (first, last) range the
+                chunk must overlap
+            ingested_after: Only chunks indexed at or after this time
+                (datetime or seconds since the epoch)
+            ingested_before: Only chunks indexed before this time
+            query_embedding: Precomputed embedding of the query (embedded
+                here if None)
+        
+        Returns:
+            List of dicts with chunk_id, text, metadata and score, best match
+            first (with hybrid search the score is the fused score, with
+            re-ranking the cross-encoder score)
+        """
+        where = self._resolve_filter(
+            self.build_filter(sources, pages, ingested_after, ingested_before)
+        )
+        if query_embedding is None:
+            query_embedding = self.embedding_generator.generate_embeddings([query])[0]
+        first_stage_k = top_k
+        if self.reranker is not None:
+            first_stage_k = max(top_k, self.reranker.candidates)
+        if self.lexical_index is None:
+            results = self.vector_store.query(query_embedding, first_stage_k, where=where)
+        else:
+            results = self._hybrid_search(query, query_embedding, first_stage_k, where)
+        if self.reranker is not None:
+            results = self.reranker.rerank(query, results, top_k)
+        logger.info(f"Retrieved {len(results)} chunks for query (filter={where})")
+        return results
+    
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        sources: Optional[Sequence[str]] = None,
+        pages: Optional[Union[int, Tuple[int, int]]] = None,
+        ingested_after: Optional[Timestamp] = None,
+        ingested_before: Optional[Timestamp] = None,
+        query_embeddings=None
+    ) -> List[List[Dict]]:
+        """
+        Retrieve for many queries at once.
+        
+        The queries are embedded in one pass and searched with one batched
+        vector store call; keyword search and re-ranking still run per
+        query. Filters apply to every query.
+        
+        Args:
+            queries: Question texts
+            top_k: Number of chunks per query
+            sources, pages, ingested_after, ingested_before: As in retrieve()
+            query_embeddings: Precomputed embeddings, one row per query
+        
+        Returns:
+            One retrieve() result list per query, in order
+        """
+        if not queries:
+            return []
+        where = self._resolve_filter(
+            self.build_filter(sources, pages, ingested_after, ingested_before)
+        )
+        if query_embeddings is None:
+            query_embeddings = self.embedding_generator.generate_embeddings(list(queries))
+        first_stage_k = top_k
+        if self.reranker is not None:
+            first_stage_k = max(top_k, self.reranker.candidates)
+        
+        if self.lexical_index is None:
+            batch = self.vector_store.query_batch(query_embeddings, first_stage_k, where=where)
+        else:
+            candidates = max(first_stage_k, self.fusion_candidates)
+            vector_batch = self.vector_store.query_batch(query_embeddings, candidates, where=where)
+            batch = [
+                self._hybrid_search(query, None, first_stage_k, where, vector_results)
+                for query, vector_results in zip(queries, vector_batch)
+            ]
+        if self.reranker is not None:
+            batch = [self.reranker.rerank(query, results, top_k)
+                     for query, results in zip(queries, batch)]
+        logger.info(f"Retrieved chunks for {len(queries)} queries (filter={where})")
+        return batch
+    
+    def _hybrid_search(self, query: str, query_embedding, top_k: int,
+                       where: Optional[MetadataFilter],
+                       vector_results: Optional[List[Dict]] = None) -> List[Dict]:
+        if top_k <= 0:
+            return []
+        candidates = max(top_k, self.fusion_candidates)
+        if vector_results is None:
+            vector_results = self.vector_store.query(query_embedding, candidates, where=where)
+        lexical_results = self.lexical_index.search(query, candidates, where=where)
+        
+        vector_scores = {r["chunk_id"]: r["score"] for r in vector_results}
+        lexical_scores = dict(lexical_results)
+        if self.fusion == "rrf":
+            fused = self._rrf([vector_scores, lexical_scores])
+        else:
+            fused = self._weighted(vector_scores, lexical_scores)
+        ranked = sorted(fused, key=fused.get, reverse=True)[:top_k]
+        
+        # Chunks found only by keyword still need their text and metadata
+        chunks = {r["chunk_id"]: r for r in vector_results}
+        missing = [chunk_id for chunk_id in ranked if chunk_id not in chunks]
+        chunks.update((r["chunk_id"], r) for r in self.vector_store.get(missing))
+        return [
+            {**chunks[chunk_id], "score": fused[chunk_id]}
+            for chunk_id in ranked
+            if chunk_id in chunks
+        ]
+    
+    def _rrf(self, rankings: List[Dict[str, float]]) -> Dict[str, float]:
+        """Reciprocal-rank fusion of result lists given best first."""
+        fused: Dict[str, float] = {}
+        for ranking in rankings:
+            for rank, chunk_id in enumerate(ranking, start=1):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (self.rrf_k + rank)
+        return fused
+    
+    def _weighted(self, vector_scores: Dict[str, float],
+                  lexical_scores: Dict[str, float]) -> Dict[str, float]:
+        """Weighted sum of min-max normalized scores (0 where a side missed)."""
+        vector_scores = _min_max(vector_scores)
+        lexical_scores = _min_max(lexical_scores)
+        return {
+            chunk_id: (1 - self.lexical_weight) * vector_scores.get(chunk_id, 0.0)
+            + self.lexical_weight * lexical_scores.get(chunk_id, 0.0)
+            for chunk_id in {**vector_scores, **lexical_scores}
+        }
+    
+    def _resolve_filter(self, where: Optional[MetadataFilter]) -> Optional[MetadataFilter]:
+        """Add the stored chunks whose duplicates match the filter."""
+        if where is None or self.deduplicator is None:
+            return where
+        where.include_ids = self.deduplicator.matching(where) or None
+        return where
     
-    def retrieve(self, query: str, top_k: int = 5) -> List[Dict]:
-        """Retrieve the most relevant chunks for a query."""
-        # TODO: Implement
-        logger.warning("Retriever.retrieve not yet implemented")
-        return []
+    @staticmethod
+    def build_filter(
+        sources: Optional[Sequence[str]] = None,
+        pages: Optional[Union[int, Tuple[int, int]]] = None,
+        ingested_after: Optional[Timestamp] = None,
+        ingested_before: Optional[Timestamp] = None
+    ) -> Optional[MetadataFilter]:
+        """Combine filter arguments into a MetadataFilter (None if unfiltered)."""
+        if sources is None and pages is None and ingested_after is None \
+                and ingested_before is None:
+            return None
+        if isinstance(sources, str):
+            sources = [sources]
+        if isinstance(pages, int):
+            pages = (pages, pages)
+        return MetadataFilter(
+            sources=sources,
+            page_range=pages,
+            ingested_after=_to_epoch(ingested_after),
+            ingested_before=_to_epoch(ingested_before)
+        )
 
 
 if __name__ == "__main__":
-    print("Retriever module (placeholder) loaded successfully!")
+    print("Retriever module loaded successfully!")
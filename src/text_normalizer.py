@@ -0,0 +1,86 @@
+"""
+Text Normalizer Module
+
+Precompiled, configurable text normalization used by DocumentProcessor.clean_text.
+"""
+
+import re
+from typing import Callable, List, Tuple
+
+# Whitespace runs that are not already a single space. Rewriting only these
+# is equivalent to collapsing every \s+ run, without touching each space.
+_WHITESPACE_RUN = re.compile(r'[^\S ]\s*| \s+')
+
+# Page numbers and headers/footers (common patterns)
+_PAGE_NUMBER = re.compile(r'Page \d+', re.IGNORECASE)
+
+# Special characters, keeping word characters, whitespace and punctuation
+_SPECIAL_CHARS = re.compile(r'[^\w\s.,!?;:()\-\'"]+')
+
+# Standalone numbers (often artifacts)
+_STANDALONE_NUMBER = re.compile(r'\b\d+\b')
+
+
+class TextNormalizer:
+    """
+    Single-pass-per-rule text normalizer with precompiled patterns.
+    
+    Rules run in a fixed order (whitespace, page numbers, special characters,
+    standalone numbers) because each one sees the output of the previous;
+    disabling a rule simply drops its step.
+    """
+    
+    def __init__(
+        self,
+        collapse_whitespace: bool = True,
+        strip_page_numbers: bool = True,
+        strip_special_chars: bool = True,
+        strip_standalone_numbers: bool = True
+    ):
+        """
+        Initialize the normalizer.
+        
+        Args:
+            collapse_whitespace: Collapse whitespace runs into a single space
+            strip_page_numbers: Remove "Page N" headers and footers
+            strip_special_chars: Remove characters other than word characters,
+                whitespace and common punctuation
+            strip_standalone_numbers: Remove numbers that are not part of a word
+        """
+        self.collapse_whitespace = collapse_whitespace
+        self.strip_page_numbers = strip_page_numbers
+        self.strip_special_chars = strip_special_chars
+        self.strip_standalone_numbers = strip_standalone_numbers
+        
+        steps: List[Tuple[Callable[..., str], str]] = []
+        if collapse_whitespace:
+            steps.append((_WHITESPACE_RUN.sub, ' '))
+        if strip_page_numbers:
+            steps.append((_PAGE_NUMBER.sub, ''))
+        if strip_special_chars:
+            steps.append((_SPECIAL_CHARS.sub, ''))
+        if strip_standalone_numbers:
+            steps.append((_STANDALONE_NUMBER.sub, ''))
+        self._steps = tuple(steps)
+    
+    def normalize(self, text: str) -> str:
+        """
+        Apply the enabled rules and strip surrounding whitespace.
+        
+        Args:
+            text: Raw text from PDF
+        
+        Returns:
+            Normalized text
+        """
+        for substitute, replacement in self._steps:
+            text = substitute(replacement, text)
+        return text.strip()
+    
+    def __repr__(self):
+        return (
+            f"TextNormalizer(collapse_whitespace={self.collapse_whitespace}, "
+            f"strip_page_numbers={self.strip_page_numbers}, "
+            f"strip_special_chars={self.strip_special_chars}, "
+            f"strip_standalone_numbers={self.strip_standalone_numbers})"
+        )
@@ -1,42 +1,417 @@
 """
 Vector Store Module
 
-Manages ChromaDB for storing and retrieving document embeddings.
+Manages storage and similarity search of document embeddings.
 """
 
 import logging
-from typing import List, Dict
+import os
+import time
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from .ivf_index import IVFIndex
+from .metadata_index import MetadataFilter
+from .numpy_index import NumpyVectorIndex
 
 logger = logging.getLogger(__name__)
 
+# ChromaDB rejects very large add/delete calls; stay well under its limit
+CHROMA_BATCH_SIZE = 5000
+
+
+def _to_chroma_metadata(metadata: Dict) -> Dict:
+    """
+    ChromaDB metadata values must be scalars, so lists become strings.
+    
+    The page span is also stored as first_page/last_page so page-range
+    filters can be expressed as a where clause.
+    """
+    stored = {
+        key: ",".join(str(v) for v in value) if isinstance(value, list) else value
+        for key, value in metadata.items()
+    }
+    if metadata.get("pages"):
+        stored["first_page"] = min(metadata["pages"])
+        stored["last_page"] = max(metadata["pages"])
+    return stored
+
+
+def _from_chroma_metadata(metadata: Dict) -> Dict:
+    metadata = dict(metadata or {})
+    metadata.pop("first_page", None)
+    metadata.pop("last_page", None)
+    pages = metadata.get("pages")
+    if isinstance(pages, str):
+        metadata["pages"] = [int(p) for p in pages.split(",") if p]
+    return metadata
+
+
+def _to_chroma_where(where: Optional[MetadataFilter]) -> Optional[Dict]:
+    """Translate a MetadataFilter into a ChromaDB where clause."""
+    if where is None:
+        return None
+    clauses = []
+    if where.sources is not None:
+        clauses.append({"source": {"$in": list(where.sources)}})
+    if where.page_range is not None:
+        clauses.append({"last_page": {"$gte": where.page_range[0]}})
+        clauses.append({"first_page": {"$lte": where.page_range[1]}})
+    if where.ingested_after is not None:
+        clauses.append({"ingested_at": {"$gte": where.ingested_after}})
+    if where.ingested_before is not None:
+        clauses.append({"ingested_at": {"$lt": where.ingested_before}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class ChromaBackend:
+    """
+    ChromaDB-backed storage for VectorStore.
+    
+    Features:
+    - Persistent collection created on first use
+    - Idempotent adds (upsert by chunk_id)
+    - Deletion by chunk_id for incremental re-indexing
+    """
+    
+    def __init__(
+        self,
+        persist_dir: str,
+        collection_name: str = "documents",
+        distance_metric: str = "cosine"
+    ):
+        self.persist_dir = persist_dir
+        self.collection_name = collection_name
+        self.distance_metric = distance_metric
+        self._client = None
+        self._collection = None
+    
+    @property
+    def collection(self):
+        """The ChromaDB collection, created on first access."""
+        if self._collection is None:
+            try:
+                import chromadb
+            except ImportError as e:
+                raise ImportError(
+                    "chromadb is required for the chromadb vector store provider. "
+                    "Install it with: pip install chromadb"
+                ) from e
+            if self._client is None:
+                self._client = chromadb.PersistentClient(path=self.persist_dir)
+            self._collection = self._client.get_or_create_collection(
+                name=self.collection_name,
+                metadata={"hnsw:space": self.distance_metric}
+            )
+        return self._collection
+    
+    def add(self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict], embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        for start in range(0, len(chunk_ids), CHROMA_BATCH_SIZE):
+            end = start + CHROMA_BATCH_SIZE
+            self.collection.upsert(
+                ids=list(chunk_ids[start:end]),
+                embeddings=embeddings[start:end].tolist(),
+                documents=list(texts[start:end]),
+                metadatas=[_to_chroma_metadata(m) for m in metadatas[start:end]]
+            )
+    
+    def delete(self, chunk_ids: List[str]):
+        for start in range(0, len(chunk_ids), CHROMA_BATCH_SIZE):
+            self.collection.delete(ids=list(chunk_ids[start:start + CHROMA_BATCH_SIZE]))
+    
+    def search(self, query_embeddings, top_k: int = 5,
+               where: Optional[MetadataFilter] = None) -> List[List[Dict]]:
+        queries = np.array(query_embeddings, dtype=np.float32, ndmin=2)
+        result = self.collection.query(
+            query_embeddings=queries.tolist(),
+            n_results=top_k,
+            where=_to_chroma_where(where),
+            include=["documents", "metadatas", "distances"]
+        )
+        batch = [
+            [
+                {
+                    "chunk_id": chunk_id,
+                    "text": text,
+                    "metadata": _from_chroma_metadata(metadata),
+                    "score": self._distance_to_score(distance),
+                }
+                for chunk_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                result["ids"], result["documents"],
+                result["metadatas"], result["distances"]
+            )
+        ]
+        if where is not None and where.include_ids:
+            batch = self._merge_included(queries, top_k, list(where.include_ids), batch)
+        return batch
+    
+    def _merge_included(self, queries: np.ndarray, top_k: int, chunk_ids: List[str],
+                        batch: List[List[Dict]]) -> List[List[Dict]]:
+        """
+        Score the filter's included chunks (which a where clause cannot
+        name) directly and merge them into each query's results.
+        """
+        found = self.collection.get(ids=chunk_ids,
+                                    include=["embeddings", "documents", "metadatas"])
+        if not len(found["ids"]):
+            return batch
+        vectors = np.asarray(found["embeddings"], dtype=np.float32)
+        if self.distance_metric == "l2":
+            scores = -((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2)
+        else:
+            if self.distance_metric == "cosine":
+                queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True),
+                                               1e-12)
+                vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True),
+                                               1e-12)
+            scores = queries @ vectors.T
+        merged = []
+        for results, row in zip(batch, scores):
+            seen = {r["chunk_id"] for r in results}
+            results = results + [
+                {
+                    "chunk_id": chunk_id,
+                    "text": text,
+                    "metadata": _from_chroma_metadata(metadata),
+                    "score": float(score),
+                }
+                for chunk_id, text, metadata, score in zip(
+                    found["ids"], found["documents"], found["metadatas"], row
+                )
+                if chunk_id not in seen
+            ]
+            merged.append(sorted(results, key=lambda r: r["score"], reverse=True)[:top_k])
+        return merged
+    
+    def get(self, chunk_ids: List[str]) -> List[Dict]:
+        result = self.collection.get(ids=list(chunk_ids), include=["documents", "metadatas"])
+        found = {
+            chunk_id: {"chunk_id": chunk_id, "text": text,
+                       "metadata": _from_chroma_metadata(metadata)}
+            for chunk_id, text, metadata in zip(
+                result["ids"], result["documents"], result["metadatas"]
+            )
+        }
+        return [found[chunk_id] for chunk_id in chunk_ids if chunk_id in found]
+    
+    def filter_ids(self, where: MetadataFilter) -> List[str]:
+        chunk_ids = self.collection.get(where=_to_chroma_where(where), include=[])["ids"]
+        if where.include_ids:
+            included = self.collection.get(ids=list(where.include_ids), include=[])["ids"]
+            chunk_ids = list(dict.fromkeys(chunk_ids + included))
+        return chunk_ids
+    
+    def _distance_to_score(self, distance: float) -> float:
+        if self.distance_metric == "l2":
+            return -float(distance)
+        # ChromaDB reports cosine and ip as 1 - similarity
+        return 1.0 - float(distance)
+    
+    def checkpoint(self):
+        """Nothing to do: ChromaDB persists every write."""
+    
+    def reset(self):
+        collection = self.collection
+        self._client.delete_collection(collection.name)
+        self._collection = None
+    
+    def __len__(self):
+        return self.collection.count()
+
 
 class VectorStore:
     """
-    Manages vector database operations using ChromaDB.
+    Manages vector database operations over a pluggable backend.
     
-    TODO (Day 2):
-    - Initialize ChromaDB client
-    - Create/load collections
-    - Add documents with embeddings
-    - Query similar documents
+    Providers:
+    - "chromadb": ChromaDB persistent collection
+    - "numpy": in-process exact search over a memory-mapped matrix
+      (see NumpyVectorIndex), fastest for collections up to a few
+      million chunks; ``index_options`` can enable int8 or PQ compression
+    - "ivf": approximate search over the same storage with an inverted
+      file index (see IVFIndex), for larger collections; tuned with
+      ``index_options`` such as nlist and nprobe
+    
+    Every provider returns results as dicts with chunk_id, text, metadata
+    and score (higher is more similar), best match first.
     """
     
-    def __init__(self, persist_dir: str = "./data/chroma_db"):
+    def __init__(
+        self,
+        persist_dir: str = "./data/chroma_db",
+        collection_name: str = "documents",
+        distance_metric: str = "cosine",
+        provider: str = "chromadb",
+        index_options: Optional[Dict] = None
+    ):
+        """
+        Initialize the vector store.
+        
+        Args:
+            persist_dir: Directory where the index is persisted
+            collection_name: Name of the collection holding the chunks
+            distance_metric: "cosine", "ip" (inner product) or "l2" (chromadb only)
+            provider: Storage backend, "chromadb", "numpy" or "ivf"
+            index_options: Extra index arguments for the "numpy" and "ivf"
+                providers (compression, rerank_factor, nlist, nprobe, ...)
+        """
         self.persist_dir = persist_dir
-        logger.info(f"Initialized VectorStore with persist_dir: {persist_dir}")
-        # TODO: Initialize ChromaDB client
+        self.collection_name = collection_name
+        self.distance_metric = distance_metric
+        self.provider = provider
+        
+        if provider == "chromadb":
+            self.backend = ChromaBackend(persist_dir, collection_name, distance_metric)
+        elif provider == "numpy":
+            self.backend = NumpyVectorIndex(
+                os.path.join(persist_dir, collection_name), distance_metric,
+                **(index_options or {})
+            )
+        elif provider == "ivf":
+            self.backend = IVFIndex(
+                os.path.join(persist_dir, collection_name), distance_metric,
+                **(index_options or {})
+            )
+        else:
+            raise ValueError(f"Unknown vector store provider: {provider}")
+        
+        logger.info(
+            f"Initialized VectorStore with persist_dir: {persist_dir} "
+            f"(provider={provider})"
+        )
     
     def add_documents(self, chunks: List, embeddings: List):
-        """Add document chunks with their embeddings to the store."""
-        # TODO: Implement
-        logger.warning("VectorStore.add_documents not yet implemented")
+        """
+        Add document chunks with their embeddings to the store.
+        
+        Re-adding a chunk_id replaces the stored chunk. Each chunk's
+        metadata is stored with an ``ingested_at`` timestamp (seconds since
+        the epoch) unless it already has one.
+        
+        Args:
+            chunks: DocumentChunk objects
+            embeddings: One vector per chunk
+        """
+        if not chunks:
+            return
+        ingested_at = time.time()
+        self.backend.add(
+            [chunk.chunk_id for chunk in chunks],
+            [chunk.text for chunk in chunks],
+            [{"ingested_at": ingested_at, **chunk.metadata} for chunk in chunks],
+            embeddings
+        )
+        logger.info(f"Added {len(chunks)} chunks to collection {self.collection_name}")
+    
+    def delete(self, chunk_ids: List[str]):
+        """
+        Remove chunks from the store.
+        
+        Args:
+            chunk_ids: IDs of the chunks to delete (unknown IDs are ignored)
+        """
+        if not chunk_ids:
+            return
+        self.backend.delete(chunk_ids)
+        logger.info(f"Deleted {len(chunk_ids)} chunks from collection {self.collection_name}")
+    
+    def query(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        where: Optional[MetadataFilter] = None
+    ) -> List[Dict]:
+        """
+        Query the vector store for similar documents.
+        
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            where: Only return chunks matching this filter
+        
+        Returns:
+            List of dicts with chunk_id, text, metadata and score, best match first
+        """
+        return self.query_batch([query_embedding], top_k, where)[0]
+    
+    def query_batch(
+        self,
+        query_embeddings,
+        top_k: int = 5,
+        where: Optional[MetadataFilter] = None
+    ) -> List[List[Dict]]:
+        """
+        Query many vectors in one call.
+        
+        The numpy and ivf providers resolve the filter against their
+        metadata index first and score only the matching chunks, so a
+        selective filter still returns top_k results.
+        
+        Args:
+            query_embeddings: Array of shape (num_queries, dimension)
+            top_k: Number of results per query
+            where: Only return chunks matching this filter
+        
+        Returns:
+            One result list per query vector
+        """
+        return self.backend.search(query_embeddings, top_k, where=where)
+    
+    def get(self, chunk_ids: List[str]) -> List[Dict]:
+        """
+        Fetch stored chunks by ID.
+        
+        Args:
+            chunk_ids: IDs of the chunks to fetch
+        
+        Returns:
+            List of dicts with chunk_id, text and metadata, in the given
+            order; unknown IDs are skipped
+        """
+        if not chunk_ids:
+            return []
+        return self.backend.get(chunk_ids)
     
-    def query(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
-        """Query the vector store for similar documents."""
-        # TODO: Implement
-        logger.warning("VectorStore.query not yet implemented")
-        return []
+    def filter_ids(self, where: MetadataFilter) -> List[str]:
+        """
+        IDs of every chunk matching a filter.
+        
+        Args:
+            where: Filter to resolve
+        
+        Returns:
+            Matching chunk IDs
+        """
+        return self.backend.filter_ids(where)
+    
+    def count(self) -> int:
+        """Number of chunks in the store."""
+        return len(self.backend)
+    
+    def checkpoint(self):
+        """
+        Write the backend's fast-reload files after a round of changes.
+        
+        For the "numpy" and "ivf" providers this maps every chunk into a
+        corpus file, so a restarted process gets texts and metadata back
+        without parsing them (see NumpyVectorIndex).
+        """
+        self.backend.checkpoint()
+    
+    def reset(self):
+        """Delete every chunk."""
+        self.backend.reset()
+        logger.info(f"Reset collection {self.collection_name}")
 
 
 if __name__ == "__main__":
-    print("VectorStore module (placeholder) loaded successfully!")
+    logging.basicConfig(level=logging.INFO)
+    
+    store = VectorStore()
+    print(f"VectorStore ready at {store.persist_dir}")
@@ -0,0 +1,197 @@
+"""
+Unit tests for BM25Index module.
+"""
+
+import math
+
+import pytest
+
+from src import bm25_index
+from src.bm25_index import BM25Index, tokenize
+from src.metadata_index import MetadataFilter
+
+
+class TestTokenize:
+    """Test suite for the tokenizer."""
+    
+    def test_words_are_lowercased(self):
+        """Test plain word splitting."""
+        assert tokenize("Termination, NOTICE!") == ["termination", "notice"]
+    
+    def test_identifiers_keep_compound_and_parts(self):
+        """Test that part numbers and clause references also yield their parts."""
+        assert tokenize("PN-4471-B per 7.3") == [
+            "pn-4471-b", "pn", "4471", "b", "per", "7.3", "7", "3"
+        ]
+
+
+class TestBM25Index:
+    """Test suite for BM25Index."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.ids = ["a", "b", "c", "d"]
+        self.texts = [
+            "termination notice of thirty days",
+            "payment terms and invoices",
+            "the supplier ships part PN-4471-B",
+            "notice notice notice about payment",
+        ]
+    
+    def test_ranking(self, tmp_path):
+        """Test that matching chunks come back best first."""
+        index = BM25Index(str(tmp_path))
+        index.add(self.ids, self.texts)
+        
+        results = index.search("termination notice", top_k=3)
+        
+        assert [chunk_id for chunk_id, _ in results] == ["a", "d"]
+        assert results[0][1] > results[1][1] > 0
+    
+    def test_score_matches_formula(self, tmp_path):
+        """Test a single-term score against the Okapi BM25 formula."""
+        index = BM25Index(str(tmp_path), k1=1.2, b=0.75)
+        index.add(self.ids, self.texts)
+        lengths = [len(tokenize(t)) for t in self.texts]
+        avg_length = sum(lengths) / len(lengths)
+        
+        score = dict(index.search("invoices"))["b"]
+        
+        idf = math.log(1 + (4 - 1 + 0.5) / (1 + 0.5))
+        norm = 1.2 * (1 - 0.75 + 0.75 * lengths[1] / avg_length)
+        assert score == pytest.approx(idf * 2.2 / (1 + norm), rel=1e-5)
+    
+    def test_identifier_lookup(self, tmp_path):
+        """Test exact and partial part-number queries."""
+        index = BM25Index(str(tmp_path))
+        index.add(self.ids, self.texts)
+        
+        assert index.search("PN-4471-B")[0][0] == "c"
+        assert index.search("4471")[0][0] == "c"
+        assert index.search("unknown words") == []
+    
+    def test_restricted_to_chunk_ids(self, tmp_path):
+        """Test that a candidate set limits the results."""
+        index = BM25Index(str(tmp_path))
+        index.add(self.ids, self.texts)
+        
+        results = index.search("notice payment", chunk_ids={"b", "c"})
+        
+        assert [chunk_id for chunk_id, _ in results] == ["b"]
+    
+    def test_restricted_by_metadata_filter(self, tmp_path):
+        """Test that a metadata filter limits the results, plus its include_ids."""
+        index = BM25Index(str(tmp_path))
+        index.add(self.ids, self.texts, [
+            {"source": "x.pdf", "pages": [1]}, {"source": "y.pdf", "pages": [2]},
+            {"source": "x.pdf", "pages": [3]}, {"source": "y.pdf", "pages": [4]},
+        ])
+        
+        by_source = index.search("notice payment", where=MetadataFilter(sources=["y.pdf"]))
+        by_page = index.search("notice payment", where=MetadataFilter(page_range=(1, 2)))
+        included = index.search("notice", where=MetadataFilter(sources=["x.pdf"],
+                                                                include_ids=["d"]))
+        
+        assert [c for c, _ in by_source] == ["d", "b"]
+        assert {c for c, _ in by_page} == {"a", "b"}
+        assert [c for c, _ in included] == ["d", "a"]
+    
+    def test_incremental_add_delete_and_replace(self, tmp_path):
+        """Test deletes, re-adds and segment merging."""
+        index = BM25Index(str(tmp_path))
+        for chunk_id, text in zip(self.ids, self.texts):
+            index.add([chunk_id], [text])
+        
+        index.delete(["a", "missing"])
+        index.add(["d"], ["invoices only"])
+        
+        assert len(index) == 3
+        assert index.search("termination") == []
+        assert [c for c, _ in index.search("notice")] == []
+        assert {c for c, _ in index.search("invoices")} == {"b", "d"}
+    
+    def test_segments_merged(self, tmp_path, monkeypatch):
+        """Test that many small adds are merged into a few segments."""
+        monkeypatch.setattr(bm25_index, "MERGE_FACTOR", 2)
+        index = BM25Index(str(tmp_path))
+        for i in range(64):
+            index.add([f"x{i}"], [f"filler text number{i}"])
+        for chunk_id, text in zip(self.ids, self.texts):
+            index.add([chunk_id], [text])
+        
+        assert len(index._segments) <= 8
+        assert [c for c, _ in index.search("notice")] == ["d", "a"]
+    
+    def test_large_segment_not_rewritten(self, tmp_path, monkeypatch):
+        """Test that small adds are merged with each other, not with a large segment."""
+        monkeypatch.setattr(bm25_index, "MERGE_FACTOR", 4)
+        index = BM25Index(str(tmp_path))
+        index.add([f"x{i}" for i in range(200)], [f"bulk text word{i}" for i in range(200)])
+        bulk = index._segments[0]
+        
+        for i in range(20):
+            index.add([f"y{i}"], [f"small text item{i}"])
+        
+        assert index._segments[0] is bulk
+        assert len(index._segments) < 8
+        assert {c for c, _ in index.search("item3")} == {"y3"}
+    
+    def test_persistence(self, tmp_path):
+        """Test that a saved index reloads with the same results."""
+        index = BM25Index(str(tmp_path))
+        index.add(self.ids, self.texts)
+        index.delete(["b"])
+        expected = index.search("payment notice")
+        index.save()
+        
+        reloaded = BM25Index(str(tmp_path))
+        
+        assert len(reloaded) == 3 and "b" not in reloaded
+        assert reloaded.search("payment notice") == pytest.approx(expected)
+    
+    def test_save_drops_deleted_docs(self, tmp_path):
+        """Test that saving compacts tombstoned docs and keeps their metadata aligned."""
+        index = BM25Index(str(tmp_path))
+        index.add(self.ids, self.texts, [{"source": f"{c}.pdf"} for c in self.ids])
+        index.delete(["a"])
+        index.add(["b"], ["payment terms and invoices"], [{"source": "b.pdf"}])
+        expected = index.search("payment notice")
+        
+        index.save()
+        reloaded = BM25Index(str(tmp_path))
+        
+        for compacted in (index, reloaded):
+            assert compacted._chunk_ids == ["c", "d", "b"]
+            assert len(compacted._lengths) == 3 and not compacted._deleted.any()
+            assert compacted.search("payment notice") == pytest.approx(expected)
+            assert compacted.search("notice", where=MetadataFilter(sources=["d.pdf"]))[0][0] \
+                == "d"
+    
+    def test_doc_arrays_grow_geometrically(self, tmp_path):
+        """Test that one-chunk adds reallocate the per-doc arrays only log2(n) times."""
+        index = BM25Index(str(tmp_path))
+        buffer, reallocations = index._deleted_buffer, 0
+        
+        for i in range(1000):
+            index.add([f"x{i}"], [f"filler text number{i}"])
+            if index._deleted_buffer is not buffer:
+                buffer, reallocations = index._deleted_buffer, reallocations + 1
+        
+        assert reallocations <= 11
+        assert len(index._lengths) == len(index._deleted) == 1000
+        assert index.search("number999")[0][0] == "x999"
+    
+    def test_reset(self, tmp_path):
+        """Test that reset empties the index and removes the file."""
+        index = BM25Index(str(tmp_path))
+        index.add(self.ids, self.texts)
+        index.save()
+        
+        index.reset()
+        
+        assert len(index) == 0
+        assert len(BM25Index(str(tmp_path))) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
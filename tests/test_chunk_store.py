@@ -0,0 +1,142 @@
+"""
+Unit tests for ChunkStore module.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from src.chunk_store import ChunkStore, ChunkStoreBuilder, ChunkView
+from src.document_processor import DocumentChunk, DocumentProcessor
+
+
+class TestChunkStore:
+    """Test suite for ChunkStore and ChunkView."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor(chunk_size=50, chunk_overlap=15,
+                                           max_chunks_per_doc=None)
+        self.page_texts = {
+            i: ("Sentence number %d on this page. " % i) * (i % 4)
+            for i in range(1, 30)
+        }
+        self.store = self.processor.create_chunk_store(self.page_texts, "test.pdf")
+    
+    def test_matches_create_chunks(self):
+        """Test identical texts and metadata to create_chunks."""
+        expected = self.processor.create_chunks(self.page_texts, "test.pdf")
+        
+        assert len(self.store) == len(expected)
+        assert self.store.to_chunks() == expected
+    
+    def test_matches_create_chunks_edge_cases(self):
+        """Test empty pages, whitespace-only chunks and the chunk limit."""
+        processor = DocumentProcessor(chunk_size=40, chunk_overlap=10, max_chunks_per_doc=3)
+        for page_texts in ({1: ""}, {1: "short"}, {1: "", 2: "", 3: "x y"},
+                           {1: "word " * 100, 2: "", 3: "tail text"}, {1: " " * 90}):
+            expected = processor.create_chunks(page_texts, "doc.pdf")
+            store = processor.create_chunk_store(page_texts, "doc.pdf")
+            assert store.to_chunks() == expected
+    
+    def test_overlap_not_duplicated(self):
+        """Test that chunk texts are spans of one buffer holding the text once."""
+        total = sum(len(text) for text in self.store.texts())
+        
+        assert len(self.store.buffer) < total
+        assert self.store.texts() == [view.text for view in self.store]
+    
+    def test_view_fields(self):
+        """Test the per-chunk view attributes."""
+        view = self.store[1]
+        
+        assert isinstance(view, ChunkView)
+        assert view.chunk_id == "test.pdf_chunk_1"
+        assert view.source == "test.pdf"
+        assert view.chunk_index == 1
+        assert (view.start_char, view.end_char) == (35, 85)
+        assert view.metadata == {
+            "source": "test.pdf", "pages": view.pages, "chunk_index": 1,
+            "start_char": 35, "end_char": 85,
+        }
+        assert not hasattr(view, "__dict__")
+    
+    def test_indexing(self):
+        """Test negative indices and out-of-range errors."""
+        assert self.store[-1].chunk_index == len(self.store) - 1
+        with pytest.raises(IndexError):
+            self.store[len(self.store)]
+    
+    def test_slice_is_zero_copy(self):
+        """Test that slices share the buffer and columns of the store."""
+        part = self.store[2:5]
+        
+        assert isinstance(part, ChunkStore)
+        assert len(part) == 3
+        assert part.buffer is self.store.buffer
+        assert np.shares_memory(part.text_start, self.store.text_start)
+        assert part.chunk_ids() == self.store.chunk_ids()[2:5]
+        assert part.to_chunks() == self.store.to_chunks()[2:5]
+    
+    def test_strided_slice_rejected(self):
+        """Test that non-contiguous slices raise."""
+        with pytest.raises(ValueError):
+            self.store[::2]
+    
+    def test_from_chunks_round_trip(self):
+        """Test building a store from DocumentChunk objects of several sources."""
+        chunks = [
+            DocumentChunk("alpha", {"source": "a.pdf", "pages": [1, 2], "chunk_index": 0,
+                                    "start_char": 0, "end_char": 5}, "a.pdf_chunk_0"),
+            DocumentChunk("beta", {"source": "b.pdf", "pages": [3], "chunk_index": 0,
+                                   "start_char": 0, "end_char": 4}, "b.pdf_chunk_0"),
+            DocumentChunk("gamma", {"source": "a.pdf", "pages": [], "chunk_index": 1,
+                                    "start_char": 5, "end_char": 10}, "a.pdf_chunk_1"),
+        ]
+        store = ChunkStore.from_chunks(chunks)
+        
+        assert store.sources == ["a.pdf", "b.pdf"]
+        assert store.to_chunks() == chunks
+    
+    def test_id_prefix_kept(self):
+        """Test that chunk IDs keyed apart from the source survive the round trip."""
+        chunks = [
+            DocumentChunk("alpha", {"source": "r.pdf", "pages": [1], "chunk_index": 0,
+                                    "start_char": 0, "end_char": 5}, "r.pdf@01_chunk_0"),
+            DocumentChunk("beta", {"source": "r.pdf", "pages": [1], "chunk_index": 0,
+                                   "start_char": 0, "end_char": 4}, "r.pdf@02_chunk_0"),
+        ]
+        
+        store = ChunkStore.from_chunks(chunks)
+        
+        assert store.chunk_ids() == ["r.pdf@01_chunk_0", "r.pdf@02_chunk_0"]
+        assert [view.source for view in store] == ["r.pdf", "r.pdf"]
+        assert store[1:].to_chunks() == chunks[1:]
+    
+    def test_empty(self):
+        """Test an empty store."""
+        store = ChunkStore.empty()
+        
+        assert len(store) == 0
+        assert not store
+        assert store.texts() == []
+        assert store.to_chunks() == []
+    
+    def test_pickle(self):
+        """Test that a store survives pickling, as between worker processes."""
+        restored = pickle.loads(pickle.dumps(self.store))
+        
+        assert restored.to_chunks() == self.store.to_chunks()
+    
+    def test_nbytes(self):
+        """Test the memory estimate covers the buffer and columns."""
+        builder = ChunkStoreBuilder()
+        builder.append_text("abcd", "a.pdf", 0, 0, 4, [1])
+        store = builder.build()
+        
+        assert store.nbytes == 4 + 2 * 8 + 4 + 4 + 2 * 8 + 2 * 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
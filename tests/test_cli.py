@@ -0,0 +1,150 @@
+"""
+Unit tests for CLI module.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from src import cli
+from src.context_builder import ContextBuilder
+from src.deduplication import ChunkDeduplicator
+from src.document_processor import DocumentChunk
+from src.ingestion_pipeline import IngestionReport
+from src.llm_interface import FakeProvider, LLMInterface
+from src.rag_pipeline import RAGPipeline
+
+
+class FakeEmbeddingGenerator:
+    """Embeds every text as the same vector."""
+    
+    def generate_embeddings(self, texts):
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+
+class FakeRetriever:
+    """Returns one fixed chunk."""
+    
+    embedding_generator = FakeEmbeddingGenerator()
+    
+    def retrieve(self, query, top_k=5, query_embedding=None):
+        return [{"chunk_id": "a_0", "text": "Notice is thirty days.",
+                 "metadata": {"source": "a.pdf", "pages": [2]}, "score": 0.9}]
+    
+    def retrieve_batch(self, queries, top_k=5, query_embeddings=None):
+        return [self.retrieve(query) for query in queries]
+
+
+class TestCli:
+    """Test suite for the command-line interface."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        llm = LLMInterface(provider=FakeProvider("Thirty days [1].", token_delay=0,
+                                                 first_token_delay=0))
+        self.pipeline = RAGPipeline(None, None, None, FakeRetriever(), llm,
+                                    context_builder=ContextBuilder(max_tokens=100))
+        self.runner = CliRunner()
+    
+    def invoke(self, monkeypatch, *args):
+        monkeypatch.setattr(cli, "load_config", lambda path: {})
+        monkeypatch.setattr(cli, "build_pipeline", lambda config: self.pipeline)
+        return self.runner.invoke(cli.main, list(args))
+    
+    def test_process_chunking_override(self, monkeypatch, tmp_path):
+        """Test that --chunking overrides the configured strategy for one run."""
+        configs = []
+        summary = {"chunks": 3, "added": 1, "modified": 0, "unchanged": 0, "deleted": 0,
+                   "failed": 0}
+        self.pipeline.process_documents = lambda path, force=False: summary
+        monkeypatch.setattr(cli, "load_config",
+                            lambda path: {"document_processing": {"chunk_size": 500}})
+        monkeypatch.setattr(cli, "build_pipeline",
+                            lambda config: configs.append(config) or self.pipeline)
+        
+        result = self.runner.invoke(cli.main, ["process", "--input", str(tmp_path),
+                                               "--chunking", "blocks"])
+        
+        assert result.exit_code == 0, result.output
+        assert "Indexed 3 chunks" in result.output
+        assert configs[0]["document_processing"] == {"chunk_size": 500, "chunking": "blocks"}
+    
+    def test_process_workers_and_batch_size(self, monkeypatch, tmp_path):
+        """Test the ingestion overrides and the per-stage metrics table."""
+        configs = []
+        summary = {"chunks": 3, "added": 1, "modified": 0, "unchanged": 0, "deleted": 0,
+                   "failed": 0}
+        self.pipeline.process_documents = lambda path, force=False: summary
+        self.pipeline.last_ingestion = IngestionReport(files=1, chunks=3, elapsed=0.5)
+        monkeypatch.setattr(cli, "load_config", lambda path: {})
+        monkeypatch.setattr(cli, "build_pipeline",
+                            lambda config: configs.append(config) or self.pipeline)
+        
+        result = self.runner.invoke(cli.main, ["process", "--input", str(tmp_path),
+                                               "--workers", "4", "--batch-size", "64"])
+        
+        assert result.exit_code == 0, result.output
+        assert configs[0]["document_processing"] == {"workers": 4, "batch_size": 64}
+        assert "Ingestion stages" in result.output
+        assert all(stage in result.output for stage in ("extract", "embed", "index"))
+    
+    def test_query_streams_answer_and_sources(self, monkeypatch):
+        """Test streamed output, the citation table and the timing line."""
+        result = self.invoke(monkeypatch, "query", "How long is notice?")
+        
+        assert result.exit_code == 0, result.output
+        assert "Thirty days [1]." in result.output
+        assert "a.pdf" in result.output
+        assert "first token" in result.output
+    
+    def test_query_without_streaming(self, monkeypatch):
+        """Test the --no-stream path."""
+        result = self.invoke(monkeypatch, "query", "--no-stream", "How long is notice?")
+        
+        assert result.exit_code == 0, result.output
+        assert "Thirty days [1]." in result.output
+        assert "first token" not in result.output
+    
+    def test_query_lists_duplicate_sources(self, monkeypatch, tmp_path):
+        """Test that documents holding a copy of a cited chunk are shown."""
+        deduplicator = ChunkDeduplicator(str(tmp_path))
+        deduplicator.filter([
+            DocumentChunk("Notice is thirty days.", {"source": "a.pdf", "pages": [2]}, "a_0"),
+            DocumentChunk("Notice is thirty days.", {"source": "b.pdf", "pages": [5]}, "b_0"),
+        ])
+        self.pipeline.deduplicator = deduplicator
+        
+        result = self.invoke(monkeypatch, "query", "--no-stream", "How long is notice?")
+        
+        assert result.exit_code == 0, result.output
+        assert "Also in" in result.output
+        assert "b.pdf p. 5" in result.output
+
+    
+    def test_batch_writes_and_resumes(self, monkeypatch, tmp_path):
+        """Test JSONL output and that a re-run only answers what is missing."""
+        questions = tmp_path / "questions.jsonl"
+        questions.write_text("\n".join(json.dumps({"id": f"q{i}", "question": f"Question {i}?"})
+                                       for i in range(5)) + "\n")
+        output = tmp_path / "questions.results.jsonl"
+        # An interrupted earlier run: q0 done, q1 failed, a truncated last line
+        output.write_text(json.dumps({"id": "q0", "answer": "done"}) + "\n"
+                          + json.dumps({"id": "q1", "error": "timeout"}) + "\n"
+                          + '{"id": "q2", "ans')
+        
+        result = self.invoke(monkeypatch, "batch", str(questions))
+        
+        assert result.exit_code == 0, result.output
+        assert "4 questions to answer (1 already done)" in result.output
+        rows = [json.loads(line) for line in output.read_text().splitlines()[3:]]
+        assert sorted(row["id"] for row in rows) == ["q1", "q2", "q3", "q4"]
+        assert all(row["answer"] == "Thirty days [1]." for row in rows)
+        
+        rerun = self.invoke(monkeypatch, "batch", str(questions))
+        assert "0 questions to answer (5 already done)" in rerun.output
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,104 @@
+"""
+Unit tests for Config module.
+"""
+
+import os
+
+import pytest
+import yaml
+
+from src.bm25_index import BM25Index
+from src.config import build_pipeline, load_config
+from src.deduplication import ChunkDeduplicator
+from src.llm_interface import QUERY_TEMPLATE, SYSTEM_PROMPT, FakeProvider
+from src.query_batcher import QueryEmbeddingBatcher
+from src.query_cache import QueryCache
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "config.yaml")
+PROMPTS_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "prompts.yaml")
+
+
+class TestConfig:
+    """Test suite for config loading and pipeline construction."""
+    
+    def test_repository_config_builds(self, tmp_path, monkeypatch):
+        """Test that the shipped config.yaml wires a pipeline."""
+        monkeypatch.chdir(tmp_path)
+        config = load_config(CONFIG_PATH)
+        
+        pipeline = build_pipeline(config)
+        
+        assert pipeline.vector_store.provider == config["vector_store"]["provider"]
+        assert pipeline.context_builder.max_tokens == config["retrieval"]["context_max_tokens"]
+        assert pipeline.retriever.reranker is None
+        assert pipeline.deduplicator is None
+        assert pipeline.max_concurrency == config["app"]["max_concurrent_queries"]
+        assert pipeline.llm_interface.provider.max_connections == \
+            config["models"]["llm"]["max_connections"]
+    
+    def test_optional_components(self, tmp_path):
+        """Test deduplication, hybrid search, query batching and cache, ivf and fake LLM."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump({
+            "models": {"llm": {"provider": "fake", "model": "fake-model",
+                               "max_connections": 8}},
+            "document_processing": {"deduplication": {"enabled": True, "threshold": 0.9}},
+            "vector_store": {"provider": "ivf", "persist_directory": str(tmp_path / "db"),
+                             "ivf": {"nprobe": 4}},
+            "retrieval": {"hybrid": {"enabled": True, "fusion": "weighted"},
+                          "query_batching": {"enabled": True, "max_wait_ms": 1}},
+            "app": {"query_cache": {"enabled": True, "max_entries": 10}},
+        }))
+        
+        pipeline = build_pipeline(load_config(str(config_path)))
+        
+        assert isinstance(pipeline.lexical_index, BM25Index)
+        assert isinstance(pipeline.deduplicator, ChunkDeduplicator)
+        assert pipeline.deduplicator.threshold == 0.9
+        assert pipeline.retriever.lexical_index is pipeline.lexical_index
+        assert pipeline.retriever.fusion == "weighted"
+        assert isinstance(pipeline.retriever.embedding_generator, QueryEmbeddingBatcher)
+        assert pipeline.retriever.embedding_generator.embedding_generator is \
+            pipeline.embedding_generator
+        assert isinstance(pipeline.query_cache, QueryCache)
+        assert pipeline.vector_store.backend.nprobe == 4
+        assert isinstance(pipeline.llm_interface.provider, FakeProvider)
+    
+    def test_prompts_loaded(self, tmp_path):
+        """Test that the shipped prompts.yaml templates reach the LLM messages."""
+        with open(PROMPTS_PATH, "r", encoding="utf-8") as f:
+            prompts = yaml.safe_load(f)
+        config = {
+            "models": {"llm": {"provider": "fake", "prompts_path": PROMPTS_PATH}},
+            "vector_store": {"provider": "numpy", "persist_directory": str(tmp_path / "db")},
+        }
+        
+        llm = build_pipeline(config).llm_interface
+        messages = llm._messages("Notice?", [
+            {"chunk_id": "a_0", "text": "Thirty days.",
+             "metadata": {"source": "a.pdf", "pages": [2]}},
+        ], None)
+        
+        assert llm.system_prompt == prompts["system_prompt"].strip()
+        assert messages[-1]["content"].startswith(
+            "Context from documents:\n[1] [Source: a.pdf, Page 2]\nThirty days.\n"
+        )
+        assert "Question: Notice?" in messages[-1]["content"]
+    
+    def test_missing_prompts_use_defaults(self, tmp_path):
+        """Test that a missing prompts file keeps the built-in prompts."""
+        config = {
+            "models": {"llm": {"provider": "fake",
+                               "prompts_path": str(tmp_path / "missing.yaml")}},
+            "vector_store": {"provider": "numpy", "persist_directory": str(tmp_path / "db")},
+        }
+        
+        llm = build_pipeline(config).llm_interface
+        
+        assert llm.system_prompt == SYSTEM_PROMPT
+        assert llm.query_template == QUERY_TEMPLATE
+        assert llm.citation_format is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,99 @@
+"""
+Unit tests for ContextBuilder module.
+"""
+
+import pytest
+
+from src.context_builder import ContextBuilder, TokenCounter
+from src.document_processor import DocumentProcessor
+
+
+class WordCounter(TokenCounter):
+    """Counts one token per word."""
+    
+    def count(self, text):
+        return len(text.split())
+
+
+def as_results(chunks, scores=None):
+    return [
+        {"chunk_id": c.chunk_id, "text": c.text, "metadata": c.metadata,
+         "score": scores[i] if scores else 1.0 - i / 100}
+        for i, c in enumerate(chunks)
+    ]
+
+
+class TestContextBuilder:
+    """Test suite for ContextBuilder."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor(chunk_size=60, chunk_overlap=20)
+        self.text = " ".join(f"word{i}" for i in range(80))
+        self.chunks = self.processor.create_chunks({1: self.text[:300], 2: self.text[300:]},
+                                                   "a.pdf")
+        self.builder = ContextBuilder(max_tokens=1000, token_counter=WordCounter())
+    
+    def test_overlapping_chunks_merge_to_original_text(self):
+        """Test that consecutive overlapping chunks reproduce the text once."""
+        passages = self.builder.build(as_results(self.chunks))
+        
+        assert len(passages) == 1
+        assert passages[0]["text"] == self.processor.clean_text(self.text[:300]) + " " + \
+            self.processor.clean_text(self.text[300:])
+        assert passages[0]["metadata"]["chunk_ids"] == [c.chunk_id for c in self.chunks]
+        assert passages[0]["metadata"]["pages"] == [1, 2]
+        assert passages[0]["score"] == 1.0
+    
+    def test_non_adjacent_chunks_stay_separate(self):
+        """Test that gaps and different sources are not merged."""
+        other = self.processor.create_chunks({1: self.text}, "b.pdf")
+        results = as_results([self.chunks[0], self.chunks[2], other[0], other[1]],
+                             scores=[0.9, 0.5, 0.8, 0.7])
+        
+        passages = self.builder.build(results)
+        
+        assert [p["metadata"]["chunk_ids"] for p in passages] == [
+            [self.chunks[0].chunk_id],
+            [other[0].chunk_id, other[1].chunk_id],
+            [self.chunks[2].chunk_id],
+        ]
+    
+    def test_greedy_packing_skips_passages_over_budget(self):
+        """Test that the budget is respected and smaller passages still fit."""
+        results = [
+            {"chunk_id": "big", "text": "x " * 8, "metadata": {}, "score": 0.9},
+            {"chunk_id": "huge", "text": "y " * 50, "metadata": {}, "score": 0.8},
+            {"chunk_id": "small", "text": "z " * 2, "metadata": {}, "score": 0.7},
+        ]
+        
+        passages = self.builder.build(results, max_tokens=10)
+        
+        assert [p["chunk_id"] for p in passages] == ["big", "small"]
+        assert sum(p["tokens"] for p in passages) == 10
+    
+    def test_chunks_without_offsets_pass_through(self):
+        """Test chunks lacking start_char/end_char metadata."""
+        results = [{"chunk_id": "x", "text": "plain", "metadata": {"source": "a"}, "score": 1}]
+        
+        assert self.builder.build(results)[0]["text"] == "plain"
+    
+    def test_inputs_not_mutated(self):
+        """Test that merging leaves the retrieval results untouched."""
+        results = as_results(self.chunks[:2])
+        
+        self.builder.build(results)
+        
+        assert results[0]["text"] == self.chunks[0].text
+        assert "chunk_ids" not in results[0]["metadata"]
+    
+    def test_length_estimate_without_tiktoken(self):
+        """Test the character-based fallback count."""
+        counter = TokenCounter()
+        counter._loaded = True
+        
+        assert counter.count("abcdefghi") == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
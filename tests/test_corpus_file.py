@@ -0,0 +1,100 @@
+"""
+Unit tests for CorpusFile module.
+"""
+
+import pytest
+
+from src.corpus_file import CorpusFile, write_corpus_file
+
+
+class TestCorpusFile:
+    """Test suite for write_corpus_file and CorpusFile."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.ids = [f"doc{i % 3}.pdf_chunk_{i}" for i in range(50)]
+        self.texts = [f"Chunk {i} text, naïve café ✓" * (i % 4) for i in range(50)]
+        self.metadatas = [
+            {"source": f"doc{i % 3}.pdf", "pages": [i % 5 + 1, i % 5 + 2],
+             "chunk_index": i, "start_char": 10 * i, "end_char": 10 * i + 9,
+             "ingested_at": 1700000000.5 + i}
+            for i in range(50)
+        ]
+    
+    def write(self, tmp_path, **kwargs):
+        path = str(tmp_path / "rows.corpus")
+        write_corpus_file(path, self.ids, self.texts, self.metadatas, **kwargs)
+        return CorpusFile(path)
+    
+    def test_round_trip(self, tmp_path):
+        """Test that every row reads back as written."""
+        corpus = self.write(tmp_path, log_bytes=1234)
+        
+        assert len(corpus) == 50
+        assert corpus.log_bytes == 1234
+        assert [corpus.chunk_id(row) for row in range(50)] == self.ids
+        assert [corpus.text(row) for row in range(50)] == self.texts
+        assert [corpus.metadata(row) for row in range(50)] == self.metadatas
+    
+    def test_metadata_columns(self, tmp_path):
+        """Test the source, page span and ingestion time columns."""
+        corpus = self.write(tmp_path)
+        
+        assert corpus.sources == ["doc0.pdf", "doc1.pdf", "doc2.pdf"]
+        assert corpus.source_id[:4].tolist() == [0, 1, 2, 0]
+        assert corpus.page_first[7] == 3 and corpus.page_last[7] == 4
+        assert corpus.ingested_at[2] == 1700000002.5
+    
+    def test_row_of(self, tmp_path):
+        """Test ID lookup, including unknown IDs."""
+        corpus = self.write(tmp_path)
+        
+        assert all(corpus.row_of(chunk_id) == row for row, chunk_id in enumerate(self.ids))
+        assert corpus.row_of("missing") is None
+    
+    def test_duplicate_ids_resolve_to_last_row(self, tmp_path):
+        """Test that a repeated ID maps to its last row."""
+        self.ids[40] = self.ids[5]
+        corpus = self.write(tmp_path)
+        
+        assert corpus.row_of(self.ids[5]) == 40
+    
+    def test_other_metadata_kept(self, tmp_path):
+        """Test keys and values that do not fit the typed columns."""
+        self.metadatas[0] = {"section": "Intro", "pages": [], "chunk_index": True}
+        self.metadatas[1] = {"source": None, "nested": {"a": [1, 2]}}
+        self.metadatas[2] = {}
+        corpus = self.write(tmp_path)
+        
+        assert [corpus.metadata(row) for row in range(3)] == self.metadatas[:3]
+        assert corpus.source_id[1] == -1
+    
+    def test_empty(self, tmp_path):
+        """Test a file without rows."""
+        path = str(tmp_path / "rows.corpus")
+        write_corpus_file(path, [], [], [])
+        corpus = CorpusFile(path)
+        
+        assert len(corpus) == 0
+        assert corpus.row_of("anything") is None
+    
+    def test_rejects_other_files(self, tmp_path):
+        """Test that a file without the magic bytes is refused."""
+        path = tmp_path / "rows.corpus"
+        path.write_bytes(b"not a corpus file at all")
+        
+        with pytest.raises(ValueError):
+            CorpusFile(str(path))
+    
+    def test_rewrite_replaces(self, tmp_path):
+        """Test that writing again replaces the file and leaves no temporary."""
+        self.write(tmp_path)
+        self.ids, self.texts, self.metadatas = self.ids[:3], self.texts[:3], self.metadatas[:3]
+        corpus = self.write(tmp_path)
+        
+        assert len(corpus) == 3
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["rows.corpus"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,268 @@
+"""
+Unit tests for Deduplication module.
+"""
+
+import numpy as np
+import pytest
+
+from src.deduplication import ChunkDeduplicator, MinHasher, lsh_bands
+from src.document_processor import DocumentChunk
+from src.metadata_index import MetadataFilter
+
+WORDS = ("records retention audit policy employee data access review quarterly annual "
+         "storage backup encryption vendor contract clause section notice privacy "
+         "request officer department report incident response training").split()
+
+
+def make_text(seed, length=120):
+    """Deterministic pseudo-random text of length words."""
+    rng = np.random.default_rng(seed)
+    return " ".join(rng.choice(WORDS, length))
+
+
+def make_chunk(text, source, index=0, pages=(1,)):
+    """DocumentChunk with the processor's ID and metadata layout."""
+    return DocumentChunk(text, {"source": source, "pages": list(pages), "chunk_index": index},
+                         f"{source}_chunk_{index}")
+
+
+def edit(text, every):
+    """Replace every n-th word, as a light revision would."""
+    words = text.split()
+    return " ".join("revised" if i % every == 0 else w for i, w in enumerate(words))
+
+
+class TestMinHasher:
+    """Test suite for MinHash signatures."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.hasher = MinHasher(num_perm=256)
+    
+    def jaccard(self, a, b):
+        sa, sb = set(self.hasher.shingles(a.split())), set(self.hasher.shingles(b.split()))
+        return len(sa & sb) / len(sa | sb)
+    
+    def test_signature_estimates_jaccard(self):
+        """Test that signature agreement tracks the true shingle Jaccard similarity."""
+        text = make_text(0)
+        for every in (40, 15, 6):
+            other = edit(text, every)
+            estimate = np.mean(self.hasher.signature(text.split()) ==
+                               self.hasher.signature(other.split()))
+            assert abs(estimate - self.jaccard(text, other)) < 0.1
+    
+    def test_signatures_deterministic(self):
+        """Test that equal settings give comparable signatures across instances."""
+        words = make_text(1).split()
+        assert np.array_equal(MinHasher(num_perm=256).signature(words),
+                              self.hasher.signature(words))
+        assert not np.array_equal(MinHasher(num_perm=256, seed=2).signature(words),
+                                  self.hasher.signature(words))
+    
+    def test_short_text(self):
+        """Test that texts shorter than a shingle still get a signature."""
+        signature = self.hasher.signature(["two", "words"])
+        assert signature.shape == (256,) and signature.dtype == np.uint32
+
+
+class TestLSHBands:
+    """Test suite for the band/row split."""
+    
+    def test_bands_cover_signature(self):
+        """Test that the split uses the whole signature below the threshold."""
+        for threshold in (0.5, 0.8, 0.85, 0.95):
+            bands, rows = lsh_bands(128, threshold)
+            assert bands * rows == 128
+            assert (1 / bands) ** (1 / rows) <= threshold
+    
+    def test_higher_threshold_fewer_bands(self):
+        """Test that stricter thresholds use longer bands."""
+        assert lsh_bands(128, 0.95)[1] >= lsh_bands(128, 0.85)[1] >= lsh_bands(128, 0.5)[1]
+
+
+class TestChunkDeduplicator:
+    """Test suite for ChunkDeduplicator."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.texts = [make_text(seed) for seed in range(5)]
+    
+    def test_exact_duplicates(self, tmp_path):
+        """Test that copies differing only in case and spacing are aliases."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        text = self.texts[0]
+        chunks = [make_chunk(text, "a.pdf"), make_chunk("  " + text.upper(), "b.pdf")]
+        
+        unique, duplicates = dedup.filter(chunks)
+        
+        assert unique == chunks[:1]
+        assert duplicates == [(chunks[1], "a.pdf_chunk_0")]
+        assert dedup.stats.exact_duplicates == 1 and dedup.stats.near_duplicates == 0
+        assert dedup.aliases("a.pdf_chunk_0") == [chunks[1].metadata]
+        assert dedup.canonical("b.pdf_chunk_0") == "a.pdf_chunk_0"
+    
+    def test_near_duplicates(self, tmp_path):
+        """Test that light revisions match and distinct texts do not."""
+        dedup = ChunkDeduplicator(str(tmp_path), threshold=0.8)
+        revision = edit(self.texts[0], 60)
+        chunks = [make_chunk(text, f"{i}.pdf") for i, text in enumerate(self.texts)]
+        chunks.append(make_chunk(revision, "revised.pdf"))
+        
+        unique, duplicates = dedup.filter(chunks)
+        
+        assert unique == chunks[:5]
+        assert duplicates == [(chunks[5], "0.pdf_chunk_0")]
+        assert dedup.stats.near_duplicates == 1
+        assert dedup.stats.saved_chars == len(revision)
+        assert dedup.stats.saved_fraction == pytest.approx(1 / 6)
+    
+    def test_threshold_one_is_exact_only(self, tmp_path):
+        """Test that a threshold of 1.0 keeps every revision."""
+        dedup = ChunkDeduplicator(str(tmp_path), threshold=1.0)
+        chunks = [make_chunk(self.texts[0], "a.pdf"),
+                  make_chunk(edit(self.texts[0], 60), "b.pdf")]
+        
+        unique, _ = dedup.filter(chunks)
+        
+        assert unique == chunks
+    
+    def test_remove_alias(self, tmp_path):
+        """Test that removing a duplicate leaves its cluster alone."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        dedup.filter([make_chunk(self.texts[0], "a.pdf"), make_chunk(self.texts[0], "b.pdf")])
+        
+        assert dedup.remove(["b.pdf_chunk_0"]) == {}
+        assert dedup.aliases("a.pdf_chunk_0") == []
+        assert dedup.canonical("b.pdf_chunk_0") is None
+    
+    def test_remove_canonical_promotes_alias(self, tmp_path):
+        """Test that the first alias takes over a removed canonical chunk."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        chunks = [make_chunk(self.texts[0], source) for source in ("a.pdf", "b.pdf", "c.pdf")]
+        dedup.filter(chunks)
+        
+        promotions = dedup.remove(["a.pdf_chunk_0"])
+        
+        assert promotions == {"a.pdf_chunk_0": {"chunk_id": "b.pdf_chunk_0",
+                                                "metadata": chunks[1].metadata}}
+        assert dedup.aliases("b.pdf_chunk_0") == [chunks[2].metadata]
+        assert dedup.canonical("c.pdf_chunk_0") == "b.pdf_chunk_0"
+        _, duplicates = dedup.filter([make_chunk(self.texts[0], "d.pdf")])
+        assert duplicates[0][1] == "b.pdf_chunk_0"
+    
+    def test_remove_cluster(self, tmp_path):
+        """Test that a cluster removed entirely no longer matches."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        dedup.filter([make_chunk(self.texts[0], "a.pdf"), make_chunk(self.texts[0], "b.pdf")])
+        
+        assert dedup.remove(["a.pdf_chunk_0", "b.pdf_chunk_0"]) == {}
+        unique, _ = dedup.filter([make_chunk(self.texts[0], "c.pdf")])
+        
+        assert len(unique) == 1 and len(dedup) == 1
+    
+    def test_matching_committed_aliases(self, tmp_path):
+        """Test that filters resolve to the stored copies of matching aliases."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        chunks = [make_chunk(self.texts[0], "a.pdf"),
+                  make_chunk(self.texts[0], "b.pdf", pages=(3,)),
+                  make_chunk(self.texts[1], "c.pdf")]
+        dedup.filter(chunks)
+        
+        before_commit = dedup.matching(MetadataFilter(sources=["b.pdf"]))
+        dedup.commit([chunk.chunk_id for chunk in chunks])
+        
+        assert before_commit == []
+        assert dedup.matching(MetadataFilter(sources=["b.pdf"])) == ["a.pdf_chunk_0"]
+        assert dedup.matching(MetadataFilter(sources=["b.pdf"], page_range=(1, 2))) == []
+        assert dedup.matching(MetadataFilter(sources=["a.pdf", "c.pdf"])) == []
+        assert dedup.matching(MetadataFilter(ingested_after=0.0)) == ["a.pdf_chunk_0"]
+        dedup.remove(["b.pdf_chunk_0"])
+        assert dedup.matching(MetadataFilter(sources=["b.pdf"])) == []
+    
+    def test_save_and_reload(self, tmp_path):
+        """Test that clusters and aliases survive a reload."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        chunks = [make_chunk(text, f"{i}.pdf") for i, text in enumerate(self.texts)]
+        chunks.append(make_chunk(self.texts[1], "copy.pdf"))
+        dedup.filter(chunks)
+        dedup.commit([chunk.chunk_id for chunk in chunks])
+        dedup.remove(["4.pdf_chunk_0"])
+        dedup.save()
+        
+        reloaded = ChunkDeduplicator(str(tmp_path))
+        _, duplicates = reloaded.filter([make_chunk(edit(self.texts[2], 60), "new.pdf")])
+        
+        assert len(reloaded) == 4 and reloaded.alias_count == 2
+        assert [m["source"] for m in reloaded.aliases("1.pdf_chunk_0")] == ["copy.pdf"]
+        assert duplicates[0][1] == "2.pdf_chunk_0"
+    
+    def test_rollback_forgets_uncommitted(self, tmp_path):
+        """Test that chunks never committed are dropped and not saved."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        dedup.filter([make_chunk(self.texts[0], "a.pdf"), make_chunk(self.texts[1], "b.pdf")])
+        dedup.commit(["a.pdf_chunk_0"])
+        dedup.filter([make_chunk(self.texts[0], "c.pdf"), make_chunk(self.texts[1], "d.pdf")])
+        
+        assert dedup.rollback() == 3
+        dedup.save()
+        
+        assert len(dedup) == 1 and dedup.alias_count == 0
+        assert dedup.canonical("c.pdf_chunk_0") is None
+        unique, _ = dedup.filter([make_chunk(self.texts[1], "b.pdf")])
+        assert len(unique) == 1
+        assert len(ChunkDeduplicator(str(tmp_path))) == 1
+    
+    def test_chunk_never_aliases_itself(self, tmp_path):
+        """Test that a chunk filtered again under its own ID stays canonical."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        chunk = make_chunk(self.texts[0], "a.pdf")
+        dedup.filter([chunk, make_chunk(self.texts[0], "b.pdf")])
+        
+        unique, duplicates = dedup.filter([chunk, make_chunk(self.texts[0], "b.pdf")])
+        
+        assert unique == [chunk]
+        assert duplicates[0][1] == "a.pdf_chunk_0"
+        assert dedup.canonical("a.pdf_chunk_0") is None
+        assert dedup.alias_count == 1
+    
+    def test_changed_text_under_same_id(self, tmp_path):
+        """Test that a canonical chunk's new text is matched from then on."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        dedup.filter([make_chunk(self.texts[0], "a.pdf")])
+        
+        unique, _ = dedup.filter([make_chunk(self.texts[1], "a.pdf")])
+        _, duplicates = dedup.filter([make_chunk(self.texts[1], "b.pdf")])
+        
+        assert len(unique) == 1 and len(dedup) == 1
+        assert duplicates[0][1] == "a.pdf_chunk_0"
+    
+    def test_settings_mismatch(self, tmp_path):
+        """Test that an index built with other MinHash settings is refused."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        dedup.filter([make_chunk(self.texts[0], "a.pdf")])
+        dedup.commit(["a.pdf_chunk_0"])
+        dedup.save()
+        
+        with pytest.raises(ValueError):
+            ChunkDeduplicator(str(tmp_path), num_perm=64)
+    
+    def test_reset(self, tmp_path):
+        """Test that reset forgets chunks and removes the index file."""
+        dedup = ChunkDeduplicator(str(tmp_path))
+        dedup.filter([make_chunk(self.texts[0], "a.pdf"), make_chunk(self.texts[0], "b.pdf")])
+        dedup.save()
+        
+        dedup.reset()
+        
+        assert len(dedup) == 0 and dedup.alias_count == 0
+        assert len(ChunkDeduplicator(str(tmp_path))) == 0
+    
+    def test_invalid_threshold(self, tmp_path):
+        """Test error handling for an out-of-range threshold."""
+        with pytest.raises(ValueError):
+            ChunkDeduplicator(str(tmp_path), threshold=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -4,7 +4,43 @@ Unit tests for DocumentProcessor module.
 
 import pytest
 import os
-from src.document_processor import DocumentProcessor, DocumentChunk
+import signal
+import time
+
+import fitz
+
+from src.chunk_store import ChunkStore
+from src.document_processor import DocumentProcessor, DocumentChunk, document_key
+from src.text_normalizer import TextNormalizer
+
+
+def _write_pdf(path, pages):
+    """Write a small PDF with one text line per page."""
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+class SlowDocumentProcessor(DocumentProcessor):
+    """Processor whose per-file work never finishes in time."""
+    
+    def _process_file(self, pdf_path):
+        time.sleep(5)
+        return super()._process_file(pdf_path)
+
+
+class HungDocumentProcessor(DocumentProcessor):
+    """Processor that hangs on hung.pdf where the worker's alarm cannot reach it."""
+    
+    def _process_file(self, pdf_path):
+        if os.path.basename(pdf_path) == "hung.pdf":
+            # Like a native call that never returns: SIGALRM stays pending
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(30)
+        return super()._process_file(pdf_path)
 
 
 class TestDocumentProcessor:
@@ -42,6 +78,14 @@ class TestDocumentProcessor:
         assert "-" in clean  # Hyphens preserved
         assert "!" in clean  # Punctuation preserved
     
+    def test_clean_text_custom_rules(self):
+        """Test that clean_text uses the configured normalizer rules."""
+        processor = DocumentProcessor(
+            normalizer=TextNormalizer(strip_standalone_numbers=False)
+        )
+        
+        assert processor.clean_text("Total  42 items") == "Total 42 items"
+    
     def test_document_chunk_creation(self):
         """Test DocumentChunk dataclass."""
         chunk = DocumentChunk(
@@ -119,6 +163,33 @@ class TestDocumentProcessor:
             assert isinstance(chunk.metadata["pages"], list)
             assert len(chunk.metadata["pages"]) > 0
     
+    def test_page_mapping_matches_linear_scan(self):
+        """Test binary-search page lookup against a scan of every page."""
+        processor = DocumentProcessor(chunk_size=60, chunk_overlap=25,
+                                      max_chunks_per_doc=None)
+        page_texts = {
+            page_num: "text " * ((page_num * 7) % 23)
+            for page_num in range(1, 80)
+        }
+        
+        chunks = processor.create_chunks(page_texts, "test.pdf")
+        
+        ranges = []
+        current_pos = 0
+        for page_num in sorted(page_texts):
+            page_len = len(processor.clean_text(page_texts[page_num]))
+            ranges.append((current_pos, current_pos + page_len, page_num))
+            current_pos += page_len + 1
+        
+        for chunk in chunks:
+            start = chunk.metadata["start_char"]
+            end = chunk.metadata["end_char"]
+            expected = [
+                page_num for page_start, page_end, page_num in ranges
+                if not (end <= page_start or start >= page_end)
+            ]
+            assert chunk.metadata["pages"] == expected
+    
     # Note: Tests for PDF extraction would require sample PDF files
     # These should be added in integration tests
     
@@ -128,5 +199,307 @@ class TestDocumentProcessor:
             self.processor.extract_text_from_pdf("nonexistent.pdf")
 
 
+
+class TestStreamingChunks:
+    """Test suite for the generator-based chunking pipeline."""
+    
+    def _assert_same_as_create_chunks(self, processor, page_texts):
+        expected = processor.create_chunks(page_texts, "test.pdf")
+        streamed = list(processor.iter_chunks_from_pages(
+            sorted(page_texts.items()), "test.pdf"
+        ))
+        assert streamed == expected
+    
+    def test_matches_create_chunks(self):
+        """Test identical boundaries and page metadata to create_chunks."""
+        processor = DocumentProcessor(chunk_size=50, chunk_overlap=15,
+                                      max_chunks_per_doc=None)
+        page_texts = {
+            i: ("Sentence number %d on this page. " % i) * (i % 4)
+            for i in range(1, 30)
+        }
+        self._assert_same_as_create_chunks(processor, page_texts)
+    
+    def test_matches_create_chunks_edge_cases(self):
+        """Test empty pages, pages longer than a chunk and tiny documents."""
+        processor = DocumentProcessor(chunk_size=40, chunk_overlap=10,
+                                      max_chunks_per_doc=None)
+        self._assert_same_as_create_chunks(processor, {1: ""})
+        self._assert_same_as_create_chunks(processor, {1: "short"})
+        self._assert_same_as_create_chunks(processor, {1: "", 2: "", 3: "x y"})
+        self._assert_same_as_create_chunks(
+            processor, {1: "word " * 100, 2: "", 3: "tail text", 4: "word " * 8}
+        )
+    
+    def test_respects_max_chunks(self):
+        """Test the per-document chunk limit while streaming."""
+        processor = DocumentProcessor(chunk_size=100, chunk_overlap=20,
+                                      max_chunks_per_doc=5)
+        self._assert_same_as_create_chunks(processor, {1: "word " * 1000})
+    
+    def test_pages_read_lazily(self):
+        """Test that pages are consumed only as chunks are requested."""
+        processor = DocumentProcessor(chunk_size=100, chunk_overlap=20)
+        consumed = []
+        
+        def pages():
+            for page_num in range(1, 101):
+                consumed.append(page_num)
+                yield page_num, "Some text on the page. " * 10
+        
+        stream = processor.iter_chunks_from_pages(pages(), "test.pdf")
+        first = next(stream)
+        
+        assert first.metadata["pages"] == [1]
+        assert len(consumed) < 5
+    
+    def test_iter_chunks_matches_process_document(self, tmp_path):
+        """Test the PDF streaming path end to end."""
+        pdf_path = tmp_path / "doc.pdf"
+        _write_pdf(pdf_path, ["Page text number %d goes here." % i for i in range(12)])
+        processor = DocumentProcessor(chunk_size=70, chunk_overlap=20)
+        
+        assert list(processor.iter_chunks(str(pdf_path))) == \
+            processor.process_document(str(pdf_path))
+    
+    def test_chunk_ids_keyed_by_path(self, tmp_path):
+        """Test that same-named files in different directories get distinct IDs."""
+        for directory in ("a", "b"):
+            (tmp_path / directory).mkdir()
+            _write_pdf(tmp_path / directory / "doc.pdf", ["Same text on every copy."])
+        processor = DocumentProcessor(chunk_size=70, chunk_overlap=20)
+        
+        first = processor.process_document(str(tmp_path / "a" / "doc.pdf"))
+        second = processor.process_document(str(tmp_path / "b" / "doc.pdf"))
+        
+        assert first[0].chunk_id != second[0].chunk_id
+        assert first[0].chunk_id.startswith("doc.pdf@")
+        assert first[0].metadata["source"] == second[0].metadata["source"] == "doc.pdf"
+        assert document_key(str(tmp_path / "a" / "doc.pdf")) == \
+            document_key(str(tmp_path / "a" / ".." / "a" / "doc.pdf"))
+    
+    def test_iter_chunks_file_not_found(self):
+        """Test that a missing PDF fails at call time."""
+        processor = DocumentProcessor()
+        with pytest.raises(FileNotFoundError):
+            processor.iter_chunks("nonexistent.pdf")
+
+
+class TestBlockChunking:
+    """Test suite for structure-aware ("blocks") chunking."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor(chunk_size=200, chunk_overlap=70,
+                                           max_chunks_per_doc=None, chunking="blocks")
+        self.paragraphs = [
+            "Termination requires written notice. The notice period is thirty days.",
+            "Payment is due within fifteen days of the invoice date.",
+            "Either party may assign the agreement with prior consent.",
+            "Warranty claims must be raised within one year of delivery.",
+            "Liability is limited to the fees paid in the preceding year.",
+        ]
+        self.page_texts = {
+            1: "\n\n".join(["Termination and Payment"] + self.paragraphs[:3]),
+            2: "\n\n".join(["Warranty and Liability"] + self.paragraphs[3:]),
+        }
+    
+    def test_chunks_respect_boundaries(self):
+        """Test that chunks hold whole paragraphs and fit in chunk_size."""
+        chunks = self.processor.create_chunks(self.page_texts, "doc.pdf")
+        
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk.text) <= 200
+            assert chunk.text.endswith(".")
+        for paragraph in self.paragraphs:
+            assert any(paragraph in chunk.text for chunk in chunks)
+    
+    def test_overlap_repeats_whole_paragraphs(self):
+        """Test that a chunk starts with the last paragraph of the previous one."""
+        processor = DocumentProcessor(chunk_size=130, chunk_overlap=70,
+                                      max_chunks_per_doc=None, chunking="blocks")
+        chunks = processor.create_chunks({1: "\n\n".join(self.paragraphs)}, "doc.pdf")
+        
+        for previous, chunk in zip(chunks, chunks[1:]):
+            last = [p for p in self.paragraphs if previous.text.endswith(p)][0]
+            assert chunk.text.startswith(last)
+    
+    def test_heading_starts_chunk(self):
+        """Test that a heading opens a chunk instead of ending the previous one."""
+        chunks = self.processor.create_chunks(self.page_texts, "doc.pdf")
+        
+        assert chunks[0].text.startswith("Termination and Payment")
+        assert chunks[-1].text == " ".join(["Warranty and Liability"] + self.paragraphs[3:])
+        assert chunks[-1].metadata["pages"] == [2]
+        assert chunks[-2].text.endswith(self.paragraphs[2])
+    
+    def test_heading_not_left_at_chunk_end(self):
+        """Test that a heading moves to the chunk holding its section."""
+        blocks = ["Scope", self.paragraphs[1], "Notice", self.paragraphs[0] * 2]
+        
+        chunks = self.processor.create_chunks({1: "\n\n".join(blocks)}, "doc.pdf")
+        
+        assert [chunk.text for chunk in chunks] == [
+            "Scope " + self.paragraphs[1], "Notice " + self.paragraphs[0] * 2
+        ]
+    
+    def test_multiline_block_is_not_a_heading(self):
+        """Test that only single-line blocks count as headings."""
+        page_texts = [(1, "Warranty\nand Liability"), (2, "Warranty and Liability")]
+        
+        assert list(self.processor._iter_block_units(page_texts)) == [
+            (1, "Warranty and Liability", False), (2, "Warranty and Liability", True)
+        ]
+    
+    def test_long_blocks_split_at_sentences_and_words(self):
+        """Test splitting of paragraphs and words longer than a chunk."""
+        sentences = " ".join(f"Sentence number {i} is here." for i in range(30))
+        chunks = self.processor.create_chunks({1: sentences, 2: "x" * 450}, "doc.pdf")
+        texts = [chunk.text for chunk in chunks]
+        
+        assert all(len(text) <= 200 for text in texts)
+        assert all(text.endswith("here.") for text in texts if "Sentence" in text)
+        assert "".join(text for text in texts if text.startswith("x")) == "x" * 450
+    
+    def test_offsets_match_document_text(self):
+        """Test that start/end offsets locate each chunk in the joined text."""
+        full_text, spans = self.processor._chunk_spans(self.page_texts, "doc.pdf")
+        chunks = self.processor.create_chunks(self.page_texts, "doc.pdf")
+        
+        for chunk in chunks:
+            metadata = chunk.metadata
+            assert full_text[metadata["start_char"]:metadata["end_char"]] == chunk.text
+    
+    def test_streaming_and_columnar_match(self):
+        """Test that iter_chunks_from_pages and create_chunk_store agree."""
+        expected = self.processor.create_chunks(self.page_texts, "doc.pdf")
+        streamed = list(self.processor.iter_chunks_from_pages(
+            sorted(self.page_texts.items()), "doc.pdf"
+        ))
+        
+        assert streamed == expected
+        assert self.processor.create_chunk_store(self.page_texts, "doc.pdf").to_chunks() \
+            == expected
+    
+    def test_max_chunks(self):
+        """Test the per-document chunk limit."""
+        processor = DocumentProcessor(chunk_size=100, chunk_overlap=0, max_chunks_per_doc=2,
+                                      chunking="blocks")
+        
+        assert len(processor.create_chunks(self.page_texts, "doc.pdf")) == 2
+    
+    def test_pdf_blocks_extracted(self, tmp_path):
+        """Test that PDF text blocks become separate paragraphs."""
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), "Notice Period", fontsize=14)
+        page.insert_textbox(fitz.Rect(72, 100, 520, 200), self.paragraphs[0])
+        page.insert_textbox(fitz.Rect(72, 220, 520, 320), self.paragraphs[1])
+        doc.save(str(tmp_path / "doc.pdf"))
+        doc.close()
+        
+        page_texts = self.processor.extract_text_from_pdf(str(tmp_path / "doc.pdf"))
+        chunks = self.processor.process_document(str(tmp_path / "doc.pdf"))
+        
+        assert page_texts[1].split("\n\n")[0] == "Notice Period"
+        assert [chunk.text for chunk in chunks] == [
+            "Notice Period " + " ".join(self.paragraphs[:2])
+        ]
+        assert list(self.processor.iter_chunks(str(tmp_path / "doc.pdf"))) == chunks
+    
+    def test_unknown_strategy(self):
+        """Test that an unknown chunking strategy is rejected."""
+        with pytest.raises(ValueError):
+            DocumentProcessor(chunking="sentences")
+
+
+class TestParallelIngestion:
+    """Test suite for multi-process directory ingestion."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.pages = [
+            "Alpha beta gamma delta epsilon zeta eta theta iota kappa.",
+            "Lambda mu nu xi omicron pi rho sigma tau upsilon phi.",
+        ]
+    
+    def _make_corpus(self, tmp_path):
+        for i in range(4):
+            _write_pdf(tmp_path / f"doc{i}.pdf", self.pages * (i + 1))
+        (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+        (tmp_path / "notes.txt").write_text("ignored")
+    
+    def test_parallel_matches_sequential(self, tmp_path):
+        """Test that the process pool returns the same chunks as one process."""
+        self._make_corpus(tmp_path)
+        sequential = DocumentProcessor(chunk_size=60, chunk_overlap=10)
+        parallel = DocumentProcessor(chunk_size=60, chunk_overlap=10, workers=2)
+        
+        expected = sequential.process_directory(str(tmp_path))
+        result = parallel.process_directory(str(tmp_path))
+        
+        assert list(result.keys()) == list(expected.keys())
+        assert result == expected
+        assert "broken.pdf" not in result
+    
+    def test_columnar_matches_lists(self, tmp_path):
+        """Test that columnar ingestion returns the same chunks as ChunkStores."""
+        self._make_corpus(tmp_path)
+        expected = DocumentProcessor(chunk_size=60, chunk_overlap=10).process_directory(
+            str(tmp_path)
+        )
+        columnar = DocumentProcessor(chunk_size=60, chunk_overlap=10, workers=2,
+                                     columnar=True)
+        
+        result = columnar.process_directory(str(tmp_path))
+        
+        assert list(result.keys()) == list(expected.keys())
+        assert all(isinstance(store, ChunkStore) for store in result.values())
+        assert {name: store.to_chunks() for name, store in result.items()} == expected
+    
+    def test_stats_reported(self, tmp_path):
+        """Test that throughput statistics are recorded."""
+        self._make_corpus(tmp_path)
+        processor = DocumentProcessor(chunk_size=60, chunk_overlap=10, workers=2)
+        
+        result = processor.process_directory(str(tmp_path))
+        stats = processor.last_stats
+        
+        assert stats.documents == 4
+        assert stats.failed == 1
+        assert stats.pages == 2 * (1 + 2 + 3 + 4)
+        assert stats.chunks == sum(len(c) for c in result.values())
+        assert stats.pages_per_second > 0
+        assert stats.chunks_per_second > 0
+    
+    def test_file_timeout_isolated(self, tmp_path):
+        """Test that a file exceeding its timeout is skipped, not fatal."""
+        _write_pdf(tmp_path / "slow.pdf", self.pages)
+        processor = SlowDocumentProcessor(file_timeout=0.2)
+        
+        started = time.perf_counter()
+        result = processor.process_directory(str(tmp_path))
+        
+        assert result == {}
+        assert processor.last_stats.failed == 1
+        assert time.perf_counter() - started < 4
+    
+    @pytest.mark.skipif(not hasattr(signal, "pthread_sigmask"), reason="POSIX only")
+    def test_hung_worker_killed(self, tmp_path):
+        """Test that a worker the alarm cannot interrupt is killed by the parent."""
+        for name in ("hung.pdf", "doc0.pdf", "doc1.pdf", "doc2.pdf"):
+            _write_pdf(tmp_path / name, self.pages)
+        processor = HungDocumentProcessor(chunk_size=60, chunk_overlap=10, workers=2,
+                                          file_timeout=0.5)
+        
+        started = time.perf_counter()
+        result = processor.process_directory(str(tmp_path))
+        
+        assert sorted(result) == ["doc0.pdf", "doc1.pdf", "doc2.pdf"]
+        assert processor.last_stats.failed == 1
+        assert time.perf_counter() - started < 10
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,167 @@
+"""
+Unit tests for EmbeddingCache module.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src import embedding_cache
+from src.embedding_cache import EmbeddingCache
+
+
+def vectors_for(values, dimension=3):
+    return np.array([[v] * dimension for v in values], dtype=np.float32)
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache class."""
+    
+    def test_make_key_normalizes_whitespace(self):
+        """Test that keys ignore whitespace layout but not the model."""
+        key = EmbeddingCache.make_key("model-a", "hello   world\n")
+        
+        assert key == EmbeddingCache.make_key("model-a", "hello world")
+        assert key != EmbeddingCache.make_key("model-b", "hello world")
+        assert len(key) == 16
+    
+    def test_put_and_get(self, tmp_path):
+        """Test that cached vectors come back for hits only."""
+        cache = EmbeddingCache(str(tmp_path))
+        keys = [EmbeddingCache.make_key("m", t) for t in ["a", "b", "c"]]
+        cache.put_many(keys[:2], vectors_for([1, 2]))
+        
+        found, vectors = cache.get_many(keys)
+        
+        assert list(found) == [True, True, False]
+        np.testing.assert_array_equal(vectors, vectors_for([1, 2]))
+        assert cache.hits == 2
+        assert cache.misses == 1
+    
+    def test_persistence(self, tmp_path):
+        """Test that entries survive a reload from disk."""
+        cache = EmbeddingCache(str(tmp_path))
+        keys = [bytes(16), b"\x01" * 15 + b"\x00"]  # trailing NUL bytes
+        cache.put_many(keys, vectors_for([3, 4]))
+        cache.flush()
+        
+        reloaded = EmbeddingCache(str(tmp_path))
+        found, vectors = reloaded.get_many(keys)
+        
+        assert len(reloaded) == 2
+        assert found.all()
+        np.testing.assert_array_equal(vectors, vectors_for([3, 4]))
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entry is evicted first."""
+        cache = EmbeddingCache(str(tmp_path), max_entries=2)
+        a, b, c = (EmbeddingCache.make_key("m", t) for t in "abc")
+        cache.put_many([a, b], vectors_for([1, 2]))
+        cache.get_many([a])  # b is now least recently used
+        cache.put_many([c], vectors_for([3]))
+        
+        assert a in cache and c in cache
+        assert b not in cache
+        assert cache.evictions == 1
+        _, vectors = cache.get_many([a, c])
+        np.testing.assert_array_equal(vectors, vectors_for([1, 3]))
+    
+    def test_lru_order_persisted(self, tmp_path):
+        """Test that recency survives a reload."""
+        cache = EmbeddingCache(str(tmp_path), max_entries=2)
+        a, b, c = (EmbeddingCache.make_key("m", t) for t in "abc")
+        cache.put_many([a, b], vectors_for([1, 2]))
+        cache.get_many([a])
+        cache.flush()
+        
+        reloaded = EmbeddingCache(str(tmp_path), max_entries=2)
+        reloaded.put_many([c], vectors_for([3]))
+        
+        assert b not in reloaded
+    
+    def test_flush_appends_to_journal(self, tmp_path):
+        """Test that flush appends new entries instead of rewriting the index."""
+        cache = EmbeddingCache(str(tmp_path))
+        a, b = (EmbeddingCache.make_key("m", t) for t in "ab")
+        cache.put_many([a], vectors_for([1]))
+        cache.close()
+        index_mtime = os.stat(tmp_path / "index.npz").st_mtime_ns
+        
+        cache.put_many([b], vectors_for([2]))
+        cache.flush()
+        
+        assert os.stat(tmp_path / "index.npz").st_mtime_ns == index_mtime
+        reloaded = EmbeddingCache(str(tmp_path))
+        found, vectors = reloaded.get_many([a, b])
+        assert found.all()
+        np.testing.assert_array_equal(vectors, vectors_for([1, 2]))
+    
+    def test_journal_replays_evictions(self, tmp_path):
+        """Test that a key whose slot was reused is gone after a reload."""
+        cache = EmbeddingCache(str(tmp_path), max_entries=2)
+        a, b, c = (EmbeddingCache.make_key("m", t) for t in "abc")
+        cache.put_many([a, b], vectors_for([1, 2]))
+        cache.close()
+        cache.get_many([a])
+        cache.put_many([c], vectors_for([3]))  # evicts b
+        cache.flush()
+        
+        reloaded = EmbeddingCache(str(tmp_path), max_entries=2)
+        found, vectors = reloaded.get_many([a, b, c])
+        
+        assert list(found) == [True, False, True]
+        np.testing.assert_array_equal(vectors, vectors_for([1, 3]))
+    
+    def test_journal_compacted(self, tmp_path, monkeypatch):
+        """Test that a long journal is folded into a rewritten index."""
+        monkeypatch.setattr(embedding_cache, "MIN_COMPACT_RECORDS", 4)
+        cache = EmbeddingCache(str(tmp_path))
+        keys = [EmbeddingCache.make_key("m", str(i)) for i in range(3)]
+        cache.put_many(keys, vectors_for([0, 1, 2]))
+        for _ in range(10):
+            cache.get_many(keys[:1])
+            cache.flush()
+        
+        journals = [name for name in os.listdir(tmp_path) if name.startswith("journal")]
+        
+        assert len(journals) == 1
+        assert os.path.getsize(tmp_path / journals[0]) <= 4 * 24
+        reloaded = EmbeddingCache(str(tmp_path))
+        assert len(reloaded) == 3 and list(reloaded._index)[-1] == keys[0]
+    
+    def test_grows_beyond_initial_capacity(self, tmp_path):
+        """Test that the memory-mapped file grows as entries are added."""
+        cache = EmbeddingCache(str(tmp_path))
+        keys = [EmbeddingCache.make_key("m", str(i)) for i in range(3000)]
+        values = np.arange(3000, dtype=np.float32)
+        cache.put_many(keys, vectors_for(values))
+        cache.flush()
+        
+        found, vectors = EmbeddingCache(str(tmp_path)).get_many(keys[::-1])
+        
+        assert found.all()
+        np.testing.assert_array_equal(vectors[:, 0], values[::-1])
+    
+    def test_dimension_mismatch(self, tmp_path):
+        """Test that vectors of another dimension are rejected."""
+        cache = EmbeddingCache(str(tmp_path))
+        cache.put_many([b"k" * 16], vectors_for([1]))
+        
+        with pytest.raises(ValueError):
+            cache.put_many([b"j" * 16], vectors_for([1], dimension=4))
+    
+    def test_stats(self, tmp_path):
+        """Test the exposed counters."""
+        cache = EmbeddingCache(str(tmp_path))
+        cache.put_many([b"k" * 16], vectors_for([1]))
+        cache.get_many([b"k" * 16, b"j" * 16])
+        
+        stats = cache.stats()
+        
+        assert stats["entries"] == 1
+        assert stats["hit_rate"] == 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,126 @@
+"""
+Unit tests for EmbeddingGenerator module.
+"""
+
+import numpy as np
+import pytest
+
+from src.embeddings import EmbeddingGenerator
+
+
+class FakeModel:
+    """Deterministic stand-in for a sentence-transformers model."""
+    
+    def __init__(self, dimension=4):
+        self.dimension = dimension
+        self.batches = []
+    
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+    
+    def encode(self, texts, batch_size=32, convert_to_numpy=True,
+               show_progress_bar=False):
+        self.batches.append(list(texts))
+        return np.array(
+            [[len(t), sum(map(ord, t)) % 97, 1.0, 2.0][:self.dimension] for t in texts],
+            dtype=np.float64
+        )
+
+
+class TestEmbeddingGenerator:
+    """Test suite for EmbeddingGenerator class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.model = FakeModel()
+        self.generator = EmbeddingGenerator(batch_size=2, model=self.model)
+        self.texts = ["a", "ccc", "bb", "eeeee", "dddd"]
+    
+    def test_output_in_input_order(self):
+        """Test that rows line up with the input texts."""
+        embeddings = self.generator.generate_embeddings(self.texts)
+        
+        assert embeddings.shape == (5, 4)
+        assert list(embeddings[:, 0]) == [1, 3, 2, 5, 4]
+    
+    def test_output_dtype_and_layout(self):
+        """Test that output is a contiguous float32 array."""
+        embeddings = self.generator.generate_embeddings(self.texts)
+        
+        assert embeddings.dtype == np.float32
+        assert embeddings.flags["C_CONTIGUOUS"]
+    
+    def test_batches_sorted_by_length(self):
+        """Test length bucketing and the configured batch size."""
+        self.generator.generate_embeddings(self.texts)
+        
+        assert self.model.batches == [["eeeee", "dddd"], ["ccc", "bb"], ["a"]]
+    
+    def test_batch_size_override(self):
+        """Test a per-call batch size."""
+        self.generator.generate_embeddings(self.texts, batch_size=5)
+        
+        assert len(self.model.batches) == 1
+    
+    def test_normalization(self):
+        """Test optional L2 normalization."""
+        generator = EmbeddingGenerator(normalize=True, model=FakeModel())
+        embeddings = generator.generate_embeddings(self.texts)
+        
+        np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1.0, rtol=1e-6)
+    
+    def test_empty_input(self):
+        """Test that no texts give an empty (0, dimension) array."""
+        embeddings = self.generator.generate_embeddings([])
+        
+        assert embeddings.shape == (0, 4)
+        assert self.model.batches == []
+    
+    def test_cache_skips_known_texts(self, tmp_path):
+        """Test that cached texts are not re-encoded, even after a restart."""
+        generator = EmbeddingGenerator(batch_size=8, model=self.model,
+                                       cache_dir=str(tmp_path))
+        first = generator.generate_embeddings(self.texts)
+        generator.close()
+        
+        restarted = EmbeddingGenerator(batch_size=8, model=self.model,
+                                       cache_dir=str(tmp_path))
+        second = restarted.generate_embeddings(self.texts + ["ffffff", "a"])
+        
+        assert self.model.batches[-1] == ["ffffff"]
+        np.testing.assert_array_equal(second[:5], first)
+        assert restarted.cache_stats()["hits"] == 6
+        assert restarted.cache_stats()["misses"] == 1
+    
+    def test_cache_encodes_duplicates_once(self, tmp_path):
+        """Test that repeated texts in one call are encoded once."""
+        generator = EmbeddingGenerator(model=self.model, cache_dir=str(tmp_path))
+        embeddings = generator.generate_embeddings(["x", "yy", "x"])
+        
+        assert self.model.batches == [["yy", "x"]]
+        np.testing.assert_array_equal(embeddings[0], embeddings[2])
+    
+    def test_cache_flushed_on_demand(self, tmp_path):
+        """Test that embedding calls do not rewrite the cache files each time."""
+        generator = EmbeddingGenerator(model=self.model, cache_dir=str(tmp_path))
+        generator.generate_embeddings(self.texts)
+        unflushed = generator.cache.unflushed
+        
+        generator.flush_cache()
+        
+        assert unflushed == len(self.texts)
+        assert generator.cache.unflushed == 0
+        restarted = EmbeddingGenerator(model=self.model, cache_dir=str(tmp_path))
+        assert len(restarted.cache) == len(self.texts)
+    
+    def test_cache_stats_disabled(self):
+        """Test that stats are empty without a cache."""
+        assert self.generator.cache_stats() == {}
+    
+    def test_dimension(self):
+        """Test the embedding dimension is read from the model."""
+        assert self.generator.dimension == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,103 @@
+"""
+Unit tests for IngestionManifest module.
+"""
+
+import os
+
+import pytest
+
+from src.ingestion_manifest import IngestionManifest, hash_file
+
+
+class TestIngestionManifest:
+    """Test suite for IngestionManifest class."""
+    
+    def write(self, tmp_path, name, content):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+    
+    def test_plan_new_files(self, tmp_path):
+        """Test that unknown files are planned as added."""
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        path = self.write(tmp_path, "a.pdf", b"one")
+        
+        plan = manifest.plan([path])
+        
+        assert plan.added == [os.path.abspath(path)]
+        assert plan.modified == plan.unchanged == plan.deleted == []
+    
+    def test_round_trip(self, tmp_path):
+        """Test that records survive save and reload."""
+        manifest_path = str(tmp_path / "manifest.json")
+        path = self.write(tmp_path, "a.pdf", b"one")
+        manifest = IngestionManifest(manifest_path)
+        manifest.record(path, ["a.pdf_chunk_0", "a.pdf_chunk_1"])
+        manifest.save()
+        
+        reloaded = IngestionManifest(manifest_path)
+        
+        assert reloaded.chunk_ids(path) == ["a.pdf_chunk_0", "a.pdf_chunk_1"]
+        assert reloaded.records[os.path.abspath(path)].content_hash == hash_file(path)
+        assert reloaded.plan([path]).unchanged == [os.path.abspath(path)]
+    
+    def test_plan_modified_and_deleted(self, tmp_path):
+        """Test detection of changed content and vanished files."""
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        a = self.write(tmp_path, "a.pdf", b"one")
+        b = self.write(tmp_path, "b.pdf", b"two")
+        manifest.record(a, [])
+        manifest.record(b, [])
+        
+        self.write(tmp_path, "a.pdf", b"changed content")
+        plan = manifest.plan([a])
+        
+        assert plan.modified == [os.path.abspath(a)]
+        assert plan.deleted == [os.path.abspath(b)]
+    
+    def test_plan_deleted_scoped_to_directory(self, tmp_path):
+        """Test that files recorded from other directories are not reported deleted."""
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "sub").mkdir()
+        a = self.write(tmp_path / "a", "a.pdf", b"one")
+        b = self.write(tmp_path / "b", "b.pdf", b"two")
+        nested = self.write(tmp_path / "b" / "sub", "c.pdf", b"three")
+        for path in (a, b, nested):
+            manifest.record(path, [])
+        os.remove(b)
+        
+        plan = manifest.plan([], directory=str(tmp_path / "b"))
+        
+        assert plan.deleted == [os.path.abspath(b)]
+        assert len(manifest.plan([]).deleted) == 3
+    
+    def test_same_content_new_mtime_unchanged(self, tmp_path):
+        """Test that the content hash overrides a changed mtime."""
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        a = self.write(tmp_path, "a.pdf", b"one")
+        manifest.record(a, [])
+        stat = os.stat(a)
+        os.utime(a, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        plan = manifest.plan([a])
+        
+        assert plan.unchanged == [os.path.abspath(a)]
+        assert manifest.records[os.path.abspath(a)].mtime_ns == stat.st_mtime_ns + 10**9
+    
+    def test_clear(self, tmp_path):
+        """Test that clear removes the manifest file."""
+        manifest_path = tmp_path / "manifest.json"
+        manifest = IngestionManifest(str(manifest_path))
+        manifest.record(self.write(tmp_path, "a.pdf", b"one"), [])
+        manifest.save()
+        
+        manifest.clear()
+        
+        assert not manifest_path.exists()
+        assert manifest.records == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
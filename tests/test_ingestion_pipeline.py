@@ -0,0 +1,184 @@
+"""
+Unit tests for IngestionPipeline module.
+"""
+
+import threading
+import time
+
+import fitz
+import numpy as np
+import pytest
+
+from src.deduplication import ChunkDeduplicator
+from src.document_processor import DocumentProcessor
+from src.ingestion_pipeline import IngestionPipeline
+
+TOPICS = "apples bananas cherries dates elderberries figs grapes kiwis".split()
+
+
+def write_pdf(path, pages):
+    """Write a small PDF with one text line per page."""
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+class FakeEmbeddingGenerator:
+    """Embeds text as a tiny vector and records batch sizes."""
+    
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+    
+    def generate_embeddings(self, texts):
+        if self.fail_on and any(self.fail_on in t for t in texts):
+            raise RuntimeError("embedding service unavailable")
+        self.batches.append(len(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+class FakeVectorStore:
+    """Records writes, optionally slowly, and what was embedded by then."""
+    
+    def __init__(self, embedder=None, delay=0.0):
+        self.chunks = {}
+        self.embedder = embedder
+        self.delay = delay
+        self.lag = []
+    
+    def add_documents(self, chunks, embeddings):
+        assert len(chunks) == len(embeddings)
+        time.sleep(self.delay)
+        for chunk in chunks:
+            self.chunks[chunk.chunk_id] = chunk
+        if self.embedder is not None:
+            self.lag.append(sum(self.embedder.batches) - len(self.chunks))
+
+
+class TestIngestionPipeline:
+    """Test suite for IngestionPipeline."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor(chunk_size=60, chunk_overlap=10)
+        self.embedder = FakeEmbeddingGenerator()
+        self.store = FakeVectorStore()
+        self.indexed = {}
+    
+    def make_docs(self, tmp_path, count=6):
+        paths = []
+        for i in range(count):
+            path = tmp_path / f"doc{i}.pdf"
+            write_pdf(path, [f"Document text about {TOPICS[i]} and more {TOPICS[i]}. " * 3] * 2)
+            paths.append(str(path))
+        return paths
+    
+    def on_indexed(self, path, chunk_ids):
+        assert all(chunk_id in self.store.chunks for chunk_id in chunk_ids)
+        self.indexed[path] = chunk_ids
+    
+    def test_indexes_every_file(self, tmp_path):
+        """Test that all chunks are written and every file is reported once done."""
+        paths = self.make_docs(tmp_path)
+        pipeline = IngestionPipeline(self.processor, self.embedder, self.store, batch_size=5)
+        
+        report = pipeline.run(paths, self.on_indexed)
+        
+        assert sorted(self.indexed) == sorted(paths)
+        assert report.files == 6 and report.failed == 0
+        assert report.chunks == len(self.store.chunks) == sum(self.embedder.batches)
+        assert all(size == 5 for size in self.embedder.batches[:-1])
+        assert pipeline.last_report is report
+    
+    def test_stage_metrics(self, tmp_path):
+        """Test per-stage item counts and queue depths."""
+        paths = self.make_docs(tmp_path)
+        pipeline = IngestionPipeline(self.processor, self.embedder, self.store,
+                                     batch_size=4, queue_size=2)
+        
+        report = pipeline.run(paths, self.on_indexed)
+        
+        extract, embed, index = report.stages
+        assert (extract.name, embed.name, index.name) == ("extract", "embed", "index")
+        assert extract.items == 6
+        assert embed.items == index.items == report.chunks
+        assert 0 < extract.max_queue_depth <= 2 and embed.max_queue_depth <= 2
+        assert report.pages == 12 and report.elapsed > 0
+    
+    def test_back_pressure(self, tmp_path):
+        """Test that a slow index stage stalls embedding instead of buffering."""
+        paths = self.make_docs(tmp_path, count=8)
+        self.store = FakeVectorStore(self.embedder, delay=0.01)
+        pipeline = IngestionPipeline(self.processor, self.embedder, self.store,
+                                     batch_size=1, queue_size=2)
+        
+        report = pipeline.run(paths, self.on_indexed)
+        
+        # In flight: the queued batches, one being written and one being handed over
+        assert max(self.store.lag) <= 2 + 2
+        assert report.stages[1].blocked > 0
+    
+    def test_failed_files_counted(self, tmp_path):
+        """Test that unreadable files are skipped and not reported as indexed."""
+        paths = self.make_docs(tmp_path, count=2)
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+        pipeline = IngestionPipeline(self.processor, self.embedder, self.store)
+        
+        report = pipeline.run(paths + [str(broken)], self.on_indexed)
+        
+        assert report.failed == 1 and report.files == 2
+        assert str(broken) not in self.indexed
+    
+    def test_stage_error_stops_pipeline(self, tmp_path):
+        """Test that an embedding failure is re-raised and the run stops."""
+        paths = self.make_docs(tmp_path)
+        embedder = FakeEmbeddingGenerator(fail_on="dates")
+        pipeline = IngestionPipeline(self.processor, embedder, self.store, batch_size=1,
+                                     queue_size=1)
+        
+        with pytest.raises(RuntimeError, match="unavailable"):
+            pipeline.run(paths, self.on_indexed)
+        
+        assert paths[3] not in self.indexed
+        assert not any(t.name.startswith("ingest-") for t in threading.enumerate())
+    
+    def test_worker_processes(self, tmp_path):
+        """Test extraction in a process pool feeding the stage threads."""
+        paths = self.make_docs(tmp_path)
+        processor = DocumentProcessor(chunk_size=60, chunk_overlap=10, workers=2)
+        pipeline = IngestionPipeline(processor, self.embedder, self.store, batch_size=8)
+        
+        report = pipeline.run(paths, self.on_indexed)
+        
+        assert sorted(self.indexed) == sorted(paths)
+        assert report.chunks == len(self.store.chunks)
+    
+    def test_duplicates_not_embedded(self, tmp_path):
+        """Test that the embed stage skips chunks the deduplicator recognizes."""
+        paths = self.make_docs(tmp_path, count=2)
+        copy = tmp_path / "copy.pdf"
+        write_pdf(copy, ["Document text about apples and more apples. " * 3] * 2)
+        deduplicator = ChunkDeduplicator(str(tmp_path / "dedup"))
+        pipeline = IngestionPipeline(self.processor, self.embedder, self.store,
+                                     deduplicator=deduplicator)
+        
+        report = pipeline.run(paths + [str(copy)], self.indexed.__setitem__)
+        
+        assert not any(chunk_id in self.store.chunks for chunk_id in self.indexed[str(copy)])
+        assert report.duplicates == len(self.indexed[str(copy)]) > 0
+        assert sum(self.embedder.batches) == report.chunks - report.duplicates
+    
+    def test_invalid_sizes(self):
+        """Test error handling for empty batches or queues."""
+        with pytest.raises(ValueError):
+            IngestionPipeline(self.processor, self.embedder, self.store, batch_size=0)
+        with pytest.raises(ValueError):
+            IngestionPipeline(self.processor, self.embedder, self.store, queue_size=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,191 @@
+"""
+Unit tests for IVFIndex module.
+"""
+
+import numpy as np
+import pytest
+
+from src.ivf_index import IVFIndex
+from src.metadata_index import MetadataFilter
+
+
+def clustered_vectors(rng, num_clusters, per_cluster, dimension):
+    """Gaussian blobs around random centers, like topic-clustered chunks."""
+    centers = rng.normal(size=(num_clusters, dimension))
+    points = centers.repeat(per_cluster, axis=0)
+    points += 0.3 * rng.normal(size=points.shape)
+    return points.astype(np.float32)
+
+
+class TestIVFIndex:
+    """Test suite for IVFIndex class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(0)
+        self.vectors = clustered_vectors(rng, 20, 50, 16)
+        self.queries = self.vectors[rng.choice(1000, 10, replace=False)] + 0.05
+        self.ids = [f"doc.pdf_chunk_{i}" for i in range(1000)]
+    
+    def build(self, tmp_path, **options):
+        options.setdefault("nlist", 20)
+        options.setdefault("train_threshold", 500)
+        index = IVFIndex(str(tmp_path / "index"), **options)
+        index.add(self.ids, [f"text {i}" for i in range(1000)],
+                  [{"chunk_index": i} for i in range(1000)], self.vectors)
+        return index
+    
+    def result_rows(self, results):
+        return [[r["metadata"]["chunk_index"] for r in hits] for hits in results]
+    
+    def test_exact_search_before_training(self, tmp_path):
+        """Test that an untrained index falls back to exact search."""
+        index = self.build(tmp_path, train_threshold=5000)
+        
+        assert not index.is_trained
+        results = index.search(self.queries, top_k=5)
+        
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(self.queries @ normalized.T), axis=1)[:, :5]
+        assert self.result_rows(results) == expected.tolist()
+    
+    def test_trains_at_threshold(self, tmp_path):
+        """Test automatic training and that every row is assigned a cell."""
+        index = self.build(tmp_path)
+        
+        assert index.is_trained
+        assert index.centroids.shape == (20, 16)
+        rows = np.concatenate([index._list_rows(c) for c in range(20)])
+        assert sorted(rows.tolist()) == list(range(1000))
+    
+    def test_recall_against_exact(self, tmp_path):
+        """Test that probing a few cells finds nearly all exact neighbours."""
+        index = self.build(tmp_path)
+        exact = index._format(*index._search_rows(index._prepare(self.queries), 10))
+        
+        approximate = index.search(self.queries, top_k=10, nprobe=3)
+        
+        hits = sum(
+            len(set(self.result_rows([a])[0]) & set(self.result_rows([e])[0]))
+            for a, e in zip(approximate, exact)
+        )
+        assert hits / 100 >= 0.9
+    
+    def test_all_cells_is_exact(self, tmp_path):
+        """Test that nprobe = nlist gives the exact results."""
+        index = self.build(tmp_path)
+        exact = index._format(*index._search_rows(index._prepare(self.queries), 10))
+        
+        assert self.result_rows(index.search(self.queries, top_k=10, nprobe=20)) == \
+            self.result_rows(exact)
+    
+    def test_incremental_insert(self, tmp_path):
+        """Test that rows added after training are searchable."""
+        index = self.build(tmp_path)
+        target = np.ones((1, 16), dtype=np.float32) * 5
+        
+        index.add(["new.pdf_chunk_0"], ["new"], [{"chunk_index": -1}], target)
+        
+        assert index.search(target, top_k=1)[0][0]["chunk_id"] == "new.pdf_chunk_0"
+    
+    def test_deleted_rows_excluded(self, tmp_path):
+        """Test that deletions and replacements are honoured."""
+        index = self.build(tmp_path)
+        first = index.search(self.queries[:1], top_k=1)[0][0]["chunk_id"]
+        
+        index.delete([first])
+        
+        assert first not in [r["chunk_id"] for r in index.search(self.queries[:1], top_k=10)[0]]
+    
+    def test_persistence(self, tmp_path):
+        """Test that clustering and assignments survive a reload."""
+        index = self.build(tmp_path)
+        index.add(["new.pdf_chunk_0"], ["new"], [{"chunk_index": -1}],
+                  np.ones((1, 16), dtype=np.float32))
+        expected = index.search(self.queries, top_k=5, nprobe=2)
+        
+        reloaded = IVFIndex(str(tmp_path / "index"), nprobe=2)
+        
+        assert reloaded.is_trained
+        np.testing.assert_array_equal(reloaded.centroids, index.centroids)
+        assert reloaded.search(self.queries, top_k=5) == expected
+    
+    def test_reload_assigns_missing_rows(self, tmp_path):
+        """Test recovery when assignments lag behind the stored rows."""
+        index = self.build(tmp_path)
+        expected = index.search(self.queries, top_k=5, nprobe=2)
+        path = tmp_path / "index" / "assignments.i32"
+        path.write_bytes(path.read_bytes()[:-400])
+        
+        reloaded = IVFIndex(str(tmp_path / "index"), nprobe=2)
+        
+        assert len(reloaded._assignments) == 1000
+        assert reloaded.search(self.queries, top_k=5) == expected
+    
+    def test_compact_keeps_results(self, tmp_path):
+        """Test that compaction reassigns cells for the rewritten rows."""
+        index = self.build(tmp_path)
+        index.delete(self.ids[:300])
+        expected = index.search(self.queries, top_k=5, nprobe=4)
+        
+        index.compact()
+        
+        assert len(index._assignments) == 700
+        assert index.search(self.queries, top_k=5, nprobe=4) == expected
+        assert IVFIndex(str(tmp_path / "index")).search(self.queries, top_k=5, nprobe=4) == expected
+    
+    def test_reset(self, tmp_path):
+        """Test that reset drops rows and clustering."""
+        index = self.build(tmp_path)
+        
+        index.reset()
+        
+        assert len(index) == 0
+        assert not index.is_trained
+        assert not IVFIndex(str(tmp_path / "index")).is_trained
+    
+    def test_filtered_search(self, tmp_path):
+        """Test selective and broad filters against exact filtered search."""
+        index = IVFIndex(str(tmp_path / "index"), nlist=20, train_threshold=500)
+        index.add(self.ids, [f"text {i}" for i in range(1000)],
+                  [{"chunk_index": i, "source": f"doc{i % 10}.pdf", "pages": [i % 7]}
+                   for i in range(1000)], self.vectors)
+        
+        for where in (MetadataFilter(sources=["doc3.pdf"], page_range=(2, 2)),
+                      MetadataFilter(sources=[f"doc{i}.pdf" for i in range(8)])):
+            rows = index.filter_rows(where)
+            exact = index._format(*index._search_rows(index._prepare(self.queries), 10, rows))
+            
+            results = index.search(self.queries, top_k=10, where=where, nprobe=20)
+            
+            assert self.result_rows(results) == self.result_rows(exact)
+            assert all(len(hits) == 10 for hits in results)
+    
+    def test_filter_rescans_when_cells_lack_matches(self, tmp_path):
+        """Test a broad filter that excludes the queries' own clusters."""
+        index = IVFIndex(str(tmp_path / "index"), nlist=20, train_threshold=500)
+        # Rows come in blocks of 50 per cluster; one source per cluster
+        index.add(self.ids, [f"text {i}" for i in range(1000)],
+                  [{"chunk_index": i, "source": f"topic{i // 50}"} for i in range(1000)],
+                  self.vectors)
+        query = self.vectors[:1]
+        where = MetadataFilter(sources=[f"topic{t}" for t in range(1, 20)])
+        
+        results = index.search(query, top_k=10, where=where, nprobe=1)
+        
+        rows = index.filter_rows(where)
+        exact = index._format(*index._search_rows(index._prepare(query), 10, rows))
+        assert self.result_rows(results) == self.result_rows(exact)
+    
+    def test_dot_product_metric(self, tmp_path):
+        """Test inner-product scoring with all cells probed."""
+        index = self.build(tmp_path, distance_metric="ip")
+        
+        results = index.search(self.queries, top_k=5, nprobe=20)
+        
+        expected = np.argsort(-(self.queries @ self.vectors.T), axis=1)[:, :5]
+        assert self.result_rows(results) == expected.tolist()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
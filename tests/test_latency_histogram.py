@@ -0,0 +1,48 @@
+"""
+Unit tests for LatencyHistogram module.
+"""
+
+import numpy as np
+import pytest
+
+from src.latency_histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Test suite for LatencyHistogram."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.histogram = LatencyHistogram()
+    
+    def test_empty(self):
+        """Test that an empty histogram has no percentiles."""
+        assert self.histogram.percentile(50) is None
+        assert self.histogram.summary()["count"] == 0
+        assert self.histogram.buckets() == {}
+    
+    def test_percentiles_within_bucket_resolution(self):
+        """Test percentiles against exact values for a skewed sample."""
+        samples = np.random.default_rng(0).lognormal(mean=-1.5, sigma=0.8, size=5000)
+        for sample in samples:
+            self.histogram.record(float(sample))
+        
+        for q in (50, 95, 99):
+            exact = np.percentile(samples, q)
+            approx = self.histogram.percentile(q)
+            assert exact <= approx <= exact * 2 ** 0.25 * 1.01
+        assert self.histogram.summary()["max"] == pytest.approx(samples.max())
+        assert sum(self.histogram.buckets().values()) == 5000
+    
+    def test_overflow_bucket(self):
+        """Test that samples beyond max_seconds are kept and reported as max."""
+        histogram = LatencyHistogram(max_seconds=1.0)
+        histogram.record(0.5)
+        histogram.record(30.0)
+        
+        assert histogram.percentile(99) == 30.0
+        assert histogram.buckets()["inf"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
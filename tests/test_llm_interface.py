@@ -0,0 +1,259 @@
+"""
+Unit tests for LLMInterface module.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm_interface import (
+    FakeProvider,
+    LLMError,
+    LLMInterface,
+    OpenAIProvider,
+    build_messages,
+)
+
+
+def make_context():
+    return [
+        {"chunk_id": "a_0", "text": "Notice period is thirty days.",
+         "metadata": {"source": "a.pdf", "pages": [2]}, "score": 0.9},
+        {"chunk_id": "b_3", "text": "Invoices are due monthly.",
+         "metadata": {"source": "b.pdf", "pages": [5, 6]}, "score": 0.7},
+    ]
+
+
+class TestLLMInterface:
+    """Test suite for LLMInterface."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.provider = FakeProvider("The notice period is thirty days [1].",
+                                     token_delay=0.01, first_token_delay=0.05)
+        self.llm = LLMInterface(provider=self.provider)
+    
+    def test_stream_yields_tokens_then_answer(self):
+        """Test that tokens arrive one at a time before the final event."""
+        arrivals = []
+        start = time.perf_counter()
+        events = []
+        for event in self.llm.generate_answer_stream("How long is notice?", make_context()):
+            arrivals.append(time.perf_counter() - start)
+            events.append(event)
+        
+        tokens = [e["text"] for e in events if e["type"] == "token"]
+        final = events[-1]
+        assert "".join(tokens) == "The notice period is thirty days [1]."
+        assert len(tokens) == 7
+        assert arrivals[0] < arrivals[-2] - 0.04
+        assert final["type"] == "answer"
+        assert final["answer"] == "The notice period is thirty days [1]."
+    
+    def test_time_to_first_token(self):
+        """Test that time to first token is measured separately from latency."""
+        response = self.llm.generate_answer("How long is notice?", make_context())
+        
+        metadata = response["metadata"]
+        assert 0.05 <= metadata["time_to_first_token"] < metadata["latency"]
+        assert metadata["latency"] >= 0.05 + 6 * 0.01
+        assert metadata["tokens"] == 7
+    
+    def test_sources_are_numbered_citations(self):
+        """Test that sources match the prompt's passage numbers."""
+        response = self.llm.generate_answer("How long is notice?", make_context())
+        
+        assert response["sources"] == [
+            {"number": 1, "chunk_id": "a_0", "source": "a.pdf", "pages": [2], "score": 0.9},
+            {"number": 2, "chunk_id": "b_3", "source": "b.pdf", "pages": [5, 6],
+             "score": 0.7},
+        ]
+    
+    def test_default_fake_answer_quotes_context(self):
+        """Test the offline provider's default answer."""
+        llm = LLMInterface(provider=FakeProvider(token_delay=0, first_token_delay=0))
+        
+        response = llm.generate_answer("How long is notice?", make_context())
+        
+        assert response["answer"].startswith("According to [1]: Notice period is thirty days.")
+    
+    def test_build_messages(self):
+        """Test numbered context and both history formats."""
+        messages = build_messages(
+            "Next?", make_context()[:1],
+            [("First?", "Yes."), {"role": "user", "content": "Again?"}]
+        )
+        
+        assert [m["role"] for m in messages] == ["user", "assistant", "user", "user"]
+        assert messages[-1]["content"] == (
+            "Context:\n[1] (a.pdf, pages 2)\nNotice period is thirty days.\n\nQuestion: Next?"
+        )
+    
+    def test_build_messages_templates(self):
+        """Test a configured question template and citation label."""
+        messages = build_messages(
+            "Due?", make_context()[1:], query_template="Q: {question}\n{context}",
+            citation_format="[Source: {document}, Page {page}]"
+        )
+        
+        assert messages[-1]["content"] == (
+            "Q: Due?\n[1] [Source: b.pdf, Page 5, 6]\nInvoices are due monthly."
+        )
+    
+    def test_openai_stream_deltas(self):
+        """Test that OpenAI stream chunks are reduced to their text deltas."""
+        def chunk(content):
+            delta = SimpleNamespace(content=content)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        
+        calls = {}
+        
+        def create(**kwargs):
+            calls.update(kwargs)
+            return iter([chunk("Thirty"), chunk(None), chunk(" days")])
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        llm = LLMInterface(model_name="gpt-test", provider=OpenAIProvider(client=client))
+        
+        response = llm.generate_answer("How long?", make_context())
+        
+        assert response["answer"] == "Thirty days"
+        assert calls["stream"] is True and calls["model"] == "gpt-test"
+        assert calls["messages"][0]["role"] == "system"
+    
+    def test_async_stream_matches_sync(self):
+        """Test that the async stream yields the same events as the sync one."""
+        async def collect():
+            return [event async for event in
+                    self.llm.agenerate_answer_stream("How long is notice?", make_context())]
+        
+        events = asyncio.run(collect())
+        
+        tokens = [e["text"] for e in events if e["type"] == "token"]
+        assert "".join(tokens) == "The notice period is thirty days [1]."
+        assert events[-1]["sources"][0]["number"] == 1
+        assert 0.05 <= events[-1]["metadata"]["time_to_first_token"]
+    
+    def test_async_answers_overlap(self):
+        """Test that concurrent async answers wait on the provider together."""
+        async def ask_all():
+            return await asyncio.gather(*[
+                self.llm.agenerate_answer(f"Question {i}?", make_context()) for i in range(20)
+            ])
+        
+        start = time.perf_counter()
+        responses = asyncio.run(ask_all())
+        elapsed = time.perf_counter() - start
+        
+        assert len(responses) == 20
+        assert all(r["answer"] == "The notice period is thirty days [1]." for r in responses)
+        assert elapsed < 20 * 0.05
+    
+    def test_provider_options(self):
+        """Test that provider_options configure a named provider."""
+        llm = LLMInterface(provider="openai",
+                           provider_options={"base_url": "http://127.0.0.1:8001/v1",
+                                             "max_connections": 8})
+        
+        assert llm.provider.base_url == "http://127.0.0.1:8001/v1"
+        assert llm.provider.max_connections == 8
+    
+    def test_unknown_provider(self):
+        """Test that an unknown provider name is rejected."""
+        with pytest.raises(ValueError):
+            LLMInterface(provider="llama")
+
+
+
+class TestResilience:
+    """Test suite for retries, failover and hedging in LLMInterface."""
+    
+    def fast(self, **faults):
+        return FakeProvider("Thirty days [1].", token_delay=0, first_token_delay=0.01, **faults)
+    
+    def test_retry_after_failure(self):
+        """Test that a failed attempt is retried after a backoff."""
+        provider = self.fast(fail_first=2)
+        llm = LLMInterface(provider=provider, max_retries=2, backoff_base=0.01, seed=0)
+        
+        response = llm.generate_answer("How long?", make_context())
+        
+        assert response["answer"] == "Thirty days [1]."
+        assert response["metadata"]["attempts"] == 3
+        assert provider.calls == 3
+        stats = llm.latency_stats()["FakeProvider"]
+        assert stats["errors"] == 2 and stats["wins"] == 1
+        assert stats["time_to_first_token"]["count"] == 1
+    
+    def test_failover_to_fallback(self):
+        """Test that a failing primary fails over to the next provider at once."""
+        primary = self.fast(error_rate=1.0)
+        fallback = FakeProvider("Backup answer.", token_delay=0, first_token_delay=0)
+        llm = LLMInterface(provider=primary, max_retries=0, backoff_base=10,
+                           fallbacks=[{"provider": fallback, "model": "backup-model"}])
+        
+        start = time.perf_counter()
+        response = llm.generate_answer("How long?", make_context())
+        
+        assert time.perf_counter() - start < 1
+        assert response["answer"] == "Backup answer."
+        assert response["metadata"]["model"] == "backup-model"
+        assert response["metadata"]["provider"] == "FakeProvider#2"
+        assert llm.latency_stats()["FakeProvider"]["errors"] == 1
+    
+    def test_all_attempts_fail(self):
+        """Test that LLMError is raised once retries are exhausted."""
+        provider = self.fast(error_rate=1.0)
+        llm = LLMInterface(provider=provider, max_retries=1, backoff_base=0.01)
+        
+        with pytest.raises(LLMError, match="All 2 LLM attempts failed"):
+            llm.generate_answer("How long?", make_context())
+        assert provider.calls == 2
+    
+    def test_hedge_beats_slow_primary(self):
+        """Test that a late first token triggers a hedge whose answer wins."""
+        slow = FakeProvider("Slow.", token_delay=0, first_token_delay=0,
+                            slow_rate=1.0, slow_delay=0.5)
+        fast = FakeProvider("Fast.", token_delay=0, first_token_delay=0.01)
+        llm = LLMInterface(provider=slow, hedge=True, hedge_delay=0.05,
+                           fallbacks=[{"provider": fast}])
+        
+        start = time.perf_counter()
+        response = llm.generate_answer("How long?", make_context())
+        
+        assert time.perf_counter() - start < 0.3
+        assert response["answer"] == "Fast."
+        assert response["metadata"]["hedged"] is True
+        assert response["metadata"]["attempts"] == 2
+    
+    def test_hedge_delay_from_p95(self):
+        """Test that without a fixed delay, hedging waits for enough samples."""
+        llm = LLMInterface(provider=self.fast(), hedge=True, hedge_min_samples=3)
+        for _ in range(3):
+            assert llm.generate_answer("How long?", make_context())["metadata"]["hedged"] is False
+        
+        llm.provider.slow_rate, llm.provider.slow_delay = 1.0, 0.2
+        response = llm.generate_answer("How long?", make_context())
+        
+        assert response["metadata"]["hedged"] is True
+        assert llm.routes[0].attempts == 5
+    
+    def test_async_failover_and_hedge(self):
+        """Test that the async path retries, fails over and hedges the same way."""
+        slow = FakeProvider("Slow.", token_delay=0, first_token_delay=0,
+                            slow_rate=1.0, slow_delay=0.5, fail_first=1)
+        fast = FakeProvider("Fast.", token_delay=0, first_token_delay=0.01, fail_first=1)
+        llm = LLMInterface(provider=slow, hedge=True, hedge_delay=0.05,
+                           backoff_base=0.01, fallbacks=[{"provider": fast}])
+        
+        response = asyncio.run(llm.agenerate_answer("How long?", make_context()))
+        
+        assert response["answer"] == "Fast."
+        assert response["metadata"]["attempts"] == 4
+        assert llm.latency_stats()["FakeProvider#2"]["wins"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
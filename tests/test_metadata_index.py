@@ -0,0 +1,97 @@
+"""
+Unit tests for MetadataIndex module.
+"""
+
+import numpy as np
+import pytest
+
+from src.metadata_index import MetadataFilter, MetadataIndex
+
+
+class TestMetadataIndex:
+    """Test suite for MetadataIndex class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.index = MetadataIndex()
+        self.index.add(0, [
+            {"source": "a.pdf", "pages": [1], "ingested_at": 100.0},
+            {"source": "a.pdf", "pages": [1, 2], "ingested_at": 100.0},
+            {"source": "b.pdf", "pages": [5, 6], "ingested_at": 200.0},
+        ])
+        self.index.add(3, [
+            {"source": "a.pdf", "pages": [3], "ingested_at": 300.0},
+            {"source": "c.pdf", "pages": [], "ingested_at": 300.0},
+        ])
+    
+    def test_no_restrictions(self):
+        """Test that an empty filter matches every row."""
+        assert self.index.rows(MetadataFilter()).tolist() == [0, 1, 2, 3, 4]
+    
+    def test_sources(self):
+        """Test source postings across several adds, merged and sorted."""
+        assert self.index.rows(MetadataFilter(sources=["a.pdf"])).tolist() == [0, 1, 3]
+        assert self.index.rows(MetadataFilter(sources=["b.pdf", "a.pdf"])).tolist() == \
+            [0, 1, 2, 3]
+        assert self.index.rows(MetadataFilter(sources=["missing.pdf"])).tolist() == []
+    
+    def test_page_range_overlap(self):
+        """Test that chunks spanning into the range match, pageless ones do not."""
+        assert self.index.rows(MetadataFilter(page_range=(2, 3))).tolist() == [1, 3]
+        assert self.index.rows(MetadataFilter(page_range=(6, 9))).tolist() == [2]
+    
+    def test_ingestion_window(self):
+        """Test inclusive lower and exclusive upper time bounds."""
+        where = MetadataFilter(ingested_after=200.0, ingested_before=300.0)
+        
+        assert self.index.rows(where).tolist() == [2]
+    
+    def test_combined(self):
+        """Test that restrictions are intersected."""
+        where = MetadataFilter(sources=["a.pdf"], page_range=(1, 1), ingested_after=50.0)
+        
+        assert self.index.rows(where).tolist() == [0, 1]
+    
+    def test_missing_metadata(self):
+        """Test rows without pages or ingestion time."""
+        self.index.add(5, [{"source": "d.pdf"}])
+        
+        assert self.index.rows(MetadataFilter(sources=["d.pdf"])).tolist() == [5]
+        assert 5 not in self.index.rows(MetadataFilter(ingested_after=0.0)).tolist()
+        assert len(self.index) == 6
+        assert sorted(self.index.sources()) == ["a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+    
+    def test_columns_grow_geometrically(self):
+        """Test that one-row adds reallocate the columns only log2(n) times."""
+        index = MetadataIndex()
+        column, reallocations = index._first_page, 0
+        
+        for row in range(1000):
+            index.add(row, [{"source": f"{row % 2}.pdf", "pages": [row],
+                             "ingested_at": float(row)}])
+            if index._first_page is not column:
+                column, reallocations = index._first_page, reallocations + 1
+        
+        assert reallocations <= 11
+        assert len(index) == 1000
+        assert len(index._first_page) < 2000
+        assert index.rows(MetadataFilter(page_range=(10, 12), ingested_before=12.0)).tolist() \
+            == [10, 11]
+        assert index.rows(MetadataFilter(sources=["1.pdf"])).tolist()[-2:] == [997, 999]
+    
+    def test_select_renumbers_rows(self):
+        """Test that select keeps the chosen rows' metadata, numbered from 0."""
+        index = MetadataIndex()
+        index.add(0, [{"source": "a.pdf", "pages": [1]}, {"pages": [2]},
+                      {"source": "b.pdf", "pages": [3]}, {"source": "a.pdf", "pages": [4]}])
+        
+        selected = index.select(np.array([1, 3]))
+        
+        assert len(selected) == 2
+        assert selected.rows(MetadataFilter(sources=["a.pdf"])).tolist() == [1]
+        assert selected.rows(MetadataFilter(page_range=(2, 2))).tolist() == [0]
+        assert selected.sources() == ["a.pdf"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
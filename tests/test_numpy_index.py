@@ -0,0 +1,356 @@
+"""
+Unit tests for NumpyVectorIndex module.
+"""
+
+import numpy as np
+import pytest
+
+from src import numpy_index
+from src.corpus_file import write_corpus_file
+from src.metadata_index import MetadataFilter
+from src.numpy_index import NumpyVectorIndex
+
+
+def brute_force(vectors, queries, top_k):
+    """Reference cosine top-k by full sort."""
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ vectors.T), axis=1)[:, :top_k]
+
+
+class TestNumpyVectorIndex:
+    """Test suite for NumpyVectorIndex class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(300, 16)).astype(np.float32)
+        self.queries = rng.normal(size=(7, 16)).astype(np.float32)
+        self.ids = [f"doc.pdf_chunk_{i}" for i in range(300)]
+    
+    def build(self, tmp_path, metric="cosine"):
+        index = NumpyVectorIndex(str(tmp_path / "index"), metric)
+        index.add(self.ids, [f"text {i}" for i in range(300)],
+                  [{"chunk_index": i} for i in range(300)], self.vectors)
+        return index
+    
+    def result_rows(self, results):
+        return [[r["metadata"]["chunk_index"] for r in hits] for hits in results]
+    
+    def test_exact_top_k(self, tmp_path):
+        """Test results against a full sort, for a batch of queries."""
+        index = self.build(tmp_path)
+        
+        results = index.search(self.queries, top_k=10)
+        
+        assert self.result_rows(results) == brute_force(
+            self.vectors, self.queries, 10).tolist()
+        scores = [r["score"] for r in results[0]]
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_blocked_search_matches(self, tmp_path, monkeypatch):
+        """Test that block-wise top-k merging gives the same results."""
+        index = self.build(tmp_path)
+        expected = index.search(self.queries, top_k=10)
+        
+        monkeypatch.setattr(numpy_index, "SEARCH_BLOCK_ROWS", 37)
+        
+        assert index.search(self.queries, top_k=10) == expected
+    
+    def test_dot_product_metric(self, tmp_path):
+        """Test raw inner-product scoring."""
+        index = self.build(tmp_path, metric="ip")
+        
+        results = index.search(self.queries[:1], top_k=5)
+        
+        expected = np.argsort(-(self.vectors @ self.queries[0]))[:5]
+        assert self.result_rows(results)[0] == expected.tolist()
+        assert results[0][0]["score"] == pytest.approx(
+            float(self.vectors[expected[0]] @ self.queries[0]), rel=1e-5)
+    
+    def test_delete_and_replace(self, tmp_path):
+        """Test tombstoned rows never come back and re-adds replace rows."""
+        index = self.build(tmp_path)
+        best = index.search(self.queries[:1], top_k=1)[0][0]["chunk_id"]
+        
+        index.delete([best])
+        assert best not in index
+        assert best not in [r["chunk_id"] for r in index.search(self.queries[:1], 300)[0]]
+        
+        index.add([best], ["new text"], [{"chunk_index": -1}], self.queries[:1])
+        top = index.search(self.queries[:1], top_k=1)[0][0]
+        
+        assert top["chunk_id"] == best and top["text"] == "new text"
+        assert len(index) == 300
+    
+    def test_duplicate_ids_in_one_add(self, tmp_path):
+        """Test that the last occurrence of a repeated ID wins."""
+        index = NumpyVectorIndex(str(tmp_path / "index"))
+        index.add(["a", "a"], ["first", "second"], [{}, {}], self.vectors[:2])
+        
+        results = index.search(self.vectors[:2], top_k=5)
+        
+        assert len(index) == 1
+        assert [r["text"] for r in results[0]] == ["second"]
+    
+    def test_deleted_mask_grows_geometrically(self, tmp_path):
+        """Test that single-row adds reallocate the deleted mask only log2(n) times."""
+        index = NumpyVectorIndex(str(tmp_path / "index"))
+        buffer, reallocations = index._deleted_buffer, 0
+        
+        for i in range(300):
+            index.add([self.ids[i]], [f"text {i}"], [{"chunk_index": i}], self.vectors[i:i + 1])
+            if index._deleted_buffer is not buffer:
+                buffer, reallocations = index._deleted_buffer, reallocations + 1
+        index.delete(self.ids[:3])
+        
+        assert reallocations <= 10
+        assert len(index._deleted) == 300
+        assert len(index) == 297
+        assert index.search(self.vectors[:1], top_k=1)[0][0]["chunk_id"] != self.ids[0]
+    
+    def test_persistence(self, tmp_path):
+        """Test that rows and tombstones survive a reload."""
+        index = self.build(tmp_path)
+        index.delete(self.ids[:50])
+        expected = index.search(self.queries, top_k=10)
+        
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"))
+        
+        assert len(reloaded) == 250
+        assert reloaded.search(self.queries, top_k=10) == expected
+    
+    def test_recovers_from_torn_write(self, tmp_path):
+        """Test that a partially written row is dropped on load."""
+        index = self.build(tmp_path)
+        with open(tmp_path / "index" / "rows.jsonl", "a") as f:
+            f.write('{"id": "partial"')
+        with open(tmp_path / "index" / "vectors.f32", "ab") as f:
+            f.write(b"\0" * 10)
+        
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"))
+        reloaded.add(["extra"], ["extra"], [{"chunk_index": 300}], self.queries[:1])
+        
+        assert len(reloaded) == 301
+        assert reloaded.search(self.queries[:1], 1)[0][0]["chunk_id"] == "extra"
+        assert len(NumpyVectorIndex(str(tmp_path / "index"))) == 301
+    
+    def test_compact(self, tmp_path):
+        """Test that compaction drops deleted rows but keeps results."""
+        index = self.build(tmp_path)
+        index.delete(self.ids[::2])
+        expected = index.search(self.queries, top_k=10)
+        
+        index.compact()
+        
+        assert len(index._rows) == 150
+        assert index.search(self.queries, top_k=10) == expected
+        assert NumpyVectorIndex(str(tmp_path / "index")).search(self.queries, 10) == expected
+    
+    def test_checkpoint_reload(self, tmp_path):
+        """Test that rows load from the corpus file plus the rows added after it."""
+        index = NumpyVectorIndex(str(tmp_path / "index"))
+        metadatas = [{"source": f"d{i % 3}.pdf", "pages": [i % 5 + 1], "chunk_index": i}
+                     for i in range(300)]
+        texts = [f"text {i}" for i in range(300)]
+        index.add(self.ids[:200], texts[:200], metadatas[:200], self.vectors[:200])
+        index.delete(self.ids[:10])
+        index.checkpoint()
+        index.add(self.ids[200:], texts[200:], metadatas[200:], self.vectors[200:])
+        where = MetadataFilter(sources=["d1.pdf"], page_range=(2, 3))
+        expected = index.search(self.queries, top_k=10)
+        
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"))
+        
+        assert reloaded._rows.base == 200
+        assert len(reloaded) == 290
+        assert reloaded.search(self.queries, top_k=10) == expected
+        assert reloaded.get([self.ids[5], self.ids[50], self.ids[250]]) == [
+            {"chunk_id": self.ids[i], "text": texts[i], "metadata": metadatas[i]}
+            for i in (50, 250)
+        ]
+        assert reloaded.filter_ids(where) == index.filter_ids(where)
+    
+    def test_checkpointed_rows_replaced_and_deleted(self, tmp_path):
+        """Test re-adding and deleting rows that live in the corpus file."""
+        index = self.build(tmp_path)
+        index.checkpoint()
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"))
+        
+        reloaded.add([self.ids[0]], ["replaced"], [{"chunk_index": 0}], self.vectors[:1])
+        reloaded.delete([self.ids[1], self.ids[1]])
+        
+        assert len(reloaded) == 299
+        assert self.ids[1] not in reloaded
+        assert reloaded.get([self.ids[0]])[0]["text"] == "replaced"
+        again = NumpyVectorIndex(str(tmp_path / "index"))
+        assert again.get([self.ids[0], self.ids[1]]) == reloaded.get([self.ids[0]])
+    
+    def test_checkpoint_writes_only_new_rows(self, tmp_path):
+        """Test that a checkpoint adds a segment and rotates the row log."""
+        index = self.build(tmp_path)
+        index.checkpoint()
+        first_segment = (tmp_path / "index" / "rows.1.corpus").stat()
+        
+        index.add(["extra"], ["extra"], [{"chunk_index": 300}], self.queries[:1])
+        index.checkpoint()
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"))
+        
+        assert [len(segment) for segment in index._rows.segments] == [300, 1]
+        assert (tmp_path / "index" / "rows.1.corpus").stat().st_mtime_ns == \
+            first_segment.st_mtime_ns
+        assert sorted(p.name for p in (tmp_path / "index").glob("rows*")) == [
+            "rows.1.corpus", "rows.2.corpus", "rows.2.jsonl"
+        ]
+        assert (tmp_path / "index" / "rows.2.jsonl").stat().st_size == 0
+        assert reloaded._rows.tail_rows == 0
+        assert reloaded.get(["extra", self.ids[7]]) == index.get(["extra", self.ids[7]])
+    
+    def test_checkpoint_segments_merged(self, tmp_path):
+        """Test that frequent checkpoints keep few, geometrically sized segments."""
+        index = NumpyVectorIndex(str(tmp_path / "index"))
+        for start in range(0, 300, 3):
+            rows = slice(start, start + 3)
+            index.add(self.ids[rows], [f"text {i}" for i in range(start, start + 3)],
+                      [{"chunk_index": i} for i in range(start, start + 3)], self.vectors[rows])
+            index.checkpoint()
+        expected = index.search(self.queries, top_k=10)
+        
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"))
+        
+        sizes = [len(segment) for segment in index._rows.segments]
+        assert sum(sizes) == 300
+        assert len(sizes) <= 9
+        assert all(older > newer for older, newer in zip(sizes, sizes[1:]))
+        assert reloaded.search(self.queries, top_k=10) == expected
+        assert len(list((tmp_path / "index").glob("rows*"))) == len(sizes) + 1
+    
+    def test_checkpoint_ahead_of_vectors_rejected(self, tmp_path):
+        """Test that segments holding rows missing from the vectors fail to load."""
+        index = self.build(tmp_path)
+        index.checkpoint()
+        with open(tmp_path / "index" / "vectors.f32", "r+") as f:
+            f.truncate(0)
+        
+        with pytest.raises(ValueError):
+            NumpyVectorIndex(str(tmp_path / "index"))
+    
+    def test_legacy_corpus_loaded(self, tmp_path):
+        """Test loading a single rows.corpus plus the rows.jsonl written after it."""
+        self.build(tmp_path)
+        rows_path = tmp_path / "index" / "rows.jsonl"
+        lines = rows_path.read_bytes().splitlines(keepends=True)
+        write_corpus_file(str(tmp_path / "index" / "rows.corpus"), self.ids[:100],
+                          [f"text {i}" for i in range(100)],
+                          [{"chunk_index": i} for i in range(100)],
+                          log_bytes=sum(len(line) for line in lines[:100]))
+        
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"))
+        reloaded.checkpoint()
+        
+        assert reloaded._rows.base == 300
+        assert reloaded.get([self.ids[5], self.ids[250]])[1]["text"] == "text 250"
+        assert not rows_path.exists()
+        assert not (tmp_path / "index" / "rows.corpus").exists()
+    
+    def test_reset_and_empty(self, tmp_path):
+        """Test searching an empty index."""
+        index = self.build(tmp_path)
+        index.reset()
+        
+        assert len(index) == 0
+        assert index.search(self.queries[:2], top_k=3) == [[], []]
+    
+    def test_dimension_mismatch(self, tmp_path):
+        """Test that vectors of another dimension are rejected."""
+        index = self.build(tmp_path)
+        with pytest.raises(ValueError):
+            index.add(["x"], ["x"], [{}], np.ones((1, 8)))
+    
+    def test_unsupported_metric(self, tmp_path):
+        """Test that unsupported metrics are rejected."""
+        with pytest.raises(ValueError):
+            NumpyVectorIndex(str(tmp_path / "index"), "l2")
+
+
+
+class TestCompressedSearch:
+    """Test suite for NumpyVectorIndex with compressed codes."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(1)
+        self.vectors = rng.normal(size=(600, 32)).astype(np.float32)
+        self.queries = self.vectors[:5] + 0.1 * rng.normal(size=(5, 32)).astype(np.float32)
+        self.ids = [f"doc.pdf_chunk_{i}" for i in range(600)]
+    
+    def build(self, tmp_path, compression, **options):
+        index = NumpyVectorIndex(str(tmp_path / "index"), compression=compression,
+                                 compression_train_rows=500, **options)
+        index.add(self.ids, [f"text {i}" for i in range(600)],
+                  [{"chunk_index": i} for i in range(600)], self.vectors)
+        return index
+    
+    def result_rows(self, results):
+        return [[r["metadata"]["chunk_index"] for r in hits] for hits in results]
+    
+    @pytest.mark.parametrize("compression", ["int8", "pq"])
+    def test_reranked_results_are_exact(self, tmp_path, compression):
+        """Test that re-ranking restores exact order and scores."""
+        index = self.build(tmp_path, compression, rerank_factor=10)
+        
+        results = index.search(self.queries, top_k=5)
+        
+        assert index._codes.shape[0] == 600
+        assert self.result_rows(results) == brute_force(self.vectors, self.queries, 5).tolist()
+        normalized = self.vectors[0] / np.linalg.norm(self.vectors[0])
+        query = self.queries[0] / np.linalg.norm(self.queries[0])
+        assert results[0][0]["score"] == pytest.approx(float(normalized @ query), rel=1e-5)
+    
+    def test_int8_scores_without_rerank(self, tmp_path):
+        """Test that int8 codes alone approximate the exact scores closely."""
+        index = self.build(tmp_path, "int8", rerank_factor=1)
+        
+        results = index.search(self.queries, top_k=1)
+        
+        assert self.result_rows(results) == brute_force(self.vectors, self.queries, 1).tolist()
+        query = self.queries[0] / np.linalg.norm(self.queries[0])
+        exact = float(self.vectors[0] @ query / np.linalg.norm(self.vectors[0]))
+        assert results[0][0]["score"] == pytest.approx(exact, abs=0.02)
+    
+    def test_float_search_before_training(self, tmp_path):
+        """Test that search uses floats until enough rows are stored."""
+        index = NumpyVectorIndex(str(tmp_path / "index"), compression="pq")
+        index.add(self.ids[:10], ["t"] * 10, [{}] * 10, self.vectors[:10])
+        
+        assert index._quantizer is None
+        assert index.search(self.vectors[:1], top_k=1)[0][0]["chunk_id"] == self.ids[0]
+    
+    def test_codes_persist_and_extend(self, tmp_path):
+        """Test that the quantizer reloads and later rows are encoded."""
+        index = self.build(tmp_path, "pq", rerank_factor=10)
+        extra = np.ones((1, 32), dtype=np.float32)
+        index.add(["extra"], ["extra"], [{"chunk_index": 600}], extra)
+        expected = index.search(self.queries, top_k=5)
+        
+        reloaded = NumpyVectorIndex(str(tmp_path / "index"), compression="pq",
+                                    rerank_factor=10)
+        
+        assert reloaded._codes.shape == (601, 4)
+        assert reloaded.search(self.queries, top_k=5) == expected
+        assert reloaded.search(extra, top_k=1)[0][0]["chunk_id"] == "extra"
+    
+    def test_compact_rewrites_codes(self, tmp_path):
+        """Test that compaction keeps codes aligned with the rows."""
+        index = self.build(tmp_path, "int8")
+        index.delete(self.ids[::2])
+        expected = index.search(self.queries, top_k=5)
+        
+        index.compact()
+        
+        assert index._codes.shape[0] == 300
+        assert index.search(self.queries, top_k=5) == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
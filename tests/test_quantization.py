@@ -0,0 +1,111 @@
+"""
+Unit tests for quantization module.
+"""
+
+import numpy as np
+import pytest
+
+from src.quantization import (
+    ProductQuantizer,
+    ScalarQuantizer,
+    kmeans,
+    load_quantizer,
+    make_quantizer,
+    nearest_centroid,
+    save_quantizer,
+)
+
+
+class TestKMeans:
+    """Test suite for the k-means helper."""
+    
+    def test_recovers_separated_clusters(self):
+        """Test that well-separated blobs get one centroid each."""
+        rng = np.random.default_rng(1)
+        centers = np.array([[10, 0], [0, 10], [-10, 0]], dtype=np.float32)
+        data = (centers.repeat(100, axis=0) + rng.normal(size=(300, 2))).astype(np.float32)
+        
+        centroids = kmeans(data, 3, 20, rng)
+        
+        nearest = nearest_centroid(centers, centroids)
+        assert sorted(nearest.tolist()) == [0, 1, 2]
+        np.testing.assert_allclose(centroids[nearest], centers, atol=0.5)
+    
+    def test_spherical_centroids_unit_length(self):
+        """Test that spherical k-means keeps centroids normalized."""
+        rng = np.random.default_rng(0)
+        data = rng.normal(size=(200, 8)).astype(np.float32)
+        
+        centroids = kmeans(data, 4, 10, rng, spherical=True)
+        
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+
+
+class TestQuantizers:
+    """Test suite for ScalarQuantizer and ProductQuantizer."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(1000, 16)).astype(np.float32)
+        self.queries = rng.normal(size=(4, 16)).astype(np.float32)
+    
+    def test_scalar_round_trip(self):
+        """Test that int8 codes decode to within half a step."""
+        quantizer = ScalarQuantizer()
+        quantizer.train(self.vectors)
+        
+        codes = quantizer.encode(self.vectors)
+        
+        assert codes.dtype == np.uint8 and codes.shape == (1000, 16)
+        error = np.abs(quantizer.decode(codes) - self.vectors)
+        assert (error <= quantizer.scale / 2 + 1e-6).all()
+    
+    @pytest.mark.parametrize("quantizer", [ScalarQuantizer(), ProductQuantizer(4)])
+    def test_score_matches_decoded_vectors(self, quantizer):
+        """Test that asymmetric scores equal scores against decoded vectors."""
+        quantizer.train(self.vectors, np.random.default_rng(0))
+        codes = quantizer.encode(self.vectors)
+        
+        scores = quantizer.score(self.queries, codes)
+        
+        np.testing.assert_allclose(scores, self.queries @ quantizer.decode(codes).T,
+                                   rtol=1e-4, atol=1e-4)
+    
+    def test_pq_code_size_and_error(self):
+        """Test PQ code width and that reconstruction beats the raw variance."""
+        quantizer = ProductQuantizer(4)
+        quantizer.train(self.vectors, np.random.default_rng(0))
+        
+        codes = quantizer.encode(self.vectors)
+        
+        assert codes.shape == (1000, 4)
+        error = np.mean((quantizer.decode(codes) - self.vectors) ** 2)
+        assert error < 0.5 * np.mean(self.vectors ** 2)
+    
+    def test_pq_rejects_bad_dimension(self):
+        """Test that the dimension must split evenly into subspaces."""
+        with pytest.raises(ValueError):
+            ProductQuantizer(5).train(self.vectors)
+    
+    def test_make_quantizer_defaults(self):
+        """Test the default PQ width of about 8 dimensions per byte."""
+        assert make_quantizer("pq", 384).subspaces == 48
+        assert make_quantizer("pq", 20).subspaces == 2
+        with pytest.raises(ValueError):
+            make_quantizer("fp16", 384)
+    
+    @pytest.mark.parametrize("quantizer", [ScalarQuantizer(), ProductQuantizer(4)])
+    def test_save_and_load(self, tmp_path, quantizer):
+        """Test that a saved quantizer encodes identically after loading."""
+        quantizer.train(self.vectors, np.random.default_rng(0))
+        save_quantizer(quantizer, str(tmp_path / "quantizer.npz"))
+        
+        loaded = load_quantizer(str(tmp_path / "quantizer.npz"))
+        
+        assert loaded.kind == quantizer.kind
+        np.testing.assert_array_equal(loaded.encode(self.vectors), quantizer.encode(self.vectors))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+"""
+Unit tests for QueryBatcher module.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.embeddings import EmbeddingGenerator
+from src.query_batcher import QueryEmbeddingBatcher
+
+
+class SlowModel:
+    """Encoder with a fixed per-call cost that records its batches."""
+    
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.batches = []
+        self.fail = False
+    
+    def get_sentence_embedding_dimension(self):
+        return 2
+    
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        if self.fail:
+            raise RuntimeError("encoder down")
+        time.sleep(self.delay)
+        self.batches.append(list(texts))
+        return np.array([[len(t), sum(map(ord, t))] for t in texts], dtype=np.float32)
+
+
+class TestQueryEmbeddingBatcher:
+    """Test suite for QueryEmbeddingBatcher."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.model = SlowModel()
+        self.generator = EmbeddingGenerator(model=self.model, batch_size=64)
+        self.batcher = QueryEmbeddingBatcher(self.generator, max_batch_size=8, max_wait_ms=20)
+    
+    def teardown_method(self):
+        """Stop the batcher's worker."""
+        self.batcher.close()
+    
+    def test_concurrent_queries_share_batches(self):
+        """Test that concurrent callers are encoded together and get their own rows."""
+        queries = [f"query number {i}" * (i % 3 + 1) for i in range(32)]
+        expected = self.generator.generate_embeddings(queries)
+        self.model.batches.clear()
+        
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(lambda q: self.batcher.generate_embeddings([q]), queries))
+        
+        for i, result in enumerate(results):
+            assert result.shape == (1, 2)
+            np.testing.assert_array_equal(result[0], expected[i])
+        assert len(self.model.batches) < len(queries) // 2
+        assert all(len(batch) <= 8 for batch in self.model.batches)
+        assert self.batcher.stats()["requests"] == len(queries)
+    
+    def test_lone_query_waits_at_most_max_wait(self):
+        """Test that a single query is encoded after about max_wait_ms."""
+        start = time.perf_counter()
+        result = self.batcher.generate_embeddings(["lonely"])
+        elapsed = time.perf_counter() - start
+        
+        assert result.shape == (1, 2)
+        assert 0.02 <= elapsed < 0.02 + self.model.delay + 0.1
+    
+    def test_large_requests_bypass_queue(self):
+        """Test that a request of max_batch_size texts is encoded directly."""
+        texts = [f"t{i}" for i in range(8)]
+        
+        result = self.batcher.generate_embeddings(texts)
+        
+        assert result.shape == (8, 2)
+        assert self.batcher.stats()["requests"] == 0
+        assert self.batcher._worker is None
+    
+    def test_encoder_error_reaches_every_caller(self):
+        """Test that a failed batch raises in each of its callers."""
+        self.model.fail = True
+        errors = []
+        
+        def ask(i):
+            try:
+                self.batcher.generate_embeddings([f"q{i}"])
+            except RuntimeError as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=ask, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(errors) == 4
+        self.model.fail = False
+        assert self.batcher.generate_embeddings(["recovered"]).shape == (1, 2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
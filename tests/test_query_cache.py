@@ -0,0 +1,122 @@
+"""
+Unit tests for QueryCache module.
+"""
+
+import pytest
+
+from src.query_cache import QueryCache, normalize_question
+
+
+class FakeClock:
+    """Manually advanced time source."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCache:
+    """Test suite for QueryCache."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.cache = QueryCache(max_entries=3, ttl_seconds=60, similarity_threshold=0.9,
+                                clock=self.clock)
+        self.response = {"answer": "30 days", "sources": [], "metadata": {}}
+    
+    def test_normalize_question(self):
+        """Test case, whitespace and trailing punctuation folding."""
+        assert normalize_question("  What is  the NOTICE period?? ") == \
+            "what is the notice period"
+    
+    def test_exact_hit(self):
+        """Test a hit on the normalized question text."""
+        self.cache.put("What is the notice period?", None, self.response)
+        
+        hit = self.cache.get("what is the notice period")
+        
+        assert hit["answer"] == "30 days"
+        assert hit["metadata"]["cache"] == "exact"
+        assert self.response["metadata"] == {}
+    
+    def test_responses_copied(self):
+        """Test that mutating a stored or served response leaves the cache intact."""
+        response = {"answer": "30 days", "sources": [{"source": "a.pdf"}], "metadata": {}}
+        self.cache.put("notice period", None, response)
+        response["sources"][0]["source"] = "changed.pdf"
+        
+        first = self.cache.get("notice period")
+        first["answer"] = "mutated"
+        first["sources"].append({"source": "b.pdf"})
+        second = self.cache.get("notice period")
+        
+        assert second["answer"] == "30 days"
+        assert second["sources"] == [{"source": "a.pdf"}]
+        assert response["metadata"] == {}
+    
+    def test_semantic_hit_above_threshold(self):
+        """Test that a close embedding hits and a distant one misses."""
+        self.cache.put("What is the notice period?", [1.0, 0.0], self.response)
+        
+        hit = self.cache.get("How long is the notice?", [0.95, 0.1])
+        miss = self.cache.get("Who pays shipping?", [0.5, 0.5])
+        
+        assert hit["metadata"]["cache"] == "semantic"
+        assert miss is None
+    
+    def test_context_must_match(self):
+        """Test that answers stored under another context are not served."""
+        self.cache.put("notice period", [1.0, 0.0], self.response, context=5)
+        
+        assert self.cache.get("notice period", [1.0, 0.0], context=10) is None
+        assert self.cache.get("notice period", [1.0, 0.0], context=5) is not None
+    
+    def test_ttl_expiry(self):
+        """Test that entries older than the TTL are dropped."""
+        self.cache.put("notice period", [1.0, 0.0], self.response)
+        self.clock.now += 61
+        
+        assert self.cache.get("notice period") is None
+        assert self.cache.get("notice", [1.0, 0.0]) is None
+        assert self.cache.stats()["expirations"] == 1
+        assert len(self.cache) == 0
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        for i, question in enumerate(["q1", "q2", "q3"]):
+            self.cache.put(question, [1.0, float(i)], self.response)
+        self.cache.get("q1")
+        
+        self.cache.put("q4", [0.0, 1.0], self.response)
+        
+        assert self.cache.get("q2") is None
+        assert self.cache.get("q1") is not None
+        assert self.cache.stats()["evictions"] == 1
+    
+    def test_invalidate(self):
+        """Test that invalidation empties both levels."""
+        self.cache.put("notice period", [1.0, 0.0], self.response)
+        
+        self.cache.invalidate()
+        
+        assert self.cache.get("notice period", [1.0, 0.0]) is None
+        assert len(self.cache) == 0
+    
+    def test_stats(self):
+        """Test hit-rate metrics per level."""
+        self.cache.put("notice period", [1.0, 0.0], self.response)
+        self.cache.get("notice period")
+        self.cache.get("the notice", [1.0, 0.01])
+        self.cache.get("shipping", [0.0, 1.0])
+        
+        stats = self.cache.stats()
+        
+        assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 1)
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,703 @@
+"""
+Unit tests for RAGPipeline module.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import fitz
+import numpy as np
+import pytest
+
+from src.bm25_index import BM25Index
+from src.context_builder import ContextBuilder
+from src.deduplication import ChunkDeduplicator
+from src.llm_interface import FakeProvider, LLMInterface
+from src.query_cache import QueryCache
+from src.document_processor import DocumentProcessor, document_key
+from src.rag_pipeline import RAGPipeline
+from src.retriever import Retriever
+from src.vector_store import VectorStore
+
+
+def write_pdf(path, pages):
+    """Write a small PDF with one text line per page."""
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+class FakeEmbeddingGenerator:
+    """Embeds text as a tiny deterministic vector and counts calls."""
+    
+    def __init__(self):
+        self.embedded = []
+    
+    def generate_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+class FakeVectorStore:
+    """In-memory vector store recording adds and deletes."""
+    
+    def __init__(self, persist_dir):
+        self.persist_dir = persist_dir
+        self.chunks = {}
+        self.deleted = []
+        self.checkpoints = 0
+    
+    def add_documents(self, chunks, embeddings):
+        assert len(chunks) == len(embeddings)
+        for chunk in chunks:
+            self.chunks[chunk.chunk_id] = chunk
+    
+    def delete(self, chunk_ids):
+        self.deleted.extend(chunk_ids)
+        for chunk_id in chunk_ids:
+            self.chunks.pop(chunk_id, None)
+    
+    def get(self, chunk_ids):
+        return [
+            {"chunk_id": chunk_id, "text": self.chunks[chunk_id].text,
+             "metadata": self.chunks[chunk_id].metadata}
+            for chunk_id in chunk_ids if chunk_id in self.chunks
+        ]
+    
+    def checkpoint(self):
+        self.checkpoints += 1
+    
+    def reset(self):
+        self.chunks = {}
+
+
+class TestIncrementalIndexing:
+    """Test suite for RAGPipeline.process_documents."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor(chunk_size=60, chunk_overlap=10)
+        self.embedder = FakeEmbeddingGenerator()
+    
+    def make_pipeline(self, tmp_path):
+        self.store = FakeVectorStore(str(tmp_path / "db"))
+        return RAGPipeline(self.processor, self.embedder, self.store, None, None)
+    
+    def make_docs(self, tmp_path):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        write_pdf(docs / "a.pdf", ["Alpha document text about apples. " * 3])
+        write_pdf(docs / "b.pdf", ["Beta document text about bananas. " * 3] * 2)
+        return docs
+    
+    def test_first_run_indexes_everything(self, tmp_path):
+        """Test that a fresh index processes every PDF."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["added"] == 2
+        assert summary["chunks"] == len(self.store.chunks) > 0
+        assert os.path.exists(pipeline.manifest_path)
+        assert self.store.checkpoints == 1
+    
+    def test_rerun_skips_unchanged(self, tmp_path):
+        """Test that unchanged files are neither re-chunked nor re-embedded."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        embedded = len(self.embedder.embedded)
+        
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["unchanged"] == 2
+        assert summary["chunks"] == 0
+        assert len(self.embedder.embedded) == embedded
+    
+    def test_touched_file_with_same_content_skipped(self, tmp_path):
+        """Test that a new mtime alone does not trigger re-indexing."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        stat = os.stat(docs / "a.pdf")
+        os.utime(docs / "a.pdf", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["unchanged"] == 2
+    
+    def test_modified_file_replaces_only_its_chunks(self, tmp_path):
+        """Test that a modified file's old chunks are deleted and replaced."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        old_b = {k for k in self.store.chunks if k.startswith("b.pdf")}
+        
+        write_pdf(docs / "a.pdf", ["Completely new apple text. " * 6])
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["modified"] == 1 and summary["unchanged"] == 1
+        assert all(k.startswith("a.pdf") for k in self.store.deleted)
+        assert {k for k in self.store.chunks if k.startswith("b.pdf")} == old_b
+        assert any("new apple" in c.text for c in self.store.chunks.values())
+    
+    def test_deleted_file_purged(self, tmp_path):
+        """Test that chunks of removed files are deleted from the store."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        
+        os.remove(docs / "b.pdf")
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["deleted"] == 1
+        assert self.store.chunks
+        assert not any(k.startswith("b.pdf") for k in self.store.chunks)
+    
+    def test_other_directory_kept(self, tmp_path):
+        """Test that indexing a second directory does not purge the first."""
+        docs = self.make_docs(tmp_path)
+        more = tmp_path / "more"
+        more.mkdir()
+        write_pdf(more / "c.pdf", ["Gamma document text about cherries. " * 3])
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        
+        summary = pipeline.process_documents(str(more))
+        again = pipeline.process_documents(str(docs))
+        
+        assert summary["added"] == 1 and summary["deleted"] == 0
+        assert self.store.deleted == []
+        assert {k.split("@")[0] for k in self.store.chunks} == {"a.pdf", "b.pdf", "c.pdf"}
+        assert again["unchanged"] == 2 and again["deleted"] == 0
+    
+    def test_same_name_in_two_directories(self, tmp_path):
+        """Test that same-named files in different directories keep separate chunks."""
+        first, second = tmp_path / "a", tmp_path / "b"
+        first.mkdir()
+        second.mkdir()
+        write_pdf(first / "report.pdf", ["First report about apples. " * 3])
+        write_pdf(second / "report.pdf", ["Second report about bananas. " * 3])
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(first))
+        pipeline.process_documents(str(second))
+        first_ids = {k for k in self.store.chunks if k.startswith(document_key(
+            str(first / "report.pdf")))}
+        
+        write_pdf(second / "report.pdf", ["Second report, revised, about cherries. " * 3])
+        modified = pipeline.process_documents(str(second))
+        again = pipeline.process_documents(str(first))
+        
+        assert first_ids and len(self.store.chunks) > len(first_ids)
+        assert modified["modified"] == 1
+        assert first_ids <= set(self.store.chunks)
+        assert not first_ids & set(self.store.deleted)
+        assert again["unchanged"] == 1
+        assert any("cherries" in chunk.text for chunk in self.store.chunks.values())
+        assert not any("bananas" in chunk.text for chunk in self.store.chunks.values())
+    
+    def test_failed_file_retried_next_run(self, tmp_path):
+        """Test that unreadable files are not recorded as indexed."""
+        docs = self.make_docs(tmp_path)
+        (docs / "broken.pdf").write_bytes(b"not a pdf")
+        pipeline = self.make_pipeline(tmp_path)
+        
+        first = pipeline.process_documents(str(docs))
+        second = pipeline.process_documents(str(docs))
+        
+        assert first["failed"] == 1
+        assert second["added"] == 1 and second["failed"] == 1
+    
+    def test_force_reindexes(self, tmp_path):
+        """Test that force re-processes unchanged files."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        
+        summary = pipeline.process_documents(str(docs), force=True)
+        
+        assert summary["modified"] == 2
+    
+    def test_lexical_index_kept_in_sync(self, tmp_path):
+        """Test that the BM25 index follows adds, modifications and deletes."""
+        docs = self.make_docs(tmp_path)
+        self.store = FakeVectorStore(str(tmp_path / "db"))
+        lexical = BM25Index(str(tmp_path / "bm25"))
+        pipeline = RAGPipeline(self.processor, self.embedder, self.store, None, None,
+                               lexical_index=lexical)
+        pipeline.process_documents(str(docs))
+        assert len(lexical) == len(self.store.chunks)
+        
+        write_pdf(docs / "a.pdf", ["Completely new cherry text. " * 6])
+        os.remove(docs / "b.pdf")
+        pipeline.process_documents(str(docs))
+        
+        reloaded = BM25Index(str(tmp_path / "bm25"))
+        assert len(reloaded) == len(self.store.chunks)
+        assert reloaded.search("bananas") == reloaded.search("apples") == []
+        assert reloaded.search("cherry")[0][0].startswith("a.pdf")
+    
+    def test_reset_forgets_files(self, tmp_path):
+        """Test that reset clears the manifest so everything is re-indexed."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        
+        pipeline.reset()
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["added"] == 2
+    
+    def test_missing_path(self, tmp_path):
+        """Test error handling for a path that does not exist."""
+        pipeline = self.make_pipeline(tmp_path)
+        with pytest.raises(ValueError):
+            pipeline.process_documents(str(tmp_path / "missing"))
+
+
+class TestDeduplication:
+    """Test suite for ingestion with a ChunkDeduplicator."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = DocumentProcessor(chunk_size=200, chunk_overlap=0)
+        self.embedder = FakeEmbeddingGenerator()
+    
+    def make_pipeline(self, tmp_path, retriever=None, llm=None):
+        self.store = FakeVectorStore(str(tmp_path / "db"))
+        self.deduplicator = ChunkDeduplicator(str(tmp_path / "dedup"))
+        return RAGPipeline(self.processor, self.embedder, self.store, retriever, llm,
+                           deduplicator=self.deduplicator,
+                           context_builder=ContextBuilder(max_tokens=1000))
+    
+    def make_docs(self, tmp_path):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        policy = "The retention policy keeps audit records for seven years."
+        write_pdf(docs / "a.pdf", [policy])
+        write_pdf(docs / "b.pdf", [policy.upper()])
+        write_pdf(docs / "c.pdf", [policy])
+        write_pdf(docs / "d.pdf", ["Unrelated notes about the cafeteria menu."])
+        self.ids = {name: f"{document_key(str(docs / name))}_chunk_0"
+                    for name in ("a.pdf", "b.pdf", "c.pdf", "d.pdf")}
+        return docs
+    
+    def test_duplicates_stored_once(self, tmp_path):
+        """Test that repeated chunks are embedded once and recorded as aliases."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["chunks"] == 4
+        assert summary["duplicates"] == 2
+        assert sorted(self.store.chunks) == [self.ids["a.pdf"], self.ids["d.pdf"]]
+        assert len(self.embedder.embedded) == 2
+        assert [m["source"] for m in self.deduplicator.aliases(self.ids["a.pdf"])] == \
+            ["b.pdf", "c.pdf"]
+        assert len(ChunkDeduplicator(str(tmp_path / "dedup"))) == 2
+    
+    def test_deleting_canonical_promotes_alias(self, tmp_path):
+        """Test that a cluster stays searchable when its stored copy's file goes away."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        
+        os.remove(docs / "a.pdf")
+        pipeline.process_documents(str(docs))
+        
+        assert sorted(self.store.chunks) == [self.ids["b.pdf"], self.ids["d.pdf"]]
+        promoted = self.store.chunks[self.ids["b.pdf"]]
+        assert "retention policy" in promoted.text
+        assert promoted.metadata["source"] == "b.pdf"
+        assert [m["source"] for m in self.deduplicator.aliases(self.ids["b.pdf"])] == ["c.pdf"]
+    
+    def test_deleting_alias_keeps_canonical(self, tmp_path):
+        """Test that removing a duplicate only drops its alias."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        embedded = len(self.embedder.embedded)
+        
+        os.remove(docs / "c.pdf")
+        pipeline.process_documents(str(docs))
+        
+        assert self.ids["a.pdf"] in self.store.chunks
+        assert len(self.embedder.embedded) == embedded
+        assert [m["source"] for m in self.deduplicator.aliases(self.ids["a.pdf"])] == ["b.pdf"]
+    
+    def test_sources_list_aliases(self, tmp_path):
+        """Test that answers cite every document holding the passage."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        chunk = self.store.chunks[self.ids["a.pdf"]]
+        pipeline.retriever = FakeRetriever([{"chunk_id": chunk.chunk_id, "text": chunk.text,
+                                             "metadata": chunk.metadata, "score": 0.9}])
+        pipeline.llm_interface = FakeLLM()
+        
+        response = pipeline.query("How long are audit records kept?")
+        
+        assert response["sources"][0]["source"] == "a.pdf"
+        assert response["sources"][0]["aliases"] == [
+            {"source": "b.pdf", "pages": [1]}, {"source": "c.pdf", "pages": [1]},
+        ]
+    
+    def test_source_filter_matches_aliases(self, tmp_path):
+        """Test that filtering on a deduplicated document finds its stored copy."""
+        docs = self.make_docs(tmp_path)
+        store = VectorStore(str(tmp_path / "db"), provider="numpy")
+        deduplicator = ChunkDeduplicator(str(tmp_path / "dedup"))
+        retriever = Retriever(store, self.embedder, deduplicator=deduplicator)
+        pipeline = RAGPipeline(self.processor, self.embedder, store, retriever, None,
+                               deduplicator=deduplicator)
+        pipeline.process_documents(str(docs))
+        
+        shared = retriever.retrieve("audit records", sources=["b.pdf"])
+        own = retriever.retrieve("audit records", sources=["d.pdf"])
+        other_page = retriever.retrieve("audit records", sources=["b.pdf"], pages=2)
+        
+        assert [r["chunk_id"] for r in shared] == [self.ids["a.pdf"]]
+        assert [r["chunk_id"] for r in own] == [self.ids["d.pdf"]]
+        assert other_page == []
+    
+    def test_failed_run_registers_nothing(self, tmp_path):
+        """Test that chunks never stored are not kept as duplicates for the retry."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        
+        def disk_full(chunks, embeddings):
+            raise RuntimeError("disk full")
+        
+        self.store.add_documents = disk_full
+        with pytest.raises(RuntimeError, match="disk full"):
+            pipeline.process_documents(str(docs))
+        del self.store.add_documents
+        
+        summary = pipeline.process_documents(str(docs))
+        
+        assert summary["chunks"] == 4 and summary["duplicates"] == 2
+        assert sorted(self.store.chunks) == [self.ids["a.pdf"], self.ids["d.pdf"]]
+        assert self.deduplicator.canonical(self.ids["a.pdf"]) is None
+        assert len(ChunkDeduplicator(str(tmp_path / "dedup"))) == 2
+    
+    def test_reset_forgets_duplicates(self, tmp_path):
+        """Test that reset clears the deduplicator with the store."""
+        docs = self.make_docs(tmp_path)
+        pipeline = self.make_pipeline(tmp_path)
+        pipeline.process_documents(str(docs))
+        
+        pipeline.reset()
+        
+        assert len(self.deduplicator) == 0
+        assert self.deduplicator.aliases(self.ids["a.pdf"]) == []
+
+
+
+class FakeRetriever:
+    """Returns fixed results and counts calls."""
+    
+    def __init__(self, results, embedding_generator=None):
+        self.results = results
+        self.embedding_generator = embedding_generator
+        self.calls = 0
+        self.batched = []
+    
+    def retrieve(self, query, top_k=5, query_embedding=None):
+        self.calls += 1
+        return self.results[:top_k]
+    
+    def retrieve_batch(self, queries, top_k=5, query_embeddings=None):
+        self.calls += 1
+        self.batched.append(list(queries))
+        if any("fail retrieval" in q for q in queries):
+            raise RuntimeError("index unavailable")
+        return [self.results[:top_k] for _ in queries]
+
+
+class FakeLLM:
+    """Records the context it was given."""
+    
+    def generate_answer(self, query, context_chunks, conversation_history=None):
+        self.context = context_chunks
+        return {"answer": f"{len(context_chunks)} passages", "sources": []}
+
+
+class TestQuery:
+    """Test suite for RAGPipeline.query."""
+    
+    def test_context_is_merged_and_packed(self):
+        """Test that overlapping retrieved chunks reach the LLM once."""
+        processor = DocumentProcessor(chunk_size=60, chunk_overlap=20)
+        chunks = processor.create_chunks({1: "Alpha document text about apples. " * 4}, "a.pdf")
+        results = [
+            {"chunk_id": c.chunk_id, "text": c.text, "metadata": c.metadata, "score": 0.5}
+            for c in chunks
+        ]
+        llm = FakeLLM()
+        pipeline = RAGPipeline(None, None, None, FakeRetriever(results), llm,
+                               context_builder=ContextBuilder(max_tokens=1000))
+        
+        response = pipeline.query("What about apples?", top_k=len(results))
+        
+        assert response["answer"] == "1 passages"
+        assert llm.context[0]["text"] == ("Alpha document text about apples. " * 4).strip()
+        assert response["sources"] == [{"source": "a.pdf", "pages": [1], "score": 0.5}]
+        assert response["metadata"]["retrieved_chunks"] == len(chunks)
+        assert response["metadata"]["context_tokens"] == llm.context[0]["tokens"]
+    
+    def test_query_cache(self, tmp_path):
+        """Test cache hits, history bypass and invalidation on re-indexing."""
+        results = [{"chunk_id": "a", "text": "apples", "metadata": {}, "score": 1.0}]
+        retriever = FakeRetriever(results, FakeEmbeddingGenerator())
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        pipeline = RAGPipeline(DocumentProcessor(chunk_size=60, chunk_overlap=10),
+                               FakeEmbeddingGenerator(), FakeVectorStore(str(tmp_path)),
+                               retriever, FakeLLM(), query_cache=QueryCache())
+        
+        first = pipeline.query("What about apples?")
+        again = pipeline.query("what about apples")
+        pipeline.query("What about apples?", conversation_history=[("hi", "hello")])
+        
+        assert first["metadata"]["cache"] == "miss"
+        assert again["metadata"]["cache"] == "exact"
+        assert again["question"] == "what about apples"
+        assert retriever.calls == 2
+        
+        pipeline.process_documents(str(docs))
+        assert len(pipeline.query_cache) == 1
+        write_pdf(docs / "a.pdf", ["Alpha document text about apples."])
+        pipeline.process_documents(str(docs))
+        
+        assert len(pipeline.query_cache) == 0
+        assert pipeline.query("What about apples?")["metadata"]["cache"] == "miss"
+    
+    def test_query_stream(self):
+        """Test token events, the final answer event and time to first token."""
+        results = [{"chunk_id": "a", "text": "apples", "metadata": {"source": "a.pdf"},
+                    "score": 1.0}]
+        llm = LLMInterface(provider=FakeProvider("Apples are red [1].", token_delay=0.01,
+                                                 first_token_delay=0.05))
+        pipeline = RAGPipeline(None, None, None, FakeRetriever(results), llm,
+                               context_builder=ContextBuilder(max_tokens=100))
+        
+        events = list(pipeline.query_stream("What about apples?"))
+        
+        assert [e["type"] for e in events] == ["token"] * 4 + ["answer"]
+        final = events[-1]
+        assert final["answer"] == "".join(e["text"] for e in events[:-1])
+        assert final["sources"][0]["source"] == "a.pdf"
+        metadata = final["metadata"]
+        assert 0.05 <= metadata["time_to_first_token"] < metadata["llm"]["latency"]
+    
+    def test_query_stream_cache_hit(self, tmp_path):
+        """Test that a cached answer is streamed as a single token."""
+        results = [{"chunk_id": "a", "text": "apples", "metadata": {}, "score": 1.0}]
+        retriever = FakeRetriever(results, FakeEmbeddingGenerator())
+        llm = LLMInterface(provider=FakeProvider("Red.", token_delay=0, first_token_delay=0))
+        pipeline = RAGPipeline(None, None, None, retriever, llm, query_cache=QueryCache())
+        list(pipeline.query_stream("What about apples?"))
+        
+        events = list(pipeline.query_stream("What about apples?"))
+        
+        assert events[0] == {"type": "token", "text": "Red."}
+        assert events[1]["metadata"]["cache"] == "exact"
+        assert retriever.calls == 1
+
+
+class CountingLLM:
+    """Async LLM that records the peak number of concurrent calls."""
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+    
+    async def agenerate_answer(self, query, context_chunks, conversation_history=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return {"answer": query, "sources": []}
+
+
+class TestAsyncQuery:
+    """Test suite for RAGPipeline.aquery."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.results = [{"chunk_id": "a", "text": "apples", "metadata": {"source": "a.pdf"},
+                         "score": 1.0}]
+    
+    def test_aquery_matches_query(self):
+        """Test that aquery returns the same result shape as query."""
+        llm = LLMInterface(provider=FakeProvider("Apples are red [1].", token_delay=0,
+                                                 first_token_delay=0))
+        pipeline = RAGPipeline(None, None, None, FakeRetriever(self.results), llm)
+        
+        result = asyncio.run(pipeline.aquery("What about apples?"))
+        pipeline.close()
+        
+        expected = pipeline.query("What about apples?")
+        assert result["answer"] == expected["answer"]
+        assert result["sources"] == expected["sources"]
+        assert result["metadata"]["context_passages"] == 1
+        assert result["metadata"]["queue_wait"] >= 0
+    
+    def test_concurrency_is_bounded(self):
+        """Test that at most max_concurrency queries run at once."""
+        llm = CountingLLM(delay=0.02)
+        pipeline = RAGPipeline(None, None, None, FakeRetriever(self.results), llm,
+                               max_concurrency=4)
+        
+        async def ask_all():
+            return await asyncio.gather(*[pipeline.aquery(f"Q{i}") for i in range(16)])
+        
+        start = time.perf_counter()
+        results = asyncio.run(ask_all())
+        elapsed = time.perf_counter() - start
+        pipeline.close()
+        
+        assert [r["answer"] for r in results] == [f"Q{i}" for i in range(16)]
+        assert llm.peak == 4
+        assert elapsed >= 4 * 0.02
+        assert max(r["metadata"]["queue_wait"] for r in results) >= 0.02
+    
+    def test_retrieval_runs_off_the_event_loop(self):
+        """Test that blocking retrieval runs in the pipeline's thread pool."""
+        threads = []
+        
+        class ThreadRecordingRetriever(FakeRetriever):
+            def retrieve(self, query, top_k=5, query_embedding=None):
+                threads.append(threading.current_thread().name)
+                return super().retrieve(query, top_k, query_embedding)
+        
+        pipeline = RAGPipeline(None, None, None, ThreadRecordingRetriever(self.results),
+                               CountingLLM(delay=0))
+        asyncio.run(pipeline.aquery("What about apples?"))
+        pipeline.close()
+        
+        assert threads[0].startswith("rag-retrieval")
+    
+    def test_aquery_cache_hit(self):
+        """Test that aquery serves repeated questions from the query cache."""
+        retriever = FakeRetriever(self.results, FakeEmbeddingGenerator())
+        pipeline = RAGPipeline(None, None, None, retriever, CountingLLM(delay=0),
+                               query_cache=QueryCache())
+        
+        async def ask_twice():
+            await pipeline.aquery("What about apples?")
+            return await pipeline.aquery("what about apples")
+        
+        result = asyncio.run(ask_twice())
+        pipeline.close()
+        
+        assert result["metadata"]["cache"] == "exact"
+        assert retriever.calls == 1
+
+
+
+class EchoLLM:
+    """Answers with the question after a delay; fails on request."""
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+    
+    def generate_answer(self, query, context_chunks, conversation_history=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if "fail" in query:
+            raise RuntimeError("provider down")
+        return {"answer": query.upper(), "sources": []}
+
+
+class TestQueryBatch:
+    """Test suite for RAGPipeline.query_batch."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.results = [{"chunk_id": "a", "text": "apples", "metadata": {"source": "a.pdf"},
+                         "score": 1.0}]
+        self.embedder = FakeEmbeddingGenerator()
+        self.retriever = FakeRetriever(self.results, self.embedder)
+    
+    def test_answers_every_question(self):
+        """Test that each question gets its answer and id, with batched retrieval."""
+        pipeline = RAGPipeline(None, None, None, self.retriever, EchoLLM())
+        questions = [f"question {i}" for i in range(10)]
+        
+        results = list(pipeline.query_batch(questions, retrieval_batch_size=4))
+        
+        assert sorted(r["id"] for r in results) == list(range(10))
+        assert all(r["answer"] == questions[r["id"]].upper() for r in results)
+        assert self.retriever.calls == 3
+        assert len(self.embedder.embedded) == 10
+    
+    def test_bounded_concurrency(self):
+        """Test that LLM calls overlap but never exceed max_concurrency."""
+        llm = EchoLLM(delay=0.02)
+        pipeline = RAGPipeline(None, None, None, self.retriever, llm)
+        
+        start = time.perf_counter()
+        results = list(pipeline.query_batch([f"q{i}" for i in range(16)], max_concurrency=4))
+        elapsed = time.perf_counter() - start
+        
+        assert len(results) == 16
+        assert llm.peak == 4
+        assert elapsed < 16 * 0.02
+    
+    def test_failures_do_not_stop_the_batch(self):
+        """Test that failed questions yield error results."""
+        pipeline = RAGPipeline(None, None, None, self.retriever, EchoLLM())
+        questions = [{"id": "ok", "question": "fine"}, {"id": "bad", "question": "fail me"}]
+        
+        results = {r["id"]: r for r in pipeline.query_batch(questions)}
+        
+        assert results["ok"]["answer"] == "FINE"
+        assert results["bad"]["error"] == "provider down"
+        failed_group = list(pipeline.query_batch(["fail retrieval"]))
+        assert failed_group == [{"id": 0, "question": "fail retrieval",
+                                 "error": "index unavailable"}]
+    
+    def test_query_cache(self):
+        """Test that batch answers are cached and served from the cache."""
+        pipeline = RAGPipeline(None, None, None, self.retriever, EchoLLM(),
+                               query_cache=QueryCache())
+        list(pipeline.query_batch(["What about apples?"]))
+        
+        results = list(pipeline.query_batch(["what about apples"]))
+        
+        assert results[0]["metadata"]["cache"] == "exact"
+        assert results[0]["answer"] == "WHAT ABOUT APPLES?"
+    
+    def test_retrieves_only_cache_misses(self):
+        """Test that cached questions are not retrieved for, nor an all-cached group."""
+        pipeline = RAGPipeline(None, None, None, self.retriever, EchoLLM(),
+                               query_cache=QueryCache(similarity_threshold=1.1))
+        list(pipeline.query_batch(["What about apples?"]))
+        
+        mixed = {r["id"]: r for r in pipeline.query_batch(["what about apples", "pears?"])}
+        cached = list(pipeline.query_batch(["What about apples?", "pears?"]))
+        
+        assert self.retriever.batched == [["What about apples?"], ["pears?"]]
+        assert mixed[0]["metadata"]["cache"] == "exact"
+        assert mixed[1]["answer"] == "PEARS?"
+        assert {r["metadata"]["cache"] for r in cached} == {"exact"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
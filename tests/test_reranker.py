@@ -0,0 +1,126 @@
+"""
+Unit tests for Reranker module.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the number of query words in the passage."""
+    
+    def __init__(self, delay_event=None):
+        self.calls = []
+        self.delay_event = delay_event
+    
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append(list(pairs))
+        if self.delay_event is not None:
+            self.delay_event.wait(5)
+        return np.array([
+            sum(word in passage.split() for word in query.split())
+            for query, passage in pairs
+        ], dtype=np.float32)
+
+
+def make_results():
+    return [
+        {"chunk_id": "a", "text": "payment schedule", "metadata": {}, "score": 0.9},
+        {"chunk_id": "b", "text": "termination notice period", "metadata": {}, "score": 0.8},
+        {"chunk_id": "c", "text": "notice of termination", "metadata": {}, "score": 0.7},
+    ]
+
+
+class TestCrossEncoderReranker:
+    """Test suite for CrossEncoderReranker."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.model = FakeCrossEncoder()
+        self.results = make_results()
+    
+    def test_reorders_by_cross_encoder_score(self):
+        """Test re-ordering, score replacement and one batched call."""
+        reranker = CrossEncoderReranker(model=self.model)
+        
+        ranked = reranker.rerank("termination notice", self.results, top_k=2)
+        
+        assert [r["chunk_id"] for r in ranked] == ["b", "c"]
+        assert ranked[0]["score"] == 2.0
+        assert ranked[0]["retrieval_score"] == 0.8
+        assert len(self.model.calls) == 1 and len(self.model.calls[0]) == 3
+    
+    def test_scores_cached_per_query_and_chunk(self):
+        """Test that repeated pairs are not scored again."""
+        reranker = CrossEncoderReranker(model=self.model)
+        reranker.rerank("termination notice", self.results[:2])
+        
+        reranker.rerank("termination notice", self.results)
+        
+        assert [len(call) for call in self.model.calls] == [2, 1]
+        assert self.model.calls[1][0][1] == "notice of termination"
+    
+    def test_cache_is_bounded(self):
+        """Test LRU eviction once cache_size is reached."""
+        reranker = CrossEncoderReranker(model=self.model, cache_size=2)
+        
+        reranker.rerank("termination", self.results)
+        
+        assert [key[:2] for key in reranker._cache] == [("termination", "b"),
+                                                        ("termination", "c")]
+    
+    def test_changed_text_rescored(self):
+        """Test that a chunk re-indexed with new text is not served a stale score."""
+        reranker = CrossEncoderReranker(model=self.model)
+        reranker.rerank("termination", self.results)
+        changed = [{**self.results[0], "text": "termination fee"}] + self.results[1:]
+        
+        ranked = reranker.rerank("termination", changed, top_k=3)
+        
+        assert [len(call) for call in self.model.calls] == [3, 1]
+        assert {r["chunk_id"]: r["score"] for r in ranked}["a"] == 1.0
+    
+    def test_passages_truncated_to_budget(self):
+        """Test that long chunks are cut before scoring."""
+        reranker = CrossEncoderReranker(model=self.model, max_length=4)
+        long_text = " ".join(f"w{i}" for i in range(100))
+        
+        reranker.rerank("w1", [{"chunk_id": "x", "text": long_text, "score": 1.0}])
+        
+        assert self.model.calls[0][0][1] == "w0 w1 w2 w3"
+    
+    def test_batches(self):
+        """Test that more candidates than batch_size are split into batches."""
+        reranker = CrossEncoderReranker(model=self.model, batch_size=2)
+        
+        ranked = reranker.rerank("notice", self.results, top_k=3)
+        
+        assert [len(call) for call in self.model.calls] == [2, 1]
+        assert {r["chunk_id"] for r in ranked[:2]} == {"b", "c"}
+    
+    def test_timeout_falls_back_to_first_stage_order(self):
+        """Test the latency cap, and that late scores still reach the cache."""
+        release = threading.Event()
+        model = FakeCrossEncoder(delay_event=release)
+        reranker = CrossEncoderReranker(model=model, timeout=0.05)
+        
+        ranked = reranker.rerank("termination notice", self.results, top_k=2)
+        release.set()
+        reranker._executor.shutdown(wait=True)
+        
+        assert [r["chunk_id"] for r in ranked] == ["a", "b"]
+        assert ranked[0]["score"] == 0.9
+        assert reranker.timeouts == 1
+        assert len(reranker._cache) == 3
+    
+    def test_empty(self):
+        """Test that no candidates give no results."""
+        assert CrossEncoderReranker(model=self.model).rerank("query", []) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
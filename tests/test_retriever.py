@@ -0,0 +1,213 @@
+"""
+Unit tests for Retriever module.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.bm25_index import BM25Index
+from src.document_processor import DocumentChunk
+from src.reranker import CrossEncoderReranker
+from src.retriever import Retriever
+from src.vector_store import VectorStore
+
+
+class FakeEmbeddingGenerator:
+    """Embeds a text as a fixed vector looked up by its first word."""
+    
+    def __init__(self, vectors):
+        self.vectors = vectors
+    
+    def generate_embeddings(self, texts, batch_size=None):
+        return np.array([self.vectors[text.split()[0]] for text in texts], dtype=np.float32)
+
+
+class TestRetriever:
+    """Test suite for Retriever class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(0)
+        self.topic = rng.normal(size=8).astype(np.float32)
+        self.embedder = FakeEmbeddingGenerator({"termination": self.topic})
+    
+    def build(self, tmp_path):
+        store = VectorStore(str(tmp_path), provider="numpy")
+        rng = np.random.default_rng(1)
+        chunks, vectors = [], []
+        # 200 near-duplicates of the topic in other.pdf outrank contract.pdf
+        for i in range(200):
+            chunks.append(DocumentChunk(f"other {i}", {"source": "other.pdf", "pages": [1]},
+                                        f"other.pdf_chunk_{i}"))
+            vectors.append(self.topic + 0.01 * rng.normal(size=8))
+        for i in range(10):
+            chunks.append(DocumentChunk(f"contract {i}",
+                                        {"source": "contract.pdf", "pages": [i + 1]},
+                                        f"contract.pdf_chunk_{i}"))
+            vectors.append(self.topic + (0.1 + 0.1 * i) * rng.normal(size=8))
+        store.add_documents(chunks, np.array(vectors))
+        return Retriever(store, self.embedder)
+    
+    def test_unfiltered(self, tmp_path):
+        """Test plain semantic retrieval."""
+        retriever = self.build(tmp_path)
+        
+        results = retriever.retrieve("termination notice", top_k=5)
+        
+        assert len(results) == 5
+        assert all(r["metadata"]["source"] == "other.pdf" for r in results)
+    
+    def test_selective_source_filter(self, tmp_path):
+        """Test that a selective filter still fills top_k from matching chunks."""
+        retriever = self.build(tmp_path)
+        
+        results = retriever.retrieve("termination notice", top_k=3, sources=["contract.pdf"])
+        
+        assert [r["chunk_id"] for r in results] == [
+            "contract.pdf_chunk_0", "contract.pdf_chunk_1", "contract.pdf_chunk_2"
+        ]
+    
+    def test_page_filter(self, tmp_path):
+        """Test single pages and page ranges."""
+        retriever = self.build(tmp_path)
+        
+        single = retriever.retrieve("termination", top_k=5, sources="contract.pdf", pages=4)
+        ranged = retriever.retrieve("termination", top_k=5, sources="contract.pdf",
+                                    pages=(8, 20))
+        
+        assert [r["metadata"]["pages"] for r in single] == [[4]]
+        assert sorted(r["metadata"]["pages"][0] for r in ranged) == [8, 9, 10]
+    
+    def test_ingestion_time_filter(self, tmp_path):
+        """Test datetime bounds against the stamped ingestion time."""
+        retriever = self.build(tmp_path)
+        
+        assert retriever.retrieve("termination", ingested_before=datetime(2000, 1, 1)) == []
+        assert len(retriever.retrieve("termination", ingested_after=datetime(2000, 1, 1))) == 5
+    
+    def test_rerank_stage(self, tmp_path):
+        """Test that the reranker sees the candidate budget and sets the order."""
+        retriever = self.build(tmp_path)
+        
+        class ContractFirst:
+            def predict(self, pairs, batch_size=32, show_progress_bar=False):
+                self.pairs = pairs
+                return np.array([passage.startswith("contract") for _, passage in pairs],
+                                dtype=np.float32)
+        
+        model = ContractFirst()
+        retriever.reranker = CrossEncoderReranker(model=model, candidates=210,
+                                                  batch_size=256)
+        
+        results = retriever.retrieve("termination", top_k=3)
+        
+        assert len(model.pairs) == 210
+        assert all(r["metadata"]["source"] == "contract.pdf" for r in results)
+    
+    def test_retrieve_batch_matches_retrieve(self, tmp_path):
+        """Test that batched retrieval returns each query's retrieve() results."""
+        retriever = self.build(tmp_path)
+        queries = ["termination notice", "termination clause"]
+        
+        batch = retriever.retrieve_batch(queries, top_k=3, sources=["contract.pdf"])
+        
+        for results, query in zip(batch, queries):
+            single = retriever.retrieve(query, top_k=3, sources=["contract.pdf"])
+            assert [r["chunk_id"] for r in results] == [r["chunk_id"] for r in single]
+            assert [r["score"] for r in results] == pytest.approx([r["score"] for r in single])
+        assert retriever.retrieve_batch([]) == []
+    
+    def test_build_filter(self):
+        """Test argument normalization."""
+        assert Retriever.build_filter() is None
+        
+        where = Retriever.build_filter(sources="a.pdf", pages=3, ingested_after=10.0)
+        
+        assert list(where.sources) == ["a.pdf"]
+        assert where.page_range == (3, 3)
+        assert where.ingested_after == 10.0
+
+
+
+class TestHybridRetrieval:
+    """Test suite for BM25 + vector fusion."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.embedder = FakeEmbeddingGenerator({
+            "supplier": [1.0, 0.0, 0.0],
+            "part": [0.0, 1.0, 0.0],
+        })
+        self.chunks = [
+            DocumentChunk("supplier obligations overview", {"source": "a.pdf"}, "a_0"),
+            DocumentChunk("supplier delivery schedule", {"source": "a.pdf"}, "a_1"),
+            DocumentChunk("warranty covers PN-4471-B", {"source": "b.pdf"}, "b_0"),
+        ]
+        self.vectors = np.array([[1.0, 0.1, 0.0], [1.0, 0.2, 0.0], [0.0, 0.0, 1.0]])
+    
+    def build(self, tmp_path, **options):
+        store = VectorStore(str(tmp_path / "db"), provider="numpy")
+        store.add_documents(self.chunks, self.vectors)
+        lexical = BM25Index(str(tmp_path / "bm25"))
+        lexical.add([c.chunk_id for c in self.chunks], [c.text for c in self.chunks],
+                    [c.metadata for c in self.chunks])
+        return Retriever(store, self.embedder, lexical_index=lexical, **options)
+    
+    def test_keyword_only_match_is_returned(self, tmp_path):
+        """Test that an exact identifier far from the query vector is found."""
+        retriever = self.build(tmp_path)
+        
+        results = retriever.retrieve("part PN-4471-B", top_k=2)
+        
+        assert results[0]["chunk_id"] == "b_0"
+        assert results[0]["text"] == "warranty covers PN-4471-B"
+        assert results[0]["metadata"]["source"] == "b.pdf"
+    
+    def test_rrf_scores(self, tmp_path):
+        """Test reciprocal-rank fusion arithmetic."""
+        retriever = self.build(tmp_path, rrf_k=10)
+        
+        results = retriever.retrieve("supplier delivery", top_k=3)
+        
+        # a_1: vector rank 2, lexical rank 1; a_0: vector rank 1, lexical rank 2
+        scores = {r["chunk_id"]: r["score"] for r in results}
+        assert scores["a_0"] == pytest.approx(1 / 11 + 1 / 12)
+        assert scores["a_1"] == pytest.approx(1 / 12 + 1 / 11)
+        assert scores["b_0"] == pytest.approx(1 / 13)
+    
+    def test_weighted_fusion(self, tmp_path):
+        """Test that weighted fusion honours lexical_weight."""
+        vector_only = self.build(tmp_path / "v", fusion="weighted", lexical_weight=0.0)
+        lexical_only = self.build(tmp_path / "l", fusion="weighted", lexical_weight=1.0)
+        
+        assert vector_only.retrieve("supplier delivery", top_k=1)[0]["chunk_id"] == "a_0"
+        assert lexical_only.retrieve("supplier delivery", top_k=1)[0]["chunk_id"] == "a_1"
+    
+    def test_filter_applies_to_both_sides(self, tmp_path):
+        """Test that metadata filters also restrict keyword hits."""
+        retriever = self.build(tmp_path)
+        
+        results = retriever.retrieve("part PN-4471-B", top_k=3, sources="a.pdf")
+        
+        assert {r["chunk_id"] for r in results} == {"a_0", "a_1"}
+    
+    def test_retrieve_batch_hybrid(self, tmp_path):
+        """Test that batched hybrid retrieval fuses each query separately."""
+        retriever = self.build(tmp_path)
+        queries = ["part PN-4471-B", "supplier delivery"]
+        
+        batch = retriever.retrieve_batch(queries, top_k=2)
+        
+        assert batch == [retriever.retrieve(q, top_k=2) for q in queries]
+        assert batch[0][0]["chunk_id"] == "b_0"
+    
+    def test_unknown_fusion(self, tmp_path):
+        """Test that an unknown fusion method is rejected."""
+        with pytest.raises(ValueError):
+            Retriever(None, self.embedder, fusion="max")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
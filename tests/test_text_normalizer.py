@@ -0,0 +1,78 @@
+"""
+Unit tests for TextNormalizer module.
+"""
+
+import itertools
+import re
+
+import pytest
+
+from src.text_normalizer import TextNormalizer
+
+
+def legacy_clean_text(
+    text,
+    collapse_whitespace=True,
+    strip_page_numbers=True,
+    strip_special_chars=True,
+    strip_standalone_numbers=True
+):
+    """Reference: the original chain of re.sub passes, rule by rule."""
+    if collapse_whitespace:
+        text = re.sub(r'\s+', ' ', text)
+    if strip_page_numbers:
+        text = re.sub(r'Page \d+', '', text, flags=re.IGNORECASE)
+    if strip_special_chars:
+        text = re.sub(r'[^\w\s.,!?;:()\-\'"]+', '', text)
+    if strip_standalone_numbers:
+        text = re.sub(r'\b\d+\b', '', text)
+    return text.strip()
+
+
+SAMPLES = [
+    "",
+    "   ",
+    "This  is   a    test.   Page 42  ",
+    "Hello © World™ - this is a test!",
+    "Line one\nLine two\r\n\tindented\x0bvertical\x0cfeed",
+    "a \t b\n\n\nc  \n  d",
+    "PAGE 7 of 12 page 3\npage\t9 Page\n10",
+    "Total: 1,200.50 units in 2024; item 3a and a12 and 12b.",
+    "“Smart quotes” and ‘single’ — em dash – en dash … ellipsis",
+    "Café naïve résumé 中文 Ελληνικά ١٢٣ numbers ²³",
+    "a©12 12©34 x_1 _5_ (42) [7] {8}",
+    " non breaking em space​zero width",
+    "Section 4.2(b): the party's \"obligations\" shall; end!",
+]
+
+
+class TestTextNormalizer:
+    """Test suite for TextNormalizer class."""
+    
+    @pytest.mark.parametrize("text", SAMPLES)
+    def test_matches_legacy_chain(self, text):
+        """Test byte-identical output to the original clean_text chain."""
+        assert TextNormalizer().normalize(text) == legacy_clean_text(text)
+    
+    @pytest.mark.parametrize(
+        "rules", list(itertools.product([True, False], repeat=4))
+    )
+    def test_rule_sets_match_legacy_chain(self, rules):
+        """Test every combination of enabled rules."""
+        normalizer = TextNormalizer(*rules)
+        for text in SAMPLES:
+            assert normalizer.normalize(text) == legacy_clean_text(text, *rules)
+    
+    def test_disabled_rule_is_skipped(self):
+        """Test that a disabled rule leaves its pattern untouched."""
+        normalizer = TextNormalizer(strip_page_numbers=False,
+                                    strip_standalone_numbers=False)
+        assert normalizer.normalize("See  Page 12") == "See Page 12"
+    
+    def test_repr(self):
+        """Test the rule set is visible in the repr."""
+        assert "strip_page_numbers=True" in repr(TextNormalizer())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
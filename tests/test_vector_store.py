@@ -0,0 +1,135 @@
+"""
+Unit tests for VectorStore module.
+"""
+
+import numpy as np
+import pytest
+
+from src.document_processor import DocumentChunk
+from src.metadata_index import MetadataFilter
+from src.vector_store import (
+    VectorStore,
+    _from_chroma_metadata,
+    _to_chroma_metadata,
+    _to_chroma_where,
+)
+
+
+def make_chunks(count):
+    return [
+        DocumentChunk(
+            text=f"chunk text {i}",
+            metadata={"source": "doc.pdf", "pages": [i + 1, i + 2], "chunk_index": i},
+            chunk_id=f"doc.pdf_chunk_{i}"
+        )
+        for i in range(count)
+    ]
+
+
+class TestVectorStore:
+    """Test suite for VectorStore with the numpy provider."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.embeddings = np.eye(4, dtype=np.float32)
+        self.chunks = make_chunks(4)
+    
+    def test_add_and_query(self, tmp_path):
+        """Test that the nearest chunk comes back with text and metadata."""
+        store = VectorStore(str(tmp_path), provider="numpy")
+        store.add_documents(self.chunks, self.embeddings)
+        
+        results = store.query([0.0, 0.0, 1.0, 0.1], top_k=2)
+        
+        assert [r["chunk_id"] for r in results] == ["doc.pdf_chunk_2", "doc.pdf_chunk_3"]
+        assert results[0]["text"] == "chunk text 2"
+        assert results[0]["metadata"]["pages"] == [3, 4]
+        assert results[0]["score"] == pytest.approx(1 / np.sqrt(1.01), rel=1e-5)
+    
+    def test_query_batch(self, tmp_path):
+        """Test many query vectors in one call."""
+        store = VectorStore(str(tmp_path), provider="numpy")
+        store.add_documents(self.chunks, self.embeddings)
+        
+        results = store.query_batch(self.embeddings[::-1], top_k=1)
+        
+        assert [r[0]["chunk_id"] for r in results] == [
+            "doc.pdf_chunk_3", "doc.pdf_chunk_2", "doc.pdf_chunk_1", "doc.pdf_chunk_0"
+        ]
+    
+    def test_delete_count_reset(self, tmp_path):
+        """Test deletion, counting and reset."""
+        store = VectorStore(str(tmp_path), provider="numpy")
+        store.add_documents(self.chunks, self.embeddings)
+        
+        store.delete(["doc.pdf_chunk_0", "unknown"])
+        assert store.count() == 3
+        
+        store.reset()
+        assert store.count() == 0
+    
+    def test_ivf_provider_options(self, tmp_path):
+        """Test that index_options reach the IVF backend."""
+        store = VectorStore(str(tmp_path), provider="ivf",
+                            index_options={"nlist": 2, "nprobe": 2, "train_threshold": 4})
+        store.add_documents(self.chunks, self.embeddings)
+        
+        assert store.backend.is_trained
+        assert store.query([0.0, 0.0, 1.0, 0.1], top_k=1)[0]["chunk_id"] == "doc.pdf_chunk_2"
+    
+    def test_filtered_query_and_ingestion_time(self, tmp_path):
+        """Test that chunks are stamped with ingested_at and can be filtered."""
+        store = VectorStore(str(tmp_path), provider="numpy")
+        store.add_documents(self.chunks, self.embeddings)
+        
+        results = store.query([0.1, 1.0, 0.0, 0.0], top_k=4,
+                              where=MetadataFilter(page_range=(1, 2)))
+        
+        assert [r["chunk_id"] for r in results] == ["doc.pdf_chunk_1", "doc.pdf_chunk_0"]
+        assert results[0]["metadata"]["ingested_at"] > 0
+        assert "ingested_at" not in self.chunks[0].metadata
+    
+    def test_get_and_filter_ids(self, tmp_path):
+        """Test fetching chunks by ID and resolving a filter to IDs."""
+        store = VectorStore(str(tmp_path), provider="numpy")
+        store.add_documents(self.chunks, self.embeddings)
+        store.delete(["doc.pdf_chunk_0"])
+        
+        chunks = store.get(["doc.pdf_chunk_3", "doc.pdf_chunk_0", "unknown"])
+        
+        assert [c["chunk_id"] for c in chunks] == ["doc.pdf_chunk_3"]
+        assert chunks[0]["text"] == "chunk text 3"
+        assert store.filter_ids(MetadataFilter(page_range=(1, 2))) == ["doc.pdf_chunk_1"]
+    
+    def test_unknown_provider(self, tmp_path):
+        """Test that an unknown provider is rejected."""
+        with pytest.raises(ValueError):
+            VectorStore(str(tmp_path), provider="faiss")
+    
+    def test_chroma_metadata_round_trip(self):
+        """Test that list metadata survives ChromaDB's scalar-only values."""
+        metadata = {"source": "doc.pdf", "pages": [3, 4], "chunk_index": 2}
+        
+        stored = _to_chroma_metadata(metadata)
+        
+        assert stored["pages"] == "3,4"
+        assert (stored["first_page"], stored["last_page"]) == (3, 4)
+        assert _from_chroma_metadata(stored) == metadata
+    
+    def test_chroma_where(self):
+        """Test MetadataFilter translation to a ChromaDB where clause."""
+        assert _to_chroma_where(None) is None
+        assert _to_chroma_where(MetadataFilter(sources=["a.pdf"])) == \
+            {"source": {"$in": ["a.pdf"]}}
+        
+        where = _to_chroma_where(MetadataFilter(page_range=(2, 5), ingested_before=10.0))
+        
+        assert where == {"$and": [
+            {"last_page": {"$gte": 2}},
+            {"first_page": {"$lte": 5}},
+            {"ingested_at": {"$lt": 10.0}},
+        ]}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])